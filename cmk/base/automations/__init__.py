@@ -62,6 +62,9 @@ class Automations:
 
             result = automation.execute(args)
 
+            if automation.needs_config:
+                config.get_config_cache().ruleset_matcher.save_persisted_matches()
+
         except (MKAutomationError, MKTimeout) as e:
             console.error(f"{e}", file=sys.stderr)
             if cmk.ccc.debug.enabled():
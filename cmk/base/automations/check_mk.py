@@ -1185,6 +1185,7 @@ class AutomationRenameHosts(Automation):
         # HW/SW Inventory
         if self._rename_host_file(var_dir + "/inventory", oldname, newname):
             self._rename_host_file(var_dir + "/inventory", oldname + ".gz", newname + ".gz")
+            self._rename_host_file(var_dir + "/inventory", oldname + ".sdtree", newname + ".sdtree")
             actions.append("inv")
 
         if self._rename_host_dir(var_dir + "/inventory_archive", oldname, newname):
@@ -1682,6 +1683,7 @@ class AutomationDeleteHosts(ABCDeleteHosts, Automation):
             f"{var_dir}/persisted/{hostname}",
             f"{var_dir}/inventory/{hostname}",
             f"{var_dir}/inventory/{hostname}.gz",
+            f"{var_dir}/inventory/{hostname}.sdtree",
             f"{var_dir}/agent_deployment/{hostname}",
         ]
 
@@ -1723,6 +1725,7 @@ class AutomationDeleteHostsKnownRemote(ABCDeleteHosts, Automation):
             f"{var_dir}/persisted/{hostname}",
             f"{var_dir}/inventory/{hostname}",
             f"{var_dir}/inventory/{hostname}.gz",
+            f"{var_dir}/inventory/{hostname}.sdtree",
         ]
 
     def _delete_host_files(self, hostname: HostName) -> None:
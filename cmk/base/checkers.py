@@ -12,6 +12,7 @@ import itertools
 import logging
 import time
 from collections.abc import Callable, Container, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import partial
 from pathlib import Path
@@ -120,7 +121,12 @@ __all__ = [
 
 
 def _fetch_all(
-    sources: Iterable[Source], *, simulation: bool, file_cache_options: FileCacheOptions, mode: Mode
+    sources: Iterable[Source],
+    *,
+    simulation: bool,
+    file_cache_options: FileCacheOptions,
+    mode: Mode,
+    concurrent_timeout: float | None = None,
 ) -> Sequence[
     tuple[
         SourceInfo,
@@ -129,6 +135,14 @@ def _fetch_all(
     ]
 ]:
     console.verbose(f"{tty.yellow}+{tty.normal} FETCHING DATA")
+    if concurrent_timeout is not None:
+        return _fetch_all_concurrently(
+            sources,
+            simulation=simulation,
+            file_cache_options=file_cache_options,
+            mode=mode,
+            timeout=concurrent_timeout,
+        )
     return [
         _do_fetch(
             source.source_info(),
@@ -140,19 +154,94 @@ def _fetch_all(
     ]
 
 
+def _fetch_all_concurrently(
+    sources: Iterable[Source],
+    *,
+    simulation: bool,
+    file_cache_options: FileCacheOptions,
+    mode: Mode,
+    timeout: float,
+) -> Sequence[
+    tuple[
+        SourceInfo,
+        result.Result[AgentRawData | SNMPRawData, Exception],
+        Snapshot,
+    ]
+]:
+    """Fetch the data of all sources at the same time, each one in its own thread
+
+    A source not done within the timeout results in an MKTimeout error. Its fetcher is
+    interrupted and its thread is waited for, the data it may still return is discarded."""
+    fetch_args = [
+        (
+            source.source_info(),
+            source.file_cache(simulation=simulation, file_cache_options=file_cache_options),
+            source.fetcher(),
+        )
+        for source in sources
+    ]
+    if not fetch_args:
+        return []
+
+    executor = ThreadPoolExecutor(max_workers=len(fetch_args), thread_name_prefix="fetcher")
+    futures: list[
+        Future[
+            tuple[
+                SourceInfo,
+                result.Result[AgentRawData | SNMPRawData, Exception],
+                Snapshot,
+            ]
+        ]
+    ] = []
+    try:
+        futures.extend(
+            executor.submit(
+                _do_fetch, source_info, file_cache, fetcher, mode=mode, per_thread_cpu=True
+            )
+            for source_info, file_cache, fetcher in fetch_args
+        )
+        deadline = time.monotonic() + timeout
+        fetched: list[
+            tuple[
+                SourceInfo,
+                result.Result[AgentRawData | SNMPRawData, Exception],
+                Snapshot,
+            ]
+        ] = []
+        for (source_info, _file_cache, _fetcher), future in zip(fetch_args, futures):
+            try:
+                fetched.append(future.result(timeout=max(deadline - time.monotonic(), 0.0)))
+            except TimeoutError:
+                fetched.append(
+                    (
+                        source_info,
+                        result.Error(MKTimeout(f"Fetching took longer than {timeout:.1f} seconds")),
+                        Snapshot.null(),
+                    )
+                )
+        return fetched
+    finally:
+        # Also on errors (e.g. the MKTimeout of the whole check): no fetcher outlives this call
+        for (_source_info, _file_cache, fetcher), future in zip(fetch_args, futures):
+            if not future.done():
+                fetcher.interrupt()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 def _do_fetch(
     source_info: SourceInfo,
     file_cache: FileCache,
     fetcher: Fetcher,
     *,
     mode: Mode,
+    per_thread_cpu: bool = False,
 ) -> tuple[
     SourceInfo,
     result.Result[AgentRawData | SNMPRawData, Exception],
     Snapshot,
 ]:
     console.debug(f"  Source: {source_info}")
-    with CPUTracker(console.debug) as tracker:
+    with CPUTracker(console.debug, per_thread=per_thread_cpu) as tracker:
         raw_data = get_raw_data(file_cache, fetcher, mode)
     return source_info, raw_data, tracker.duration
 
@@ -409,6 +498,7 @@ class CMKFetcher:
                             ),
                             on_error=self.on_error if not is_cluster else OnError.RAISE,
                             oid_cache_dir=Path(cmk.utils.paths.snmp_scan_cache_dir),
+                            use_cached_scan_result=not self.force_snmp_cache_refresh,
                         ),
                         selected_sections=(
                             self.selected_sections if not is_cluster else NO_SELECTION
@@ -457,6 +547,7 @@ class CMKFetcher:
             simulation=self.simulation_mode,
             file_cache_options=self.file_cache_options,
             mode=self.mode,
+            concurrent_timeout=self.config_cache.concurrent_source_fetching(host_name),
         )
 
 
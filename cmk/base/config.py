@@ -14,6 +14,7 @@ import ipaddress
 import itertools
 import logging
 import marshal
+import mmap
 import numbers
 import os
 import pickle
@@ -22,6 +23,7 @@ import socket
 import struct
 import sys
 import time
+from array import array
 from collections.abc import Callable, Container, Iterable, Iterator, Mapping, Sequence
 from enum import Enum
 from importlib.util import MAGIC_NUMBER as _MAGIC_NUMBER
@@ -841,8 +843,91 @@ class PackedConfigGenerator:
         return helper_config
 
 
+_PACKED_CONFIG_MAGIC: Final = b"CMKPACKEDCONFIG\x01"
+# head length, number of hosts
+_PACKED_CONFIG_HEADER: Final = struct.Struct("=QQ")
+
+
+class _PackedConfigFile:
+    """The mapped packed config, the host sections are unpickled on first access
+
+    Layout of the file (native byte order, it never leaves the site):
+
+        MAGIC | header | head (pickle) | offsets (uint64 per host + 1) | hosts (pickles)
+    """
+
+    def __init__(self, data: mmap.mmap) -> None:
+        self._data = data
+        head_length, num_hosts = _PACKED_CONFIG_HEADER.unpack_from(data, len(_PACKED_CONFIG_MAGIC))
+        start = len(_PACKED_CONFIG_MAGIC) + _PACKED_CONFIG_HEADER.size
+        head = pickle.loads(data[start : start + head_length])  # nosec B301 # BNS:c3c5e9
+        start += head_length
+        self.global_config: Mapping[str, Any] = head["global_config"]
+        self.host_names: Sequence[HostName] = head["host_names"]
+        # variable name -> positions of the hosts having a value
+        self.host_positions: Mapping[str, Sequence[int]] = head["host_positions"]
+        self.positions = {host_name: pos for pos, host_name in enumerate(self.host_names)}
+        self._offsets = array("Q")
+        self._offsets.frombytes(data[start : start + (num_hosts + 1) * 8])
+        self._hosts_start = start + (num_hosts + 1) * 8
+        self._host_sections: dict[int, Mapping[str, Any]] = {}
+
+    def host_section(self, pos: int) -> Mapping[str, Any]:
+        """The values of all per host variables of a host"""
+        if (section := self._host_sections.get(pos)) is None:
+            section = self._host_sections[pos] = pickle.loads(  # nosec B301 # BNS:c3c5e9
+                self._data[
+                    self._hosts_start
+                    + self._offsets[pos] : self._hosts_start
+                    + self._offsets[pos + 1]
+                ]
+            )
+        return section
+
+
+class PackedHostValues(Mapping[HostName | HostAddress, Any]):
+    """The values of a per host variable of the packed config
+
+    The values of a host are unpickled when they are accessed for the first time."""
+
+    def __init__(self, packed_file: _PackedConfigFile, varname: str) -> None:
+        self._packed_file = packed_file
+        self._varname = varname
+        self._positions: frozenset[int] | None = None
+
+    def _host_positions(self) -> frozenset[int]:
+        if self._positions is None:
+            self._positions = frozenset(self._packed_file.host_positions[self._varname])
+        return self._positions
+
+    def __getitem__(self, host_name: HostName | HostAddress) -> Any:
+        if (pos := self._packed_file.positions.get(host_name)) is None:
+            raise KeyError(host_name)
+        return self._packed_file.host_section(pos)[self._varname]
+
+    def __contains__(self, host_name: object) -> bool:
+        return self._packed_file.positions.get(host_name) in self._host_positions()
+
+    def __iter__(self) -> Iterator[HostName]:
+        return (
+            self._packed_file.host_names[pos]
+            for pos in self._packed_file.host_positions[self._varname]
+        )
+
+    def __len__(self) -> int:
+        return len(self._packed_file.host_positions[self._varname])
+
+
 class PackedConfigStore:
-    """Caring about persistence of the packed configuration"""
+    """Caring about persistence of the packed configuration
+
+    A helper usually only checks some of the hosts. The values of the variables mapping host
+    names to host specific values are stored per host, only the ones of the hosts actually
+    needed by a helper are unpickled."""
+
+    _per_host_variable_names: Final = frozenset(
+        ["host_attributes", "ipaddresses", "ipv6addresses", "explicit_snmp_communities"]
+    )
 
     def __init__(self, path: Path) -> None:
         self.path: Final = path
@@ -859,12 +944,67 @@ class PackedConfigStore:
         self.path.parent.mkdir(parents=True, exist_ok=True)
         tmp_path = self.path.with_suffix(f"{self.path.suffix}.compiled")
         with tmp_path.open("wb") as compiled_file:
-            pickle.dump(helper_config, compiled_file)
+            compiled_file.write(self._pack(helper_config))
         tmp_path.rename(self.path)
 
+    def _pack(self, helper_config: Mapping[str, Any]) -> bytes:
+        global_config = dict(helper_config)
+        host_sections: dict[HostName, dict[str, Any]] = {}
+        for varname in sorted(self._per_host_variable_names):
+            if isinstance(host_values := global_config.get(varname), dict):
+                del global_config[varname]
+                for host_name, value in host_values.items():
+                    host_sections.setdefault(host_name, {})[varname] = value
+
+        host_names = list(host_sections)
+        host_positions: dict[str, list[int]] = {
+            varname: []
+            for varname in sorted(self._per_host_variable_names)
+            if varname in helper_config and varname not in global_config
+        }
+        for pos, section in enumerate(host_sections.values()):
+            for varname in section:
+                host_positions[varname].append(pos)
+
+        head = pickle.dumps(
+            {
+                "global_config": global_config,
+                "host_names": host_names,
+                "host_positions": host_positions,
+            },
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        hosts = [
+            pickle.dumps(section, protocol=pickle.HIGHEST_PROTOCOL)
+            for section in host_sections.values()
+        ]
+        offsets = array("Q", [0])
+        for host in hosts:
+            offsets.append(offsets[-1] + len(host))
+        return b"".join(
+            [
+                _PACKED_CONFIG_MAGIC,
+                _PACKED_CONFIG_HEADER.pack(len(head), len(hosts)),
+                head,
+                offsets.tobytes(),
+                *hosts,
+            ]
+        )
+
     def read(self) -> Mapping[str, Any]:
         with self.path.open("rb") as f:
-            return pickle.load(f)  # nosec B301 # BNS:c3c5e9
+            if f.read(len(_PACKED_CONFIG_MAGIC)) != _PACKED_CONFIG_MAGIC:
+                # Written by a previous version
+                f.seek(0)
+                return pickle.load(f)  # nosec B301 # BNS:c3c5e9
+            packed_file = _PackedConfigFile(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        return {
+            **packed_file.global_config,
+            **{
+                varname: PackedHostValues(packed_file, varname)
+                for varname in packed_file.host_positions
+            },
+        }
 
 
 @contextlib.contextmanager
@@ -1921,6 +2061,11 @@ class ConfigCache:
             nodes_of=self._nodes_cache,
             all_configured_hosts=list(set(self.hosts_config)),
             debug_matching_stats=ruleset_matching_stats,
+            match_cache_path=(
+                Path(cmk.utils.paths.tmp_dir, "ruleset_matching_cache")
+                if ruleset_matching_cache
+                else None
+            ),
         )
 
         self.ruleset_matcher.ruleset_optimizer.set_all_processed_hosts(
@@ -3075,6 +3220,14 @@ class ConfigCache:
             and cmk_version.edition(cmk.utils.paths.omd_root) is not cmk_version.Edition.CRE
         )
 
+    def concurrent_source_fetching(self, host_name: HostName) -> float | None:
+        """The timeout of each data source if they are fetched concurrently"""
+        if host_values := self.ruleset_matcher.get_host_values(
+            host_name, concurrent_source_fetching_hosts
+        ):
+            return host_values[0]
+        return concurrent_source_fetching
+
     def get_snmp_backend(self, host_name: HostName | HostAddress) -> SNMPBackendEnum:
         if result := self.__snmp_backend.get(host_name):
             return result
@@ -3098,12 +3251,16 @@ class ConfigCache:
                 return SNMPBackendEnum.INLINE
             if host_backend == "classic":
                 return SNMPBackendEnum.CLASSIC
+            if host_backend == "python":
+                return SNMPBackendEnum.PYTHON
             raise MKGeneralException(f"Bad Host SNMP Backend configuration: {host_backend}")
 
         if with_inline_snmp and snmp_backend_default == "inline":
             return SNMPBackendEnum.INLINE
         if snmp_backend_default == "classic":
             return SNMPBackendEnum.CLASSIC
+        if snmp_backend_default == "python":
+            return SNMPBackendEnum.PYTHON
         # Note: in the above case we raise here.
         # I am not sure if this different behavior is intentional.
         return SNMPBackendEnum.CLASSIC
@@ -4632,6 +4789,7 @@ def get_ruleset_id_mapping() -> Mapping[int, str]:
         id(piggyback_translation): "piggyback_translation",
         id(service_description_translation): "service_description_translation",
         id(snmp_backend_hosts): "snmp_backend_hosts",
+        id(concurrent_source_fetching_hosts): "concurrent_source_fetching_hosts",
         id(non_inline_snmp_hosts): "non_inline_snmp_hosts",
         id(snmp_limit_oid_range): "snmp_limit_oid_range",
         id(snmp_bulk_size): "snmp_bulk_size",
@@ -50,6 +50,10 @@ agent_exclude_sections: list[RuleSpec[dict[str, str]]] = []
 snmp_ports: list[RuleSpec[int]] = []
 tcp_connect_timeout = 5.0
 tcp_connect_timeouts: list[RuleSpec[float]] = []
+# Timeout of each data source in seconds if the sources of a host are fetched concurrently,
+# None fetches the data of one source after the other
+concurrent_source_fetching: float | None = None
+concurrent_source_fetching_hosts: list[RuleSpec[float | None]] = []
 use_dns_cache = True  # prevent DNS by using own cache file
 delay_precompile = False  # delay Python compilation to Nagios execution
 restart_locking: Literal["abort", "wait"] | None = "abort"
@@ -83,7 +87,7 @@ http_proxies: dict[str, dict[str, str]] = {}
 # SNMP communities and encoding
 
 # Global config for SNMP Backend
-snmp_backend_default: Literal["inline", "classic"] = "inline"
+snmp_backend_default: Literal["inline", "classic", "python"] = "inline"
 # Deprecated: Replaced by snmp_backend_hosts
 use_inline_snmp: bool = True
 
@@ -354,3 +358,4 @@ config_storage_format: Literal["standard", "raw", "pickle"] = "pickle"
 automatic_host_removal: list[RuleSpec[object]] = []
 
 ruleset_matching_stats = False
+ruleset_matching_cache = False
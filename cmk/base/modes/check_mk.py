@@ -3,6 +3,7 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import contextlib
 import dataclasses
 import itertools
 import logging
@@ -176,6 +177,8 @@ def parse_snmp_backend(backend: object) -> SNMPBackendEnum | None:
             return SNMPBackendEnum.INLINE
         case "classic":
             return SNMPBackendEnum.CLASSIC
+        case "python":
+            return SNMPBackendEnum.PYTHON
         case "stored-walk":
             return SNMPBackendEnum.STORED_WALK
         case _:
@@ -312,7 +315,7 @@ _SNMP_BACKEND_OPTION: Final = Option(
     long_option="snmp-backend",
     short_help="Override default SNMP backend",
     argument=True,
-    argument_descr="inline|classic|stored-walk",
+    argument_descr="inline|classic|python|stored-walk",
 )
 
 # .
@@ -1247,6 +1250,8 @@ def mode_flush(hosts: list[HostName]) -> None:  # pylint: disable=too-many-branc
         path = cmk.utils.paths.var_dir + "/inventory/" + host
         if os.path.exists(path):
             os.remove(path)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path + ".sdtree")
             print_(tty.bold + tty.yellow + " inventory")
 
         if not flushed:
@@ -2157,6 +2162,8 @@ def mode_discover(options: _DiscoveryOptions, args: list[str]) -> None:
             on_error=on_error,
         )
 
+    config_cache.ruleset_matcher.save_persisted_matches()
+
 
 modes.register(
     Mode(
@@ -2656,6 +2663,7 @@ def _execute_active_check_inventory(
     tree_or_archive_store = TreeOrArchiveStore(
         cmk.utils.paths.inventory_output_dir,
         cmk.utils.paths.inventory_archive_dir,
+        cmk.utils.paths.inventory_table_index_dir,
     )
     previous_tree = tree_or_archive_store.load_previous(host_name=host_name)
 
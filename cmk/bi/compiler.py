@@ -6,9 +6,11 @@
 from __future__ import annotations
 
 import ast
+import hashlib
 import os
-import pickle
+import re
 import time
+from collections.abc import Mapping
 from pathlib import Path
 from typing import TypedDict
 
@@ -18,10 +20,26 @@ from cmk.utils.log import logger
 from cmk.utils.paths import default_config_dir
 from cmk.utils.redis import get_redis_client
 
+from cmk.bi.actions import (
+    BICallARuleAction,
+    BIStateOfHostAction,
+    BIStateOfRemainingServicesAction,
+    BIStateOfServiceAction,
+)
 from cmk.bi.aggregation import BIAggregation
 from cmk.bi.data_fetcher import BIStructureFetcher, get_cache_dir, SiteProgramStart
-from cmk.bi.lib import SitesCallback
+from cmk.bi.lib import BIHostData, SitesCallback
+from cmk.bi.node_generator_interface import ABCBINodeGenerator
+from cmk.bi.packed_aggregation import (
+    branch_summaries,
+    branch_titles,
+    find_branch,
+    load_packed_aggregation,
+    pack_aggregation,
+)
 from cmk.bi.packs import BIAggregationPacks
+from cmk.bi.rule_interface import bi_rule_id_registry
+from cmk.bi.search import BIFixedArgumentsSearch, BIHostSearch, BIServiceSearch
 from cmk.bi.searcher import BISearcher
 from cmk.bi.trees import BICompiledAggregation, BICompiledRule, FrozenBIInfo
 from cmk.bi.type_defs import frozen_aggregations_dir
@@ -36,6 +54,16 @@ class ConfigStatus(TypedDict):
     online_sites: set[SiteProgramStart]
 
 
+class AggregationDependencies(TypedDict):
+    config: str | None
+    hosts: set[str]
+
+
+class CompilationDependencies(TypedDict):
+    hosts: dict[str, str]
+    aggregations: dict[str, AggregationDependencies]
+
+
 path_compiled_aggregations = Path(get_cache_dir(), "compiled_aggregations")
 
 
@@ -48,6 +76,7 @@ class BICompiler:
         self._compiled_aggregations: dict[str, BICompiledAggregation] = {}
         self._path_compilation_lock = Path(get_cache_dir(), "compilation.LOCK")
         self._path_compilation_timestamp = Path(get_cache_dir(), "last_compilation")
+        self._path_compilation_dependencies = Path(get_cache_dir(), "compilation_dependencies")
         path_compiled_aggregations.mkdir(parents=True, exist_ok=True)
 
         self._redis_client: Redis[str] | None = None
@@ -66,9 +95,8 @@ class BICompiler:
         self, aggr_name: str
     ) -> tuple[BICompiledAggregation, BICompiledRule] | None:
         for _name, compiled_aggregation in self._compiled_aggregations.items():
-            for branch in compiled_aggregation.branches:
-                if branch.properties.title == aggr_name:
-                    return compiled_aggregation, branch
+            if branch := find_branch(compiled_aggregation, aggr_name):
+                return compiled_aggregation, branch
         return None
 
     def cleanup(self) -> None:
@@ -78,6 +106,10 @@ class BICompiler:
         try:
             self._check_compilation_status()
         finally:
+            invalid_aggregations = self._load_compiled_aggregations()
+        if invalid_aggregations:
+            # E.g. packed by a previous version, the compilation replaces them
+            self._check_compilation_status(force=True)
             self._load_compiled_aggregations()
 
     def get_frozen_aggr_id(self, frozen_info: FrozenBIInfo) -> str:
@@ -91,11 +123,11 @@ class BICompiler:
 
     def _freeze_new_branches(self, compiled_aggregation: BICompiledAggregation) -> bool:
         new_branch_found = False
-        for branch in list(compiled_aggregation.branches):
-            if self._frozen_branch_file(branch.properties.title).exists():
+        for branch_title in list(branch_titles(compiled_aggregation)):
+            if self._frozen_branch_file(branch_title).exists():
                 continue
             new_branch_found = True
-            self.freeze_branch(branch.properties.title)
+            self.freeze_branch(branch_title)
         return new_branch_found
 
     def freeze_branch(self, branch_name: str) -> None:
@@ -166,15 +198,13 @@ class BICompiler:
 
             # Read frozen branches. Each branch gets a separate aggregation ID since
             # the computation time may differ, which also means possibly changed computation options
-            for branch in list(compiled_aggregation.branches):
-                if branch.properties.title in frozen_branch_names:
+            for branch_title in list(branch_titles(compiled_aggregation)):
+                if branch_title in frozen_branch_names:
                     frozen_aggregation = BIAggregation.create_trees_from_schema(
-                        ast.literal_eval(
-                            (frozen_aggregations_dir / branch.properties.title).read_text()
-                        )
+                        ast.literal_eval((frozen_aggregations_dir / branch_title).read_text())
                     )
                     frozen_aggregation.frozen_info = FrozenBIInfo(
-                        compiled_aggregation.id, branch.properties.title
+                        compiled_aggregation.id, branch_title
                     )
                     updated_aggregations[
                         self.get_frozen_aggr_id(frozen_aggregation.frozen_info)
@@ -188,7 +218,9 @@ class BICompiler:
 
         return updated_aggregations
 
-    def _load_compiled_aggregations(self) -> None:
+    def _load_compiled_aggregations(self) -> list[str]:
+        """Returns the IDs of the aggregations which can not be loaded from invalid files"""
+        invalid_aggregations = []
         for path_object in path_compiled_aggregations.iterdir():
             if path_object.is_dir():
                 continue
@@ -197,15 +229,20 @@ class BICompiler:
                 continue
 
             self._logger.debug("Loading cached aggregation results %s" % aggr_id)
-            self._compiled_aggregations[aggr_id] = BIAggregation.create_trees_from_schema(
-                store.load_object_from_pickle_file(path_object, default={})
-            )
+            try:
+                self._compiled_aggregations[aggr_id] = load_packed_aggregation(path_object)
+            except ValueError as e:
+                self._logger.warning("Cannot load compiled aggregation %s: %s" % (aggr_id, e))
+                invalid_aggregations.append(aggr_id)
+            except OSError as e:
+                self._logger.warning("Cannot load compiled aggregation %s: %s" % (aggr_id, e))
 
         self._compiled_aggregations = self._manage_frozen_branches(self._compiled_aggregations)
+        return invalid_aggregations
 
-    def _check_compilation_status(self) -> None:
+    def _check_compilation_status(self, force: bool = False) -> None:
         current_configstatus = self.compute_current_configstatus()
-        if not self._compilation_required(current_configstatus):
+        if not force and not self._compilation_required(current_configstatus):
             self._logger.debug("No compilation required")
             return
 
@@ -213,33 +250,73 @@ class BICompiler:
             # Re-check compilation required after lock has been required
             # Another apache might have done the job
             current_configstatus = self.compute_current_configstatus()
-            if not self._compilation_required(current_configstatus):
+            if not force and not self._compilation_required(current_configstatus):
                 self._logger.debug("No compilation required. An other process already compiled it")
                 return
 
             self.prepare_for_compilation(current_configstatus["online_sites"])
 
-            # Compile the raw tree
+            previous_dependencies = self._load_compilation_dependencies()
+            dependencies: CompilationDependencies = {
+                "hosts": compute_host_fingerprints(self.bi_searcher.hosts),
+                "aggregations": {},
+            }
+            changed_hosts = find_changed_hosts(
+                previous_dependencies["hosts"], dependencies["hosts"]
+            )
+            self._logger.debug("%d hosts changed since the last compilation", len(changed_hosts))
+
+            # Compile the raw tree, but only of the aggregations affected by the changes
             all_aggregations_by_id: dict[str, BIAggregation] = {
                 x.id: x for x in self._bi_packs.get_all_aggregations()
             }
+            recompiled_aggregations: dict[str, BICompiledAggregation] = {}
             for aggregation in all_aggregations_by_id.values():
+                config_fingerprint = self._compute_config_fingerprint(aggregation)
+                previous = previous_dependencies["aggregations"].get(aggregation.id)
+                path = path_compiled_aggregations.joinpath(aggregation.id)
+                if (
+                    previous is not None
+                    and config_fingerprint is not None
+                    and previous["config"] == config_fingerprint
+                    and not is_affected_by_host_changes(
+                        aggregation, previous["hosts"], changed_hosts, self.bi_searcher.hosts
+                    )
+                ):
+                    try:
+                        self._compiled_aggregations[aggregation.id] = load_packed_aggregation(path)
+                        dependencies["aggregations"][aggregation.id] = previous
+                        continue
+                    except (OSError, ValueError):
+                        pass  # Missing or outdated file format, compile it again
+
                 start = time.time()
-                self._compiled_aggregations[aggregation.id] = aggregation.compile(self.bi_searcher)
+                compiled_aggregation = aggregation.compile(self.bi_searcher)
+                self._compiled_aggregations[aggregation.id] = compiled_aggregation
+                recompiled_aggregations[aggregation.id] = compiled_aggregation
+                dependencies["aggregations"][aggregation.id] = {
+                    "config": config_fingerprint,
+                    "hosts": referenced_hosts(compiled_aggregation),
+                }
                 self._logger.debug(f"Compilation of {aggregation.id} took {time.time() - start:f}")
+            self._logger.debug(
+                "Compiled %d of %d aggregations"
+                % (len(recompiled_aggregations), len(all_aggregations_by_id))
+            )
             self._verify_aggregation_title_uniqueness(self._compiled_aggregations)
 
-            for aggr_id, compiled_aggr in self._compiled_aggregations.items():
+            for aggr_id, compiled_aggr in recompiled_aggregations.items():
                 start = time.time()
-                result = compiled_aggr.serialize()
+                result = pack_aggregation(compiled_aggr)
                 self._logger.debug(
                     "Schema dump %s took config took %f (%d branches)"
                     % (aggr_id, time.time() - start, len(compiled_aggr.branches))
                 )
-                self._save_data(path_compiled_aggregations.joinpath(aggr_id), result)
+                store.save_bytes_to_file(path_compiled_aggregations.joinpath(aggr_id), result)
 
             self._compiled_aggregations = self._manage_frozen_branches(self._compiled_aggregations)
             self._generate_part_of_aggregation_lookup(self._compiled_aggregations)
+            store.save_object_to_pickle_file(self._path_compilation_dependencies, dependencies)
 
         known_sites = {kv[0]: kv[1] for kv in current_configstatus.get("known_sites", set())}
         self._cleanup_vanished_aggregations()
@@ -248,6 +325,25 @@ class BICompiler:
             str(self._path_compilation_timestamp), str(current_configstatus["configfile_timestamp"])
         )
 
+    def _load_compilation_dependencies(self) -> CompilationDependencies:
+        return store.load_object_from_pickle_file(
+            self._path_compilation_dependencies, default={"hosts": {}, "aggregations": {}}
+        )
+
+    def _compute_config_fingerprint(self, aggregation: BIAggregation) -> str | None:
+        """Fingerprint of the aggregation and all rules it calls, None if it can't be computed"""
+        try:
+            rules = [
+                (bi_rule.pack_id, bi_rule.serialize())
+                for rule_id in sorted(self._bi_packs.get_rule_ids_of_aggregation(aggregation.id))
+                for bi_rule in [self._bi_packs.get_rule_mandatory(rule_id)]
+            ]
+        except MKGeneralException:
+            return None
+        return hashlib.sha256(
+            repr((aggregation.pack_id, aggregation.serialize(), rules)).encode("utf-8")
+        ).hexdigest()
+
     def _cleanup_vanished_aggregations(self) -> None:
         valid_aggregations = list(self._compiled_aggregations.keys())
         for path_object in path_compiled_aggregations.iterdir():
@@ -262,8 +358,7 @@ class BICompiler:
     ) -> None:
         used_titles: dict[str, str] = {}
         for aggr_id, bi_aggregation in compiled_aggregations.items():
-            for bi_branch in bi_aggregation.branches:
-                branch_title = bi_branch.properties.title
+            for branch_title in branch_titles(bi_aggregation):
                 if branch_title in used_titles:
                     raise MKGeneralException(
                         _(
@@ -351,9 +446,6 @@ class BICompiler:
 
         return latest_timestamp
 
-    def _save_data(self, filepath: Path, data: dict) -> None:
-        store.save_bytes_to_file(filepath, pickle.dumps(data))
-
     def _get_redis_client(self) -> Redis[str]:
         if self._redis_client is None:
             self._redis_client = get_redis_client()
@@ -391,15 +483,13 @@ class BICompiler:
     def _generate_part_of_aggregation_lookup(self, compiled_aggregations):
         part_of_aggregation_map: dict[str, list[str]] = {}
         for aggr_id, compiled_aggregation in compiled_aggregations.items():
-            for branch in compiled_aggregation.branches:
-                for _site, host_name, service_description in branch.required_elements():
+            for branch_title, required_elements in branch_summaries(compiled_aggregation):
+                for _site, host_name, service_description in required_elements:
                     # This information can be used to selectively load the relevant compiled
                     # aggregation for any host/service. Right now it is only an indicator if this
                     # host/service is part of an aggregation
                     key = f"bi:aggregation_lookup:{host_name}:{service_description}"
-                    part_of_aggregation_map.setdefault(key, []).append(
-                        f"{aggr_id}\t{branch.properties.title}"
-                    )
+                    part_of_aggregation_map.setdefault(key, []).append(f"{aggr_id}\t{branch_title}")
 
         client = self._get_redis_client()
 
@@ -420,3 +510,144 @@ class BICompiler:
             pipeline.delete(*obsolete_keys)
 
         pipeline.execute()
+
+
+def compute_host_fingerprints(hosts: Mapping[str, BIHostData]) -> dict[str, str]:
+    return {host_name: _host_fingerprint(host) for host_name, host in hosts.items()}
+
+
+def _host_fingerprint(host: BIHostData) -> str:
+    # The sets and dicts are sorted, the fingerprints are compared across processes
+    return hashlib.sha256(
+        repr(
+            (
+                host.site_id,
+                sorted(host.tags),
+                sorted(host.labels.items()),
+                host.folder,
+                sorted(
+                    (name, sorted(service.tags), sorted(service.labels.items()))
+                    for name, service in host.services.items()
+                ),
+                host.children,
+                host.parents,
+                host.alias,
+                host.name,
+            )
+        ).encode("utf-8")
+    ).hexdigest()
+
+
+def find_changed_hosts(previous: Mapping[str, str], current: Mapping[str, str]) -> set[str]:
+    """The hosts which have been added, removed or modified"""
+    return {
+        host_name
+        for host_name in previous.keys() | current.keys()
+        if previous.get(host_name) != current.get(host_name)
+    }
+
+
+def referenced_hosts(compiled_aggregation: BICompiledAggregation) -> set[str]:
+    return {
+        host_name
+        for _title, required_elements in branch_summaries(compiled_aggregation)
+        for _site_id, host_name, _service_description in required_elements
+    }
+
+
+def has_relational_searches(aggregation: BIAggregation) -> bool:
+    """Whether the aggregation or one of the rules it calls finds hosts by their relations
+
+    These are the parents and children of a host and the hosts whose names are taken from
+    the results of another search, e.g. from the match groups of the host of a service.
+    Such hosts can be any host, they are not found by compiling with only some of them.
+    Looking up the host a search has just found (`$HOSTNAME$`, also when passed on to the
+    parameters of a rule) is no relation.
+    """
+    # The node generators with the macros standing for the name of the host found last
+    pending: list[tuple[ABCBINodeGenerator, frozenset[str]]] = [(aggregation.node, frozenset())]
+    seen_rules: set[tuple[str, frozenset[str]]] = set()
+    while pending:
+        generator, host_macros = pending.pop()
+        search = generator.search
+        if isinstance(search, BIHostSearch | BIServiceSearch):
+            if isinstance(search, BIHostSearch) and _referred_type(search) != "host":
+                return True
+            host_choice = search.conditions["host_choice"]
+            if host_choice["type"] != "all_hosts" and not _is_local_host_regex(
+                host_choice["pattern"], host_macros
+            ):
+                return True
+            host_macros = frozenset({"$HOSTNAME$"})
+        elif isinstance(search, BIFixedArgumentsSearch):
+            host_macros -= {f"${argument['key']}$" for argument in search.arguments}
+
+        action = generator.action
+        if isinstance(
+            action, BIStateOfHostAction | BIStateOfServiceAction | BIStateOfRemainingServicesAction
+        ):
+            if not _is_local_host_regex(action.host_regex, host_macros):
+                return True
+        elif isinstance(action, BICallARuleAction):
+            if (rule := bi_rule_id_registry.get(action.rule_id)) is None:
+                return True
+            rule_host_macros = frozenset(
+                f"${name}$"
+                for name, argument in zip(rule.params.arguments, action.params.arguments)
+                if argument in host_macros
+            )
+            if (action.rule_id, rule_host_macros) not in seen_rules:
+                seen_rules.add((action.rule_id, rule_host_macros))
+                pending.extend((node, rule_host_macros) for node in rule.get_nodes())
+    return False
+
+
+def _referred_type(search: BIHostSearch) -> str:
+    # TODO: remove with version 2.3: unconverted legacy refer_to field
+    return search.refer_to if isinstance(search.refer_to, str) else search.refer_to["type"]
+
+
+def _is_local_host_regex(regex: str, host_macros: frozenset[str]) -> bool:
+    return regex in host_macros or not re.search(r"\$\w+\$", regex)
+
+
+def is_affected_by_host_changes(
+    aggregation: BIAggregation,
+    previously_referenced_hosts: set[str],
+    changed_hosts: set[str],
+    hosts: Mapping[str, BIHostData],
+) -> bool:
+    """Whether the compiled aggregation may differ because of the changed hosts
+
+    An aggregation is affected if it referenced one of the changed hosts or if one of them
+    would now be part of it. The latter is found out by compiling the aggregation with only
+    the changed hosts and, since the searches may depend on each other, with the changed and
+    the previously referenced hosts. Both is way cheaper than compiling it with all hosts.
+    Aggregations with relational searches are always affected.
+    """
+    if not changed_hosts:
+        return False
+    if previously_referenced_hosts & changed_hosts:
+        return True
+    if has_relational_searches(aggregation):
+        return True
+    if not (present_changed_hosts := {h: hosts[h] for h in changed_hosts if h in hosts}):
+        return False  # only hosts have been removed, which were not referenced
+
+    for probe_hosts in (
+        present_changed_hosts,
+        {
+            **{h: hosts[h] for h in previously_referenced_hosts if h in hosts},
+            **present_changed_hosts,
+        },
+    ):
+        probe_searcher = BISearcher()
+        probe_searcher.set_hosts(probe_hosts)
+        try:
+            probe = aggregation.compile(probe_searcher)
+        except Exception:
+            # e.g. children of the hosts which are not part of the probe
+            return True
+        if referenced_hosts(probe) & changed_hosts:
+            return True
+    return False
@@ -11,7 +11,9 @@ from cmk.utils.hostaddress import HostName
 from cmk.utils.servicename import ServiceName
 
 from cmk.bi.data_fetcher import BIStatusFetcher
+from cmk.bi.flattened_computation import BIBatchComputation
 from cmk.bi.lib import NodeResultBundle, RequiredBIElement
+from cmk.bi.packed_aggregation import branch_summaries, find_branch
 from cmk.bi.trees import BICompiledAggregation, BICompiledRule
 from cmk.ccc.plugin_registry import Registry
 
@@ -75,9 +77,8 @@ class BIComputer:
         if not compiled_aggregation:
             return []
 
-        for branch in compiled_aggregation.branches:
-            if branch.properties.title == title:
-                return self.compute_results([(compiled_aggregation, [branch])])
+        if branch := find_branch(compiled_aggregation, title):
+            return self.compute_results([(compiled_aggregation, [branch])])
         return []
 
     def compute_result_for_filter(
@@ -112,10 +113,12 @@ class BIComputer:
         self, required_aggregations: list[tuple[BICompiledAggregation, list[BICompiledRule]]]
     ) -> list[tuple[BICompiledAggregation, list[NodeResultBundle]]]:
         results = []
+        # Subtrees shared by several aggregations are only computed once
+        batch_computation = BIBatchComputation(self._bi_status_fetcher)
         for compiled_aggregation, branches in required_aggregations:
-            node_result_bundles = compiled_aggregation.compute_branches(
+            node_result_bundles = batch_computation.compute_branches(
+                compiled_aggregation,
                 branches,
-                self._bi_status_fetcher,
             )
 
             # Postprocess results. Custom user plugins may add additional information for each node
@@ -137,10 +140,13 @@ class BIComputer:
         if not self._use_aggregation(compiled_aggregation, bi_aggregation_filter):
             return []
 
+        # Only the matching branches of packed aggregations are unpacked
         return [
-            compiled_branch
-            for compiled_branch in compiled_aggregation.branches
-            if self._use_aggregation_branch(compiled_branch, bi_aggregation_filter)
+            compiled_aggregation.branches[index]
+            for index, (title, required_elements) in enumerate(
+                branch_summaries(compiled_aggregation)
+            )
+            if self._use_aggregation_branch(title, required_elements, bi_aggregation_filter)
         ]
 
     def _use_aggregation(
@@ -175,9 +181,11 @@ class BIComputer:
         )
 
     def _use_aggregation_branch(
-        self, compiled_branch: BICompiledRule, bi_aggregation_filter: BIAggregationFilter
+        self,
+        title: str,
+        branch_elements: set[RequiredBIElement],
+        bi_aggregation_filter: BIAggregationFilter,
     ) -> bool:
-        branch_elements = compiled_branch.required_elements()
         branch_hosts = {x[1] for x in branch_elements}
         branch_services = {(x[1], x[2]) for x in branch_elements if x[2] is not None}
         if bi_aggregation_filter.hosts and not branch_hosts.intersection(
@@ -190,10 +198,7 @@ class BIComputer:
         ):
             return False
 
-        return (
-            not bi_aggregation_filter.aggr_titles
-            or compiled_branch.properties.title in bi_aggregation_filter.aggr_titles
-        )
+        return not bi_aggregation_filter.aggr_titles or title in bi_aggregation_filter.aggr_titles
 
     #   .--Legacy--------------------------------------------------------------.
     #   |                  _                                                   |
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Computation of many compiled branches in one pass
+
+Instead of recursively computing each branch, the nodes of a branch are flattened into
+a list in which every node follows its nested nodes. The list is evaluated front to
+back. Leaves and structurally equal subtrees are very often part of several
+aggregations, e.g. the host and service rules of the default aggregations. Their
+results are computed only once per pass and shared by all branches containing them.
+
+The flattened form and the structural keys of the subtrees are computed once per branch.
+Packed aggregations store them, see pack_aggregation(), so their branches are never
+flattened again.
+
+The result is the same as the one of BICompiledRule.compute().
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Hashable, Iterator, Mapping, Sequence
+from typing import Any, NamedTuple
+from weakref import WeakKeyDictionary
+
+from cmk.bi.lib import (
+    ABCBICompiledNode,
+    ABCBIStatusFetcher,
+    BIAggregationComputationOptions,
+    NodeComputeResult,
+    NodeResultBundle,
+)
+from cmk.bi.rule import BIRule
+from cmk.bi.trees import BICompiledAggregation, BICompiledLeaf, BICompiledRule
+
+_NodeResults = tuple[NodeComputeResult, NodeComputeResult | None]
+# subtree id, computation options, use assumed
+_ResultKey = tuple[int, tuple[bool, bool, bool], bool]
+
+
+class FlattenedBranch(NamedTuple):
+    nodes: Sequence[ABCBICompiledNode]
+    """All nodes of the branch, each one after its nested nodes, the branch is the last"""
+    nested_positions: Sequence[Sequence[int]]
+    """The positions of the nested nodes of each node"""
+    subtree_keys: Sequence[bytes | None]
+    """The structural key of the subtree of each node, None if it is never shared"""
+
+
+# The flattened form of the branches flattened or unpacked in this process
+_flattened_branches: WeakKeyDictionary[BICompiledRule, FlattenedBranch] = WeakKeyDictionary()
+
+
+def flatten_branch(branch: BICompiledRule) -> FlattenedBranch:
+    if (flattened_branch := _flattened_branches.get(branch)) is not None:
+        return flattened_branch
+
+    nodes: list[ABCBICompiledNode] = []
+    nested_positions: list[list[int]] = []
+    subtree_keys: list[bytes | None] = []
+    # node, positions of its already flattened nested nodes, its remaining nested nodes
+    stack: list[tuple[ABCBICompiledNode, list[int], Iterator[ABCBICompiledNode]]] = [
+        (branch, [], iter(branch.nodes))
+    ]
+    while stack:
+        node, positions, remaining = stack[-1]
+        if (nested_node := next(remaining, None)) is not None:
+            stack.append(
+                (
+                    nested_node,
+                    [],
+                    iter(nested_node.nodes if isinstance(nested_node, BICompiledRule) else ()),
+                )
+            )
+            continue
+        stack.pop()
+        if stack:
+            stack[-1][1].append(len(nodes))
+        nodes.append(node)
+        nested_positions.append(positions)
+        subtree_keys.append(_subtree_key(node, [subtree_keys[pos] for pos in positions]))
+
+    flattened_branch = _flattened_branches[branch] = FlattenedBranch(
+        nodes, nested_positions, subtree_keys
+    )
+    return flattened_branch
+
+
+def _subtree_key(node: ABCBICompiledNode, nested_subtree_keys: list[bytes | None]) -> bytes | None:
+    if isinstance(node, BICompiledLeaf):
+        key: tuple = ("leaf", node.site_id, node.host_name, node.service_description)
+    elif isinstance(node, BICompiledRule) and None not in nested_subtree_keys:
+        # Everything the aggregation of the nested results depends on
+        key = (
+            "rule",
+            node.aggregation_function.serialize(),
+            node.properties.state_messages,
+            nested_subtree_keys,
+        )
+    else:
+        return None
+    return hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+
+
+def serialize_flattened_branch(branch: BICompiledRule) -> dict[str, Any]:
+    """The serialized flattened form of a branch, the nodes are serialized without their
+    nested nodes"""
+    flattened_branch = flatten_branch(branch)
+    node_configs: list[dict[str, Any]] = []
+    # The serialized nodes in the order of the flattened nodes
+    stack: list[tuple[dict[str, Any], Iterator[dict[str, Any]]]] = [
+        (config := branch.serialize(), iter(config["nodes"]))
+    ]
+    while stack:
+        config, remaining = stack[-1]
+        if (nested_config := next(remaining, None)) is not None:
+            stack.append((nested_config, iter(nested_config.get("nodes", ()))))
+            continue
+        stack.pop()
+        node_configs.append({**config, "nodes": []} if "nodes" in config else config)
+    return {
+        "nodes": node_configs,
+        "nested_positions": flattened_branch.nested_positions,
+        "subtree_keys": flattened_branch.subtree_keys,
+    }
+
+
+def deserialize_flattened_branch(flattened_config: Mapping[str, Any]) -> BICompiledRule:
+    """The branch of serialize_flattened_branch(), without flattening it again"""
+    nodes: list[ABCBICompiledNode] = []
+    for config, positions in zip(flattened_config["nodes"], flattened_config["nested_positions"]):
+        node: ABCBICompiledNode
+        if config["type"] == BICompiledRule.kind():
+            node = BIRule.create_tree_from_schema(config)
+            node.nodes = [nodes[pos] for pos in positions]
+        elif config["type"] == BICompiledLeaf.kind():
+            node = BICompiledLeaf(**config)
+        else:
+            raise NotImplementedError("Unknown node type")
+        nodes.append(node)
+    branch = nodes[-1]
+    assert isinstance(branch, BICompiledRule)
+    _flattened_branches[branch] = FlattenedBranch(
+        nodes, flattened_config["nested_positions"], flattened_config["subtree_keys"]
+    )
+    return branch
+
+
+class BIBatchComputation:
+    """Computes the branches of several aggregations, sharing the results of equal subtrees
+
+    The states of the status fetcher must not change during the lifetime of an instance."""
+
+    def __init__(self, bi_status_fetcher: ABCBIStatusFetcher) -> None:
+        self._bi_status_fetcher = bi_status_fetcher
+        self._assumed_state_ids = set(bi_status_fetcher.assumed_states)
+        # structural key of a subtree -> subtree id
+        self._subtree_ids: dict[Hashable, int] = {}
+        self._results: dict[_ResultKey, _NodeResults | None] = {}
+
+    def compute_branches(
+        self, compiled_aggregation: BICompiledAggregation, branches: Sequence[BICompiledRule]
+    ) -> list[NodeResultBundle]:
+        """Same as BICompiledAggregation.compute_branches()"""
+        aggregation_results = []
+        for branch in branches:
+            compute_assumed_state = any(
+                self._assumed_state_ids.intersection(branch.required_elements())
+            )
+            result = self._compute_branch(
+                branch, compiled_aggregation.computation_options, compute_assumed_state
+            )
+            if result is not None:
+                aggregation_results.append(result)
+        return aggregation_results
+
+    def _compute_branch(
+        self,
+        branch: BICompiledRule,
+        computation_options: BIAggregationComputationOptions,
+        use_assumed: bool,
+    ) -> NodeResultBundle | None:
+        options_key = (
+            bool(computation_options.use_hard_states),
+            bool(computation_options.escalate_downtimes_as_warn),
+            bool(computation_options.freeze_aggregations),
+        )
+        flattened_branch = flatten_branch(branch)
+        bundles: list[NodeResultBundle | None] = []
+        for node, positions, subtree_key in zip(*flattened_branch):
+            result_key: _ResultKey = (
+                self._subtree_ids.setdefault(
+                    # Not shared with other subtrees
+                    ("node", id(node)) if subtree_key is None else subtree_key,
+                    len(self._subtree_ids),
+                ),
+                options_key,
+                use_assumed,
+            )
+
+            if isinstance(node, BICompiledLeaf):
+                bundles.append(
+                    self._compute_leaf(node, computation_options, use_assumed, result_key)
+                )
+                continue
+
+            if not isinstance(node, BICompiledRule):
+                bundles.append(
+                    node.compute(computation_options, self._bi_status_fetcher, use_assumed)
+                )
+                continue
+
+            nested_bundles = [bundle for pos in positions if (bundle := bundles[pos]) is not None]
+            if not nested_bundles:
+                bundles.append(None)
+                continue
+            if (results := self._results.get(result_key)) is None:
+                results = self._results[result_key] = node.aggregate_nested_results(
+                    nested_bundles, computation_options, use_assumed
+                )
+            else:
+                results = _fresh_results(results)
+            bundles.append(NodeResultBundle(results[0], results[1], nested_bundles, node))
+
+        return bundles[-1]
+
+    def _compute_leaf(
+        self,
+        leaf: BICompiledLeaf,
+        computation_options: BIAggregationComputationOptions,
+        use_assumed: bool,
+        result_key: _ResultKey,
+    ) -> NodeResultBundle | None:
+        if result_key in self._results:
+            if (results := self._results[result_key]) is None:
+                return None
+            actual_result, assumed_result = _fresh_results(results)
+            return NodeResultBundle(actual_result, assumed_result, [], leaf)
+
+        bundle = leaf.compute(computation_options, self._bi_status_fetcher, use_assumed)
+        self._results[result_key] = (
+            None if bundle is None else (bundle.actual_result, bundle.assumed_result)
+        )
+        return bundle
+
+
+def _fresh_results(results: _NodeResults) -> _NodeResults:
+    # The custom infos of a result may be extended by the postprocessing plugins
+    actual_result, assumed_result = results
+    return (
+        actual_result._replace(custom_infos={}),
+        None if assumed_result is None else assumed_result._replace(custom_infos={}),
+    )
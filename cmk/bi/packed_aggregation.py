@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Compiled aggregations in a format which is loaded lazily
+
+Every GUI process needs the compiled aggregations, but most requests only need a few
+of their branches. A packed aggregation file consists of a small head with the
+properties of the aggregation and the title and the required elements of each branch,
+followed by the individually pickled branches. The file is mapped into memory and a
+branch is only unpickled when it is accessed. The processes share the pages of the file
+in the page cache, but the unpickled head and branches are private to each process.
+The branches are stored in their flattened form together with the structural keys of
+their subtrees, so they are not flattened again for their computation.
+
+Layout of a packed aggregation file (native byte order, it never leaves the site):
+
+    MAGIC | header | head (pickle) | offsets (uint64 per branch + 1) | branches (pickles)
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import pickle
+import struct
+from array import array
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import Any, Final, overload
+
+from cmk.bi.flattened_computation import deserialize_flattened_branch, serialize_flattened_branch
+from cmk.bi.lib import BIAggregationComputationOptions, BIAggregationGroups, RequiredBIElement
+from cmk.bi.trees import BICompiledAggregation, BICompiledRule
+
+_MAGIC: Final = b"CMKBIPACKED\x02"
+# head length, number of branches
+_HEADER: Final = struct.Struct("=QQ")
+
+
+class _PackedFile:
+    """The mapped file and its unpickled head, shared by all loads of the same file"""
+
+    def __init__(self, path: Path) -> None:
+        with path.open("rb") as f:
+            stat = os.fstat(f.fileno())
+            self.stat_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[: len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{path} is not a packed aggregation")
+        head_length, num_branches = _HEADER.unpack_from(self.data, len(_MAGIC))
+        start = len(_MAGIC) + _HEADER.size
+        self.head: dict[str, Any] = pickle.loads(self.data[start : start + head_length])
+        start += head_length
+        self.offsets = array("Q")
+        self.offsets.frombytes(self.data[start : start + (num_branches + 1) * 8])
+        self.branches_start = start + (num_branches + 1) * 8
+        self.titles: Sequence[str] = self.head["titles"]
+
+    def load_branch_config(self, index: int) -> dict[str, Any]:
+        return pickle.loads(
+            memoryview(self.data)[
+                self.branches_start
+                + self.offsets[index] : self.branches_start
+                + self.offsets[index + 1]
+            ]
+        )
+
+
+# Per process: path -> mapped file
+_packed_files: dict[Path, _PackedFile] = {}
+
+
+def _get_packed_file(path: Path) -> _PackedFile:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        _packed_files.pop(path, None)
+        raise
+    if (packed_file := _packed_files.get(path)) is None or packed_file.stat_key != (
+        stat.st_ino,
+        stat.st_mtime_ns,
+        stat.st_size,
+    ):
+        # The aggregations may have been removed or renamed in the meantime
+        for outdated_path in [p for p in _packed_files if p != path and not p.exists()]:
+            del _packed_files[outdated_path]
+        # The files are replaced, not rewritten, so a mapping of an outdated file stays
+        # valid for the aggregations still using it
+        packed_file = _packed_files[path] = _PackedFile(path)
+    return packed_file
+
+
+class PackedBranches(Sequence[BICompiledRule]):
+    """The branches of a packed aggregation, each one is unpacked on first access"""
+
+    def __init__(self, packed_file: _PackedFile) -> None:
+        self._packed_file = packed_file
+        self._branches: dict[int, BICompiledRule] = {}
+
+    @property
+    def titles(self) -> Sequence[str]:
+        return self._packed_file.titles
+
+    def required_elements(self, index: int) -> set[RequiredBIElement]:
+        return {
+            RequiredBIElement(*element)
+            for element in self._packed_file.head["required_elements"][index]
+        }
+
+    def __len__(self) -> int:
+        return len(self._packed_file.titles)
+
+    @overload
+    def __getitem__(self, index: int) -> BICompiledRule: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[BICompiledRule]: ...
+
+    def __getitem__(self, index: int | slice) -> BICompiledRule | list[BICompiledRule]:
+        if isinstance(index, slice):
+            return [self[idx] for idx in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        if (branch := self._branches.get(index)) is None:
+            branch = self._branches[index] = deserialize_flattened_branch(
+                self._packed_file.load_branch_config(index)
+            )
+        return branch
+
+
+def pack_aggregation(compiled_aggregation: BICompiledAggregation) -> bytes:
+    summaries = list(branch_summaries(compiled_aggregation))
+    branches = [
+        pickle.dumps(serialize_flattened_branch(branch), protocol=pickle.HIGHEST_PROTOCOL)
+        for branch in compiled_aggregation.branches
+    ]
+    head = pickle.dumps(
+        {
+            "id": compiled_aggregation.id,
+            "aggregation_visualization": compiled_aggregation.aggregation_visualization,
+            "computation_options": compiled_aggregation.computation_options.serialize(),
+            "groups": compiled_aggregation.groups.serialize(),
+            "titles": [title for title, _elements in summaries],
+            "required_elements": [
+                [tuple(element) for element in elements] for _title, elements in summaries
+            ],
+        },
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+    offsets = array("Q", [0])
+    for branch in branches:
+        offsets.append(offsets[-1] + len(branch))
+    return b"".join(
+        [_MAGIC, _HEADER.pack(len(head), len(branches)), head, offsets.tobytes(), *branches]
+    )
+
+
+def load_packed_aggregation(path: Path) -> BICompiledAggregation:
+    """Load a packed aggregation, its branches are unpacked when they are accessed
+
+    Raises OSError or ValueError if the file can not be read."""
+    packed_file = _get_packed_file(path)
+    return BICompiledAggregation(
+        packed_file.head["id"],
+        PackedBranches(packed_file),
+        BIAggregationComputationOptions(packed_file.head["computation_options"]),
+        packed_file.head["aggregation_visualization"],
+        BIAggregationGroups(packed_file.head["groups"]),
+    )
+
+
+def branch_summaries(
+    compiled_aggregation: BICompiledAggregation,
+) -> Iterator[tuple[str, set[RequiredBIElement]]]:
+    """The title and the required elements of each branch, without unpacking the branches"""
+    branches = compiled_aggregation.branches
+    if isinstance(branches, PackedBranches):
+        for index, title in enumerate(branches.titles):
+            yield title, branches.required_elements(index)
+        return
+    for branch in branches:
+        yield branch.properties.title, branch.required_elements()
+
+
+def branch_titles(compiled_aggregation: BICompiledAggregation) -> Sequence[str]:
+    branches = compiled_aggregation.branches
+    if isinstance(branches, PackedBranches):
+        return branches.titles
+    return [branch.properties.title for branch in branches]
+
+
+def find_branch(compiled_aggregation: BICompiledAggregation, title: str) -> BICompiledRule | None:
+    for index, branch_title in enumerate(branch_titles(compiled_aggregation)):
+        if branch_title == title:
+            return compiled_aggregation.branches[index]
+    return None
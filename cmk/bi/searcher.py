@@ -3,13 +3,22 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+from bisect import bisect_left
 from collections.abc import Iterable, Mapping
+from operator import itemgetter
 from typing import Any
 
 from cmk.utils.labels import LabelGroups
 from cmk.utils.regex import regex
-from cmk.utils.rulesets.ruleset_matcher import matches_labels, matches_tag_condition, TagCondition
-from cmk.utils.tags import TagGroupID
+from cmk.utils.rulesets.ruleset_matcher import (
+    is_tag_condition_ne,
+    is_tag_condition_nor,
+    is_tag_condition_or,
+    matches_labels,
+    matching_objects_by_labels,
+    TagCondition,
+)
+from cmk.utils.tags import TagGroupID, TagID
 
 from cmk.bi.lib import ABCBISearcher, BIHostData, BIHostSearchMatch, BIServiceSearchMatch
 
@@ -24,6 +33,32 @@ from cmk.bi.lib import ABCBISearcher, BIHostData, BIHostSearchMatch, BIServiceSe
 
 # Search data used by bi_searcher
 
+# Characters ending the literal prefix of a regex pattern
+_REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]\\|()")
+_REGEX_QUANTIFIERS = frozenset("*+?{")
+
+
+def _literal_prefix(pattern: str) -> str:
+    """The prefix every string matched by the pattern (via re.match) starts with
+
+    >>> _literal_prefix("CPU load")
+    'CPU load'
+    >>> _literal_prefix("Interface (.*)")
+    'Interface '
+    >>> _literal_prefix("Filesystems?")
+    'Filesystem'
+    >>> _literal_prefix("CPU|Memory")
+    ''
+    """
+    if "|" in pattern:
+        return ""  # the alternatives may be at the top level
+    for idx, char in enumerate(pattern):
+        if char in _REGEX_SPECIAL_CHARS:
+            # The last literal char is optional or repeated if a quantifier follows
+            return pattern[: idx - 1] if char in _REGEX_QUANTIFIERS and idx else pattern[:idx]
+    return pattern
+
+
 #   .--BISearcher----------------------------------------------------------.
 #   |         ____ ___ ____                      _                         |
 #   |        | __ )_ _/ ___|  ___  __ _ _ __ ___| |__   ___ _ __           |
@@ -35,10 +70,36 @@ from cmk.bi.lib import ABCBISearcher, BIHostData, BIHostSearchMatch, BIServiceSe
 
 
 class BISearcher(ABCBISearcher):
+    def __init__(self) -> None:
+        super().__init__()
+        self._alias_regex_match_cache: dict[str, dict[str, tuple]] = {}
+        self._alias_regex_miss_cache: dict[str, set[str]] = {}
+        # Indexes of the hosts, built by set_hosts
+        self._host_names: set[str] = set()
+        self._hosts_by_tag: dict[tuple[TagGroupID, TagID | None], set[str]] = {}
+        self._hosts_by_label: dict[tuple[str, str], set[str]] = {}
+        self._hosts_by_folder: dict[str, set[str]] = {}
+        # Per host: The service descriptions, sorted, with their original position
+        self._sorted_services: dict[str, list[tuple[str, int]]] = {}
+
     def set_hosts(self, hosts: dict[str, BIHostData]) -> None:
         self.cleanup()
         # The key may be a pattern / regex, so `str` is the correct type for the key.
         self.hosts = hosts
+        self._host_names = set(hosts)
+        for host_name, host in hosts.items():
+            for tag in host.tags:
+                self._hosts_by_tag.setdefault(tag, set()).add(host_name)
+            for label in host.labels.items():
+                self._hosts_by_label.setdefault(label, set()).add(host_name)
+            # A host is in its folder and in all parent folders
+            for idx, char in enumerate(host.folder):
+                if char == "/":
+                    self._hosts_by_folder.setdefault(host.folder[: idx + 1], set()).add(host_name)
+            self._sorted_services[host_name] = sorted(
+                (service_description, position)
+                for position, service_description in enumerate(host.services)
+            )
 
     def cleanup(self) -> None:
         # Note: Do not call clear() on hosts
@@ -46,6 +107,13 @@ class BISearcher(ABCBISearcher):
         self.hosts = {}
         self._host_regex_match_cache.clear()
         self._host_regex_miss_cache.clear()
+        self._alias_regex_match_cache.clear()
+        self._alias_regex_miss_cache.clear()
+        self._host_names = set()
+        self._hosts_by_tag.clear()
+        self._hosts_by_label.clear()
+        self._hosts_by_folder.clear()
+        self._sorted_services.clear()
 
     def search_hosts(self, conditions: dict) -> list[BIHostSearchMatch]:
         hosts, matched_re_groups = self.filter_host_choice(
@@ -128,17 +196,27 @@ class BISearcher(ABCBISearcher):
         if pattern == "(.*)":
             return hosts, self._host_match_groups(hosts, "alias")
 
-        # TODO: alias matches currently costs way more performance than the host matches
-        #       requires alias lookup cache to fix
         matched_hosts = []
         matched_re_groups = {}
         regex_pattern = regex(pattern)
+        pattern_match_cache = self._alias_regex_match_cache.setdefault(pattern, {})
+        pattern_miss_cache = self._alias_regex_miss_cache.setdefault(pattern, set())
         for host in hosts:
+            if host.name in pattern_miss_cache:
+                continue
+
+            if (cached_match := pattern_match_cache.get(host.name)) is not None:
+                matched_hosts.append(host)
+                matched_re_groups[host.name] = cached_match
+                continue
+
             match = regex_pattern.match(host.alias)
             if match is None:
+                pattern_miss_cache.add(host.name)
                 continue
+            pattern_match_cache[host.name] = tuple(match.groups())
             matched_hosts.append(host)
-            matched_re_groups[host.name] = tuple(match.groups())
+            matched_re_groups[host.name] = pattern_match_cache[host.name]
         return matched_hosts, matched_re_groups
 
     def get_service_description_matches(
@@ -146,16 +224,43 @@ class BISearcher(ABCBISearcher):
         host_matches: list[BIHostSearchMatch],
         pattern: str,
     ) -> list[BIServiceSearchMatch]:
-        matched_services = []
+        matched_services: list[BIServiceSearchMatch] = []
         regex_pattern = regex(pattern)
+        prefix = _literal_prefix(pattern)
         for host_match in host_matches:
-            for service_description in host_match.host.services.keys():
+            host_matched_services = []
+            for service_description, position in self._services_with_prefix(
+                host_match.host, prefix
+            ):
                 if match := regex_pattern.match(service_description):
-                    matched_services.append(
-                        BIServiceSearchMatch(host_match, service_description, tuple(match.groups()))
+                    host_matched_services.append(
+                        (
+                            position,
+                            BIServiceSearchMatch(
+                                host_match, service_description, tuple(match.groups())
+                            ),
+                        )
                     )
+            # Keep the order of the services of the host
+            matched_services.extend(
+                service_match for _position, service_match in sorted(host_matched_services)
+            )
         return matched_services
 
+    def _services_with_prefix(self, host: BIHostData, prefix: str) -> list[tuple[str, int]]:
+        if (sorted_services := self._sorted_services.get(host.name)) is None:
+            # Not one of the hosts of this searcher
+            return [
+                (service_description, pos) for pos, service_description in enumerate(host.services)
+            ]
+        if not prefix:
+            return sorted_services
+        start = bisect_left(sorted_services, prefix, key=itemgetter(0))
+        end = start
+        while end < len(sorted_services) and sorted_services[end][0].startswith(prefix):
+            end += 1
+        return sorted_services[start:end]
+
     def search_services(self, conditions: dict) -> list[BIServiceSearchMatch]:
         host_matches: list[BIHostSearchMatch] = self.search_hosts(conditions)
         service_matches = self.get_service_description_matches(
@@ -174,33 +279,54 @@ class BISearcher(ABCBISearcher):
         if not folder_path:
             return hosts
 
-        folder_path = f"{folder_path}/"
-        return (x for x in hosts if x.folder.startswith(folder_path))
+        matching_host_names = self._hosts_by_folder.get(f"{folder_path}/", set())
+        return (x for x in hosts if x.name in matching_host_names)
 
     def filter_host_tags(
         self,
         hosts: Iterable[BIHostData],
         tag_conditions: Mapping[TagGroupID, TagCondition],
     ) -> Iterable[BIHostData]:
-        return (
-            host
-            for host in hosts  #
-            if all(
-                matches_tag_condition(
-                    taggroup_id,
-                    tag_condition,
-                    host.tags,
-                )
-                for taggroup_id, tag_condition in tag_conditions.items()
+        if not tag_conditions:
+            return hosts
+
+        matching_host_names = self._host_names
+        for taggroup_id, tag_condition in tag_conditions.items():
+            matching_host_names = matching_host_names & self._hosts_matching_tag_condition(
+                taggroup_id, tag_condition
             )
-        )
+        return (x for x in hosts if x.name in matching_host_names)
+
+    def _hosts_matching_tag_condition(
+        self, taggroup_id: TagGroupID, tag_condition: TagCondition
+    ) -> set[str]:
+        """Set based implementation of matches_tag_condition()"""
+
+        def having(tag_ids: Iterable[TagID | None]) -> set[str]:
+            return set().union(
+                *(self._hosts_by_tag.get((taggroup_id, tag_id), set()) for tag_id in tag_ids)
+            )
+
+        if is_tag_condition_ne(tag_condition):
+            return self._host_names - having([tag_condition["$ne"]])
+        if is_tag_condition_or(tag_condition):
+            return having(tag_condition["$or"])
+        if is_tag_condition_nor(tag_condition):
+            return self._host_names - having(tag_condition["$nor"])
+        if isinstance(tag_condition, dict):
+            raise NotImplementedError()
+        return having([tag_condition])
 
     def filter_host_labels(
         self, hosts: Iterable[BIHostData], required_label_groups: LabelGroups
     ) -> Iterable[BIHostData]:
         if not required_label_groups:
             return hosts
-        return (x for x in hosts if matches_labels(x.labels, required_label_groups))
+
+        matching_host_names = matching_objects_by_labels(
+            self._host_names, self._hosts_by_label, required_label_groups
+        )
+        return (x for x in hosts if x.name in matching_host_names)
 
     def filter_service_labels(
         self, services: list[BIServiceSearchMatch], required_label_groups: Any
@@ -404,12 +404,24 @@ class BICompiledRule(ABCBICompiledNode):
         ]
         if not bundled_results:
             return None
+        actual_result, assumed_result = self.aggregate_nested_results(
+            bundled_results, computation_options, use_assumed
+        )
+        return NodeResultBundle(actual_result, assumed_result, bundled_results, self)
+
+    def aggregate_nested_results(
+        self,
+        bundled_results: list[NodeResultBundle],
+        computation_options: BIAggregationComputationOptions,
+        use_assumed: bool,
+    ) -> tuple[NodeComputeResult, NodeComputeResult | None]:
+        """The actual and the assumed result of this rule, given the results of its nodes"""
         actual_result = self._process_node_compute_result(
             [x.actual_result for x in bundled_results], computation_options
         )
 
         if not use_assumed:
-            return NodeResultBundle(actual_result, None, bundled_results, self)
+            return actual_result, None
 
         assumed_result_items = [
             bundle.assumed_result if bundle.assumed_result is not None else bundle.actual_result
@@ -418,7 +430,7 @@ class BICompiledRule(ABCBICompiledNode):
         assumed_result = self._process_node_compute_result(
             assumed_result_items, computation_options
         )
-        return NodeResultBundle(actual_result, assumed_result, bundled_results, self)
+        return actual_result, assumed_result
 
     def _process_node_compute_result(
         self, results: list[NodeComputeResult], computation_options: BIAggregationComputationOptions
@@ -579,7 +591,7 @@ class BICompiledAggregation:
     def __init__(
         self,
         aggregation_id: str,
-        branches: list[BICompiledRule],
+        branches: Sequence[BICompiledRule],
         computation_options: BIAggregationComputationOptions,
         aggregation_visualization: dict[str, Any],
         groups: BIAggregationGroups,
@@ -592,7 +604,7 @@ class BICompiledAggregation:
         self.groups = groups
 
     def compute_branches(
-        self, branches: list[BICompiledRule], bi_status_fetcher: ABCBIStatusFetcher
+        self, branches: Sequence[BICompiledRule], bi_status_fetcher: ABCBIStatusFetcher
     ) -> list[NodeResultBundle]:
         assumed_state_ids = set(bi_status_fetcher.assumed_states)
         aggregation_results = []
@@ -124,7 +124,8 @@ def _do_inventory_actions_during_checking_for(
     params: HWSWInventoryParameters,
     providers: Mapping[HostKey, Provider],
 ) -> None:
-    tree_store = TreeStore(cmk.utils.paths.status_data_dir)
+    # Saved on every check, the status data trees are always loaded unfiltered
+    tree_store = TreeStore(cmk.utils.paths.status_data_dir, binary_copy=False)
 
     if not params.status_data_inventory:
         # includes cluster case
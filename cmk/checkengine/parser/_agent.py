@@ -7,6 +7,7 @@ from __future__ import annotations
 
 import abc
 import logging
+import re
 import time
 from collections.abc import Iterator, Mapping, MutableMapping, Sequence
 from typing import final, Final, NamedTuple
@@ -38,6 +39,19 @@ class SectionWithHeader(NamedTuple):
 MutableSection = list[SectionWithHeader]
 ImmutableSection = Sequence[SectionWithHeader]
 
+# A line the state machine reacts to, see `ParserState.__call__`. Matches in the middle
+# of a line have to be skipped, anchoring the pattern with "^" makes the search a lot slower.
+_MARKER_LINE: Final = re.compile(rb"<<<.*>>>\r*$", re.MULTILINE)
+
+
+class _DataChunk(NamedTuple):
+    """The data lines between two marker lines, not yet split"""
+
+    section: SectionWithHeader
+    strip: bool
+    start: int
+    end: int
+
 
 class ParserState(abc.ABC):
     """Base class for the state machine.
@@ -104,6 +118,10 @@ class ParserState(abc.ABC):
     def do_action(self, line: bytes) -> ParserState:
         raise NotImplementedError()
 
+    def data_section(self) -> tuple[SectionWithHeader, bool] | None:
+        """The section `do_action` adds the data lines to and whether they are stripped"""
+        return None
+
     @abc.abstractmethod
     def on_section_header(self, section_header: SectionMarker) -> ParserState:
         raise NotImplementedError()
@@ -364,6 +382,9 @@ class PiggybackSectionParser(ParserState):
         self.piggyback_sections[self.current_host][-1].section.append(AgentRawData(line))
         return self
 
+    def data_section(self) -> tuple[SectionWithHeader, bool]:
+        return self.piggyback_sections[self.current_host][-1], False
+
     def on_piggyback_header(self, piggyback_header: PiggybackMarker) -> ParserState:
         if piggyback_header.should_be_ignored():
             return self.to_piggyback_ignore_parser()
@@ -474,6 +495,9 @@ class HostSectionParser(ParserState):
         )
         return self
 
+    def data_section(self) -> tuple[SectionWithHeader, bool]:
+        return self.sections[-1], not self.current_section.nostrip
+
     def on_piggyback_header(self, piggyback_header: PiggybackMarker) -> ParserState:
         if piggyback_header.hostname == self.hostname:
             # Unpiggybacked "normal" host
@@ -525,7 +549,7 @@ class AgentParser(Parser[AgentRawData, AgentRawDataSection]):
     ) -> HostSections[AgentRawDataSection]:
         now = int(time.time())
 
-        raw_sections, piggyback_sections = self._parse_host_section(raw_data)
+        raw_sections, piggyback_sections = self._parse_host_section(raw_data, selection)
         section_info = {
             header.name: header
             for header, _ in raw_sections
@@ -537,7 +561,10 @@ class AgentParser(Parser[AgentRawData, AgentRawDataSection]):
         ) -> MutableSectionMap[list[AgentRawDataSectionElem]]:
             out: MutableSectionMap[list[AgentRawDataSectionElem]] = {}
             for header, content in sections:
-                out.setdefault(header.name, []).extend(header.parse_line(line) for line in content)
+                if selection is NO_SELECTION or header.name in selection:
+                    out.setdefault(header.name, []).extend(
+                        header.parse_line(line) for line in content
+                    )
             return out
 
         def flatten_piggyback_section(
@@ -567,11 +594,7 @@ class AgentParser(Parser[AgentRawData, AgentRawDataSection]):
                     ).encode(header.encoding)
                 yield from (bytes(line) for line in content)
 
-        sections = {
-            name: content
-            for name, content in decode_sections(raw_sections).items()
-            if selection is NO_SELECTION or name in selection
-        }
+        sections = decode_sections(raw_sections)
         piggybacked_raw_data = {
             header.hostname: list(
                 flatten_piggyback_section(
@@ -613,8 +636,14 @@ class AgentParser(Parser[AgentRawData, AgentRawDataSection]):
     def _parse_host_section(
         self,
         raw_data: AgentRawData,
+        selection: SectionNameCollection,
     ) -> tuple[ImmutableSection, Mapping[PiggybackMarker, ImmutableSection]]:
-        """Split agent output in chunks, splits lines by whitespaces."""
+        """Split agent output in chunks, splits lines by whitespaces.
+
+        Only the marker lines are run through the state machine, the data lines in between
+        are indexed by their position. The data lines are only split off for the sections
+        in `selection`, the other sections are returned without content.
+        """
         parser: ParserState = NOOPParser(
             self.hostname,
             [],
@@ -623,7 +652,25 @@ class AgentParser(Parser[AgentRawData, AgentRawDataSection]):
             encoding_fallback=self.encoding_fallback,
             logger=self._logger,
         )
-        for line in raw_data.split(b"\n"):
-            parser = parser(line.rstrip(b"\r"))
+        chunks: list[_DataChunk] = []
+        start = 0
+        for marker in _MARKER_LINE.finditer(raw_data):
+            if marker.start() and raw_data[marker.start() - 1] != ord("\n"):
+                continue
+            if (data_section := parser.data_section()) is not None:
+                chunks.append(_DataChunk(*data_section, start, marker.start()))
+            parser = parser(marker[0].rstrip(b"\r"))
+            start = marker.end()
+        if (data_section := parser.data_section()) is not None:
+            chunks.append(_DataChunk(*data_section, start, len(raw_data)))
+
+        for chunk in chunks:
+            if not (selection is NO_SELECTION or chunk.section.header.name in selection):
+                continue
+            for line in raw_data[chunk.start : chunk.end].split(b"\n"):
+                if (line := line.rstrip(b"\r")) and not line.isspace():
+                    chunk.section.section.append(
+                        AgentRawData(line.strip() if chunk.strip else line)
+                    )
 
         return parser.sections, parser.piggyback_sections
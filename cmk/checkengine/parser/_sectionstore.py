@@ -4,7 +4,7 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import logging
-from collections.abc import Callable
+from collections.abc import Callable, Iterator, Mapping
 from pathlib import Path
 from typing import Final, Generic, TypeVar
 
@@ -17,6 +17,33 @@ __all__ = ["SectionStore"]
 _T = TypeVar("_T")
 
 
+class _SectionsWithPersisted(Mapping[SectionName, _T]):
+    """The sections plus the persisted sections not contained in them
+
+    The sections are only looked up on access, their contents may be decoded lazily.
+    """
+
+    def __init__(self, sections: SectionMap[_T], persisted: SectionMap[_T]) -> None:
+        self._sections: Final = sections
+        self._persisted: Final = persisted
+
+    def __getitem__(self, key: SectionName) -> _T:
+        return self._persisted[key] if key in self._persisted else self._sections[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._persisted or key in self._sections
+
+    def __iter__(self) -> Iterator[SectionName]:
+        yield from self._sections
+        yield from self._persisted
+
+    def __len__(self) -> int:
+        return len(self._sections) + len(self._persisted)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._sections!r}, {self._persisted!r})"
+
+
 class SectionStore(Generic[_T]):
     def __init__(
         self,
@@ -85,8 +112,8 @@ class SectionStore(Generic[_T]):
         persisted_sections = self.load()
 
         new_sections = {
-            section_name: persist_info + (section_content,)
-            for section_name, section_content in sections.items()
+            section_name: persist_info + (sections[section_name],)
+            for section_name in sections
             if (persist_info := lookup_persist(section_name)) is not None
         }
         store_sections = bool(new_sections)
@@ -109,20 +136,22 @@ class SectionStore(Generic[_T]):
         cache_info: MutableSectionMap[tuple[int, int]],
         persisted_sections: MutableSectionMap[tuple[int, int, _T]],
     ) -> SectionMap[_T]:
+        # Don't access the sections, they may be decoded on access
+        section_names = set(sections)
         cache_info.update(
             {
                 section_name: (created_at, valid_until - created_at)
                 for section_name, (created_at, valid_until, *_rest) in persisted_sections.items()
-                if section_name not in sections
+                if section_name not in section_names
             }
         )
-        result: MutableSectionMap[_T] = dict(sections.items())
+        result: MutableSectionMap[_T] = {}
         for section_name, entry in persisted_sections.items():
             if len(entry) == 2:
                 continue  # Skip entries of "old" format
 
             # Don't overwrite sections that have been received from the source with this call
-            if section_name in sections:
+            if section_name in section_names:
                 self._logger.debug(
                     "Skipping persisted section %r, live data available",
                     section_name,
@@ -131,4 +160,4 @@ class SectionStore(Generic[_T]):
 
             self._logger.debug("Using persisted section %r", section_name)
             result[section_name] = entry[-1]
-        return result
+        return _SectionsWithPersisted(sections, result) if result else sections
@@ -52,7 +52,6 @@ class SNMPParser(Parser[SNMPRawData, SNMPRawData]):
         # in the fetcher for SNMP.
         selection: SectionNameCollection,
     ) -> HostSections[SNMPRawData]:
-        sections = dict(raw_data)
         now = int(time.time())
 
         def lookup_persist(section_name: SectionName) -> tuple[int, int] | None:
@@ -62,7 +61,7 @@ class SNMPParser(Parser[SNMPRawData, SNMPRawData]):
 
         cache_info: MutableSectionMap[tuple[int, int]] = {}
         new_sections = self.section_store.update(
-            sections,
+            raw_data,
             cache_info,
             lookup_persist,
             # persisted section is considered valid for one host check interval after fetch
@@ -9,7 +9,7 @@ from collections import defaultdict
 from collections.abc import Callable, Iterable, Mapping
 
 from cmk.utils.hostaddress import HostName
-from cmk.utils.sectionname import MutableSectionMap
+from cmk.utils.sectionname import MutableSectionMap, SectionMap
 
 from cmk.checkengine.fetcher import HostKey
 
@@ -21,7 +21,7 @@ __all__ = ["group_by_host"]
 def group_by_host(
     host_sections: Iterable[tuple[HostKey, HostSections]], log: Callable[[str], None]
 ) -> Mapping[HostKey, HostSections]:
-    out_sections: dict[HostKey, MutableSectionMap[list]] = defaultdict(dict)
+    out_sections: dict[HostKey, SectionMap[list]] = {}
     out_cache_info: dict[HostKey, MutableSectionMap[tuple[int, int]]] = defaultdict(dict)
     out_piggybacked_raw_data: dict[HostKey, dict[HostName, list[bytes]]] = defaultdict(dict)
     host_keys: list[HostKey] = []
@@ -30,8 +30,11 @@ def group_by_host(
         host_keys.append(host_key)
         section_names = sorted(str(s) for s in host_section.sections.keys())
         log(f"  {host_key!s}  -> Add sections: {section_names}")
-        for section_name, section_content in host_section.sections.items():
-            out_sections[host_key].setdefault(section_name, []).extend(section_content)
+        if not (sections := out_sections.get(host_key)):
+            # Don't copy the sections, their contents may be decoded on access
+            out_sections[host_key] = host_section.sections
+        elif host_section.sections:
+            out_sections[host_key] = _merge_sections(sections, host_section.sections)
         for hostname, raw_lines in host_section.piggybacked_raw_data.items():
             out_piggybacked_raw_data[host_key].setdefault(hostname, []).extend(raw_lines)
         # TODO: It should be supported that different sources produce equal sections.
@@ -49,3 +52,10 @@ def group_by_host(
         )
         for hk in host_keys
     }
+
+
+def _merge_sections(sections: SectionMap[list], other: SectionMap[list]) -> SectionMap[list]:
+    merged: MutableSectionMap[list] = dict(sections.items())
+    for section_name, section_content in other.items():
+        merged[section_name] = [*merged.get(section_name, []), *section_content]
+    return merged
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""The open events of the Event Console, indexed by id, rule and host"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from typing import TypeVar
+
+from cmk.utils.hostaddress import HostName
+
+from .event import Event
+
+_K = TypeVar("_K")
+
+
+class EventStore:
+    """
+    Keeps the events in the order of their creation.
+
+    All dicts below are ordered by insertion, so the first entry is always
+    the oldest event of the whole store, of a rule or of a host. The host of
+    an event may be rewritten while it is open, so the host index has to be
+    told about that, see reindex().
+    """
+
+    def __init__(self, events: Iterable[Event] = ()) -> None:
+        self._by_id: dict[int, Event] = {}
+        self._by_rule: dict[str | None, dict[int, Event]] = {}
+        self._by_host: dict[HostName, dict[int, Event]] = {}
+        self._indexed_hosts: dict[int, HostName] = {}
+        for event in events:
+            self.add(event)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, event: Event) -> bool:
+        return self._by_id.get(event["id"]) is event
+
+    def add(self, event: Event) -> None:
+        self._by_id[event["id"]] = event
+        self._by_rule.setdefault(event["rule_id"], {})[event["id"]] = event
+        self._by_host.setdefault(event["host"], {})[event["id"]] = event
+        self._indexed_hosts[event["id"]] = event["host"]
+
+    def remove(self, event: Event) -> bool:
+        if event not in self:
+            return False
+        del self._by_id[event["id"]]
+        _remove_from_index(self._by_rule, event["rule_id"], event["id"])
+        _remove_from_index(self._by_host, self._indexed_hosts.pop(event["id"]), event["id"])
+        return True
+
+    def reindex(self, event: Event) -> None:
+        """Update the host index after the event has been modified"""
+        if event not in self or (old_host := self._indexed_hosts[event["id"]]) == event["host"]:
+            return
+        _remove_from_index(self._by_host, old_host, event["id"])
+        events = self._by_host.setdefault(event["host"], {})
+        newer_events_present = bool(events) and next(reversed(events)) > event["id"]
+        events[event["id"]] = event
+        if newer_events_present:
+            # Keep the order of creation within the host
+            self._by_host[event["host"]] = dict(sorted(events.items()))
+        self._indexed_hosts[event["id"]] = event["host"]
+
+    def get(self, event_id: int) -> Event | None:
+        return self._by_id.get(event_id)
+
+    def oldest(self) -> Event | None:
+        return next(iter(self._by_id.values()), None)
+
+    def oldest_of_rule(self, rule_id: str | None) -> Event | None:
+        return next(iter(self._by_rule.get(rule_id, {}).values()), None)
+
+    def oldest_of_host(self, host: HostName) -> Event | None:
+        return next(iter(self._by_host.get(host, {}).values()), None)
+
+    # The methods below return copies: The callers may remove events while iterating.
+
+    def all(self) -> list[Event]:
+        return list(self._by_id.values())
+
+    def of_rule(self, rule_id: str | None) -> Sequence[Event]:
+        return list(self._by_rule.get(rule_id, {}).values())
+
+    def of_host(self, host: HostName) -> Sequence[Event]:
+        return list(self._by_host.get(host, {}).values())
+
+
+def _remove_from_index(index: dict[_K, dict[int, Event]], key: _K, event_id: int) -> None:
+    if (events := index.get(key)) is None:
+        return
+    events.pop(event_id, None)
+    if not events:
+        del index[key]
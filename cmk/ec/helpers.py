@@ -5,7 +5,7 @@
 from __future__ import annotations
 
 import threading
-from collections.abc import Callable, Iterable
+from collections.abc import Callable, Sequence
 from logging import Logger
 from types import TracebackType
 from typing import Literal, TypeAlias, TypeVar
@@ -83,7 +83,7 @@ def parse_syslog_message(tokens: Tokens) -> ParseResult[bytes]:
     return msg, rest2
 
 
-def parse_bytes_into_syslog_messages(data: bytes) -> tuple[Iterable[bytes], bytes]:
+def parse_bytes_into_syslog_messages(data: bytes) -> tuple[Sequence[bytes], bytes]:
     """
     Parse a bunch of bytes into separate syslog messages and an unparsed rest.
 
@@ -4,14 +4,12 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import itertools
-import shlex
-import subprocess
 import threading
 import time
-from collections.abc import Callable, Iterable, Sequence
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
 from logging import Logger
 from pathlib import Path
-from typing import Any
+from typing import Any, Final
 
 from cmk.utils.log import VERBOSE
 from cmk.utils.render import date_and_time
@@ -19,6 +17,14 @@ from cmk.utils.render import date_and_time
 from .config import Config
 from .event import Event, scrub_string
 from .history import _log_event, ActiveHistoryPeriod, get_logfile, History, HistoryWhat, quote_tab
+from .history_file_index import (
+    HistoryFileIndex,
+    index_path,
+    INDEXED_COLUMNS,
+    load_index,
+    read_lines,
+    update_index,
+)
 from .query import Columns, OperatorName, QueryFilter, QueryGET
 from .settings import Settings
 
@@ -82,7 +88,9 @@ class FileHistory(History):
         limit = query.limit
         self._logger.debug("Limit: %r", limit)
 
-        grep_pipeline = _grep_pipeline(filters)
+        lookups = _index_lookups(filters)
+        self._logger.debug("index lookups: %r", lookups)
+        prefilters = _text_prefilters(filters)
 
         time_filters = [
             (f.operator_name, f.argument) for f in filters if f.column_name.split("_")[-1] == "time"
@@ -114,11 +122,13 @@ class FileHistory(History):
             if not _intersects(time_range, _get_logfile_timespan(path)):
                 self._logger.debug("skipping history file %s because of time filters", path)
                 continue
-            tac = f"nl -b a {shlex.quote(str(path))} | tac"  # Process younger lines first
-            cmd = " | ".join([tac] + grep_pipeline)
-            self._logger.debug("preprocessing history file with command [%s]", cmd)
             new_entries = parse_history_file(
-                self._history_columns, path, query.filter_row, cmd, limit, self._logger
+                self._history_columns,
+                path,
+                query.filter_row,
+                _candidate_lines(path, lookups, time_range, prefilters),
+                limit,
+                self._logger,
             )
             history_entries += new_entries
             if limit is not None:
@@ -127,6 +137,7 @@ class FileHistory(History):
 
     def housekeeping(self) -> None:
         _expire_logfiles(self._settings, self._config, self._logger, self._lock, False)
+        _update_indexes(self._settings, self._logger)
 
     def close(self) -> None:
         pass
@@ -152,63 +163,178 @@ def _expire_logfiles(
                         "Deleting log file %s (age %s)", path, date_and_time(path.stat().st_mtime)
                     )
                     path.unlink()
+                    index_path(path).unlink(missing_ok=True)
         except Exception as e:
             if settings.options.debug:
                 raise
             logger.warning("Error expiring log files: %s", e)
 
 
-# Please note: Keep this in sync with packages/neb/src/TableEventConsole.cc.
-_GREPABLE_COLUMNS = {
-    "event_id",
-    "event_text",
-    "event_comment",
-    "event_host",
-    "event_contact",
-    "event_application",
-    "event_rule_id",
-    "event_owner",
-    "event_ipaddress",
-    "event_core_host",
-}
+def _update_indexes(settings: Settings, logger: Logger) -> None:
+    """Index the lines written since the last housekeeping, including those of rotated files"""
+    for path in settings.paths.history_dir.value.glob("*.log"):
+        try:
+            update_index(path, logger)
+        except Exception as e:
+            if settings.options.debug:
+                raise
+            logger.warning("Error indexing history file %s: %s", path, e)
 
 
-def _grep_pipeline(filters: Iterable[QueryFilter]) -> list[str]:
+def _index_lookups(filters: Iterable[QueryFilter]) -> Mapping[str, set[str]]:
     """
-    Optimization: use grep in order to reduce amount of read lines based on some frequently used
-    filters. It's OK if the filters don't match 100% accurately on the right lines. If in doubt, you
-    can output more lines than necessary. This is only a kind of prefiltering.
+    Optimization: The values of the indexed columns the lines have to contain. It's OK if the
+    lookups don't match 100% accurately on the right lines, the filters are applied afterwards
+    anyway. This is only a kind of prefiltering.
+
+    >>> _index_lookups([])
+    {}
+
+    >>> _index_lookups([QueryFilter("event_host", "=", lambda x: True, "foo"),
+    ...                 QueryFilter("event_host", "in", lambda x: True, ["foo", "bar"]),
+    ...                 QueryFilter("event_text", "=", lambda x: True, "baz")])
+    {'event_host': {'foo'}}
+
+    """
+    lookups: dict[str, set[str]] = {}
+    for f in filters:
+        if f.column_name not in INDEXED_COLUMNS:
+            continue
+        if f.operator_name == "=":
+            values = {_raw_value(f.argument)}
+        elif f.operator_name == "in":
+            values = {_raw_value(argument) for argument in f.argument}
+        else:
+            continue
+        lookups[f.column_name] = (
+            lookups[f.column_name] & values if f.column_name in lookups else values
+        )
+    return lookups
+
+
+# The position of the columns containing plain texts in a line of a history file
+_TEXT_COLUMNS: Final[Mapping[str, int]] = {
+    "history_what": 1,
+    "history_who": 2,
+    "history_addinfo": 3,
+    "event_text": 6,
+    "event_comment": 9,
+    "event_host": 11,
+    "event_contact": 12,
+    "event_application": 13,
+    "event_rule_id": 17,
+    "event_phase": 19,
+    "event_owner": 20,
+    "event_ipaddress": 23,
+    "event_orig_host": 24,
+    "event_core_host": 26,
+}
+
+# A substring a matching line contains, the position of the column and the filter predicate
+_TextPrefilter = tuple[bytes, int, Callable[[object], bool]]
+
 
-    >>> _grep_pipeline([])
-    []
+def _text_prefilters(filters: Iterable[QueryFilter]) -> Sequence[_TextPrefilter]:
+    """
+    Optimization: The filters on text columns the index can't answer, checked on the raw lines
+    before they are parsed. Like the lookups, they are only a kind of prefiltering, the filters
+    are applied to the parsed lines afterwards anyway.
 
-    >>> _grep_pipeline([QueryFilter("event_core_host", '=', lambda x: True, '|| ping')])
-    ["grep -F -e '|| ping'"]
+    >>> [(needle, column) for needle, column, _predicate in _text_prefilters([
+    ...     QueryFilter("event_host", "=", lambda x: True, "foo"),
+    ...     QueryFilter("event_host", "~", lambda x: True, "f.o"),
+    ...     QueryFilter("event_text", "=", lambda x: True, "baz"),
+    ...     QueryFilter("event_count", "=", lambda x: True, 1)])]
+    [(b'', 11), (b'baz', 6)]
 
     """
     return [
-        command
+        (quote_tab(f.argument) if f.operator_name == "=" else b"", column, f.predicate)
         for f in filters
-        if f.column_name in _GREPABLE_COLUMNS
-        for command in [_grep_command(f.operator_name, str(f.argument))]
-        if command is not None
+        if (column := _TEXT_COLUMNS.get(f.column_name)) is not None
+        and not (f.column_name in INDEXED_COLUMNS and f.operator_name in ("=", "in"))
     ]
 
 
-def _grep_command(operator_name: OperatorName, argument: str) -> str | None:
-    if operator_name == "=":
-        return f"grep -F {_grep_pattern(argument)}"
-    if operator_name == "=~":
-        return f"grep -F -i {_grep_pattern(argument)}"
-    if operator_name == "~":
-        return f"grep -E {_grep_pattern(argument)}"
-    if operator_name == "~~":
-        return f"grep -E -i {_grep_pattern(argument)}"
-    return None
+def _raw_value(argument: object) -> str:
+    """The value as it is written to the history file"""
+    return quote_tab(argument).decode("utf-8", "replace")
 
 
-def _grep_pattern(argument: str) -> str:
-    return f"-e {shlex.quote(argument)}"
+def _candidate_lines(
+    path: Path,
+    lookups: Mapping[str, set[str]],
+    time_range: tuple[float | None, float | None],
+    prefilters: Sequence[_TextPrefilter] = (),
+) -> Iterator[tuple[int, bytes]]:
+    """
+    The numbers (starting at 1) and contents of the lines possibly matching the lookups, the
+    time range and the text prefilters, younger lines first.
+
+    The lines covered by the index of the file are looked up, the ones written since the index
+    has been updated are scanned.
+    """
+    index = load_index(path)
+    with path.open("rb") as f:
+        f.seek(index.size if index else 0)
+        unindexed_lines = f.read().split(b"\n")
+    if not unindexed_lines[-1]:
+        del unindexed_lines[-1]
+
+    first_unindexed_line = len(index.offsets) + 1 if index else 1
+    for line_number, line in zip(
+        range(first_unindexed_line + len(unindexed_lines) - 1, first_unindexed_line - 1, -1),
+        reversed(unindexed_lines),
+    ):
+        if _matches_lookups(line, lookups) and _matches_text_prefilters(line, prefilters):
+            yield line_number, line
+
+    if index:
+        for indexed_line, content in read_lines(
+            path,
+            index,
+            reversed(index.lines_in_time_range(_indexed_lines(index, lookups), time_range)),
+        ):
+            if _matches_text_prefilters(content, prefilters):
+                yield indexed_line + 1, content
+
+
+def _indexed_lines(index: HistoryFileIndex, lookups: Mapping[str, set[str]]) -> Iterable[int]:
+    if not lookups:
+        return range(len(index.offsets))
+    return sorted(
+        set.intersection(
+            *(index.lookup(column_name, values) for column_name, values in lookups.items())
+        )
+    )
+
+
+def _matches_lookups(line: bytes, lookups: Mapping[str, set[str]]) -> bool:
+    if not lookups:
+        return True
+    columns = line.split(b"\t")
+    return all(
+        column < len(columns) and columns[column].decode("utf-8", "replace") in values
+        for column_name, values in lookups.items()
+        for column in [INDEXED_COLUMNS[column_name]]
+    )
+
+
+def _matches_text_prefilters(line: bytes, prefilters: Sequence[_TextPrefilter]) -> bool:
+    if not prefilters:
+        return True
+    # A cheap check on the raw bytes first, most lines don't contain the searched texts.
+    if not all(needle in line for needle, _column, _predicate in prefilters):
+        return False
+    columns = line.rstrip(b"\n").split(b"\t")
+    try:
+        return all(
+            # Older lines lack some columns, they are filled in with defaults when parsed.
+            column >= len(columns) or predicate(columns[column].decode("utf-8", "replace"))
+            for _needle, column, predicate in prefilters
+        )
+    except Exception:
+        return True  # let the real filters report the problem
 
 
 def _greatest_lower_bound_for_filters(
@@ -264,30 +390,21 @@ def parse_history_file(
     history_columns: Sequence[tuple[str, Any]],
     path: Path,
     filter_row: Callable[[Sequence[Any]], bool],
-    cmd: str,
+    lines: Iterable[tuple[int, bytes]],
     limit: int | None,
     logger: Logger,
 ) -> list[Any]:
     entries: list[Any] = []
-    with subprocess.Popen(
-        cmd,
-        shell=True,  # nosec B602 # BNS:67522a
-        close_fds=True,
-        stdout=subprocess.PIPE,
-    ) as grep:
-        if grep.stdout is None:
-            raise Exception("Huh? stdout vanished...")
-
-        for line in grep.stdout:
-            if limit is not None and len(entries) > limit:
-                break
-            try:
-                parts: list[Any] = line.decode("utf-8").rstrip("\n").split("\t")
-                convert_history_line(history_columns, parts)
-                if filter_row(parts):
-                    entries.append(parts)
-            except Exception:
-                logger.exception("Invalid line '%s' in history file %s", line, path)
+    for line_number, line in lines:
+        if limit is not None and len(entries) > limit:
+            break
+        try:
+            parts: list[Any] = [line_number, *line.decode("utf-8").rstrip("\n").split("\t")]
+            convert_history_line(history_columns, parts)
+            if filter_row(parts):
+                entries.append(parts)
+        except Exception:
+            logger.exception("Invalid line '%s' in history file %s", line, path)
 
     return entries
 
@@ -300,8 +417,8 @@ def parse_history_file_python(
     """Pure python reader for history files. Used for update config, where filtering is not needed.
 
     To avoid slurping the whole file in memory this generator yields chunks of entries.
-    This is not faster than the grep approach(parse_history_file()), but it's more memory efficient
-    and does not need to fork a subprocess and other cmk specific stuff.
+    This does not use the indexes of the history files (parse_history_file()), but it's more
+    memory efficient and does not need other cmk specific stuff.
     """
     with open(path, "rb") as f:
         for chunk in itertools.batched(f, 100_000):
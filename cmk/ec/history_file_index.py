@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Sidecar index of a history file of the file history backend
+
+For every line of a history file the index holds its offset and its time. In
+addition, it maps the values of some frequently filtered columns (event id, host,
+rule id) to the numbers of the lines containing them. History files are only
+appended to, so an index is extended with the lines written since it was built.
+
+Layout of an index file (native byte order, it never leaves the site):
+
+    MAGIC | header | offsets (int64 per line) | times (double per line) | values (JSON)
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+from array import array
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from logging import Logger
+from pathlib import Path
+from typing import Final
+
+from cmk.ccc import store
+
+_MAGIC: Final = b"CMKECHISTIDX\x01"
+# indexed size of the history file, inode of the history file, number of lines, values length
+_HEADER: Final = struct.Struct("=QQQQ")
+
+# The position of the columns in a line of a history file, see FileHistory.add()
+_TIME_COLUMN: Final = 0
+INDEXED_COLUMNS: Final[Mapping[str, int]] = {
+    "event_id": 4,
+    "event_host": 11,
+    "event_rule_id": 17,
+}
+
+
+def index_path(path: Path) -> Path:
+    return path.with_suffix(".idx")
+
+
+@dataclass(frozen=True)
+class HistoryFileIndex:
+    size: int
+    """The number of bytes of the history file covered by the index"""
+    inode: int
+    offsets: array[int]
+    times: array[float]
+    values: dict[str, dict[str, list[int]]]
+    """column name -> column value -> line numbers (starting at 0)"""
+
+    def lookup(self, column_name: str, values: Iterable[str]) -> set[int]:
+        lines = self.values[column_name]
+        return {line for value in values for line in lines.get(value, ())}
+
+    def lines_in_time_range(
+        self, lines: Iterable[int], time_range: tuple[float | None, float | None]
+    ) -> list[int]:
+        lo, hi = time_range
+        return [
+            line
+            for line in lines
+            if (lo is None or self.times[line] >= lo) and (hi is None or self.times[line] <= hi)
+        ]
+
+    def serialize(self) -> bytes:
+        raw_values = json.dumps(self.values, separators=(",", ":")).encode("utf-8")
+        return b"".join(
+            (
+                _MAGIC,
+                _HEADER.pack(self.size, self.inode, len(self.offsets), len(raw_values)),
+                self.offsets.tobytes(),
+                self.times.tobytes(),
+                raw_values,
+            )
+        )
+
+    @classmethod
+    def deserialize(cls, raw: bytes) -> HistoryFileIndex:
+        if not raw.startswith(_MAGIC):
+            raise ValueError("not a history file index")
+        size, inode, num_lines, values_length = _HEADER.unpack_from(raw, len(_MAGIC))
+        start = len(_MAGIC) + _HEADER.size
+        offsets = array("q")
+        offsets.frombytes(raw[start : (start := start + num_lines * offsets.itemsize)])
+        times = array("d")
+        times.frombytes(raw[start : (start := start + num_lines * times.itemsize)])
+        if len(raw) != start + values_length:
+            raise ValueError("truncated history file index")
+        return cls(
+            size=size,
+            inode=inode,
+            offsets=offsets,
+            times=times,
+            values=json.loads(raw[start:]),
+        )
+
+
+def load_index(path: Path) -> HistoryFileIndex | None:
+    """Load the index of the history file, if it is (still) valid"""
+    try:
+        index = HistoryFileIndex.deserialize(index_path(path).read_bytes())
+        stat = path.stat()
+    except (OSError, ValueError):
+        return None
+    if index.inode != stat.st_ino or index.size > stat.st_size:
+        return None
+    return index
+
+
+def update_index(path: Path, logger: Logger) -> None:
+    """Create the index of the history file or extend it by the recently written lines"""
+    index = load_index(path) or HistoryFileIndex(
+        size=0,
+        inode=path.stat().st_ino,
+        offsets=array("q"),
+        times=array("d"),
+        values={column_name: {} for column_name in INDEXED_COLUMNS},
+    )
+    with path.open("rb") as f:
+        f.seek(index.size)
+        new_data = f.read()
+    if not (complete_data := new_data[: new_data.rfind(b"\n") + 1]):
+        return
+
+    offset = index.size
+    # The arrays and dicts of a loaded index are not shared, so they are extended in place.
+    for line in complete_data[:-1].split(b"\n"):
+        line_number = len(index.offsets)
+        index.offsets.append(offset)
+        offset += len(line) + 1
+        columns = line.split(b"\t")
+        try:
+            index.times.append(float(columns[_TIME_COLUMN]))
+        except ValueError:
+            index.times.append(0.0)  # invalid line, will be reported when it is read
+        for column_name, column in INDEXED_COLUMNS.items():
+            if column < len(columns):
+                value = columns[column].decode("utf-8", "replace")
+                index.values[column_name].setdefault(value, []).append(line_number)
+
+    logger.debug("Indexed history file %s up to line %d", path, len(index.offsets))
+    store.save_bytes_to_file(
+        index_path(path),
+        HistoryFileIndex(
+            size=offset,
+            inode=index.inode,
+            offsets=index.offsets,
+            times=index.times,
+            values=index.values,
+        ).serialize(),
+    )
+
+
+def read_lines(
+    path: Path, index: HistoryFileIndex, lines: Iterable[int]
+) -> Iterator[tuple[int, bytes]]:
+    """Read the given lines (numbers starting at 0) of the indexed part of the history file"""
+    if not index.size:
+        return
+    with path.open("rb") as f, mmap.mmap(f.fileno(), index.size, access=mmap.ACCESS_READ) as m:
+        for line in lines:
+            start = index.offsets[line]
+            end = index.offsets[line + 1] if line + 1 < len(index.offsets) else index.size
+            yield line, m[start:end]
@@ -14,11 +14,13 @@ from __future__ import annotations
 
 import abc
 import ast
+import collections
 import contextlib
 import errno
 import ipaddress
 import itertools
 import json
+import multiprocessing
 import os
 import pprint
 import select
@@ -29,6 +31,7 @@ import threading
 import time
 import traceback
 from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
 from logging import DEBUG, getLogger, Logger
 from pathlib import Path
 from types import FrameType
@@ -55,12 +58,14 @@ from .config import Config, ConfigFromWATO, Count, ECRulePack, MatchGroups, Rule
 from .core_queries import HostInfo, query_hosts_scheduled_downtime_depth
 from .crash_reporting import CrashReportStore, ECCrashReport
 from .event import create_events_from_syslog_messages, Event, scrub_string
+from .event_store import EventStore
 from .helpers import ECLock, parse_bytes_into_syslog_messages
 from .history import ActiveHistoryPeriod, get_logfile, History, HistoryWhat, quote_tab, TimedHistory
 from .history_file import FileHistory
 from .history_mongo import MongoDBHistory
 from .history_sqlite import SQLiteHistory, SQLiteSettings
 from .host_config import HostConfig
+from .message_queue import MessageQueue, parse_syslog_batches, ReceivedData
 from .perfcounters import Perfcounters
 from .query import (
     Columns,
@@ -76,6 +81,7 @@ from .rule_matcher import compile_rule, match, MatchFailure, MatchResult, MatchS
 from .rule_packs import load_active_config
 from .settings import create_settings, FileDescriptor, PortNumber, Settings
 from .snmp import SNMPTrapParser
+from .status_journal import StatusJournal
 from .syslog import SyslogFacility, SyslogPriority
 from .timeperiod import TimePeriods
 
@@ -349,8 +355,112 @@ class MKSignalException(MKException):
 #   '----------------------------------------------------------------------'
 
 
+# Batches of received messages waiting for the event processor
+_RECEIVE_QUEUE_LEN = 10000
+# Handing over messages to a parser process costs some hundred microseconds, parsing a message
+# in the event processor some ten microseconds: The pool only parses the larger drains.
+_MIN_POOL_MESSAGES = 64
+# Limit the messages of one drain of the queue, so that the parsers share the work of a burst
+_MAX_DRAIN_MESSAGES = 1000
+
+
+class EventProcessor(ECServerThread):
+    """Parses the received messages and feeds them into the event server, one at a time."""
+
+    def __init__(
+        self,
+        logger: Logger,
+        settings: Settings,
+        config: Config,
+        slave_status: SlaveStatus,
+        event_server: EventServer,
+        message_queue: MessageQueue,
+    ) -> None:
+        super().__init__(
+            name="EventProcessor",
+            logger=logger,
+            settings=settings,
+            config=config,
+            slave_status=slave_status,
+            profiling_enabled=settings.options.profile_event,
+            profile_file=settings.paths.event_processor_profile.value,
+        )
+        self._event_server = event_server
+        self._message_queue = message_queue
+
+    def serve(self) -> None:
+        if not (processes := self.settings.options.parser_processes):
+            while not self._terminate_event.is_set():
+                if (data := self._message_queue.get(timeout=1)) is not None:
+                    self._event_server.process_received_data(data)
+            return
+
+        with ProcessPoolExecutor(
+            processes, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            # The drains of the queue in the order they were received, with their events if
+            # parsed by the pool
+            pending: collections.deque[
+                tuple[Sequence[ReceivedData], Future[Sequence[Sequence[Event] | None]] | None]
+            ] = collections.deque()
+
+            def process_oldest() -> None:
+                drained, parsed = pending.popleft()
+                events = [None] * len(drained) if parsed is None else parsed.result()
+                for data, data_events in zip(drained, events):
+                    self._event_server.process_received_data(data, data_events)
+
+            while not self._terminate_event.is_set():
+                # Keep the parsers busy while the events of the oldest drain are processed
+                while len(pending) < 2 * processes and (
+                    drained := self._drain_queue(timeout=0 if pending else 1)
+                ):
+                    pending.append((drained, self._parse_in_pool(pool, drained)))
+                if pending:
+                    process_oldest()
+            while pending:
+                process_oldest()
+
+    def _drain_queue(self, timeout: float) -> Sequence[ReceivedData]:
+        """The data in the queue, waiting up to `timeout` seconds for the first one"""
+        drained: list[ReceivedData] = []
+        messages = 0
+        while (
+            messages < _MAX_DRAIN_MESSAGES
+            and (data := self._message_queue.get(timeout=0 if drained else timeout)) is not None
+        ):
+            drained.append(data)
+            messages += len(data.messages)
+        return drained
+
+    def _parse_in_pool(
+        self, pool: ProcessPoolExecutor, drained: Sequence[ReceivedData]
+    ) -> Future[Sequence[Sequence[Event] | None]] | None:
+        """Parse the syslog messages of a drain with one call of a parser process
+
+        Returns None if the messages are parsed by the event processor, e.g. the few
+        messages of a single UDP datagram.
+        """
+        batches = [
+            (data.messages, data.address) if self._event_server.may_parse_elsewhere(data) else None
+            for data in drained
+        ]
+        if sum(len(batch[0]) for batch in batches if batch is not None) < _MIN_POOL_MESSAGES:
+            return None
+        return pool.submit(parse_syslog_batches, batches)
+
+    def run(self) -> None:
+        super().run()
+        # Process what has been received before the termination
+        while (data := self._message_queue.get(timeout=0)) is not None:
+            try:
+                self._event_server.process_received_data(data)
+            except Exception:
+                self._logger.exception("Exception while processing the remaining messages")
+
+
 class EventServer(ECServerThread):
-    """Processing and classification of incoming events."""
+    """Receiving and classification of incoming events."""
 
     def __init__(
         self,
@@ -398,6 +508,15 @@ class EventServer(ECServerThread):
             omd_site_id=omd_site(),
             is_active_time_period=self._time_period.active,
         )
+        self._message_queue = MessageQueue(_RECEIVE_QUEUE_LEN, perfcounters)
+        self._processor = EventProcessor(
+            logger.getChild("EventProcessor"),
+            settings,
+            config,
+            slave_status,
+            self,
+            self._message_queue,
+        )
 
         # HACK for testing: The real fix would involve breaking up these huge
         # class monsters.
@@ -647,7 +766,20 @@ class EventServer(ECServerThread):
         # http://www.outflux.net/blog/archives/2008/03/09/using-select-on-a-fifo/
         return os.open(str(self.settings.paths.event_pipe.value), os.O_RDWR | os.O_NONBLOCK)
 
+    def start(self) -> None:
+        self._processor.start()
+        super().start()
+
+    def terminate(self) -> None:
+        super().terminate()
+        self._processor.terminate()
+
+    def join(self, timeout: float | None = None) -> None:
+        super().join(timeout)
+        self._processor.join(timeout)
+
     def serve(self) -> None:  # pylint: disable=too-many-branches
+        """Only receive the messages here, they are processed by the EventProcessor"""
         pipe = self.open_pipe()
         listen_list = [
             f
@@ -707,7 +839,7 @@ class EventServer(ECServerThread):
                         messages, unprocessed = parse_bytes_into_syslog_messages(
                             previous_data + new_data
                         )
-                        self.process_syslog_messages(messages, address)
+                        self._message_queue.put(messages, address)
                         client_sockets[fd] = (cs, address, unprocessed)
                     else:  # the other side is gone, no more data will ever come
                         del client_sockets[fd]  # discarding previous_data is OK, it's incomplete
@@ -723,31 +855,52 @@ class EventServer(ECServerThread):
                 messages, unprocessed_pipe_data = parse_bytes_into_syslog_messages(
                     unprocessed_pipe_data
                 )
-                self.process_syslog_messages(messages, None)
+                self._message_queue.put(messages, None)
 
             # Read events from builtin syslog server
             if self._syslog_udp is not None and self._syslog_udp in readable:
                 message, address = self._syslog_udp.recvfrom(4096)
-                self.process_syslog_messages(
-                    [message], parse_address("syslog socket (UDP)", address)
-                )
+                self._message_queue.put([message], parse_address("syslog socket (UDP)", address))
 
             # Read events from builtin snmptrap server
             if self._snmp_trap_socket is not None and self._snmp_trap_socket in readable:
                 message, address = self._snmp_trap_socket.recvfrom(65535)
-                self.process_potential_event_instrumented(
-                    self.create_events_from_trap(message, parse_address("SNMP trap", address))
+                self._message_queue.put(
+                    [message], parse_address("SNMP trap", address), is_trap=True
                 )
 
-            if spool_files := sorted(
-                self.settings.paths.spool_dir.value.glob("[!.]*"), key=lambda x: x.stat().st_mtime
+            # Spool files are only taken when they can be queued, they must not be dropped.
+            if not self._message_queue.full() and (
+                spool_files := sorted(
+                    self.settings.paths.spool_dir.value.glob("[!.]*"),
+                    key=lambda x: x.stat().st_mtime,
+                )
             ):
-                self.process_syslog_messages(spool_files[0].read_bytes().splitlines(), None)
+                self._message_queue.put(spool_files[0].read_bytes().splitlines(), None)
                 spool_files[0].unlink()
                 select_timeout = 0  # enable fast processing to process further files
             else:
                 select_timeout = 1  # restore default select timeout
 
+    def may_parse_elsewhere(self, data: ReceivedData) -> bool:
+        """Whether the messages may be parsed without the logging of the rule debugging"""
+        return not data.is_trap and not self._config["debug_rules"]
+
+    def process_received_data(
+        self, data: ReceivedData, events: Sequence[Event] | None = None
+    ) -> None:
+        """Process the received messages, `events` are the ones already parsed from them"""
+        if data.is_trap:
+            assert data.address is not None  # traps are only received via UDP
+            for message in data.messages:
+                self.process_potential_event_instrumented(
+                    self.create_events_from_trap(message, data.address)
+                )
+        elif events is not None:
+            self.process_potential_event_instrumented(events)
+        else:
+            self.process_syslog_messages(data.messages, data.address)
+
     def create_events_from_trap(self, data: bytes, address: tuple[str, int]) -> Iterator[Event]:
         try:
             if varbinds_and_ipaddress := self._snmp_trap_parser(data, address):
@@ -872,6 +1025,7 @@ class EventServer(ECServerThread):
                             event["last_token"] = (
                                 last_token + new_tokens * secs_per_token
                             )  # not now! would be unfair
+                            self._event_status.event_changed(event)
                             if event["count"] == 0:
                                 self._logger.info(
                                     "Rule %s/%s, event %d: again without allowed rate, dropping event",
@@ -905,6 +1059,7 @@ class EventServer(ECServerThread):
                         event["rule_id"],
                     )
                     event["phase"] = "open"
+                    self._event_status.event_changed(event)
                     self._history.add(event, "DELAYOVER")
                     if rule:
                         event_has_opened(
@@ -985,9 +1140,8 @@ class EventServer(ECServerThread):
                 # First look for case 1: rule that already have at least one hit
                 # and this events in the state "counting" exist.
                 events_to_delete: list[tuple[Event, HistoryWhat]] = []
-                events = self._event_status.events()
-                for event in events:
-                    if event["rule_id"] == rule["id"] and event["phase"] == "counting":
+                for event in self._event_status.events_of_rule(rule["id"]):
+                    if event["phase"] == "counting":
                         # time has elapsed. Now lets see if we have reached
                         # the necessary count:
                         if event["count"] < expected_count:  # no -> trigger alarm
@@ -1040,10 +1194,8 @@ class EventServer(ECServerThread):
             merge, reset_ack = merge  # type: ignore[unreachable]
 
         if merge != "never":
-            for event in self._event_status.events():
-                if event["rule_id"] == rule["id"] and (
-                    event["phase"] == "open" or (event["phase"] == "ack" and merge == "acked")
-                ):
+            for event in self._event_status.events_of_rule(rule["id"]):
+                if event["phase"] == "open" or (event["phase"] == "ack" and merge == "acked"):
                     merge_event = event
                     break
 
@@ -1062,6 +1214,7 @@ class EventServer(ECServerThread):
             # Better rewrite (again). Rule might have changed. Also we have changed
             # the text and the user might have his own text added via set_text.
             self.rewrite_event(rule, merge_event, MatchGroups(), set_first=False)
+            self._event_status.event_changed(merge_event)
             self._history.add(merge_event, "COUNTFAILED")
         else:
             # Create artificial event from scratch. Make sure that all important
@@ -1360,6 +1513,7 @@ class EventServer(ECServerThread):
                                 existing_event,
                             )
 
+                        self._event_status.event_changed(existing_event)
                         self._history.add(existing_event, "COUNTREACHED")
 
                         if "delay" not in rule and rule.get("autodelete"):
@@ -1390,6 +1544,7 @@ class EventServer(ECServerThread):
                             rule,
                             event,
                         )
+                        self._event_status.event_changed(event)
                         if rule.get("autodelete"):
                             event["phase"] = "closed"
                             with self._event_status.lock:
@@ -2273,6 +2428,7 @@ class StatusServer(ECServerThread):
                 event["contact"] = contact
             if user:
                 event["owner"] = user
+            self._event_status.event_changed(event)
             self._history.add(event, "UPDATE", user)
 
     def handle_command_create(self, arguments: list[str]) -> None:
@@ -2291,6 +2447,7 @@ class StatusServer(ECServerThread):
             event["state"] = int(newstate)
             if user:
                 event["owner"] = user
+            self._event_status.event_changed(event)
             self._history.add(event, "CHANGESTATE", user)
 
     def handle_command_reload(self) -> None:
@@ -2339,6 +2496,7 @@ class StatusServer(ECServerThread):
             event: Event | None = self._event_status.event(int(event_id))
             if user and event is not None:
                 event["owner"] = user
+                self._event_status.event_changed(event)
 
             # TODO: De-duplicate code from do_event_actions()
             if action_id == "@NOTIFY" and event is not None:
@@ -2542,6 +2700,7 @@ class EventStatus:
         self.lock = threading.Lock()
         self._history = history
         self._logger = logger
+        self._journal = StatusJournal(settings.paths.status_journal_file.value, logger)
         self.flush()
 
     def reload_configuration(self, config: Config, history: History) -> None:
@@ -2550,7 +2709,9 @@ class EventStatus:
 
     def flush(self) -> None:
         # TODO: Improve types!
-        self._events: list[Event] = []
+        self._events = EventStore()
+        self._journal.discard_changes()
+        self._needs_snapshot = True
         self._next_event_id = 1
         self._rule_stats: dict[str, int] = {}
         # needed for expecting rules
@@ -2564,13 +2725,19 @@ class EventStatus:
 
     def events(self) -> list[Event]:
         # TODO: Improve type!
-        return self._events
+        return self._events.all()
+
+    def events_of_rule(self, rule_id: str | None) -> Sequence[Event]:
+        return self._events.of_rule(rule_id)
 
     def event(self, eid: int) -> Event | None:
-        for event in self._events:
-            if event["id"] == eid:
-                return event
-        return None
+        return self._events.get(eid)
+
+    def event_changed(self, event: Event) -> None:
+        """Remember to persist an event that has been modified in place"""
+        if event in self._events:
+            self._events.reindex(event)
+            self._journal.event_changed(event)
 
     def interval_start(self, rule_id: str, interval: int) -> int:
         """
@@ -2619,20 +2786,42 @@ class EventStatus:
     def pack_status(self) -> PackedEventStatus:
         return PackedEventStatus(
             next_event_id=self._next_event_id,
-            events=self._events,
+            events=self._events.all(),
             rule_stats=self._rule_stats,
             interval_starts=self._interval_starts,
         )
 
     def unpack_status(self, status: PackedEventStatus) -> None:
         self._next_event_id = status["next_event_id"]
-        self._events = status["events"]
+        self._events = EventStore(status["events"])
         self._rule_stats = status["rule_stats"]
         self._interval_starts = status["interval_starts"]
+        self._journal.discard_changes()
+        self._needs_snapshot = True
 
     def save_status(self) -> None:
+        """Append the changes to the journal, from time to time write a complete snapshot"""
+        if self._needs_snapshot or self._journal.needs_compaction(len(self._events)):
+            self._save_snapshot()
+            return
+
         now = time.time()
-        status = self.pack_status()
+        num_changes = self._journal.append(
+            self._next_event_id, self._rule_stats, self._interval_starts
+        )
+        elapsed = time.time() - now
+        self._logger.log(
+            VERBOSE,
+            "Saved %d event changes to %s in %.3fms.",
+            num_changes,
+            self.settings.paths.status_journal_file.value,
+            elapsed * 1000,
+        )
+
+    def _save_snapshot(self) -> None:
+        now = time.time()
+        generation = self._journal.generation + 1
+        status = {**self.pack_status(), "journal_generation": generation}
         path = self.settings.paths.status_file.value
         path_new = path.parent / (path.name + ".new")
         # Believe it or not: cPickle is more than two times slower than repr()
@@ -2641,6 +2830,8 @@ class EventStatus:
             f.flush()
             os.fsync(f.fileno())
         path_new.rename(path)
+        self._journal.reset(generation)
+        self._needs_snapshot = False
         elapsed = time.time() - now
         self._logger.log(VERBOSE, "Saved event state to %s in %.3fms.", path, elapsed * 1000)
 
@@ -2657,17 +2848,21 @@ class EventStatus:
         if path.exists():
             try:
                 status = ast.literal_eval(path.read_text(encoding="utf-8"))
+                self._journal.replay(status, status.get("journal_generation", 0))
                 self._next_event_id = status["next_event_id"]
-                self._events = status["events"]
+                self._events = EventStore(status["events"])
                 self._rule_stats = status["rule_stats"]
                 self._interval_starts = status.get("interval_starts", {})
+                # Fold the journal and the fixes below into a new snapshot
+                self._journal.discard_changes()
+                self._needs_snapshot = True
                 self._logger.info("Loaded event state from %s.", path)
             except Exception:
                 self._logger.exception("Error loading event state from %s", path)
                 raise
 
         # Add new columns and fix broken events
-        for event in self._events:
+        for event in self._events.all():
             event.setdefault("ipaddress", "")
             event.setdefault("host", HostName(""))
             event.setdefault("application", "")
@@ -2690,7 +2885,7 @@ class EventStatus:
 
         self.num_existing_events_by_host: dict[tuple[str, HostName | None], int] = {}
         self.num_existing_events_by_rule: dict[Any, int] = {}
-        for event in self._events:
+        for event in self._events.all():
             self._count_event_add(event)
 
     def _count_event_add(self, event: Event) -> None:
@@ -2716,7 +2911,8 @@ class EventStatus:
         self._perfcounters.count("events")
         event["id"] = self._next_event_id
         self._next_event_id += 1
-        self._events.append(event)
+        self._events.add(event)
+        self._journal.event_changed(event)
         self.num_existing_events += 1
         self._count_event_add(event)
         self._history.add(event, "NEW")
@@ -2729,19 +2925,19 @@ class EventStatus:
         self._history.add(event, "ARCHIVED")
 
     def remove_event(self, event: Event, delete_reason: HistoryWhat, user: str = "") -> None:
-        try:
-            self._events.remove(event)
-            self._history.add(event, delete_reason, user)
-            self._count_event_remove(event)
-        except ValueError:
-            self._logger.exception("Cannot remove event %d: not present", event["id"])
+        if not self._events.remove(event):
+            self._logger.error("Cannot remove event %d: not present", event["id"])
+            return
+        self._journal.event_removed(event)
+        self._history.add(event, delete_reason, user)
+        self._count_event_remove(event)
 
     # protected by self.lock
     def remove_oldest_event(self, ty: LimitKind, event: Event) -> None:
         if ty == "overall":
             self._logger.log(VERBOSE, "  Removing oldest event")
-            oldest_event = self._events[0]
-            self.remove_event(oldest_event, "AUTODELETE")
+            if (oldest_event := self._events.oldest()) is not None:
+                self.remove_event(oldest_event, "AUTODELETE")
         elif ty == "by_rule" and event["rule_id"] is not None:
             self._logger.log(VERBOSE, '  Removing oldest event of rule "%s"', event["rule_id"])
             self._remove_oldest_event_of_rule(event["rule_id"])
@@ -2751,17 +2947,13 @@ class EventStatus:
 
     # protected by self.lock
     def _remove_oldest_event_of_rule(self, rule_id: str) -> None:
-        for event in self._events:
-            if event["rule_id"] == rule_id:
-                self.remove_event(event, "AUTODELETE")
-                return
+        if (event := self._events.oldest_of_rule(rule_id)) is not None:
+            self.remove_event(event, "AUTODELETE")
 
     # protected by self.lock
-    def _remove_oldest_event_of_host(self, hostname: str) -> None:
-        for event in self._events:
-            if event["host"] == hostname:
-                self.remove_event(event, "AUTODELETE")
-                return
+    def _remove_oldest_event_of_host(self, hostname: HostName) -> None:
+        if (event := self._events.oldest_of_host(hostname)) is not None:
+            self.remove_event(event, "AUTODELETE")
 
     # protected by self.lock
     def get_num_existing_events_by(self, ty: LimitKind, event: Event) -> int:
@@ -2789,10 +2981,8 @@ class EventStatus:
         """
         with self.lock:
             to_delete = []
-            for event in self._events:
-                if event["rule_id"] == rule["id"] and self.cancelling_match(
-                    match_groups, new_event, event, rule
-                ):
+            for event in self._events.of_rule(rule["id"]):
+                if self.cancelling_match(match_groups, new_event, event, rule):
                     # Fill a few fields of the cancelled event with data from
                     # the cancelling event so that action scripts have useful
                     # values and the logfile entry if more relevant.
@@ -2965,10 +3155,11 @@ class EventStatus:
                 preserve["contact"] = found["contact"]
         found.update(event)
         found.update(preserve)
+        self.event_changed(found)
 
     def count_expected_event(self, event_server: EventServer, event: Event) -> None:
-        for ev in self._events:
-            if ev["rule_id"] == event["rule_id"] and ev["phase"] == "counting":
+        for ev in self._events.of_rule(event["rule_id"]):
+            if ev["phase"] == "counting":
                 self.count_event_up(ev, event)
                 return
 
@@ -2985,31 +3176,33 @@ class EventStatus:
         since the event has been created because the count was too
         low in the specified period of time.
         """
-        for ev in self._events:
-            if ev["rule_id"] == event["rule_id"]:
-                if ev["phase"] == "ack" and not count["count_ack"]:
-                    continue  # skip acknowledged events
-
-                if count["separate_host"] and ev["host"] != event["host"]:
-                    continue  # treat events with separated hosts separately
+        candidates = (
+            # treat events with separated hosts separately
+            [ev for ev in self._events.of_host(event["host"]) if ev["rule_id"] == event["rule_id"]]
+            if count["separate_host"]
+            else self._events.of_rule(event["rule_id"])
+        )
+        for ev in candidates:
+            if ev["phase"] == "ack" and not count["count_ack"]:
+                continue  # skip acknowledged events
 
-                if count["separate_application"] and ev["application"] != event["application"]:
-                    continue  # same for application
+            if count["separate_application"] and ev["application"] != event["application"]:
+                continue  # same for application
 
-                if count["separate_match_groups"] and ev["match_groups"] != event["match_groups"]:
-                    continue
+            if count["separate_match_groups"] and ev["match_groups"] != event["match_groups"]:
+                continue
 
-                count_duration = count.get("count_duration")
-                if count_duration is not None and ev["first"] + count_duration < event["time"]:
-                    # Counting has been discontinued on this event after a certain time
-                    continue
+            count_duration = count.get("count_duration")
+            if count_duration is not None and ev["first"] + count_duration < event["time"]:
+                # Counting has been discontinued on this event after a certain time
+                continue
 
-                if ev["host_in_downtime"] != event["host_in_downtime"]:
-                    continue  # treat events with different downtime states separately
+            if ev["host_in_downtime"] != event["host_in_downtime"]:
+                continue  # treat events with different downtime states separately
 
-                found = ev
-                self.count_event_up(found, event)
-                break
+            found = ev
+            self.count_event_up(found, event)
+            break
         else:
             event["count"] = 1
             event["phase"] = "counting"
@@ -3019,11 +3212,12 @@ class EventStatus:
         # Did we just count the event that was just one too much?
         if found["phase"] == "counting" and found["count"] >= count["count"]:
             found["phase"] = "open"
+            self.event_changed(found)
             return found  # do event action, return found copy of event
         return None  # do not do event action
 
     def delete_events_by(self, predicate: Callable[[Event], bool], user: str) -> None:
-        for event in self._events[:]:
+        for event in self._events.all():
             if predicate(event):
                 event["phase"] = "closed"
                 if user:
@@ -3031,7 +3225,7 @@ class EventStatus:
                 self.remove_event(event, "DELETE", user)
 
     def get_events(self) -> Iterable[Event]:
-        return self._events
+        return self._events.all()
 
     def get_rule_stats(self) -> Iterable[tuple[str, int]]:
         return sorted(self._rule_stats.items(), key=lambda x: x[0])
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Hand over of the received messages from the receiver to the event processor
+
+The receiver only drains the sockets, the pipe and the spool directory. Parsing and
+rule matching happens in the event processor, so that a burst of messages does not
+overflow the receive buffers of the sockets while the rules are being evaluated.
+
+The syslog messages are parsed by a pool of processes while the event processor
+matches the rules against the events of the previous batches. All batches drained
+from the queue at once go to the pool together, a few messages are parsed by the
+event processor itself. The rule matching and all changes of the event status stay
+in the event processor thread: they depend on the time periods and the host config
+of the event server, and the matching of a rule depends on the events created by the
+rules before.
+"""
+
+from __future__ import annotations
+
+import queue
+import time
+from collections.abc import Sequence
+from typing import Final, NamedTuple
+
+from .event import create_events_from_syslog_messages, Event
+from .perfcounters import Perfcounters
+
+
+class ReceivedData(NamedTuple):
+    """A batch of raw messages (or a single raw SNMP trap) from one source"""
+
+    messages: Sequence[bytes]
+    address: tuple[str, int] | None
+    is_trap: bool
+    received: float
+
+
+class MessageQueue:
+    """A bounded queue of received data, overflowing data is dropped and counted"""
+
+    def __init__(self, maxsize: int, perfcounters: Perfcounters) -> None:
+        self._queue: Final[queue.Queue[ReceivedData]] = queue.Queue(maxsize)
+        self._perfcounters: Final = perfcounters
+
+    def full(self) -> bool:
+        return self._queue.full()
+
+    def empty(self) -> bool:
+        return self._queue.empty()
+
+    def put(
+        self,
+        messages: Sequence[bytes],
+        address: tuple[str, int] | None,
+        *,
+        is_trap: bool = False,
+    ) -> bool:
+        if not messages:
+            return True
+        try:
+            self._queue.put_nowait(ReceivedData(messages, address, is_trap, time.time()))
+        except queue.Full:
+            self._perfcounters.count("queue_drops", len(messages))
+            return False
+        self._perfcounters.count("received", len(messages))
+        return True
+
+    def get(self, timeout: float) -> ReceivedData | None:
+        try:
+            data = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        self._perfcounters.count_time("queue_wait", time.time() - data.received)
+        return data
+
+
+def parse_syslog_batches(
+    batches: Sequence[tuple[Sequence[bytes], tuple[str, int] | None] | None],
+) -> Sequence[Sequence[Event] | None]:
+    """The events of the batches of syslog messages, called in the parser processes
+
+    All batches drained from the queue at once are parsed with one call, this keeps the
+    overhead of the pool low. None stands for a batch which is not parsed here.
+    """
+    return [
+        None if batch is None else list(create_events_from_syslog_messages(*batch, None))
+        for batch in batches
+    ]
@@ -28,6 +28,8 @@ class Perfcounters:
         "overflows",
         "events",
         "connects",
+        "received",  # messages put into the receive queue
+        "queue_drops",  # messages dropped because the receive queue was full
     ]
 
     # Average processing times
@@ -35,6 +37,7 @@ class Perfcounters:
         "processing": 0.99,  # event processing
         "sync": 0.95,  # Replication sync
         "request": 0.95,  # Client requests
+        "queue_wait": 0.99,  # time from receiving a message until its processing starts
     }
 
     # TODO: Why aren't self._times / self._rates / ... not initialized with their defaults?
@@ -51,9 +54,9 @@ class Perfcounters:
 
         self._logger = logger.getChild("Perfcounters")
 
-    def count(self, counter: str) -> None:
+    def count(self, counter: str, value: int = 1) -> None:
         with self._lock:
-            self._counters[counter] += 1
+            self._counters[counter] += value
 
     def count_time(self, counter: str, ptime: float) -> None:
         with self._lock:
@@ -8,6 +8,7 @@
 # but excellent article "Parsing Command Line Arguments" in the FPComplete blog
 # at https://www.fpcomplete.com/blog/2017/12/parsing-command-line-arguments.
 
+import os
 import sys
 from argparse import ArgumentParser, ArgumentTypeError, RawDescriptionHelpFormatter
 from pathlib import Path
@@ -36,8 +37,10 @@ class Paths(NamedTuple):
     slave_status_file: AnnotatedPath
     spool_dir: AnnotatedPath
     status_file: AnnotatedPath
+    status_journal_file: AnnotatedPath
     status_server_profile: AnnotatedPath
     event_server_profile: AnnotatedPath
+    event_processor_profile: AnnotatedPath
     compiled_mibs_dir: AnnotatedPath
     mongodb_config_file: AnnotatedPath
 
@@ -61,12 +64,16 @@ def create_paths(omd_root: Path) -> Paths:
         slave_status_file=AnnotatedPath("slave status", state_dir / "slave_status"),
         spool_dir=AnnotatedPath("spool directory", state_dir / "spool"),
         status_file=AnnotatedPath("status file", state_dir / "status"),
+        status_journal_file=AnnotatedPath("status journal", state_dir / "status.journal"),
         status_server_profile=AnnotatedPath(
             "status server profile", state_dir / "StatusServer.profile"
         ),
         event_server_profile=AnnotatedPath(
             "event server profile", state_dir / "EventServer.profile"
         ),
+        event_processor_profile=AnnotatedPath(
+            "event processor profile", state_dir / "EventProcessor.profile"
+        ),
         compiled_mibs_dir=AnnotatedPath(
             "compiled MIBs directory", omd_root / "local/share/check_mk/compiled_mibs"
         ),
@@ -169,6 +176,16 @@ class ECArgumentParser(ArgumentParser):
             action="store_true",
             help="enable debug mode, letting exceptions through",
         )
+        self.add_argument(
+            "--parser-processes",
+            metavar="N",
+            type=int,
+            default=_default_parser_processes(),
+            help=(
+                "number of processes parsing the received syslog messages, 0 parses them "
+                "in the event processor thread (default: %(default)s)"
+            ),
+        )
         self.add_argument(
             "--profile-status",
             action="store_true",
@@ -192,6 +209,11 @@ class ECArgumentParser(ArgumentParser):
         return FileDescriptor(file_desc)
 
 
+def _default_parser_processes() -> int:
+    """Leave one CPU to the event processor, the parsers are not worth it on a single CPU"""
+    return min(4, (os.cpu_count() or 1) - 1)
+
+
 # a communication endpoint, e.g. for syslog or SNMP
 EndPoint = PortNumber | FileDescriptor
 
@@ -220,6 +242,7 @@ class Options(NamedTuple):
     debug: bool
     profile_status: bool
     profile_event: bool
+    parser_processes: int
 
 
 class Settings(NamedTuple):
@@ -244,6 +267,7 @@ def create_settings(version: str, omd_root: Path, argv: list[str]) -> Settings:
         debug=args.debug,
         profile_status=args.profile_status,
         profile_event=args.profile_event,
+        parser_processes=max(args.parser_processes, 0),
     )
     return Settings(paths=paths, options=options)
 
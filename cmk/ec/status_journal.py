@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Write-ahead journal of the event status
+
+Between two snapshots of the whole event status (the status file), only the
+changes are appended to the journal: The current state of each created or
+changed event, the ids of the removed events and the counters.
+
+Each line of the journal is the repr() of one entry:
+
+    ("generation", 17)
+    ("event", {...})
+    ("delete", 4711)
+    ("counters", next_event_id, rule_stats, interval_starts)
+
+The first line names the snapshot the journal belongs to. The snapshot
+carries the same generation. A journal of another generation is stale: The
+snapshot has been written, but the process died before the journal was reset.
+"""
+
+from __future__ import annotations
+
+import ast
+import os
+from collections.abc import Iterable, Iterator, Mapping
+from logging import Logger
+from pathlib import Path
+from typing import Any, Final
+
+from .event import Event
+
+# Write a new snapshot when the journal holds more entries than this or the number
+# of events, whichever is greater.
+_MIN_ENTRIES_BEFORE_COMPACTION: Final = 1000
+
+
+class StatusJournal:
+    def __init__(self, path: Path, logger: Logger) -> None:
+        self._path: Final = path
+        self._logger: Final = logger
+        self.generation = 0
+        self._num_entries = 0
+        self._changed: dict[int, Event] = {}
+        self._removed: set[int] = set()
+
+    def event_changed(self, event: Event) -> None:
+        self._removed.discard(event["id"])
+        self._changed[event["id"]] = event
+
+    def event_removed(self, event: Event) -> None:
+        self._changed.pop(event["id"], None)
+        self._removed.add(event["id"])
+
+    def discard_changes(self) -> None:
+        self._changed.clear()
+        self._removed.clear()
+
+    def needs_compaction(self, num_events: int) -> bool:
+        return self._num_entries > max(_MIN_ENTRIES_BEFORE_COMPACTION, num_events)
+
+    def reset(self, generation: int) -> None:
+        """Start a new journal after a snapshot of the given generation has been written"""
+        self.generation = generation
+        self._num_entries = 0
+        self.discard_changes()
+        self._write(("generation", generation), mode="wb")
+
+    def append(
+        self,
+        next_event_id: int,
+        rule_stats: Mapping[str, int],
+        interval_starts: Mapping[str, int],
+    ) -> int:
+        """Persist the changes since the last call, returns the number of changed events"""
+        num_changes = len(self._changed) + len(self._removed)
+        self._write(
+            *(("event", event) for event in self._changed.values()),
+            *(("delete", event_id) for event_id in self._removed),
+            ("counters", next_event_id, rule_stats, interval_starts),
+            mode="ab",
+        )
+        self._num_entries += num_changes
+        self.discard_changes()
+        return num_changes
+
+    def _write(self, *entries: tuple[object, ...], mode: str) -> None:
+        with self._path.open(mode=mode) as f:
+            f.write("".join(f"{entry!r}\n" for entry in entries).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def replay(self, status: dict[str, Any], generation: int) -> None:
+        """Apply the journal to the status loaded from the snapshot of the given generation"""
+        self.generation = generation
+        try:
+            lines = self._path.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return
+
+        entries = _parse(lines, self._logger)
+        if next(entries, None) != ("generation", generation):
+            self._logger.info("Ignoring stale event status journal %s", self._path)
+            return
+
+        events = {event["id"]: event for event in status["events"]}
+        for entry in entries:
+            match entry:
+                case ("event", event):
+                    events[event["id"]] = event
+                case ("delete", event_id):
+                    events.pop(event_id, None)
+                case ("counters", next_event_id, rule_stats, interval_starts):
+                    status["next_event_id"] = next_event_id
+                    status["rule_stats"] = rule_stats
+                    status["interval_starts"] = interval_starts
+            self._num_entries += 1
+        status["events"] = list(events.values())
+        # The counters of the last (incomplete) write may be missing
+        status["next_event_id"] = max(status["next_event_id"], max(events, default=0) + 1)
+        self._logger.info(
+            "Replayed %d entries of the event status journal %s", self._num_entries, self._path
+        )
+
+
+def _parse(lines: Iterable[str], logger: Logger) -> Iterator[tuple[Any, ...]]:
+    for line in lines:
+        try:
+            yield ast.literal_eval(line)
+        except (SyntaxError, ValueError):
+            # Incomplete last write: Everything up to here is consistent.
+            logger.warning("Ignoring truncated event status journal entry")
+            return
@@ -51,6 +51,12 @@ class Fetcher(Generic[_TRawData], abc.ABC):
     def close(self) -> None:
         raise NotImplementedError()
 
+    def interrupt(self) -> None:
+        """Make a fetch running in another thread return as soon as possible
+
+        Fetchers which cannot be interrupted end within their own timeouts.
+        """
+
     @final
     def fetch(self, mode: Mode) -> result.Result[_TRawData, Exception]:
         """Return the data from the source, either cached or from IO."""
@@ -128,6 +128,18 @@ class ProgramFetcher(Fetcher[AgentRawData]):
         self._process.stderr.close()
         self._process = None
 
+    def interrupt(self) -> None:
+        # communicate() returns once the process and its children are gone. With Nagios we
+        # share the process group (see close()), so only the process itself is terminated.
+        process = self._process
+        if process is None or process.poll() is not None:
+            return
+        with suppress(OSError):
+            if self.is_cmc:
+                os.killpg(os.getpgid(process.pid), signal.SIGTERM)
+            else:
+                process.terminate()
+
     def _fetch_from_io(self, mode: Mode) -> AgentRawData:
         self._logger.log(VERBOSE, "Get data from program")
         if self._process is None:
@@ -236,6 +236,8 @@ class SNMPFetcher(Fetcher[SNMPRawData]):
         )
 
     def close(self) -> None:
+        if self._backend is not None:
+            self._backend.close()
         self._backend = None
 
     def _detect(
@@ -5,49 +5,60 @@
 """SNMP caching"""
 
 import os
+import threading
+import time
+from collections.abc import Iterable
 from pathlib import Path
 
 import cmk.utils.cleanup
 from cmk.utils.hostaddress import HostAddress, HostName
+from cmk.utils.sectionname import SectionName
 
 from cmk.snmplib import OID, SNMPDecodedString
 
 from cmk.ccc import store
 
+
+class _SingleOIDCache(threading.local):
+    def __init__(self) -> None:
+        self.hostname: HostName | None = None
+        self.ipaddress: HostAddress | None = None
+        self.cache: dict[OID, SNMPDecodedString | None] | None = None
+
+
 # TODO: Replace this by generic caching
-_g_single_oid_hostname: HostName | None = None
-_g_single_oid_ipaddress: HostAddress | None = None
-_g_single_oid_cache: dict[OID, SNMPDecodedString | None] | None = None
+# The SNMP sources of a host, e.g. the host itself and its management board, may be fetched
+# concurrently. They have the same host name but different addresses, so each thread has its
+# own cache. Otherwise they would reset each others cache.
+_g_single_oid = _SingleOIDCache()
 
 
 def initialize_single_oid_cache(
     host_name: HostName, ipaddress: HostAddress | None, from_disk: bool = False, *, cache_dir: Path
 ) -> None:
-    global _g_single_oid_cache, _g_single_oid_ipaddress, _g_single_oid_hostname
-
     if (
-        _g_single_oid_hostname != host_name
-        or _g_single_oid_ipaddress != ipaddress
-        or _g_single_oid_cache is None
+        _g_single_oid.hostname != host_name
+        or _g_single_oid.ipaddress != ipaddress
+        or _g_single_oid.cache is None
     ):
-        _g_single_oid_hostname = host_name
-        _g_single_oid_ipaddress = ipaddress
+        _g_single_oid.hostname = host_name
+        _g_single_oid.ipaddress = ipaddress
         if from_disk:
-            _g_single_oid_cache = _load_single_oid_cache(host_name, ipaddress, cache_dir=cache_dir)
+            _g_single_oid.cache = _load_single_oid_cache(host_name, ipaddress, cache_dir=cache_dir)
         else:
-            _g_single_oid_cache = {}
+            _g_single_oid.cache = {}
 
 
 def write_single_oid_cache(
     host_name: HostName, ipaddress: HostAddress | None, *, cache_dir: Path
 ) -> None:
-    if not _g_single_oid_cache:
+    if not _g_single_oid.cache:
         return
 
     if not os.path.exists(cache_dir):
         os.makedirs(cache_dir)
     cache_path = f"{cache_dir}/{host_name}.{ipaddress}"
-    store.save_object_to_file(cache_path, _g_single_oid_cache, pretty=False)
+    store.save_object_to_file(cache_path, _g_single_oid.cache, pretty=False)
 
 
 def _load_single_oid_cache(
@@ -58,8 +69,33 @@ def _load_single_oid_cache(
 
 
 def single_oid_cache() -> dict[OID, SNMPDecodedString | None]:
-    assert _g_single_oid_cache is not None
-    return _g_single_oid_cache
+    assert _g_single_oid.cache is not None
+    return _g_single_oid.cache
+
+
+def _scan_result_path(cache_dir: Path, fingerprint: str) -> Path:
+    return cache_dir / "fingerprints" / fingerprint
+
+
+def load_scan_result(
+    fingerprint: str, *, cache_dir: Path, max_age: float
+) -> frozenset[SectionName] | None:
+    """The sections found by a previous scan of a device with the same fingerprint"""
+    cache_path = _scan_result_path(cache_dir, fingerprint)
+    try:
+        if time.time() - cache_path.stat().st_mtime > max_age:
+            return None
+    except FileNotFoundError:
+        return None
+    if (sections := store.load_object_from_file(cache_path, default=None)) is None:
+        return None
+    return frozenset(SectionName(s) for s in sections)
+
+
+def save_scan_result(fingerprint: str, sections: Iterable[SectionName], *, cache_dir: Path) -> None:
+    cache_path = _scan_result_path(cache_dir, fingerprint)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    store.save_object_to_file(cache_path, sorted(str(s) for s in sections), pretty=False)
 
 
 def cleanup_host_caches() -> None:
@@ -70,8 +106,7 @@ cmk.utils.cleanup.register_cleanup(cleanup_host_caches)
 
 
 def _clear_other_hosts_oid_cache(hostname: HostName | None) -> None:
-    global _g_single_oid_cache, _g_single_oid_ipaddress, _g_single_oid_hostname
-    if _g_single_oid_hostname != hostname:
-        _g_single_oid_cache = None
-        _g_single_oid_hostname = hostname
-        _g_single_oid_ipaddress = None
+    if _g_single_oid.hostname != hostname:
+        _g_single_oid.cache = None
+        _g_single_oid.hostname = hostname
+        _g_single_oid.ipaddress = None
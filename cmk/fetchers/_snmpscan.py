@@ -4,8 +4,9 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import functools
+import hashlib
 import re
-from collections.abc import Callable, Collection, Iterable
+from collections.abc import Callable, Collection, Iterable, Mapping
 from dataclasses import dataclass
 from logging import Logger
 from pathlib import Path
@@ -15,7 +16,15 @@ from cmk.utils.regex import regex
 from cmk.utils.sectionname import SectionName
 from cmk.utils.tty import format_warning
 
-from cmk.snmplib import get_single_oid, SNMPBackend, SNMPDetectAtom, SNMPDetectBaseType
+from cmk.snmplib import (
+    ensure_str,
+    get_single_oid,
+    SNMPBackend,
+    SNMPDecodedString,
+    SNMPDetectAtom,
+    SNMPDetectBaseType,
+    SNMPVersion,
+)
 
 import cmk.fetchers._snmpcache as snmp_cache
 
@@ -29,6 +38,8 @@ class SNMPScanConfig:
     on_error: OnError
     missing_sys_description: bool
     oid_cache_dir: Path
+    # An explicit rescan must not get the sections found for a device of the same kind
+    use_cached_scan_result: bool = True
 
 
 # gather auto_discovered check_plugin_names for this host
@@ -57,6 +68,9 @@ def gather_available_raw_section_names(
 OID_SYS_DESCR = ".1.3.6.1.2.1.1.1.0"
 OID_SYS_OBJ = ".1.3.6.1.2.1.1.2.0"
 
+# Devices with the same fingerprint get the sections of the previous scan for this long
+SCAN_RESULT_MAX_AGE = 24 * 3600
+
 
 def _snmp_scan(
     sections: Iterable[SNMPScanSection],
@@ -69,17 +83,33 @@ def _snmp_scan(
     )
     backend.logger.debug("  SNMP scan:")
 
+    sections = list(sections)
+    fingerprint = None
     if scan_config.missing_sys_description:
         _fake_description_object(backend.logger)
     else:
         _prefetch_description_object(backend=backend)
+        fingerprint = _fingerprint(sections)
+
+    if fingerprint is not None and scan_config.use_cached_scan_result:
+        cached = snmp_cache.load_scan_result(
+            fingerprint, cache_dir=scan_config.oid_cache_dir, max_age=SCAN_RESULT_MAX_AGE
+        )
+        if cached is not None:
+            _output_snmp_check_plugins("SNMP scan found (cached)", cached, backend.logger)
+            return cached
 
+    complete = _prefetch_detect_oids(sections, backend=backend)
     found_sections = _find_sections(
         sections,
         on_error=scan_config.on_error,
         backend=backend,
     )
     _output_snmp_check_plugins("SNMP scan found", found_sections, backend.logger)
+    if fingerprint is not None and complete:
+        snmp_cache.save_scan_result(
+            fingerprint, found_sections, cache_dir=scan_config.oid_cache_dir
+        )
     snmp_cache.write_single_oid_cache(
         backend.config.hostname, backend.config.ipaddress, cache_dir=scan_config.oid_cache_dir
     )
@@ -116,6 +146,77 @@ def _fake_description_object(logger: Logger) -> None:
     snmp_cache.single_oid_cache()[OID_SYS_OBJ] = ""
 
 
+def _fingerprint(sections: Iterable[SNMPScanSection]) -> str:
+    """Identify the type of the device and the detect specs it is scanned with"""
+    cache = snmp_cache.single_oid_cache()
+    return hashlib.sha256(
+        repr(
+            (
+                cache[OID_SYS_OBJ],
+                cache[OID_SYS_DESCR],
+                sorted((str(name), specs) for name, specs in sections),
+            )
+        ).encode()
+    ).hexdigest()
+
+
+def _prefetch_detect_oids(sections: Iterable[SNMPScanSection], *, backend: SNMPBackend) -> bool:
+    """Fetch the OIDs needed to evaluate the detect specs with as few requests as possible
+
+    Only the alternatives of a detect spec not yet decided by the cached values (usually
+    the system description and object) need their OIDs. Returns False if the host did not
+    answer. Backends which cannot fetch several OIDs with one request are left to
+    _find_sections(), which only asks for the OIDs it needs.
+    """
+    if type(backend).get_many is SNMPBackend.get_many:
+        return True
+
+    cache = snmp_cache.single_oid_cache()
+    undecided: set[str] = set()
+    for _name, specs in sections:
+        try:
+            undecided.update(_undecided_oids(specs, cache))
+        except Exception:
+            # _find_sections() reports the broken detect specs
+            continue
+    # get_single_oid() deals with the invalid OIDs
+    oids = sorted(oid for oid in undecided if oid.startswith("."))
+    if not oids:
+        return True
+
+    backend.logger.debug(f"       Getting {len(oids)} OIDs...")
+    try:
+        values = backend.get_many(oids, context=backend.config.snmpv3_contexts_of(None).contexts[0])
+    except MKTimeout:
+        raise
+    except Exception as e:
+        backend.logger.debug(f"       Getting OIDs failed: {e}")
+        return False
+
+    for oid, value in zip(oids, values):
+        if value is not None:
+            cache[oid] = ensure_str(value, encoding=backend.config.character_encoding)
+        elif backend.config.snmp_version is not SNMPVersion.V3:
+            # With SNMPv3, the OID may still be found in the contexts of the section
+            cache[oid] = None
+    return True
+
+
+def _undecided_oids(
+    detect_spec: SNMPDetectBaseType, values: Mapping[str, SNMPDecodedString | None]
+) -> set[str]:
+    oids: set[str] = set()
+    for alternative in detect_spec:
+        known = [atom for atom in alternative if atom[0] in values]
+        if not all(_atom_matches(atom, values[atom[0]]) for atom in known):
+            continue
+        if len(known) == len(alternative):
+            # the whole spec is true
+            return set()
+        oids.update(atom[0] for atom in alternative if atom[0] not in values)
+    return oids
+
+
 def _find_sections(
     sections: Iterable[SNMPScanSection],
     *,
@@ -163,23 +264,21 @@ def _evaluate_snmp_detection(
     Return True if and and only if at least all conditions in one "line" are True
     """
 
-    def _impl(
-        atom: SNMPDetectAtom,
-        oid_value_getter: Callable[[str], str | None],
-    ) -> bool:
-        oid, pattern, flag = atom
-        value = oid_value_getter(oid)
-        if value is None:
-            # check for "not_exists"
-            return pattern == ".*" and not flag
-        # ignore case!
-        return bool(regex(pattern, re.IGNORECASE | re.DOTALL).fullmatch(value)) is flag
-
     return any(
-        all(_impl(atom, oid_value_getter) for atom in alternative) for alternative in detect_spec
+        all(_atom_matches(atom, oid_value_getter(atom[0])) for atom in alternative)
+        for alternative in detect_spec
     )
 
 
+def _atom_matches(atom: SNMPDetectAtom, value: str | None) -> bool:
+    _oid, pattern, flag = atom
+    if value is None:
+        # check for "not_exists"
+        return pattern == ".*" and not flag
+    # ignore case!
+    return bool(regex(pattern, re.IGNORECASE | re.DOTALL).fullmatch(value)) is flag
+
+
 def _output_snmp_check_plugins(
     title: str, collection: Iterable[SectionName], logger: Logger
 ) -> None:
@@ -7,6 +7,7 @@ import logging
 import socket
 import ssl
 from collections.abc import Buffer
+from contextlib import suppress
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Final
@@ -147,6 +148,14 @@ class TCPFetcher(Fetcher[AgentRawData]):
         self._socket.close()
         self._socket = None
 
+    def interrupt(self) -> None:
+        # Closing the socket does not wake up a thread blocked in recv(), shutting it down does
+        sock = self._socket
+        if sock is None:
+            return
+        with suppress(OSError):
+            sock.shutdown(socket.SHUT_RDWR)
+
     def _fetch_from_io(self, mode: Mode) -> AgentRawData:
         sock = self._socket
         if sock is None:
@@ -2,25 +2,102 @@
 # Copyright (C) 2019 Checkmk GmbH - License: GNU General Public License v2
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
+"""SNMP file cache
+
+The cache file is a header followed by one block per section:
+
+    MAGIC | index length (4 bytes, big endian) | index (JSON) | block | block | ...
+
+The index maps the section names to the location of their block (offset relative to
+the end of the index, length). Every block is the JSON encoded section content. Only
+the index is decoded when the cache is read, the sections are decoded on first access.
+
+Cache files written by older versions (the `repr()` of all sections) are still read.
+"""
 
 from __future__ import annotations
 
 import ast
+import json
+import struct
+from collections.abc import Iterator, Mapping
+from typing import Final
 
 from cmk.utils.sectionname import SectionName
 
-from cmk.snmplib import SNMPRawData
+from cmk.snmplib import SNMPRawData, SNMPRawDataElem
 
 from ._cache import FileCache
 
 __all__ = ["SNMPFileCache"]
 
+_MAGIC: Final = b"CMKSNMPCACHE\x01"
+_INDEX_LENGTH: Final = struct.Struct(">I")
+_HEADER_LENGTH: Final = len(_MAGIC) + _INDEX_LENGTH.size
+
+
+class _CachedSections(Mapping[SectionName, SNMPRawDataElem]):
+    """The sections of a cache file, decoded on first access"""
+
+    def __init__(self, raw_data: bytes) -> None:
+        if len(raw_data) < _HEADER_LENGTH:
+            raise ValueError("Truncated SNMP cache file")
+        (index_length,) = _INDEX_LENGTH.unpack_from(raw_data, len(_MAGIC))
+        blocks_start = _HEADER_LENGTH + index_length
+        self._raw_data: Final = raw_data
+        self._index: Final[Mapping[SectionName, tuple[int, int]]] = {
+            SectionName(name): (blocks_start + offset, length)
+            for name, (offset, length) in json.loads(raw_data[_HEADER_LENGTH:blocks_start]).items()
+        }
+        self._decoded: dict[SectionName, SNMPRawDataElem] = {}
+
+    def __getitem__(self, key: SectionName) -> SNMPRawDataElem:
+        try:
+            return self._decoded[key]
+        except KeyError:
+            pass
+        start, length = self._index[key]
+        section = self._decoded[key] = json.loads(self._raw_data[start : start + length])
+        return section
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[SectionName]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
 
 class SNMPFileCache(FileCache[SNMPRawData]):
     @staticmethod
     def _from_cache_file(raw_data: bytes) -> SNMPRawData:
+        if raw_data.startswith(_MAGIC):
+            return _CachedSections(raw_data)
         return {SectionName(k): v for k, v in ast.literal_eval(raw_data.decode("utf-8")).items()}
 
     @staticmethod
     def _to_cache_file(raw_data: SNMPRawData) -> bytes:
-        return (repr({str(k): v for k, v in raw_data.items()}) + "\n").encode("utf-8")
+        blocks = [
+            (str(name), json.dumps(section, separators=(",", ":")).encode("ascii"))
+            for name, section in raw_data.items()
+        ]
+        index: dict[str, tuple[int, int]] = {}
+        offset = 0
+        for name, block in blocks:
+            index[name] = (offset, len(block))
+            offset += len(block)
+
+        raw_index = json.dumps(index, separators=(",", ":")).encode("ascii")
+        return b"".join(
+            (
+                _MAGIC,
+                _INDEX_LENGTH.pack(len(raw_index)),
+                raw_index,
+                *(block for _name, block in blocks),
+            )
+        )
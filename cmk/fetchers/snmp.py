@@ -16,9 +16,10 @@ from cmk.snmplib import (
     SNMPBackendEnum,
     SNMPDetectSpec,
     SNMPHostConfig,
+    SNMPVersion,
 )
 
-from .snmp_backend import ClassicSNMPBackend, StoredWalkSNMPBackend
+from .snmp_backend import ClassicSNMPBackend, PythonSNMPBackend, StoredWalkSNMPBackend
 
 try:
     from .cee.snmp_backend import inline  # type: ignore[import,unused-ignore]
@@ -59,6 +60,12 @@ def make_backend(
     if inline and snmp_config.snmp_backend is SNMPBackendEnum.INLINE:
         return inline.InlineSNMPBackend(snmp_config, logger)
 
+    if snmp_config.snmp_backend is SNMPBackendEnum.PYTHON:
+        if snmp_config.snmp_version is SNMPVersion.V3:
+            logger.debug("SNMP v3 is not supported by the Python backend, using the classic one")
+            return ClassicSNMPBackend(snmp_config, logger)
+        return PythonSNMPBackend(snmp_config, logger)
+
     if snmp_config.snmp_backend is SNMPBackendEnum.CLASSIC:
         return ClassicSNMPBackend(snmp_config, logger)
 
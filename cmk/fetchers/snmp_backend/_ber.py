@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""The messages of SNMP v1 and v2c in the basic encoding rules (RFC 1157, RFC 3416)
+
+Only the subset of BER used by SNMP is supported: single byte tags and definite lengths.
+"""
+
+from collections.abc import Sequence
+from typing import Final, NamedTuple
+
+from cmk.snmplib import SNMPRawValue
+
+__all__ = [
+    "decode_message",
+    "encode_message",
+    "format_oid",
+    "Message",
+    "ObjectIdentifier",
+    "parse_oid",
+    "raw_value",
+    "VarBind",
+]
+
+ObjectIdentifier = tuple[int, ...]
+
+# Universal types
+INTEGER: Final = 0x02
+OCTET_STRING: Final = 0x04
+NULL: Final = 0x05
+OBJECT_IDENTIFIER: Final = 0x06
+SEQUENCE: Final = 0x30
+
+# Application types (RFC 2578)
+IP_ADDRESS: Final = 0x40
+COUNTER32: Final = 0x41
+GAUGE32: Final = 0x42
+TIME_TICKS: Final = 0x43
+OPAQUE: Final = 0x44
+NSAP_ADDRESS: Final = 0x45
+COUNTER64: Final = 0x46
+UINTEGER32: Final = 0x47
+
+# Exceptions in responses of SNMP v2c (RFC 3416)
+NO_SUCH_OBJECT: Final = 0x80
+NO_SUCH_INSTANCE: Final = 0x81
+END_OF_MIB_VIEW: Final = 0x82
+
+# PDU types
+GET_REQUEST: Final = 0xA0
+GET_NEXT_REQUEST: Final = 0xA1
+RESPONSE: Final = 0xA2
+GET_BULK_REQUEST: Final = 0xA5
+
+# Error status of a response
+NO_ERROR: Final = 0
+TOO_BIG: Final = 1
+NO_SUCH_NAME: Final = 2
+GEN_ERR: Final = 5
+
+ERROR_STATUS_NAMES: Final = {
+    1: "tooBig",
+    2: "noSuchName",
+    3: "badValue",
+    4: "readOnly",
+    5: "genErr",
+    6: "noAccess",
+    7: "wrongType",
+    8: "wrongLength",
+    9: "wrongEncoding",
+    10: "wrongValue",
+    11: "noCreation",
+    12: "inconsistentValue",
+    13: "resourceUnavailable",
+    14: "commitFailed",
+    15: "undoFailed",
+    16: "authorizationError",
+    17: "notWritable",
+    18: "inconsistentName",
+}
+
+_UNSIGNED_TYPES: Final = frozenset({COUNTER32, GAUGE32, TIME_TICKS, COUNTER64, UINTEGER32})
+
+
+class VarBind(NamedTuple):
+    oid: ObjectIdentifier
+    tag: int
+    value: bytes
+    """The content octets of the value"""
+
+
+class Message(NamedTuple):
+    version: int
+    community: bytes
+    pdu_type: int
+    request_id: int
+    error_status: int
+    """The number of non-repeaters in a GetBulkRequest"""
+    error_index: int
+    """The maximum number of repetitions in a GetBulkRequest"""
+    varbinds: Sequence[VarBind]
+
+
+def parse_oid(oid: str) -> ObjectIdentifier:
+    return tuple(int(arc) for arc in oid.strip(".").split("."))
+
+
+def format_oid(oid: ObjectIdentifier) -> str:
+    return "." + ".".join(map(str, oid))
+
+
+def raw_value(varbind: VarBind) -> SNMPRawValue | None:
+    """The value like the other backends deliver it, None for the exceptions"""
+    tag = varbind.tag
+    if tag in (NO_SUCH_OBJECT, NO_SUCH_INSTANCE, END_OF_MIB_VIEW):
+        return None
+    if tag == INTEGER:
+        return str(int.from_bytes(varbind.value, "big", signed=True)).encode()
+    if tag in _UNSIGNED_TYPES:
+        return str(int.from_bytes(varbind.value, "big")).encode()
+    if tag == OBJECT_IDENTIFIER:
+        return format_oid(_decode_oid(varbind.value)).encode()
+    if tag == IP_ADDRESS:
+        return ".".join(map(str, varbind.value)).encode()
+    if tag == NULL:
+        return b""
+    # OCTET STRING (also BITS), Opaque, NsapAddress
+    return varbind.value
+
+
+def encode_message(message: Message) -> bytes:
+    return _encode(
+        SEQUENCE,
+        _encode_integer(message.version)
+        + _encode(OCTET_STRING, message.community)
+        + _encode(
+            message.pdu_type,
+            _encode_integer(message.request_id)
+            + _encode_integer(message.error_status)
+            + _encode_integer(message.error_index)
+            + _encode(
+                SEQUENCE,
+                b"".join(
+                    _encode(
+                        SEQUENCE,
+                        _encode(OBJECT_IDENTIFIER, _encode_oid(varbind.oid))
+                        + _encode(varbind.tag, varbind.value),
+                    )
+                    for varbind in message.varbinds
+                ),
+            ),
+        ),
+    )
+
+
+def decode_message(data: bytes) -> Message:
+    """Raises ValueError if the data is not a valid message"""
+    try:
+        return _decode_message(data)
+    except IndexError as e:
+        raise ValueError("truncated message") from e
+
+
+def _decode_message(data: bytes) -> Message:
+    _tag, start, end = _expect(data, 0, SEQUENCE)
+    _tag, version_start, version_end = _expect(data, start, INTEGER)
+    _tag, community_start, community_end = _expect(data, version_end, OCTET_STRING)
+    pdu_type, pdu_start, pdu_end = _decode_tlv(data, community_end)
+    header = []
+    pos = pdu_start
+    for _ in range(3):
+        _tag, value_start, pos = _expect(data, pos, INTEGER)
+        header.append(_decode_integer(data[value_start:pos]))
+
+    _tag, pos, varbinds_end = _expect(data, pos, SEQUENCE)
+    varbinds = []
+    while pos < varbinds_end:
+        _tag, varbind_start, pos = _expect(data, pos, SEQUENCE)
+        _tag, oid_start, oid_end = _expect(data, varbind_start, OBJECT_IDENTIFIER)
+        value_tag, value_start, value_end = _decode_tlv(data, oid_end)
+        varbinds.append(
+            VarBind(_decode_oid(data[oid_start:oid_end]), value_tag, data[value_start:value_end])
+        )
+
+    if varbinds_end > pdu_end or pdu_end > end:
+        raise ValueError("invalid length")
+
+    return Message(
+        version=_decode_integer(data[version_start:version_end]),
+        community=data[community_start:community_end],
+        pdu_type=pdu_type,
+        request_id=header[0],
+        error_status=header[1],
+        error_index=header[2],
+        varbinds=varbinds,
+    )
+
+
+def _encode(tag: int, content: bytes) -> bytes:
+    length = len(content)
+    if length < 0x80:
+        return bytes((tag, length)) + content
+    length_octets = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes((tag, 0x80 | len(length_octets))) + length_octets + content
+
+
+def _encode_integer(value: int) -> bytes:
+    return _encode(INTEGER, value.to_bytes(value.bit_length() // 8 + 1, "big", signed=True))
+
+
+def _encode_oid(oid: ObjectIdentifier) -> bytes:
+    if len(oid) < 2:
+        raise ValueError(f"invalid OID: {oid}")
+    encoded = bytearray()
+    for arc in (40 * oid[0] + oid[1], *oid[2:]):
+        octets = [arc & 0x7F]
+        while arc := arc >> 7:
+            octets.append(0x80 | arc & 0x7F)
+        encoded.extend(reversed(octets))
+    return bytes(encoded)
+
+
+def _decode_tlv(data: bytes, pos: int) -> tuple[int, int, int]:
+    """The tag, and the start and the end of the content"""
+    tag = data[pos]
+    length = data[pos + 1]
+    pos += 2
+    if length & 0x80:
+        num_octets = length & 0x7F
+        if not num_octets or pos + num_octets > len(data):
+            raise ValueError("unsupported length")
+        length = int.from_bytes(data[pos : pos + num_octets], "big")
+        pos += num_octets
+    if pos + length > len(data):
+        raise ValueError("truncated message")
+    return tag, pos, pos + length
+
+
+def _expect(data: bytes, pos: int, tag: int) -> tuple[int, int, int]:
+    tlv = _decode_tlv(data, pos)
+    if tlv[0] != tag:
+        raise ValueError(f"expected tag {tag:#x} at {pos}, got {tlv[0]:#x}")
+    return tlv
+
+
+def _decode_integer(content: bytes) -> int:
+    return int.from_bytes(content, "big", signed=True)
+
+
+def _decode_oid(content: bytes) -> ObjectIdentifier:
+    arcs = []
+    arc = 0
+    for octet in content:
+        arc = arc << 7 | octet & 0x7F
+        if not octet & 0x80:
+            arcs.append(arc)
+            arc = 0
+    if not arcs:
+        return ()
+    first = min(arcs[0] // 40, 2)
+    return (first, arcs[0] - 40 * first, *arcs[1:])
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""SNMP v1 and v2c without the Net-SNMP command line tools
+
+All requests of a backend are sent over the same UDP socket. The columns of a table are
+walked together: every GetBulkRequest (GetNextRequest for SNMP v1 or if bulk walks are
+disabled) asks for the next OIDs of all the columns which are not yet complete. Likewise,
+get_many() puts many OIDs into one GetRequest.
+"""
+
+import itertools
+import logging
+import random
+import socket
+import time
+from collections.abc import Sequence
+
+from cmk.utils import tty
+from cmk.utils.log import VERBOSE
+from cmk.utils.sectionname import SectionName
+
+from cmk.snmplib import (
+    OID,
+    SNMPBackend,
+    SNMPContext,
+    SNMPHostConfig,
+    SNMPRawValue,
+    SNMPRowInfo,
+    SNMPVersion,
+)
+
+from cmk.ccc.exceptions import MKGeneralException, MKSNMPError
+
+from ._ber import (
+    decode_message,
+    encode_message,
+    END_OF_MIB_VIEW,
+    ERROR_STATUS_NAMES,
+    format_oid,
+    GET_BULK_REQUEST,
+    GET_NEXT_REQUEST,
+    GET_REQUEST,
+    Message,
+    NO_SUCH_NAME,
+    NULL,
+    ObjectIdentifier,
+    parse_oid,
+    raw_value,
+    RESPONSE,
+    TOO_BIG,
+    VarBind,
+)
+
+__all__ = ["PythonSNMPBackend"]
+
+# The defaults of the Net-SNMP tools
+_DEFAULT_TIMEOUT = 1.0
+_DEFAULT_RETRIES = 5
+
+_MAX_MESSAGE_SIZE = 65535
+# Keep the requests of get_many() well below the limits of most agents
+_MAX_VARBINDS = 32
+
+
+class PythonSNMPBackend(SNMPBackend):
+    def __init__(self, snmp_config: SNMPHostConfig, logger: logging.Logger) -> None:
+        super().__init__(snmp_config, logger)
+        if snmp_config.snmp_version is SNMPVersion.V3:
+            raise MKGeneralException("SNMP v3 is not supported by the Python SNMP backend")
+        if not isinstance(snmp_config.credentials, str):
+            raise TypeError()
+        self._socket: socket.socket | None = None
+        self._peer: tuple[str, int] | None = None
+        self._request_ids = itertools.count(random.randint(1, 2**30))
+
+    def close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            self._peer = None
+
+    def get(self, /, oid: OID, *, context: SNMPContext) -> SNMPRawValue | None:
+        if oid.endswith(".*"):
+            pdu_type = GET_NEXT_REQUEST
+            oid_prefix = parse_oid(oid[:-2])
+        else:
+            pdu_type = GET_REQUEST
+            oid_prefix = parse_oid(oid)
+
+        try:
+            response = self._request(pdu_type, [oid_prefix])
+        except MKSNMPError as e:
+            self._logger.log(VERBOSE, f"{tty.red}{tty.bold}ERROR: {tty.normal}SNMP error: {e}")
+            return None
+
+        if response.error_status or not response.varbinds:
+            self._logger.log(VERBOSE, "Error in response to %s.", format_oid(oid_prefix))
+            return None
+
+        varbind = response.varbinds[0]
+        # In case of .*, check if prefix is the one we are looking for
+        if pdu_type == GET_NEXT_REQUEST and not _is_below(varbind.oid, oid_prefix):
+            return None
+
+        value = raw_value(varbind)
+        self._logger.debug(f"SNMP answer: ==> [{value!r}]")
+        return value
+
+    def get_many(
+        self, /, oids: Sequence[OID], *, context: SNMPContext
+    ) -> Sequence[SNMPRawValue | None]:
+        """Fetch the OIDs with GetRequests (GetNextRequests for the OIDs ending with .*)
+
+        Raises MKSNMPError if the host does not answer or reports an error.
+        """
+        values: list[SNMPRawValue | None] = [None] * len(oids)
+        for pdu_type, pending in (
+            (GET_REQUEST, [i for i, oid in enumerate(oids) if not oid.endswith(".*")]),
+            (GET_NEXT_REQUEST, [i for i, oid in enumerate(oids) if oid.endswith(".*")]),
+        ):
+            prefixes = {i: parse_oid(oids[i].removesuffix(".*")) for i in pending}
+            max_varbinds = _MAX_VARBINDS
+            while pending:
+                chunk = pending[:max_varbinds]
+                response = self._request(pdu_type, [prefixes[i] for i in chunk])
+
+                if response.error_status == TOO_BIG and len(chunk) > 1:
+                    max_varbinds = len(chunk) // 2
+                    self._logger.debug(
+                        "Response too big, reducing OIDs per request to %d", max_varbinds
+                    )
+                    continue
+
+                if response.error_status == NO_SUCH_NAME and 0 < response.error_index <= len(chunk):
+                    # SNMP v1: the whole request fails, ask again without the unknown OID
+                    pending.remove(chunk[response.error_index - 1])
+                    continue
+
+                if response.error_status or len(response.varbinds) != len(chunk):
+                    # The values of the other OIDs are unknown, not missing
+                    raise MKSNMPError(
+                        "Error in response to %s"
+                        % ", ".join(format_oid(prefixes[i]) for i in chunk)
+                    )
+
+                del pending[: len(chunk)]
+
+                for i, varbind in zip(chunk, response.varbinds):
+                    if pdu_type == GET_NEXT_REQUEST and not _is_below(varbind.oid, prefixes[i]):
+                        continue
+                    values[i] = raw_value(varbind)
+
+        return values
+
+    def walk(
+        self,
+        /,
+        oid: OID,
+        *,
+        context: SNMPContext,
+        section_name: SectionName | None = None,
+        table_base_oid: OID | None = None,
+    ) -> SNMPRowInfo:
+        return self.walk_columns(
+            [oid], context=context, section_name=section_name, table_base_oid=table_base_oid
+        )[0]
+
+    def walk_columns(
+        self,
+        /,
+        oids: Sequence[OID],
+        *,
+        context: SNMPContext,
+        section_name: SectionName | None = None,
+        table_base_oid: OID | None = None,
+    ) -> Sequence[SNMPRowInfo]:
+        roots = [parse_oid(oid) for oid in oids]
+        rowinfos: list[SNMPRowInfo] = [[] for _ in oids]
+        # index of the column -> the last OID fetched for it
+        pending = dict(enumerate(roots))
+        max_repetitions = max(self.config.bulk_walk_size_of, 1)
+
+        while pending:
+            columns = list(pending)
+            if self.config.use_bulkwalk:
+                response = self._request(
+                    GET_BULK_REQUEST,
+                    [pending[column] for column in columns],
+                    error_index=max_repetitions,
+                )
+            else:
+                response = self._request(GET_NEXT_REQUEST, [pending[column] for column in columns])
+
+            if response.error_status == TOO_BIG and max_repetitions > 1:
+                max_repetitions //= 2
+                self._logger.debug("Response too big, reducing repetitions to %d", max_repetitions)
+                continue
+
+            if response.error_status == NO_SUCH_NAME and 0 < response.error_index <= len(columns):
+                # SNMP v1: the end of the MIB has been reached for this column
+                del pending[columns[response.error_index - 1]]
+                continue
+
+            if response.error_status:
+                raise MKSNMPError(
+                    f"SNMP Error on {self._address}: "
+                    f"{ERROR_STATUS_NAMES.get(response.error_status, response.error_status)} "
+                    f"(Index: {response.error_index})"
+                )
+
+            if not response.varbinds:
+                break
+
+            completed: set[int] = set()
+            for position, varbind in enumerate(response.varbinds):
+                # The varbinds of a GetBulkResponse are interleaved: one per column and repetition
+                column = columns[position % len(columns)]
+                if column in completed:
+                    continue
+                if (
+                    varbind.tag == END_OF_MIB_VIEW
+                    or not _is_below(varbind.oid, roots[column])
+                    # Do not loop forever on agents returning OIDs not increasing
+                    or varbind.oid <= pending[column]
+                    or (value := raw_value(varbind)) is None
+                ):
+                    completed.add(column)
+                    continue
+                rowinfos[column].append((format_oid(varbind.oid), value))
+                pending[column] = varbind.oid
+
+            for column in completed:
+                del pending[column]
+
+        # Like the walks of Net-SNMP: Get the root itself if there is nothing below it, e.g.
+        # for the columns of scalar OIDs like "1.0"
+        if empty := [column for column, rows in enumerate(rowinfos) if not rows]:
+            for column, value in zip(
+                empty, self.get_many([format_oid(roots[c]) for c in empty], context=context)
+            ):
+                if value is not None:
+                    rowinfos[column].append((format_oid(roots[column]), value))
+
+        return rowinfos
+
+    @property
+    def _address(self) -> str:
+        return self.config.ipaddress or "0.0.0.0"
+
+    def _get_socket(self) -> socket.socket:
+        # The port may have been changed in the meantime
+        if self._socket is None or self._peer != (self._address, self.config.port):
+            self.close()
+            self._socket = socket.socket(
+                socket.AF_INET6 if self.config.is_ipv6_primary else socket.AF_INET,
+                socket.SOCK_DGRAM,
+            )
+            self._peer = (self._address, self.config.port)
+            # Only accept datagrams from the host
+            self._socket.connect(self._peer)
+        return self._socket
+
+    def _request(
+        self,
+        pdu_type: int,
+        oids: Sequence[ObjectIdentifier],
+        *,
+        error_index: int = 0,
+    ) -> Message:
+        request_id = next(self._request_ids)
+        request = encode_message(
+            Message(
+                version=0 if self.config.snmp_version is SNMPVersion.V1 else 1,
+                community=str(self.config.credentials).encode(),
+                pdu_type=pdu_type,
+                request_id=request_id,
+                error_status=0,
+                error_index=error_index,
+                varbinds=[VarBind(oid, NULL, b"") for oid in oids],
+            )
+        )
+        timeout = float(self.config.timing.get("timeout", _DEFAULT_TIMEOUT))
+        retries = int(self.config.timing.get("retries", _DEFAULT_RETRIES))
+        sock = self._get_socket()
+
+        # A retry has the same request ID, so late responses to the previous attempts count
+        for _attempt in range(retries + 1):
+            try:
+                sock.send(request)
+                deadline = time.monotonic() + timeout
+                while (remaining := deadline - time.monotonic()) > 0:
+                    sock.settimeout(remaining)
+                    try:
+                        data = sock.recv(_MAX_MESSAGE_SIZE)
+                    except TimeoutError:
+                        break
+                    try:
+                        response = decode_message(data)
+                    except ValueError as e:
+                        self._logger.debug("Ignoring invalid response: %s", e)
+                        continue
+                    if response.pdu_type == RESPONSE and response.request_id == request_id:
+                        return response
+            except OSError as e:
+                raise MKSNMPError(f"SNMP Error on {self._address}: {e}") from e
+
+        raise MKSNMPError(
+            f"SNMP Error on {self._address}: Timeout: No Response from {self._address}"
+        )
+
+
+def _is_below(oid: ObjectIdentifier, prefix: ObjectIdentifier) -> bool:
+    return len(oid) > len(prefix) and oid[: len(prefix)] == prefix
@@ -14,13 +14,12 @@ from cmk.gui import sites
 from cmk.gui.hooks import request_memoize
 from cmk.gui.i18n import _
 
-from cmk.bi.aggregation import BIAggregation
 from cmk.bi.compiler import BICompiler, path_compiled_aggregations
 from cmk.bi.computer import BIComputer
 from cmk.bi.data_fetcher import BIStatusFetcher
 from cmk.bi.lib import SitesCallback
+from cmk.bi.packed_aggregation import find_branch, load_packed_aggregation
 from cmk.bi.trees import BICompiledAggregation, BICompiledRule
-from cmk.ccc import store
 from cmk.ccc.exceptions import MKGeneralException
 
 
@@ -61,15 +60,19 @@ def bi_livestatus_query(
 
 @request_memoize(maxsize=10000)
 def load_compiled_branch(aggr_id: str, branch_title: str) -> BICompiledRule:
-    compiled_aggregation = _load_compiled_aggregation(aggr_id)
-    for branch in compiled_aggregation.branches:
-        if branch.properties.title == branch_title:
-            return branch
+    if branch := find_branch(load_compiled_aggregation(aggr_id), branch_title):
+        return branch
     raise MKGeneralException(f"Branch {branch_title} not found in aggregation {aggr_id}")
 
 
 @request_memoize(maxsize=10000)
-def _load_compiled_aggregation(aggr_id: str) -> BICompiledAggregation:
-    return BIAggregation.create_trees_from_schema(
-        store.load_object_from_pickle_file(path_compiled_aggregations.joinpath(aggr_id), default={})
-    )
+def load_compiled_aggregation(aggr_id: str) -> BICompiledAggregation:
+    try:
+        return load_packed_aggregation(path_compiled_aggregations.joinpath(aggr_id))
+    except ValueError:
+        # E.g. packed by a previous version, the compiler packs it again
+        if (
+            compiled_aggregation := BIManager().compiler.compiled_aggregations.get(aggr_id)
+        ) is None:
+            raise
+        return compiled_aggregation
@@ -13,7 +13,7 @@ from cmk.utils.hostaddress import HostName
 from cmk.utils.servicename import ServiceName
 from cmk.utils.statename import short_service_state_name
 
-from cmk.gui.bi.bi_manager import BIManager, load_compiled_branch
+from cmk.gui.bi.bi_manager import BIManager, load_compiled_aggregation, load_compiled_branch
 from cmk.gui.bi.foldable_tree_renderer import (
     ABCFoldableTreeRenderer,
     BIAggrTreeState,
@@ -53,13 +53,11 @@ from cmk.gui.views.command.base import CommandSpecWithoutSite
 from cmk.gui.visuals import get_livestatus_filter_headers
 from cmk.gui.visuals.filter import Filter
 
-from cmk.bi.aggregation import BIAggregation
 from cmk.bi.computer import BIAggregationFilter
-from cmk.bi.data_fetcher import get_cache_dir
 from cmk.bi.lib import FrozenMarker
+from cmk.bi.packed_aggregation import find_branch
 from cmk.bi.trees import BICompiledRule
 from cmk.bi.type_defs import frozen_aggregations_dir
-from cmk.ccc import store
 from cmk.ccc.exceptions import MKGeneralException
 
 
@@ -912,15 +910,11 @@ def convert_tree_to_frozen_diff_tree(row: Row) -> tuple[Row, bool]:
     bi_ref_aggregation, bi_ref_branch = found_aggr
 
     # Load other aggregation from disk
-    other_aggr_path = Path(get_cache_dir(), "compiled_aggregations", other_aggregation)
-    other_aggr = BIAggregation.create_trees_from_schema(
-        store.load_object_from_pickle_file(other_aggr_path, default={})
-    )
+    other_aggr = load_compiled_aggregation(other_aggregation)
 
     aggregations_are_equal = True
-    for bi_other_branch in other_aggr.branches:
-        if bi_other_branch.properties.title == other_branch:
-            aggregations_are_equal = combine_branches(bi_ref_branch, bi_other_branch)
+    if bi_other_branch := find_branch(other_aggr, other_branch):
+        aggregations_are_equal = combine_branches(bi_ref_branch, bi_other_branch)
 
     required_aggregations = [(bi_ref_aggregation, [bi_ref_branch])]
     required_elements = bi_manager.computer.get_required_elements(required_aggregations)
@@ -4,15 +4,12 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 """Core for getting the actual raw data points via Livestatus from RRD"""
 
-
 import collections
-import contextlib
 import time
-from collections.abc import Callable, Iterable, Iterator, Mapping
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
 from functools import lru_cache
 
-import livestatus
-from livestatus import livestatus_lql, SiteId
+from livestatus import lqencode, SiteId
 
 from cmk.utils.hostaddress import HostName
 from cmk.utils.metrics import MetricName
@@ -29,7 +26,7 @@ from cmk.ccc.version import parse_check_mk_version
 
 from ._graph_specification import GraphDataRange, GraphRecipe
 from ._loader import get_unit_info
-from ._timeseries import op_func_wrapper, time_series_operators
+from ._timeseries import time_series_math
 from ._type_defs import GraphConsoldiationFunction, RRDData, RRDDataKey
 from ._utils import (
     check_metrics,
@@ -50,30 +47,30 @@ def fetch_rrd_data_for_graph(
         for key in metric.operation.keys()
         if isinstance(key, RRDDataKey)
     )
+    fetched_rrd_data = _fetch_rrd_data_of_services(
+        by_service,
+        graph_recipe.consolidation_function,
+        graph_data_range,
+    )
     rrd_data: dict[RRDDataKey, TimeSeries] = {}
-    for (site, host_name, service_description), metrics in by_service.items():
-        with contextlib.suppress(livestatus.MKLivestatusNotFoundError):
-            for (metric_name, consolidation_func_name, scale), data in _fetch_rrd_data(
-                site,
-                host_name,
-                service_description,
-                metrics,
-                graph_recipe.consolidation_function,
-                graph_data_range,
-            ):
-                rrd_data[
-                    RRDDataKey(
-                        site,
-                        host_name,
-                        service_description,
-                        metric_name,
-                        consolidation_func_name,
-                        scale,
-                    )
-                ] = TimeSeries(
-                    data,
-                    conversion=conversion,
+    # Keep the order of the services, the first metric is the reference for the alignment
+    for site, host_name, service_description in by_service:
+        for (metric_name, consolidation_func_name, scale), data in fetched_rrd_data.get(
+            (site, host_name, service_description), []
+        ):
+            rrd_data[
+                RRDDataKey(
+                    site,
+                    host_name,
+                    service_description,
+                    metric_name,
+                    consolidation_func_name,
+                    scale,
                 )
+            ] = TimeSeries(
+                data,
+                conversion=conversion,
+            )
     _align_and_resample_rrds(rrd_data, graph_recipe.consolidation_function)
     _chop_last_empty_step(graph_data_range, rrd_data)
 
@@ -162,14 +159,16 @@ def _group_needed_rrd_data_by_service(
     return by_service
 
 
-def _fetch_rrd_data(
-    site: SiteId,
-    host_name: HostName,
-    service_description: ServiceName,
-    metrics: set[MetricProperties],
+def _fetch_rrd_data_of_services(
+    by_service: Mapping[tuple[SiteId, HostName, ServiceName], set[MetricProperties]],
     consolidation_func_name: GraphConsoldiationFunction | None,
     graph_data_range: GraphDataRange,
-) -> list[tuple[MetricProperties, TimeSeriesValues]]:
+) -> dict[tuple[SiteId, HostName, ServiceName], list[tuple[MetricProperties, TimeSeriesValues]]]:
+    """Fetch the RRD data of all services with one query per set of needed metrics
+
+    Usually all services of a graph need the same metrics, so there is only one query. It is
+    sent to all involved sites in parallel. Services which are not found are missing in the
+    result."""
     start_time, end_time = graph_data_range.time_range
 
     step = graph_data_range.step
@@ -178,11 +177,71 @@ def _fetch_rrd_data(
         step = max(1, step)
 
     point_range = ":".join(map(str, (start_time, end_time, step)))
-    lql_columns = list(rrd_columns(metrics, consolidation_func_name, point_range))
-    query = livestatus_lql([host_name], lql_columns, service_description)
 
-    with sites.only_sites(site):
-        return list(zip(metrics, sites.live().query_row(query)))
+    by_metrics: dict[
+        tuple[bool, frozenset[MetricProperties]],
+        list[tuple[SiteId, HostName, ServiceName]],
+    ] = collections.defaultdict(list)
+    for service, metrics in by_service.items():
+        by_metrics[(service[2] == "_HOST_", frozenset(metrics))].append(service)
+
+    fetched: dict[
+        tuple[SiteId, HostName, ServiceName],
+        list[tuple[MetricProperties, TimeSeriesValues]],
+    ] = {}
+    for (is_host, metric_set), services in by_metrics.items():
+        ordered_metrics = list(metric_set)
+        query = _rrd_data_query(
+            is_host,
+            services,
+            list(rrd_columns(ordered_metrics, consolidation_func_name, point_range)),
+        )
+        with sites.only_sites(sorted({site for site, _host_name, _service in services})):
+            with sites.prepend_site():
+                rows = sites.live().query(query, "ColumnHeaders: off\n")
+
+        needed_services = set(services)
+        for row in rows:
+            site, host_name, *values = row
+            service = (
+                SiteId(site),
+                HostName(host_name),
+                "_HOST_" if is_host else ServiceName(values.pop(0)),
+            )
+            # The filters of all sites are sent to each site
+            if service in needed_services:
+                fetched[service] = list(zip(ordered_metrics, values))
+    return fetched
+
+
+def _rrd_data_query(
+    is_host: bool,
+    services: Sequence[tuple[SiteId, HostName, ServiceName]],
+    rrd_data_columns: Sequence[ColumnName],
+) -> str:
+    if is_host:
+        columns = ["host_name", *rrd_data_columns]
+        filters = [
+            f"Filter: host_name = {lqencode(host_name)}\n"
+            for host_name in sorted({host_name for _site, host_name, _service in services})
+        ]
+        what = "hosts"
+    else:
+        columns = ["host_name", "service_description", *rrd_data_columns]
+        filters = [
+            f"Filter: host_name = {lqencode(host_name)}\n"
+            f"Filter: service_description = {lqencode(service_description)}\n"
+            "And: 2\n"
+            for host_name, service_description in sorted(
+                {
+                    (host_name, service_description)
+                    for _site, host_name, service_description in services
+                }
+            )
+        ]
+        what = "services"
+    connective = f"Or: {len(filters)}\n" if len(filters) > 1 else ""
+    return f"GET {what}\nColumns: {' '.join(columns)}\n{''.join(filters)}{connective}"
 
 
 def rrd_columns(
@@ -295,11 +354,11 @@ def translate_and_merge_rrd_columns(
     if not relevant_ts:
         return TimeSeries([0, 0, 0])
 
-    _op_title, op_func = time_series_operators()["MERGE"]
-    single_value_series = [op_func_wrapper(op_func, list(tsp)) for tsp in zip(*relevant_ts)]
+    if (merged := time_series_math("MERGE", relevant_ts)) is None:
+        return TimeSeries([0, 0, 0])
 
     return TimeSeries(
-        single_value_series,
+        merged.values,
         time_window=relevant_ts[0].twindow,
         conversion=get_extended_metric_info(metric_name).unit_info.conversion,
     )
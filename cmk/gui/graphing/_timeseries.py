@@ -5,12 +5,14 @@
 
 import functools
 import operator
-from collections.abc import Callable
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass
 from typing import Literal, TypeVar
 
+import numpy as np
+
 from cmk.gui.i18n import _
-from cmk.gui.time_series import TimeSeries, TimeSeriesValues
+from cmk.gui.time_series import MaskedValues, TimeSeries, TimeSeriesValues
 from cmk.gui.utils import escaping
 
 from cmk.ccc.exceptions import MKGeneralException
@@ -60,14 +62,211 @@ def time_series_math(
         # Silently return so to get an empty graph slot
         return None
 
-    _op_title, op_func = operators[operator_id]
-    twindow = operands_evaluated[0].twindow
-
+    num_points = min(len(time_series) for time_series in operands_evaluated)
+    try:
+        operands = [
+            time_series.masked_values().head(num_points) for time_series in operands_evaluated
+        ]
+    except OverflowError:
+        # Ints beyond the range of floats
+        return _time_series_math_point_wise(operator_id, operands_evaluated)
+    values = np.ma.vstack([o.values for o in operands])
+    is_int = np.vstack([o.is_int for o in operands])
+    if not _are_ints_exact(values, is_int):
+        return _time_series_math_point_wise(operator_id, operands_evaluated)
+
+    # Like with Python floats, overflows result in inf
+    with np.errstate(all="ignore"):
+        masked_values = _VECTORIZED_OPERATORS[operator_id](values, is_int)
+    return TimeSeries.from_masked_values(masked_values, operands_evaluated[0].twindow)
+
+
+def _time_series_math_point_wise(
+    operator_id: Operators, operands_evaluated: list[TimeSeries]
+) -> TimeSeries:
+    _op_title, op_func = time_series_operators()[operator_id]
     return TimeSeries(
-        [op_func_wrapper(op_func, list(tsp)) for tsp in zip(*operands_evaluated)], twindow
+        [op_func_wrapper(op_func, list(tsp)) for tsp in zip(*operands_evaluated)],
+        operands_evaluated[0].twindow,
     )
 
 
+# Floats represent the ints below this value exactly
+_MAX_EXACT_INT = 2.0**53
+
+
+def _are_ints_exact(values: np.ma.MaskedArray, is_int: np.ndarray) -> bool:
+    """Whether all ints and the int results of all operators are exact as floats
+
+    This is the case if neither the sum nor the product of the absolute int values of a
+    point reaches 2**53. Otherwise the point-wise computation with Python ints is needed."""
+    if not is_int.any():
+        return True
+    with np.errstate(all="ignore"):
+        int_values = np.where(is_int & ~np.ma.getmaskarray(values), np.abs(values.data), 0.0)
+        return bool(
+            (int_values.sum(axis=0) < _MAX_EXACT_INT).all()
+            and (np.maximum(int_values, 1.0).prod(axis=0) < _MAX_EXACT_INT).all()
+        )
+
+
+# The vectorized versions of the operators below. The values of the operands are the rows.
+# The results are the same, eg. the operands are processed in the same order and ints are
+# handled like Python does. Points without any value are always masked.
+
+
+def _vectorized_operator_sum(values: np.ma.MaskedArray, is_int: np.ndarray) -> MaskedValues:
+    """Same as the builtin sum() which compensates the rounding errors of floats (Neumaier)"""
+    mask = np.ma.getmaskarray(values)
+    int_total = np.zeros(values.shape[1])
+    total = np.zeros(values.shape[1])
+    compensation = np.zeros(values.shape[1])
+    # Ints are summed up until the first float
+    has_float = np.zeros(values.shape[1], dtype=bool)
+    for row, row_mask, row_is_int in zip(values.filled(0.0), mask, is_int):
+        add_int = ~row_mask & row_is_int
+        add_float = ~row_mask & ~row_is_int
+        new_total = total + row
+        compensation += np.where(
+            add_float & has_float,
+            np.where(
+                np.abs(total) >= np.abs(row),
+                (total - new_total) + row,
+                (row - new_total) + total,
+            ),
+            0.0,
+        )
+        total = np.where(
+            has_float,
+            np.where(row_mask, total, new_total),
+            np.where(add_float, int_total + row, total),
+        )
+        int_total = np.where(add_int & ~has_float, int_total + row, int_total)
+        has_float |= add_float
+    return MaskedValues(
+        np.ma.MaskedArray(
+            np.where(
+                has_float,
+                np.where(
+                    (compensation != 0) & np.isfinite(compensation), total + compensation, total
+                ),
+                int_total,
+            ),
+            mask=mask.all(axis=0),
+        ),
+        ~has_float,
+    )
+
+
+def _vectorized_operator_product(values: np.ma.MaskedArray, is_int: np.ndarray) -> MaskedValues:
+    result = np.ones(values.shape[1])
+    result_is_int = np.ones(values.shape[1], dtype=bool)
+    for row, row_is_int in zip(values.data, is_int):
+        result_is_int &= row_is_int
+        result = result * row
+        # Unlike floats, ints have no negative zero
+        result[result_is_int & (result == 0)] = 0.0
+    return MaskedValues(
+        np.ma.MaskedArray(result, mask=np.ma.getmaskarray(values).any(axis=0)),
+        result_is_int,
+    )
+
+
+def _vectorized_operator_difference(values: np.ma.MaskedArray, is_int: np.ndarray) -> MaskedValues:
+    return MaskedValues(
+        np.ma.MaskedArray(
+            values.data[0] - values.data[1],
+            mask=np.ma.getmaskarray(values).any(axis=0),
+        ),
+        is_int[0] & is_int[1],
+    )
+
+
+def _vectorized_operator_fraction(values: np.ma.MaskedArray, is_int: np.ndarray) -> MaskedValues:
+    mask = np.ma.getmaskarray(values).any(axis=0) | (values.data[1] == 0)
+    return MaskedValues(
+        np.ma.MaskedArray(
+            np.divide(values.data[0], values.data[1], out=np.zeros(values.shape[1]), where=~mask),
+            mask=mask,
+        ),
+        np.zeros(values.shape[1], dtype=bool),
+    )
+
+
+def _select_rows(
+    values: np.ma.MaskedArray, is_int: np.ndarray, rows: np.ndarray, mask: np.ndarray
+) -> MaskedValues:
+    columns = np.arange(values.shape[1])
+    return MaskedValues(
+        np.ma.MaskedArray(values.data[rows, columns], mask=mask),
+        is_int[rows, columns],
+    )
+
+
+def _select_like_builtin(
+    values: np.ma.MaskedArray,
+    is_int: np.ndarray,
+    replaces: Callable[[np.ndarray, np.ndarray], np.ndarray],
+) -> MaskedValues:
+    """Same as max() and min(): The first value is replaced by every later one comparing
+    greater (less). Thus a leading NaN is kept, later ones are ignored."""
+    mask = np.ma.getmaskarray(values)
+    rows = np.zeros(values.shape[1], dtype=int)
+    selected = np.zeros(values.shape[1])
+    has_value = np.zeros(values.shape[1], dtype=bool)
+    for idx, (row, row_mask) in enumerate(zip(values.data, mask)):
+        take = ~row_mask & (~has_value | replaces(row, selected))
+        rows = np.where(take, idx, rows)
+        selected = np.where(take, row, selected)
+        has_value |= ~row_mask
+    return _select_rows(values, is_int, rows, ~has_value)
+
+
+def _vectorized_operator_maximum(values: np.ma.MaskedArray, is_int: np.ndarray) -> MaskedValues:
+    return _select_like_builtin(values, is_int, np.greater)
+
+
+def _vectorized_operator_minimum(values: np.ma.MaskedArray, is_int: np.ndarray) -> MaskedValues:
+    return _select_like_builtin(values, is_int, np.less)
+
+
+def _vectorized_operator_average(values: np.ma.MaskedArray, is_int: np.ndarray) -> MaskedValues:
+    counts = (~np.ma.getmaskarray(values)).sum(axis=0)
+    return MaskedValues(
+        np.ma.MaskedArray(
+            np.divide(
+                _vectorized_operator_sum(values, is_int).values.data,
+                counts,
+                out=np.zeros(values.shape[1]),
+                where=counts > 0,
+            ),
+            mask=counts == 0,
+        ),
+        np.zeros(values.shape[1], dtype=bool),
+    )
+
+
+def _vectorized_operator_merge(values: np.ma.MaskedArray, is_int: np.ndarray) -> MaskedValues:
+    mask = np.ma.getmaskarray(values)
+    # The first row with a value, all rows are masked for points without any value
+    return _select_rows(values, is_int, (~mask).argmax(axis=0), mask.all(axis=0))
+
+
+_VECTORIZED_OPERATORS: Mapping[
+    Operators,
+    Callable[[np.ma.MaskedArray, np.ndarray], MaskedValues],
+] = {
+    "+": _vectorized_operator_sum,
+    "*": _vectorized_operator_product,
+    "-": _vectorized_operator_difference,
+    "/": _vectorized_operator_fraction,
+    "MAX": _vectorized_operator_maximum,
+    "MIN": _vectorized_operator_minimum,
+    "AVERAGE": _vectorized_operator_average,
+    "MERGE": _vectorized_operator_merge,
+}
+
+
 _TOperatorReturn = TypeVar("_TOperatorReturn")
 
 
@@ -19,7 +19,7 @@ import livestatus
 
 import cmk.utils.paths
 from cmk.utils.hostaddress import HostAddress, HostName
-from cmk.utils.structured_data import SDRawTree
+from cmk.utils.structured_data import SDRawTree, TreeStore
 
 from cmk.gui import sites
 from cmk.gui.config import active_config
@@ -55,6 +55,7 @@ from ._store import has_inventory
 from ._tree import (
     get_short_inventory_filepath,
     InventoryPath,
+    load_filtered_and_merged_table,
     load_filtered_and_merged_tree,
     make_filter_choices_from_api_request_paths,
     parse_inventory_path,
@@ -73,6 +74,7 @@ __all__ = [
     "InventoryHistoryPath",
     "InventoryPath",
     "load_delta_tree",
+    "load_filtered_and_merged_table",
     "load_filtered_and_merged_tree",
     "load_latest_delta_tree",
     "parse_inventory_path",
@@ -287,6 +289,11 @@ class InventoryHousekeeping:
                 if delete:
                     (self._inventory_delta_cache_path / hostname / filename).unlink()
 
+        # Also drops the tables of deleted or renamed hosts
+        TreeStore(
+            self._inventory_path, cmk.utils.paths.inventory_table_index_dir
+        ).compact_table_index()
+
         # TODO: remove with pylint 2
         last_cleanup.touch()
 
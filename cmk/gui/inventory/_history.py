@@ -10,7 +10,13 @@ from typing import NamedTuple
 
 import cmk.utils.paths
 from cmk.utils.hostaddress import HostName
-from cmk.utils.structured_data import ImmutableDeltaTree, ImmutableTree, load_tree, SDFilterChoice
+from cmk.utils.structured_data import (
+    ImmutableDeltaTree,
+    ImmutableTree,
+    load_tree,
+    SDFilterChoice,
+    TreeOrArchiveStore,
+)
 
 from cmk.gui.i18n import _
 
@@ -23,6 +29,7 @@ from ._tree import _get_permitted_inventory_paths, make_filter_choices_from_perm
 class InventoryHistoryPath(NamedTuple):
     path: Path
     timestamp: int | None
+    archived: bool = False
 
     @property
     def short(self) -> Path:
@@ -133,7 +140,11 @@ def _get_history(
     except FilterInventoryHistoryPathsError:
         return [], []
 
-    cached_tree_loader = _CachedTreeLoader()
+    tree_or_archive_store = TreeOrArchiveStore(
+        cmk.utils.paths.inventory_output_dir,
+        cmk.utils.paths.inventory_archive_dir,
+    )
+    cached_tree_loader = _CachedTreeLoader(hostname, tree_or_archive_store)
     corrupted_history_files: set[Path] = set()
     history: list[HistoryEntry] = []
     filters = (
@@ -157,10 +168,28 @@ def _get_history(
             history.append(cached_history_entry)
             continue
 
+        if current.archived:
+            try:
+                delta_tree = tree_or_archive_store.load_archived_delta_tree(
+                    host_name=hostname,
+                    timestamp=current.timestamp,
+                    previous_timestamp=previous.timestamp,
+                )
+            except (FileNotFoundError, KeyError, ValueError):
+                corrupted_history_files.add(current.short)
+                continue
+
+            if delta_tree is not None:
+                if (
+                    history_entry := cached_delta_tree_loader.get_entry_from_delta_tree(delta_tree)
+                ) is not None:
+                    history.append(history_entry)
+                continue
+
         try:
-            previous_tree = cached_tree_loader.get_tree(previous.path)
-            current_tree = cached_tree_loader.get_tree(current.path)
-        except (FileNotFoundError, ValueError):
+            previous_tree = cached_tree_loader.get_tree(previous)
+            current_tree = cached_tree_loader.get_tree(current)
+        except (FileNotFoundError, KeyError, ValueError):
             corrupted_history_files.add(current.short)
             continue
 
@@ -183,6 +212,7 @@ def _get_inventory_history_paths(hostname: HostName) -> Sequence[InventoryHistor
             InventoryHistoryPath(
                 path=filepath,
                 timestamp=int(filepath.name),
+                archived=True,
             )
             for filepath in sorted(inventory_archive_dir.iterdir())
         ]
@@ -217,19 +247,29 @@ def _get_pairs(
 
 @dataclass(frozen=True)
 class _CachedTreeLoader:
+    hostname: HostName
+    tree_or_archive_store: TreeOrArchiveStore
     _lookup: dict[Path, ImmutableTree] = field(default_factory=dict)
 
-    def get_tree(self, filepath: Path) -> ImmutableTree:
-        if filepath == Path():
+    def get_tree(self, tree_path: InventoryHistoryPath) -> ImmutableTree:
+        if tree_path.path == Path():
             return ImmutableTree()
 
-        if filepath in self._lookup:
-            return self._lookup[filepath]
+        if tree_path.path in self._lookup:
+            return self._lookup[tree_path.path]
 
-        if not (tree := load_tree(filepath)):
+        if not (
+            tree := (
+                self.tree_or_archive_store.load_archived_tree(
+                    host_name=self.hostname, timestamp=tree_path.timestamp
+                )
+                if tree_path.archived and tree_path.timestamp is not None
+                else load_tree(tree_path.path)
+            )
+        ):
             raise ValueError(tree)
 
-        return self._lookup.setdefault(filepath, tree)
+        return self._lookup.setdefault(tree_path.path, tree)
 
 
 @dataclass(frozen=True)
@@ -265,6 +305,15 @@ class _CachedDeltaTreeLoader:
             ImmutableDeltaTree.deserialize(raw_delta_tree),
         )
 
+    def get_entry_from_delta_tree(self, delta_tree: ImmutableDeltaTree) -> HistoryEntry | None:
+        delta_stats = delta_tree.get_stats()
+        new = delta_stats["new"]
+        changed = delta_stats["changed"]
+        removed = delta_stats["removed"]
+        if new or changed or removed:
+            return self._make_history_entry(new, changed, removed, delta_tree)
+        return None
+
     def get_calculated_or_store_entry(
         self,
         previous_tree: ImmutableTree,
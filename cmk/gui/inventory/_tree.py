@@ -6,7 +6,7 @@
 from __future__ import annotations
 
 import ast
-from collections.abc import Sequence
+from collections.abc import Callable, Mapping, Sequence
 from dataclasses import dataclass
 from enum import auto, Enum
 from pathlib import Path
@@ -15,6 +15,7 @@ from typing import Literal
 import cmk.utils.paths
 from cmk.utils.hostaddress import HostName
 from cmk.utils.structured_data import (
+    ImmutableTable,
     ImmutableTree,
     load_tree,
     parse_visible_raw_path,
@@ -22,6 +23,8 @@ from cmk.utils.structured_data import (
     SDKey,
     SDNodeName,
     SDPath,
+    SDValue,
+    TreeStore,
 )
 
 from cmk.gui import userdb
@@ -142,13 +145,16 @@ def _load_tree_from_file(
     if "/" in host_name:
         # just for security reasons
         return ImmutableTree()
+    if tree_type == "status_data":
+        return load_tree(Path(cmk.utils.paths.status_data_dir) / host_name)
+    # The subtrees which are not permitted are filtered anyway, skip them while loading
     return load_tree(
-        Path(
-            cmk.utils.paths.inventory_output_dir
-            if tree_type == "inventory"
-            else cmk.utils.paths.status_data_dir
-        )
-        / host_name
+        Path(cmk.utils.paths.inventory_output_dir) / host_name,
+        (
+            make_filter_choices_from_permitted_paths(permitted_paths)
+            if isinstance(permitted_paths := _get_permitted_inventory_paths(), list)
+            else None
+        ),
     )
 
 
@@ -189,18 +195,15 @@ def _get_permitted_inventory_paths() -> Sequence[PermittedPath] | None:
     return permitted_paths
 
 
-def load_filtered_and_merged_tree(row: Row) -> ImmutableTree:
-    """Load inventory tree from file, status data tree from row,
-    merge these trees and returns the filtered tree"""
-    host_name = row.get("host_name")
-    inventory_tree = _load_tree_from_file(tree_type="inventory", host_name=host_name)
+def _load_status_data_tree(row: Row) -> ImmutableTree:
     if raw_status_data_tree := row.get("host_structured_status"):
-        status_data_tree = ImmutableTree.deserialize(
-            ast.literal_eval(raw_status_data_tree.decode("utf-8"))
-        )
-    else:
-        status_data_tree = _load_tree_from_file(tree_type="status_data", host_name=host_name)
+        return ImmutableTree.deserialize(ast.literal_eval(raw_status_data_tree.decode("utf-8")))
+    return _load_tree_from_file(tree_type="status_data", host_name=row.get("host_name"))
+
 
+def _filter_and_merge_trees(
+    inventory_tree: ImmutableTree, status_data_tree: ImmutableTree
+) -> ImmutableTree:
     merged_tree = inventory_tree.merge(status_data_tree)
     if isinstance(permitted_paths := _get_permitted_inventory_paths(), list):
         return merged_tree.filter(make_filter_choices_from_permitted_paths(permitted_paths))
@@ -208,6 +211,58 @@ def load_filtered_and_merged_tree(row: Row) -> ImmutableTree:
     return merged_tree
 
 
+def load_filtered_and_merged_tree(row: Row) -> ImmutableTree:
+    """Load inventory tree from file, status data tree from row,
+    merge these trees and returns the filtered tree"""
+    return _filter_and_merge_trees(
+        _load_tree_from_file(tree_type="inventory", host_name=row.get("host_name")),
+        _load_status_data_tree(row),
+    )
+
+
+def load_filtered_and_merged_table(
+    row: Row,
+    path: SDPath,
+    row_filters: Mapping[SDKey, Callable[[SDValue], bool]] | None = None,
+) -> ImmutableTable:
+    """Same as load_filtered_and_merged_tree(row).get_tree(path).table but the inventory table
+    is read from the table index if possible. Only the rows matching all row filters are
+    returned."""
+    host_name = row.get("host_name")
+    status_data_tree = _load_status_data_tree(row)
+    inventory_tree = (
+        None
+        if not host_name or "/" in host_name
+        else TreeStore(
+            cmk.utils.paths.inventory_output_dir,
+            cmk.utils.paths.inventory_table_index_dir,
+        ).load_table_tree(
+            host_name=host_name,
+            path=path,
+            # Merged rows have to be filtered after merging
+            row_filters=None if status_data_tree.get_tree(path).table else row_filters,
+        )
+    )
+    if inventory_tree is None:
+        inventory_tree = _load_tree_from_file(tree_type="inventory", host_name=host_name)
+
+    table = _filter_and_merge_trees(inventory_tree, status_data_tree).get_tree(path).table
+    if not row_filters:
+        return table
+    return ImmutableTable(
+        key_columns=table.key_columns,
+        rows_by_ident={
+            ident: table_row
+            for ident, table_row in table.rows_by_ident.items()
+            if all(
+                key in table_row and row_filter(table_row[key])
+                for key, row_filter in row_filters.items()
+            )
+        },
+        retentions=table.retentions,
+    )
+
+
 def get_short_inventory_filepath(hostname: HostName) -> Path:
     return (
         Path(cmk.utils.paths.inventory_output_dir)
@@ -4,10 +4,13 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import re
-from collections.abc import Callable
+from collections.abc import Callable, Mapping, Sequence
 from functools import partial
 
+from cmk.utils.structured_data import SDKey, SDNodeName, SDValue
+
 from cmk.gui import query_filters
+from cmk.gui.config import active_config
 from cmk.gui.exceptions import MKUserError
 from cmk.gui.htmllib.html import html
 from cmk.gui.i18n import _, _l
@@ -15,6 +18,7 @@ from cmk.gui.ifaceoper import interface_oper_states, interface_port_types
 from cmk.gui.num_split import cmp_version
 from cmk.gui.type_defs import FilterHeader, FilterHTTPVariables, Row, Rows, VisualContext
 from cmk.gui.utils.speaklater import LazyString
+from cmk.gui.utils.user_errors import user_errors
 from cmk.gui.visuals.filter import (
     CheckboxRowFilter,
     display_filter_radiobuttons,
@@ -25,7 +29,9 @@ from cmk.gui.visuals.filter import (
     InputTextFilter,
 )
 
-from ._tree import InventoryPath
+from cmk.ccc.exceptions import MKGeneralException
+
+from ._tree import get_short_inventory_filepath, InventoryPath, load_filtered_and_merged_table
 
 
 class FilterInvtableText(InputTextFilter):
@@ -348,7 +354,8 @@ class FilterInvHasSoftwarePackage(Filter):
         )
 
     def need_inventory(self, value: FilterHTTPVariables) -> bool:
-        return bool(value.get(self._varprefix + "name"))
+        # The packages are read from the inventory table index, see filter_table
+        return False
 
     def display(self, value: FilterHTTPVariables) -> None:
         html.text_input(self._varprefix + "name")
@@ -408,12 +415,34 @@ class FilterInvHasSoftwarePackage(Filter):
                     ),
                 )
 
+        name_filter: Callable[[SDValue], bool] = (
+            (lambda v: v == name)
+            if isinstance(name, str)
+            else (lambda v: bool(name.search(str(v))))
+        )
         new_rows = []
+        corrupted_inventory_files = set()
         for row in rows:
-            packages = row["host_inventory"].get_rows(("software", "packages"))
+            try:
+                packages = _load_software_packages(row, {SDKey("name"): name_filter})
+            except (MKGeneralException, SyntaxError, ValueError) as e:
+                if active_config.debug:
+                    html.show_warning("%s" % e)
+                # Same as a corrupted tree in the inventory row post processor
+                packages = []
+                corrupted_inventory_files.add(str(get_short_inventory_filepath(row["host_name"])))
             is_in = self.find_package(packages, name, from_version, to_version)
             if is_in != negate:
                 new_rows.append(row)
+
+        if corrupted_inventory_files:
+            user_errors.add(
+                MKUserError(
+                    "load_structured_data_tree",
+                    _("Cannot load HW/SW Inventory trees %s. Please remove the corrupted files.")
+                    % ", ".join(sorted(corrupted_inventory_files)),
+                )
+            )
         return new_rows
 
     def find_package(self, packages, name, from_version, to_version):
@@ -439,3 +468,12 @@ class FilterInvHasSoftwarePackage(Filter):
 
     def version_is_higher(self, a: str | None, b: str | None) -> bool:
         return cmp_version(a, b) == 1
+
+
+def _load_software_packages(
+    row: Row, row_filters: Mapping[SDKey, Callable[[SDValue], bool]]
+) -> Sequence[Mapping[SDKey, SDValue]]:
+    path = (SDNodeName("software"), SDNodeName("packages"))
+    if "host_inventory" in row:
+        return row["host_inventory"].get_rows(path)
+    return load_filtered_and_merged_table(row, path, row_filters).rows
@@ -4,8 +4,11 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass
 from statistics import fmean
 
+import numpy as np
+
 Timestamp = int
 
 TimeWindow = tuple[Timestamp, Timestamp, int]
@@ -38,6 +41,53 @@ def aggregation_functions(series: TimeSeriesValues, aggr: str | None) -> TimeSer
             raise ValueError(f"Invalid Aggregation function {aggr}, only max, min, average allowed")
 
 
+@dataclass(frozen=True)
+class MaskedValues:
+    """The values of a time series as floats, missing values are masked
+
+    Python treats ints and floats differently, eg. the builtin sum() only compensates the
+    rounding errors of floats. The ints are marked in order to get the very same results.
+    Ints are only exact as floats below 2**53, time_series_math() computes point-wise
+    otherwise."""
+
+    values: np.ma.MaskedArray
+    is_int: np.ndarray
+
+    @classmethod
+    def from_list(cls, values: TimeSeriesValues) -> "MaskedValues":
+        # Usually there are no ints and often no missing values
+        types = set(map(type, values))
+        return cls(
+            np.ma.MaskedArray(
+                np.array(values, dtype=float),
+                mask=(
+                    np.equal(np.array(values, dtype=object), None)  # type: ignore[call-overload]
+                    if type(None) in types
+                    else np.zeros(len(values), dtype=bool)
+                ),
+                shrink=False,
+            ),
+            (
+                np.fromiter((type(v) is int for v in values), dtype=bool, count=len(values))
+                if int in types
+                else np.zeros(len(values), dtype=bool)
+            ),
+        )
+
+    def to_list(self) -> list[TimeSeriesValue]:
+        data = self.values.data
+        values = data.astype(object)
+        values[self.is_int] = data[self.is_int].astype(int).astype(object)
+        values[np.ma.getmaskarray(self.values)] = None
+        return values.tolist()
+
+    def __len__(self) -> int:
+        return len(self.is_int)
+
+    def head(self, num_points: int) -> "MaskedValues":
+        return MaskedValues(self.values[:num_points], self.is_int[:num_points])
+
+
 class TimeSeries:
     """Describes the returned time series returned by livestatus
 
@@ -74,7 +124,42 @@ class TimeSeries:
         self.start = int(time_window[0])
         self.end = int(time_window[1])
         self.step = int(time_window[2])
-        self.values = [v if v is None else conversion(v) for v in data]
+        self._values: list[TimeSeriesValue] | None = [
+            v if v is None else conversion(v) for v in data
+        ]
+        self._masked_values: MaskedValues | None = None
+
+    @classmethod
+    def from_masked_values(
+        cls, masked_values: "MaskedValues", time_window: TimeWindow
+    ) -> "TimeSeries":
+        """Create an array backed time series
+
+        The values are converted to a list when they are accessed for the first time. Until
+        then, computations on the masked values do not need any conversion."""
+        time_series = cls([], time_window)
+        time_series._values = None
+        time_series._masked_values = masked_values
+        return time_series
+
+    @property
+    def values(self) -> list[TimeSeriesValue]:
+        if self._values is None:
+            assert self._masked_values is not None
+            self._values = self._masked_values.to_list()
+            # The list may be changed in place from now on
+            self._masked_values = None
+        return self._values
+
+    @values.setter
+    def values(self, values: list[TimeSeriesValue]) -> None:
+        self._values = values
+        self._masked_values = None
+
+    def masked_values(self) -> "MaskedValues":
+        if self._masked_values is not None:
+            return self._masked_values
+        return MaskedValues.from_list(self.values)
 
     @property
     def twindow(self) -> TimeWindow:
@@ -90,11 +175,10 @@ class TimeSeries:
             return self.values
 
         idx_max = len(self.values) - 1
-
-        return [
-            self.values[max(0, min(int((t - self.start) / self.step), idx_max))]
-            for t in range(*twindow)
-        ]
+        indices = np.clip(
+            np.trunc((np.arange(*twindow) - self.start) / self.step).astype(int), 0, idx_max
+        )
+        return np.array(self.values, dtype=object)[indices].tolist()
 
     def downsample(self, twindow: TimeWindow, cf: str | None = "max") -> TimeSeriesValues:
         """Downsample time series by consolidation function
@@ -146,6 +230,8 @@ class TimeSeries:
         return self.values[i]
 
     def __len__(self) -> int:
+        if self._masked_values is not None:
+            return len(self._masked_values)
         return len(self.values)
 
     def __iter__(self) -> Iterator[TimeSeriesValue]:
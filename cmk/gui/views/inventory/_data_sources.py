@@ -23,7 +23,7 @@ from cmk.gui.inventory._history import get_history
 from cmk.gui.inventory._tree import (
     get_short_inventory_filepath,
     InventoryPath,
-    load_filtered_and_merged_tree,
+    load_filtered_and_merged_table,
 )
 from cmk.gui.painter.v0.base import Cell
 from cmk.gui.type_defs import ColumnName, Row, Rows, SingleInfos, VisualContext
@@ -120,11 +120,9 @@ class RowTableInventory(ABCRowTable):
             return
 
         try:
-            table_rows = (
-                load_filtered_and_merged_tree(hostrow)
-                .get_tree(self._inventory_path.path)
-                .table.rows_with_retentions
-            )
+            table_rows = load_filtered_and_merged_table(
+                hostrow, self._inventory_path.path
+            ).rows_with_retentions
         except Exception as e:
             if active_config.debug:
                 html.show_warning("%s" % e)
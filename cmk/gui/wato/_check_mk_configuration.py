@@ -207,9 +207,11 @@ def register(
     config_variable_registry.register(ConfigVariableDelayPrecompile)
     config_variable_registry.register(ConfigVariableClusterMaxCachefileAge)
     config_variable_registry.register(ConfigVariablePiggybackMaxCachefileAge)
+    config_variable_registry.register(ConfigVariableRulesetMatchingCache)
     config_variable_registry.register(ConfigVariableCheckMKPerfdataWithTimes)
     config_variable_registry.register(ConfigVariableUseDNSCache)
     config_variable_registry.register(ConfigVariableChooseSNMPBackend)
+    config_variable_registry.register(ConfigVariableConcurrentSourceFetching)
     config_variable_registry.register(ConfigVariableUseInlineSNMP)
     config_variable_registry.register(ConfigVariableHTTPProxies)
     config_variable_group_registry.register(ConfigVariableGroupServiceDiscovery)
@@ -289,6 +291,7 @@ def register(
     rulespec_registry.register(SnmpPorts)
     rulespec_registry.register(AgentPorts)
     rulespec_registry.register(TcpConnectTimeouts)
+    rulespec_registry.register(ConcurrentSourceFetchingHosts)
     rulespec_registry.register(EncryptionHandling)
     rulespec_registry.register(AgentEncryption)
     rulespec_registry.register(CheckMkExitStatus)
@@ -3116,6 +3119,29 @@ class ConfigVariablePiggybackMaxCachefileAge(ConfigVariable):
         )
 
 
+class ConfigVariableRulesetMatchingCache(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupCheckExecution
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainCore
+
+    def ident(self) -> str:
+        return "ruleset_matching_cache"
+
+    def valuespec(self) -> ValueSpec:
+        return Checkbox(
+            title=_("Persist ruleset matching results"),
+            label=_("Reuse the matching hosts of rules between Checkmk invocations"),
+            help=_(
+                "If enabled, the hosts matching the conditions of the configured rules are "
+                "persisted after a configuration update, service discovery or automation call. "
+                "Subsequent calls only match the hosts again whose tags, labels or folder "
+                "changed in the meantime."
+            ),
+        )
+
+
 class ConfigVariableCheckMKPerfdataWithTimes(ConfigVariable):
     def group(self) -> type[ConfigVariableGroup]:
         return ConfigVariableGroupCheckExecution
@@ -3167,20 +3193,25 @@ class ConfigVariableUseDNSCache(ConfigVariable):
 
 
 def transform_snmp_backend_default_to_valuespec(
-    backend: Literal["classic", "inline"]
+    backend: Literal["classic", "inline", "python"],
 ) -> SNMPBackendEnum:
     return {
         "classic": SNMPBackendEnum.CLASSIC,
         "inline": SNMPBackendEnum.INLINE,
+        "python": SNMPBackendEnum.PYTHON,
     }[backend]
 
 
-def transform_snmp_backend_from_valuespec(backend: SNMPBackendEnum) -> Literal["classic", "inline"]:
+def transform_snmp_backend_from_valuespec(
+    backend: SNMPBackendEnum,
+) -> Literal["classic", "inline", "python"]:
     match backend:
         case SNMPBackendEnum.CLASSIC:
             return "classic"
         case SNMPBackendEnum.INLINE:
             return "inline"
+        case SNMPBackendEnum.PYTHON:
+            return "python"
         case _:
             raise MKConfigError("SNMPBackendEnum %r not implemented" % backend)
 
@@ -3204,6 +3235,7 @@ class ConfigVariableChooseSNMPBackend(ConfigVariable):
                 choices=[
                     (SNMPBackendEnum.CLASSIC, _("Use Classic SNMP Backend")),
                     (SNMPBackendEnum.INLINE, _("Use Inline SNMP Backend")),
+                    (SNMPBackendEnum.PYTHON, _("Use Python SNMP Backend")),
                 ],
                 help=_(
                     "By default Checkmk uses command line calls of Net-SNMP tools like snmpget or "
@@ -3212,7 +3244,9 @@ class ConfigVariableChooseSNMPBackend(ConfigVariable):
                     "which calls the respective libraries directly via its python bindings. This "
                     "should increase the performance of SNMP checks in a significant way. Both "
                     "SNMP modes are features which improve the performance for large installations and are "
-                    "only available via our subscription."
+                    "only available via our subscription. The Python SNMP backend sends the "
+                    "requests of SNMP v1 and v2c itself and fetches all columns of a table "
+                    "together. Hosts using SNMP v3 are queried with the Classic SNMP backend."
                 ),
             ),
             to_valuespec=transform_snmp_backend_hosts_to_valuespec,
@@ -3220,6 +3254,48 @@ class ConfigVariableChooseSNMPBackend(ConfigVariable):
         )
 
 
+def _valuespec_concurrent_source_fetching(title: str) -> ValueSpec:
+    return Alternative(
+        title=title,
+        help=_(
+            "By default the data of the data sources of a host, like the Checkmk agent, SNMP, "
+            "special agents, piggyback data or the management board, are fetched one after "
+            "the other. The time needed by the Checkmk service is then the sum of the times "
+            "of all sources. If the sources are fetched concurrently, it is the time of the "
+            "slowest source. A source which does not deliver its data within the configured "
+            "timeout results in a timeout of this source."
+        ),
+        elements=[
+            FixedValue(
+                value=None,
+                title=_("Fetch the data sources one after the other"),
+                totext="",
+            ),
+            Float(
+                title=_("Fetch the data sources concurrently"),
+                label=_("Timeout of each data source"),
+                unit=_("sec"),
+                minvalue=1.0,
+                default_value=60.0,
+            ),
+        ],
+    )
+
+
+class ConfigVariableConcurrentSourceFetching(ConfigVariable):
+    def group(self) -> type[ConfigVariableGroup]:
+        return ConfigVariableGroupCheckExecution
+
+    def domain(self) -> type[ABCConfigDomain]:
+        return ConfigDomainCore
+
+    def ident(self) -> str:
+        return "concurrent_source_fetching"
+
+    def valuespec(self) -> ValueSpec:
+        return _valuespec_concurrent_source_fetching(_("Concurrent fetching of data sources"))
+
+
 class ConfigVariableCMCRulesetMatchingStats(ConfigVariable):
     def group(self) -> type[ConfigVariableGroup]:
         return ConfigVariableGroupDeveloperTools
@@ -5642,6 +5718,8 @@ def transform_snmp_backend_hosts_to_valuespec(backend):
         # We dropped pysnmp during the 2.1 beta because it is currently slow
         # and unreliable.
         return SNMPBackendEnum.CLASSIC
+    if backend == "python":
+        return SNMPBackendEnum.PYTHON
     raise MKConfigError("SNMPBackendEnum %r not implemented" % backend)
 
 
@@ -5652,6 +5730,7 @@ def _valuespec_snmp_backend():
             choices=[
                 (SNMPBackendEnum.INLINE, _("Use Inline SNMP backend")),
                 (SNMPBackendEnum.CLASSIC, _("Use Classic backend")),
+                (SNMPBackendEnum.PYTHON, _("Use Python SNMP backend")),
             ],
         ),
         to_valuespec=transform_snmp_backend_hosts_to_valuespec,
@@ -5763,6 +5842,14 @@ TcpConnectTimeouts = HostRulespec(
     valuespec=_valuespec_tcp_connect_timeouts,
 )
 
+ConcurrentSourceFetchingHosts = HostRulespec(
+    group=RulespecGroupAgentGeneralSettings,
+    name="concurrent_source_fetching_hosts",
+    valuespec=lambda: _valuespec_concurrent_source_fetching(
+        _("Hosts with concurrent fetching of data sources")
+    ),
+)
+
 
 def _valuespec_encryption_handling() -> Dictionary:
     return Dictionary(
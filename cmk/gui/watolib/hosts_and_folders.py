@@ -81,6 +81,7 @@ from cmk.gui.watolib.config_domain_name import (
     SerializedSettings,
 )
 from cmk.gui.watolib.host_attributes import (
+    ABCHostAttribute,
     collect_attributes,
     host_attribute_registry,
     HostAttributes,
@@ -110,6 +111,8 @@ from cmk.ccc.site import omd_site
 _ContactgroupName = str
 
 SearchCriteria = Mapping[str, Any]
+# inode, modification time, size
+HostsFileStamp = tuple[int, int, int]
 
 
 class CollectedHostAttributes(HostAttributes):
@@ -1214,6 +1217,7 @@ class Folder(FolderProtocol):
         self._parent = parent_folder
         self._num_hosts = num_hosts
         self._hosts = hosts
+        self._hosts_file_stamp: HostsFileStamp | None = None
 
         self._loaded_subfolders: dict[PathWithoutSlash, Folder] | None = None
         self._choices_for_moving_host: Choices | None = None
@@ -1264,6 +1268,8 @@ class Folder(FolderProtocol):
         self._locked_hosts = False
 
         self._hosts = {}
+        # Before reading the file, the hosts must not be newer than the stamp
+        self._hosts_file_stamp = HostAttributeIndex.hosts_file_stamp(self)
         if (wato_hosts := self._load_wato_hosts()) is None:
             return
 
@@ -1323,6 +1329,8 @@ class Folder(FolderProtocol):
         if not self.has_hosts() and not exposed_folder_attributes_for_base:
             for storage in get_all_storage_readers():
                 storage.remove(Path(self.hosts_file_path_without_extension()))
+            self._hosts_file_stamp = None
+            HostAttributeIndex().delete(self)
             return
 
         all_hosts: list[HostName] = []
@@ -1450,6 +1458,14 @@ class Folder(FolderProtocol):
                 get_value_formatter(),
             )
 
+        self._hosts_file_stamp = HostAttributeIndex.hosts_file_stamp(self)
+        self.update_host_attribute_index()
+
+    def update_host_attribute_index(self) -> None:
+        if self._hosts is None or self._hosts_file_stamp is None:
+            return
+        HostAttributeIndex().save(self, self._hosts, self._hosts_file_stamp)
+
     def _folder_attributes_for_base_config(self) -> dict[str, FolderAttributesForBase]:
         # TODO:
         # At this time, this is the only attribute there is, at it only exists in the CEE.
@@ -2804,6 +2820,82 @@ class FolderLookupCache:
         self._save(cache)
 
 
+class HostAttributeIndex:
+    """Persistent index of the searchable attributes of the hosts in each folder
+
+    The effective values of the indexed attributes of the hosts of a folder are stored in one
+    file per folder. They are updated whenever the hosts file of the folder is written. This
+    includes changes of inherited attributes, because these rewrite the hosts files of all
+    affected folders. An entry is only used as long as the hosts file was not changed."""
+
+    # Besides the host name and the tag attributes
+    _indexed_attribute_names: Final = frozenset(
+        ["alias", "ipaddress", "ipv6address", "labels", "site"]
+    )
+
+    def _path(self, folder: Folder) -> Path:
+        return Path(
+            cmk.utils.paths.tmp_dir, "wato", "host_attribute_index", folder.path(), ".hosts"
+        )
+
+    @staticmethod
+    def hosts_file_stamp(folder: Folder) -> HostsFileStamp | None:
+        try:
+            stat = os.stat(folder.hosts_file_path())
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def indexed_attribute_names(self) -> frozenset[str]:
+        return self._indexed_attribute_names.union(
+            attr.name() for attr in host_attribute_registry.attributes() if attr.is_tag_attribute
+        )
+
+    def load(
+        self, folder: Folder
+    ) -> tuple[frozenset[str], Mapping[HostName, HostAttributes]] | None:
+        """The indexed attribute names and the indexed attributes of the hosts of a folder
+
+        None is returned if the folder is not indexed or the index of the folder is outdated."""
+        if (stamp := self.hosts_file_stamp(folder)) is None:
+            return None
+        try:
+            index = store.load_object_from_pickle_file(self._path(folder), default={})
+        except (TypeError, pickle.UnpicklingError) as e:
+            logger.warning("Unable to read host attribute index from disk: %s", str(e))
+            return None
+        if index.get("stamp") != stamp:
+            return None
+        return index["attribute_names"], index["hosts"]
+
+    def save(self, folder: Folder, hosts: Mapping[HostName, Host], stamp: HostsFileStamp) -> None:
+        """Index the hosts of a folder, which have been read from the hosts file with the stamp"""
+        attribute_names = self.indexed_attribute_names()
+        store.save_bytes_to_file(
+            self._path(folder),
+            pickle.dumps(
+                {
+                    "stamp": stamp,
+                    "attribute_names": attribute_names,
+                    "hosts": {
+                        host_name: {
+                            name: value
+                            for name, value in host.effective_attributes().items()
+                            if name in attribute_names
+                        }
+                        for host_name, host in hosts.items()
+                    },
+                }
+            ),
+        )
+
+    def delete(self, folder: Folder) -> None:
+        try:
+            self._path(folder).unlink()
+        except FileNotFoundError:
+            pass
+
+
 class WATOFoldersOnDemand(Mapping[PathWithoutSlash, Folder]):
     def __init__(self, tree: FolderTree, values: dict[PathWithoutSlash, Folder | None]) -> None:
         self.tree = tree
@@ -3004,30 +3096,56 @@ class SearchFolder(FolderProtocol):
         if not in_folder.permissions.may("read"):
             return {}
 
-        found = {}
-        for host_name, host in in_folder.hosts().items():
-            if self._criteria[".name"] and not host_attribute_matches(
-                self._criteria[".name"], host_name
-            ):
-                continue
-
-            # Compute inheritance
-            effective = host.effective_attributes()
-
-            # Check attributes
-            dont_match = False
-            for attr in host_attribute_registry.attributes():
-                attrname = attr.name()
-                if attrname in self._criteria and not attr.filter_matches(
-                    self._criteria[attrname], effective.get(attrname), host_name
-                ):
-                    dont_match = True
-                    break
+        attributes = [
+            attr for attr in host_attribute_registry.attributes() if attr.name() in self._criteria
+        ]
+        index = HostAttributeIndex()
+        if (indexed := index.load(in_folder)) is None:
+            found = {
+                host_name: host
+                for host_name, host in in_folder.hosts().items()
+                if self._host_matches(host_name, host.effective_attributes(), attributes)
+            }
+            in_folder.update_host_attribute_index()
+            return found
 
-            if not dont_match:
-                found[host_name] = host
+        # Only load the hosts of the folder if some of them match the indexed attributes
+        indexed_attribute_names, indexed_hosts = indexed
+        indexed_attributes = [attr for attr in attributes if attr.name() in indexed_attribute_names]
+        candidates = {
+            host_name
+            for host_name, host_attributes in indexed_hosts.items()
+            if self._host_matches(host_name, host_attributes, indexed_attributes)
+        }
+        if not candidates:
+            return {}
+        remaining_attributes = [
+            attr for attr in attributes if attr.name() not in indexed_attribute_names
+        ]
+        return {
+            host_name: host
+            for host_name, host in in_folder.hosts().items()
+            if host_name in candidates
+            and (
+                not remaining_attributes
+                or self._host_matches(host_name, host.effective_attributes(), remaining_attributes)
+            )
+        }
 
-        return found
+    def _host_matches(
+        self,
+        host_name: HostName,
+        effective: HostAttributes,
+        attributes: Sequence[ABCHostAttribute],
+    ) -> bool:
+        if self._criteria[".name"] and not host_attribute_matches(
+            self._criteria[".name"], host_name
+        ):
+            return False
+        return all(
+            attr.filter_matches(self._criteria[attr.name()], effective.get(attr.name()), host_name)
+            for attr in attributes
+        )
 
     def _invalidate_search(self) -> None:
         self._found_hosts = None
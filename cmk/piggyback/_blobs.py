@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Batched storage of the piggyback payloads of one source
+
+All payloads a source sent for its piggybacked hosts are stored in a single file:
+
+    MAGIC | index length (4 bytes, big endian) | index (JSON) | payload | payload | ...
+
+The index maps the piggybacked host names to the time of their last update and to the
+location of their payload (offset relative to the end of the index, length). A blob is
+never modified. It is replaced as a whole, so readers either see the old or the new one.
+"""
+
+import json
+import os
+import struct
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Final
+
+from cmk.utils.hostaddress import HostAddress
+
+_MAGIC: Final = b"CMKPIGGY\x01"
+_INDEX_LENGTH: Final = struct.Struct(">I")
+_HEADER_LENGTH: Final = len(_MAGIC) + _INDEX_LENGTH.size
+
+
+@dataclass(frozen=True)
+class BlobEntry:
+    last_update: int
+    offset: int
+    length: int
+
+
+class InvalidBlobError(Exception):
+    pass
+
+
+def serialize_blob(payloads: Mapping[HostAddress, tuple[int, bytes]]) -> bytes:
+    """Create a blob from the piggybacked hosts last update and payload"""
+    index: dict[str, tuple[int, int, int]] = {}
+    offset = 0
+    for piggybacked_hostname, (last_update, payload) in payloads.items():
+        index[str(piggybacked_hostname)] = (last_update, offset, len(payload))
+        offset += len(payload)
+
+    raw_index = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    return b"".join(
+        (
+            _MAGIC,
+            _INDEX_LENGTH.pack(len(raw_index)),
+            raw_index,
+            *(payload for _last_update, payload in payloads.values()),
+        )
+    )
+
+
+def load_blob_index(blob_path: Path) -> Mapping[HostAddress, BlobEntry]:
+    """Read the index of a blob without reading the payloads
+
+    Raises FileNotFoundError if the blob does not exist (anymore).
+    """
+    with blob_path.open("rb") as blob:
+        return _read_index(blob_path, blob)
+
+
+def read_blob_payloads(
+    blob_path: Path, select: Callable[[HostAddress], bool]
+) -> Mapping[HostAddress, tuple[int, bytes]]:
+    """Read the last update and the payload of the selected piggybacked hosts
+
+    Raises FileNotFoundError if the blob does not exist (anymore).
+    """
+    with blob_path.open("rb") as blob:
+        index = _read_index(blob_path, blob)
+        payloads_start = blob.tell()
+        payloads = {}
+        for piggybacked_hostname, entry in index.items():
+            if not select(piggybacked_hostname):
+                continue
+            blob.seek(payloads_start + entry.offset)
+            payloads[piggybacked_hostname] = (entry.last_update, blob.read(entry.length))
+        return payloads
+
+
+def read_blob_payload(blob_path: Path, piggybacked_hostname: HostAddress) -> bytes | None:
+    try:
+        payloads = read_blob_payloads(blob_path, lambda h: h == piggybacked_hostname)
+    except (FileNotFoundError, InvalidBlobError):
+        return None
+    return payloads[piggybacked_hostname][1] if piggybacked_hostname in payloads else None
+
+
+def _read_index(blob_path: Path, blob: BinaryIO) -> Mapping[HostAddress, BlobEntry]:
+    """Read the index and position the blob at the start of the payloads
+
+    The parsed indexes are cached. As a blob is only ever replaced, the status of the opened
+    file tells whether the cached index is still valid.
+    """
+    stat = os.fstat(blob.fileno())
+    file_id = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+    if (cached := _INDEX_CACHE.get(blob_path)) is not None and cached.file_id == file_id:
+        blob.seek(cached.payloads_start)
+        return cached.index
+
+    header = blob.read(_HEADER_LENGTH)
+    if len(header) != _HEADER_LENGTH or not header.startswith(_MAGIC):
+        raise InvalidBlobError(f"Invalid piggyback blob: {blob_path}")
+    (index_length,) = _INDEX_LENGTH.unpack(header[len(_MAGIC) :])
+    index = {
+        HostAddress(piggybacked_hostname): BlobEntry(last_update, offset, length)
+        for piggybacked_hostname, (last_update, offset, length) in json.loads(
+            blob.read(index_length)
+        ).items()
+    }
+    _INDEX_CACHE[blob_path] = _CachedIndex(file_id, index, blob.tell())
+    return index
+
+
+@dataclass(frozen=True)
+class _CachedIndex:
+    file_id: tuple[int, int, int, int, int]
+    index: Mapping[HostAddress, BlobEntry]
+    payloads_start: int
+
+
+# One entry per source blob
+_INDEX_CACHE: Final[dict[Path, _CachedIndex]] = {}
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Index of the piggyback meta data
+
+Knows which sources have data for which piggybacked host, the time of the last update of this
+data and the last contact of each source. This answers the queries of the fetchers without
+listing and stat()ing the piggyback directories.
+
+The index is updated along with the files by the functions in _storage.py. If it does not
+exist (yet), it is built from the files on first use.
+"""
+
+import contextlib
+import sqlite3
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import Final, NamedTuple
+
+from cmk.utils.hostaddress import HostAddress
+
+_SCHEMA: Final = (
+    """CREATE TABLE IF NOT EXISTS payloads (
+        piggybacked TEXT NOT NULL,
+        source TEXT NOT NULL,
+        last_update INTEGER NOT NULL,
+        in_blob INTEGER NOT NULL,
+        PRIMARY KEY (piggybacked, source)
+    );""",
+    "CREATE INDEX IF NOT EXISTS idx_payloads_last_update ON payloads (last_update);",
+    "CREATE TABLE IF NOT EXISTS sources (source TEXT PRIMARY KEY, last_contact INTEGER NOT NULL);",
+    "CREATE INDEX IF NOT EXISTS idx_sources_last_contact ON sources (last_contact);",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);",
+)
+
+_PRAGMAS: Final = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    # Many fetchers may update the index concurrently
+    "PRAGMA busy_timeout=10000;",
+)
+
+
+class IndexedPayload(NamedTuple):
+    piggybacked: HostAddress
+    source: HostAddress
+    last_update: int
+    in_blob: bool
+
+
+class IndexedPayloadMetaData(NamedTuple):
+    payload: IndexedPayload
+    last_contact: int | None
+
+
+class IndexContent(NamedTuple):
+    payloads: Iterable[IndexedPayload]
+    last_contacts: Iterable[tuple[HostAddress, int]]
+
+
+class PiggybackIndex:
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self._connection: Final = connection
+
+    @classmethod
+    @contextlib.contextmanager
+    def open(cls, path: Path, scan: Callable[[], IndexContent]) -> Iterator["PiggybackIndex"]:
+        """Open the index, building it from the result of `scan` if it is not initialized
+
+        Raises sqlite3.Error if the index can not be used.
+        """
+        path.parent.mkdir(mode=0o770, exist_ok=True, parents=True)
+        connection = sqlite3.connect(path, isolation_level=None)
+        try:
+            for pragma in _PRAGMAS:
+                connection.execute(pragma)
+            index = cls(connection)
+            if not index._is_initialized():
+                index._initialize(scan)
+            yield index
+        finally:
+            connection.close()
+
+    @classmethod
+    def invalidate(cls, path: Path) -> None:
+        """Mark the index as not initialized, it is built again on next use
+
+        The database itself is kept, other processes may be using it. Raises sqlite3.Error
+        if the index can not be invalidated, e.g. because it is locked.
+        """
+        if not path.exists():
+            return
+        connection = sqlite3.connect(path, isolation_level=None)
+        try:
+            for pragma in _PRAGMAS:
+                connection.execute(pragma)
+            with cls(connection)._transaction() as transaction:
+                for statement in _SCHEMA:
+                    transaction.execute(statement)
+                transaction.execute("DELETE FROM meta WHERE key = 'initialized';")
+        finally:
+            connection.close()
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        self._connection.execute("BEGIN IMMEDIATE;")
+        try:
+            yield self._connection
+        except BaseException:
+            self._connection.execute("ROLLBACK;")
+            raise
+        self._connection.execute("COMMIT;")
+
+    def _is_initialized(self) -> bool:
+        try:
+            return bool(
+                self._connection.execute(
+                    "SELECT value FROM meta WHERE key = 'initialized';"
+                ).fetchone()
+            )
+        except sqlite3.OperationalError:  # no such table
+            return False
+
+    def _data_version(self) -> int:
+        return int(self._connection.execute("PRAGMA data_version;").fetchone()[0])
+
+    def _scan_unlocked(self, scan: Callable[[], IndexContent]) -> tuple[int, IndexContent]:
+        """Scan the files without holding the write lock of the index
+
+        Scanning the whole piggyback tree takes a while, the writers must not be blocked
+        meanwhile. The data version tells if another connection committed during the scan.
+        """
+        data_version = self._data_version()
+        content = scan()
+        return data_version, IndexContent(list(content.payloads), list(content.last_contacts))
+
+    def _scan_locked(
+        self, scan: Callable[[], IndexContent], data_version: int, content: IndexContent
+    ) -> IndexContent:
+        # An update committed during the scan may be missing in its result. Scan again, this
+        # time holding the write lock.
+        return content if self._data_version() == data_version else scan()
+
+    def _initialize(self, scan: Callable[[], IndexContent]) -> None:
+        data_version, content = self._scan_unlocked(scan)
+        with self._transaction() as connection:
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            # Another process may have been faster
+            if connection.execute("SELECT value FROM meta WHERE key = 'initialized';").fetchone():
+                return
+            content = self._scan_locked(scan, data_version, content)
+            # Leftovers of an invalidated index
+            connection.execute("DELETE FROM payloads;")
+            connection.execute("DELETE FROM sources;")
+            self._fill(connection, content)
+            connection.execute("INSERT INTO meta (key, value) VALUES ('initialized', '1');")
+
+    def rebuild(self, scan: Callable[[], IndexContent]) -> None:
+        data_version, content = self._scan_unlocked(scan)
+        with self._transaction() as connection:
+            content = self._scan_locked(scan, data_version, content)
+            connection.execute("DELETE FROM payloads;")
+            connection.execute("DELETE FROM sources;")
+            self._fill(connection, content)
+
+    @staticmethod
+    def _fill(connection: sqlite3.Connection, content: IndexContent) -> None:
+        PiggybackIndex._upsert_payloads(connection, content.payloads)
+        connection.executemany(
+            "INSERT OR REPLACE INTO sources (source, last_contact) VALUES (?, ?);",
+            ((str(source), last_contact) for source, last_contact in content.last_contacts),
+        )
+
+    @staticmethod
+    def _upsert_payloads(
+        connection: sqlite3.Connection, payloads: Iterable[IndexedPayload]
+    ) -> None:
+        # Never replace the location of a more recent payload: Concurrent writers may race.
+        connection.executemany(
+            """INSERT INTO payloads (piggybacked, source, last_update, in_blob)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (piggybacked, source) DO UPDATE SET
+                    last_update = excluded.last_update, in_blob = excluded.in_blob
+                WHERE excluded.last_update >= payloads.last_update;""",
+            ((str(p.piggybacked), str(p.source), p.last_update, int(p.in_blob)) for p in payloads),
+        )
+
+    def update_source(
+        self, source: HostAddress, payloads: Iterable[IndexedPayload], last_contact: int
+    ) -> None:
+        with self._transaction() as connection:
+            self._upsert_payloads(connection, payloads)
+            connection.execute(
+                "INSERT OR REPLACE INTO sources (source, last_contact) VALUES (?, ?);",
+                (str(source), last_contact),
+            )
+
+    def remove_last_contact(self, source: HostAddress) -> None:
+        self._connection.execute("DELETE FROM sources WHERE source = ?;", (str(source),))
+
+    def payloads_meta_data(
+        self, piggybacked: HostAddress | None = None
+    ) -> Sequence[IndexedPayloadMetaData]:
+        """The payloads of the piggybacked host (or all payloads), ordered by host and source"""
+        return [
+            IndexedPayloadMetaData(
+                IndexedPayload(
+                    HostAddress(piggybacked_hostname),
+                    HostAddress(source),
+                    last_update,
+                    bool(in_blob),
+                ),
+                last_contact,
+            )
+            for piggybacked_hostname, source, last_update, in_blob, last_contact in (
+                self._connection.execute(
+                    f"""SELECT p.piggybacked, p.source, p.last_update, p.in_blob, s.last_contact
+                        FROM payloads p LEFT JOIN sources s ON p.source = s.source
+                        {"" if piggybacked is None else "WHERE p.piggybacked = ?"}
+                        ORDER BY p.piggybacked, p.source;""",
+                    () if piggybacked is None else (str(piggybacked),),
+                )
+            )
+        ]
+
+    def outdated_payloads(self, cut_off_timestamp: float) -> Sequence[IndexedPayload]:
+        return [
+            IndexedPayload(
+                HostAddress(piggybacked), HostAddress(source), last_update, bool(in_blob)
+            )
+            for piggybacked, source, last_update, in_blob in self._connection.execute(
+                """SELECT piggybacked, source, last_update, in_blob
+                    FROM payloads WHERE last_update < ?;""",
+                (cut_off_timestamp,),
+            )
+        ]
+
+    def outdated_sources(self, cut_off_timestamp: float) -> Sequence[HostAddress]:
+        return [
+            HostAddress(source)
+            for (source,) in self._connection.execute(
+                "SELECT source FROM sources WHERE last_contact < ?;", (cut_off_timestamp,)
+            )
+        ]
+
+    def remove_outdated(self, cut_off_timestamp: float) -> None:
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM payloads WHERE last_update < ?;", (cut_off_timestamp,))
+            connection.execute("DELETE FROM sources WHERE last_contact < ?;", (cut_off_timestamp,))
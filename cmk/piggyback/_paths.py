@@ -7,6 +7,8 @@ from pathlib import Path
 
 _RELATIVE_PAYLOAD_DIR = "tmp/check_mk/piggyback"
 _RELATIVE_SOURCE_STATUS_DIR = "tmp/check_mk/piggyback_sources"
+_RELATIVE_BLOB_DIR = "tmp/check_mk/piggyback_blobs"
+_RELATIVE_INDEX_PATH = "tmp/check_mk/piggyback_index.sqlite"
 
 
 def payload_dir(omd_root: Path) -> Path:
@@ -15,3 +17,11 @@ def payload_dir(omd_root: Path) -> Path:
 
 def source_status_dir(omd_root: Path) -> Path:
     return omd_root / _RELATIVE_SOURCE_STATUS_DIR
+
+
+def blob_dir(omd_root: Path) -> Path:
+    return omd_root / _RELATIVE_BLOB_DIR
+
+
+def index_path(omd_root: Path) -> Path:
+    return omd_root / _RELATIVE_INDEX_PATH
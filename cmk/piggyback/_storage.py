@@ -3,24 +3,40 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import contextlib
 import datetime
 import errno
+import fcntl
 import json
 import logging
 import os
 import shutil
+import sqlite3
 import tempfile
-from collections.abc import Iterable, Mapping, Sequence
+from collections.abc import Callable, Container, Iterable, Iterator, Mapping, Sequence
 from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Self
+from typing import Final, NamedTuple, Self
 
 from cmk.utils.hostaddress import HostAddress, HostName
 
-from ._paths import payload_dir, source_status_dir
+from ._blobs import (
+    BlobEntry,
+    InvalidBlobError,
+    load_blob_index,
+    read_blob_payload,
+    read_blob_payloads,
+    serialize_blob,
+)
+from ._index import IndexContent, IndexedPayload, PiggybackIndex
+from ._paths import blob_dir, index_path, payload_dir, source_status_dir
 
 logger = logging.getLogger(__name__)
 
+# Sources sending data for at least this many piggybacked hosts (vSphere, AWS, ...) store all
+# their payloads in one blob per source instead of one file per piggybacked host.
+_BLOB_MIN_PIGGYBACKED_HOSTS: Final = 100
+
 
 @dataclass(frozen=True, kw_only=True)
 class PiggybackMetaData:
@@ -65,43 +81,67 @@ class PiggybackMessage:
 # "source_hostname":
 # - Path(tmp/check_mk/piggyback/HOST/SOURCE).name
 # - Path(tmp/check_mk/piggyback_sources/SOURCE).name
+#
+# "source_blob":
+# - tmp/check_mk/piggyback_blobs/SOURCE
+#   Contains the payloads of all piggybacked hosts of a source, see _blobs.py
+#
+# "index":
+# - tmp/check_mk/piggyback_index.sqlite
+#   The meta data of all payloads and the last contacts of the sources, see _index.py
+
+
+class _PayloadLocation(NamedTuple):
+    meta: PiggybackMetaData
+    path: Path
+    in_blob: bool
 
 
 def get_piggyback_raw_data(
     piggybacked_hostname: HostAddress, omd_root: Path
 ) -> Sequence[PiggybackMessage]:
     """Returns piggyback messages for the given host"""
-    piggyback_meta_data = _get_payload_meta_data(piggybacked_hostname, omd_root)
-    logger.debug("%s piggyback files for '%s'.", len(piggyback_meta_data), piggybacked_hostname)
+    if (payload_locations := _query_index(omd_root, piggybacked_hostname)) is None:
+        payload_locations = _get_payload_locations(
+            piggybacked_hostname, omd_root, _load_blob_indexes(omd_root)
+        )
+    logger.debug("%s piggyback files for '%s'.", len(payload_locations), piggybacked_hostname)
 
     piggyback_data = []
-    for meta_data in piggyback_meta_data:
-        content_path = _get_piggybacked_file_path(meta_data.source, meta_data.piggybacked, omd_root)
-        try:
-            # Raw data is always stored as bytes. Later the content is
-            # converted to unicode in abstact.py:_parse_info which respects
-            # 'encoding' in section options.
-            raw_data = content_path.read_bytes()
-
-        except FileNotFoundError:
+    for location in payload_locations:
+        # Raw data is always stored as bytes. Later the content is
+        # converted to unicode in abstact.py:_parse_info which respects
+        # 'encoding' in section options.
+        if (raw_data := _read_payload(location)) is None:
             # race condition: file was removed between listing and reading
             continue
 
-        logger.debug("Read piggyback file '%s'", content_path)
-        piggyback_data.append(PiggybackMessage(meta_data, raw_data))
+        logger.debug("Read piggyback file '%s'", location.path)
+        piggyback_data.append(PiggybackMessage(location.meta, raw_data))
 
     return piggyback_data
 
 
+def _read_payload(location: _PayloadLocation) -> bytes | None:
+    if location.in_blob:
+        return read_blob_payload(location.path, location.meta.piggybacked)
+    try:
+        return location.path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
 def get_piggybacked_host_with_sources(
     omd_root: Path,
 ) -> Mapping[HostAddress, Sequence[PiggybackMetaData]]:
     """Generates all piggyback pig/piggybacked host pairs"""
-    return {
-        piggybacked_host: _get_payload_meta_data(piggybacked_host, omd_root)
-        for piggybacked_host_folder in _get_piggybacked_host_folders(omd_root)
-        if (piggybacked_host := HostAddress(piggybacked_host_folder.name))
-    }
+    if (payload_locations := _query_index(omd_root, None)) is None:
+        payload_locations = _scan_payload_locations(omd_root)
+
+    piggybacked_hosts: dict[HostAddress, list[PiggybackMetaData]] = {}
+    for location in payload_locations:
+        piggybacked_hosts.setdefault(location.meta.piggybacked, []).append(location.meta)
+    return piggybacked_hosts
 
 
 def _remove_piggyback_file(piggyback_file_path: Path) -> bool:
@@ -116,7 +156,9 @@ def remove_source_status_file(source_hostname: HostName, omd_root: Path) -> bool
     """Remove the source_status_file of this piggyback host which will
     mark the piggyback data from this source as outdated."""
     source_status_path = _get_source_status_file_path(source_hostname, omd_root)
-    return _remove_piggyback_file(source_status_path)
+    removed = _remove_piggyback_file(source_status_path)
+    _update_index(omd_root, lambda index: index.remove_last_contact(source_hostname))
+    return removed
 
 
 def store_piggyback_raw_data(
@@ -131,19 +173,17 @@ def store_piggyback_raw_data(
         remove_source_status_file(source_hostname, omd_root)
         return
 
-    piggyback_file_paths = []
-    for piggybacked_hostname, lines in piggybacked_raw_data.items():
-        piggyback_file_path = _get_piggybacked_file_path(
-            source_hostname, piggybacked_hostname, omd_root
-        )
-        logger.debug("Storing piggyback data for: %r", piggybacked_hostname)
-        # Raw data is always stored as bytes. Later the content is
-        # converted to unicode in abstact.py:_parse_info which respects
-        # 'encoding' in section options.
-        _write_file_with_mtime(
-            file_path=piggyback_file_path, content=b"%s\n" % b"\n".join(lines), mtime=timestamp
-        )
-        piggyback_file_paths.append(piggyback_file_path)
+    # Raw data is always stored as bytes. Later the content is
+    # converted to unicode in abstact.py:_parse_info which respects
+    # 'encoding' in section options.
+    payloads = {
+        piggybacked_hostname: b"%s\n" % b"\n".join(lines)
+        for piggybacked_hostname, lines in piggybacked_raw_data.items()
+    }
+    if len(payloads) >= _BLOB_MIN_PIGGYBACKED_HOSTS:
+        stored = _store_blob(source_hostname, payloads, timestamp, omd_root)
+    else:
+        stored = _store_files(source_hostname, payloads, timestamp, omd_root)
 
     # Store the last contact with this piggyback source to be able to filter outdated data later
     # We use the mtime of this file later for comparison.
@@ -152,6 +192,105 @@ def store_piggyback_raw_data(
     status_file_path = _get_source_status_file_path(source_hostname, omd_root)
     _write_file_with_mtime(file_path=status_file_path, content=b"", mtime=timestamp)
 
+    _update_index(
+        omd_root, lambda index: index.update_source(source_hostname, stored, int(timestamp))
+    )
+
+
+def _store_files(
+    source_hostname: HostName,
+    payloads: Mapping[HostName, bytes],
+    timestamp: float,
+    omd_root: Path,
+) -> Sequence[IndexedPayload]:
+    stored = [
+        IndexedPayload(piggybacked_hostname, source_hostname, int(timestamp), in_blob=False)
+        for piggybacked_hostname in payloads
+    ]
+    for piggybacked_hostname, payload in payloads.items():
+        logger.debug("Storing piggyback data for: %r", piggybacked_hostname)
+        _write_file_with_mtime(
+            file_path=_get_piggybacked_file_path(source_hostname, piggybacked_hostname, omd_root),
+            content=payload,
+            mtime=timestamp,
+        )
+
+    # The source switched from the blob to the file storage: Keep the payloads of the
+    # piggybacked hosts which were not sent this turn, just like the file storage does.
+    blob_path = _get_source_blob_path(source_hostname, omd_root)
+    if not blob_path.exists():
+        return stored
+
+    with _locked_source_blob(blob_path):
+        try:
+            outdated_payloads = read_blob_payloads(blob_path, lambda h: h not in payloads)
+        except (FileNotFoundError, InvalidBlobError):
+            return stored
+
+        for piggybacked_hostname, (last_update, payload) in outdated_payloads.items():
+            _write_file_with_mtime(
+                file_path=_get_piggybacked_file_path(
+                    source_hostname, piggybacked_hostname, omd_root
+                ),
+                content=payload,
+                mtime=last_update,
+            )
+            stored.append(
+                IndexedPayload(piggybacked_hostname, source_hostname, last_update, in_blob=False)
+            )
+        _remove_piggyback_file(blob_path)
+    return stored
+
+
+def _store_blob(
+    source_hostname: HostName,
+    payloads: Mapping[HostName, bytes],
+    timestamp: float,
+    omd_root: Path,
+) -> Sequence[IndexedPayload]:
+    """Store all payloads of this turn with a single write
+
+    The payloads of the piggybacked hosts that were not sent this turn are taken over
+    from the previous blob, keeping their time of last update.
+    """
+    blob_path = _get_source_blob_path(source_hostname, omd_root)
+    with _locked_source_blob(blob_path):
+        try:
+            outdated_payloads = read_blob_payloads(blob_path, lambda h: h not in payloads)
+        except (FileNotFoundError, InvalidBlobError):
+            outdated_payloads = {}
+
+        blob_payloads = {
+            **outdated_payloads,
+            **{
+                piggybacked_hostname: (int(timestamp), payload)
+                for piggybacked_hostname, payload in payloads.items()
+            },
+        }
+        logger.debug("Storing piggyback data for %d hosts in %s", len(payloads), blob_path)
+        _write_file_with_mtime(
+            file_path=blob_path, content=serialize_blob(blob_payloads), mtime=timestamp
+        )
+    return [
+        IndexedPayload(piggybacked_hostname, source_hostname, last_update, in_blob=True)
+        for piggybacked_hostname, (last_update, _payload) in blob_payloads.items()
+    ]
+
+
+@contextlib.contextmanager
+def _locked_source_blob(blob_path: Path) -> Iterator[None]:
+    """Serialize the updates of the blob of a source
+
+    Every update reads the blob and replaces it, it must not lose the changes of a concurrent
+    one. As the blob is replaced, the lock is held on a separate (hidden) file. Readers don't
+    need the lock.
+    """
+    lock_path = blob_path.with_name(f".{blob_path.name}.lock")
+    lock_path.parent.mkdir(mode=0o770, exist_ok=True, parents=True)
+    with lock_path.open("ab") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
 
 def _write_file_with_mtime(
     file_path: Path,
@@ -182,17 +321,22 @@ def _write_file_with_mtime(
 #   '----------------------------------------------------------------------'
 
 
-def _get_payload_meta_data(
-    piggybacked_hostname: HostName, omd_root: Path
-) -> Sequence[PiggybackMetaData]:
-    """Gather a list of piggyback files to read for further processing.
+def _get_payload_locations(
+    piggybacked_hostname: HostName,
+    omd_root: Path,
+    blob_indexes: Mapping[HostAddress, Mapping[HostAddress, BlobEntry]],
+) -> Sequence[_PayloadLocation]:
+    """Gather a list of piggyback files and blob entries to read for further processing.
 
     Please note that there may be multiple parallel calls executing
     store_piggyback_raw_data() or cleanup_piggyback_files() functions.
     All these functions need to deal with suddenly vanishing or updated files/directories.
+
+    A source may have payloads in both storages after switching between them.
+    In this case the most recently updated one wins.
     """
     piggybacked_host_folder = payload_dir(omd_root) / Path(piggybacked_hostname)
-    meta_data = []
+    locations: dict[HostAddress, _PayloadLocation] = {}
     for payload_file in _files_in(piggybacked_host_folder):
         source = HostAddress(payload_file.name)
         status_file_path = _get_source_status_file_path(source, omd_root)
@@ -200,15 +344,49 @@ def _get_payload_meta_data(
         if (mtime := _get_mtime(payload_file)) is None:
             continue
 
-        meta_data.append(
+        locations[source] = _PayloadLocation(
             PiggybackMetaData(
                 source=source,
                 piggybacked=piggybacked_hostname,
                 last_update=mtime,
                 last_contact=_get_mtime(status_file_path),
-            )
+            ),
+            payload_file,
+            in_blob=False,
         )
-    return meta_data
+
+    for source, blob_index in blob_indexes.items():
+        if (entry := blob_index.get(piggybacked_hostname)) is None:
+            continue
+        if (known := locations.get(source)) is not None and (
+            known.meta.last_update > entry.last_update
+        ):
+            continue
+
+        locations[source] = _PayloadLocation(
+            PiggybackMetaData(
+                source=source,
+                piggybacked=piggybacked_hostname,
+                last_update=entry.last_update,
+                last_contact=_get_mtime(_get_source_status_file_path(source, omd_root)),
+            ),
+            _get_source_blob_path(source, omd_root),
+            in_blob=True,
+        )
+
+    return [locations[source] for source in sorted(locations)]
+
+
+def _load_blob_indexes(omd_root: Path) -> Mapping[HostAddress, Mapping[HostAddress, BlobEntry]]:
+    blob_indexes = {}
+    for blob_path in _get_source_blobs(omd_root):
+        try:
+            blob_indexes[HostAddress(blob_path.name)] = load_blob_index(blob_path)
+        except FileNotFoundError:
+            continue
+        except InvalidBlobError as e:
+            logger.warning("Ignoring piggyback data: %s", e)
+    return blob_indexes
 
 
 def _get_piggybacked_host_folders(omd_root: Path) -> Sequence[Path]:
@@ -219,6 +397,10 @@ def _get_source_state_files(omd_root: Path) -> Sequence[Path]:
     return _files_in(source_status_dir(omd_root))
 
 
+def _get_source_blobs(omd_root: Path) -> Sequence[Path]:
+    return _files_in(blob_dir(omd_root))
+
+
 def _files_in(path: Path) -> Sequence[Path]:
     """Return a sorted sequence of files in `path` excluding hidden files.
 
@@ -235,6 +417,10 @@ def _get_source_status_file_path(source_hostname: HostName, omd_root: Path) -> P
     return source_status_dir(omd_root) / str(source_hostname)
 
 
+def _get_source_blob_path(source_hostname: HostName, omd_root: Path) -> Path:
+    return blob_dir(omd_root) / str(source_hostname)
+
+
 def _get_piggybacked_file_path(
     source_hostname: HostName,
     piggybacked_hostname: HostName | HostAddress,
@@ -243,6 +429,111 @@ def _get_piggybacked_file_path(
     return payload_dir(omd_root).joinpath(piggybacked_hostname, source_hostname)
 
 
+# .
+#   .--index---------------------------------------------------------------.
+#   |                       _           _                                  |
+#   |                      (_)_ __   __| | _____  __                       |
+#   |                      | | '_ \ / _` |/ _ \ \/ /                       |
+#   |                      | | | | | (_| |  __/>  <                        |
+#   |                      |_|_| |_|\__,_|\___/_/\_\                       |
+#   |                                                                      |
+#   '----------------------------------------------------------------------'
+
+
+@contextlib.contextmanager
+def _open_index(omd_root: Path) -> Iterator[PiggybackIndex]:
+    with PiggybackIndex.open(index_path(omd_root), lambda: _scan_index_content(omd_root)) as index:
+        yield index
+
+
+def _query_index(
+    omd_root: Path, piggybacked_hostname: HostAddress | None
+) -> Sequence[_PayloadLocation] | None:
+    """Look up the payloads of the piggybacked host (or all payloads) in the index
+
+    Returns None if the index can not be used. The caller has to scan the files in this case.
+    """
+    try:
+        with _open_index(omd_root) as index:
+            indexed = index.payloads_meta_data(piggybacked_hostname)
+    except sqlite3.Error as e:
+        logger.warning("Cannot use the piggyback index, scanning the files instead: %s", e)
+        return None
+
+    return [
+        _PayloadLocation(
+            PiggybackMetaData(
+                source=payload.source,
+                piggybacked=payload.piggybacked,
+                last_update=payload.last_update,
+                last_contact=last_contact,
+            ),
+            (
+                _get_source_blob_path(payload.source, omd_root)
+                if payload.in_blob
+                else _get_piggybacked_file_path(payload.source, payload.piggybacked, omd_root)
+            ),
+            payload.in_blob,
+        )
+        for payload, last_contact in indexed
+    ]
+
+
+def _update_index(omd_root: Path, update: Callable[[PiggybackIndex], None]) -> None:
+    try:
+        with _open_index(omd_root) as index:
+            update(index)
+    except sqlite3.Error as e:
+        # The index must not miss any update. Drop it, it is rebuilt from the files on next use.
+        logger.warning("Failed to update the piggyback index, invalidating it: %s", e)
+        _invalidate_index(omd_root)
+
+
+def _invalidate_index(omd_root: Path) -> None:
+    try:
+        PiggybackIndex.invalidate(index_path(omd_root))
+    except sqlite3.DatabaseError as e:
+        # A locked index is still in use by other processes, it must not be removed. It must
+        # not be left outdated either, so the caller fails in this case.
+        if e.sqlite_errorcode != sqlite3.SQLITE_NOTADB:
+            raise
+        # Only remove the database file, the journal files are owned by SQLite.
+        logger.warning("The piggyback index is not a database, removing it: %s", e)
+        index_path(omd_root).unlink(missing_ok=True)
+
+
+def _scan_index_content(omd_root: Path) -> IndexContent:
+    return IndexContent(
+        payloads=[
+            IndexedPayload(
+                location.meta.piggybacked,
+                location.meta.source,
+                location.meta.last_update,
+                location.in_blob,
+            )
+            for location in _scan_payload_locations(omd_root)
+        ],
+        last_contacts=[
+            (HostAddress(source_state_file.name), mtime)
+            for source_state_file in _get_source_state_files(omd_root)
+            if (mtime := _get_mtime(source_state_file)) is not None
+        ],
+    )
+
+
+def _scan_payload_locations(omd_root: Path) -> Sequence[_PayloadLocation]:
+    blob_indexes = _load_blob_indexes(omd_root)
+    piggybacked_hosts = {
+        HostAddress(piggybacked_host_folder.name)
+        for piggybacked_host_folder in _get_piggybacked_host_folders(omd_root)
+    }.union(*(blob_index for blob_index in blob_indexes.values()))
+    return [
+        location
+        for piggybacked_host in sorted(piggybacked_hosts)
+        for location in _get_payload_locations(piggybacked_host, omd_root, blob_indexes)
+    ]
+
+
 # .
 #   .--clean up------------------------------------------------------------.
 #   |                     _                                                |
@@ -267,6 +558,15 @@ def cleanup_piggyback_files(cut_off_timestamp: float, omd_root: Path) -> None:
         cut_off_timestamp,
     )
 
+    try:
+        with _open_index(omd_root) as index:
+            _cleanup_indexed_files(index, cut_off_timestamp, omd_root)
+            index.remove_outdated(cut_off_timestamp)
+        return
+    except sqlite3.Error as e:
+        logger.warning("Cannot use the piggyback index, scanning the files instead: %s", e)
+        _invalidate_index(omd_root)
+
     piggybacked_hosts_settings = [
         (piggybacked_host_folder, _files_in(piggybacked_host_folder))
         for piggybacked_host_folder in _get_piggybacked_host_folders(omd_root)
@@ -274,6 +574,42 @@ def cleanup_piggyback_files(cut_off_timestamp: float, omd_root: Path) -> None:
 
     _cleanup_old_source_status_files(_get_source_state_files(omd_root), cut_off_timestamp)
     _cleanup_old_piggybacked_files(piggybacked_hosts_settings, cut_off_timestamp)
+    _cleanup_old_source_blobs(_get_source_blobs(omd_root), cut_off_timestamp)
+
+
+def _cleanup_indexed_files(index: PiggybackIndex, cut_off_timestamp: float, omd_root: Path) -> None:
+    """Only visit the files the index considers outdated
+
+    The mtimes are checked again before removing anything, the files may have been updated
+    in the meantime.
+    """
+    outdated_payloads = index.outdated_payloads(cut_off_timestamp)
+
+    piggybacked_files: dict[Path, list[Path]] = {}
+    for payload in outdated_payloads:
+        # Also look for a file if the payload is stored in a blob: It may be a leftover from
+        # before the source switched its storage.
+        piggybacked_file = _get_piggybacked_file_path(payload.source, payload.piggybacked, omd_root)
+        piggybacked_files.setdefault(piggybacked_file.parent, []).append(piggybacked_file)
+
+    _cleanup_old_source_status_files(
+        [
+            _get_source_status_file_path(source, omd_root)
+            for source in index.outdated_sources(cut_off_timestamp)
+        ],
+        cut_off_timestamp,
+    )
+    _cleanup_old_piggybacked_files(piggybacked_files.items(), cut_off_timestamp)
+    _cleanup_old_source_blobs(
+        sorted(
+            {
+                _get_source_blob_path(payload.source, omd_root)
+                for payload in outdated_payloads
+                if payload.in_blob
+            }
+        ),
+        cut_off_timestamp,
+    )
 
 
 def _cleanup_old_source_status_files(
@@ -316,7 +652,7 @@ def _cleanup_old_piggybacked_files(
         try:
             piggybacked_host_folder.rmdir()
         except OSError as e:
-            if e.errno == errno.ENOTEMPTY:
+            if e.errno in (errno.ENOTEMPTY, errno.ENOENT):
                 continue
             raise
         logger.debug(
@@ -325,6 +661,59 @@ def _cleanup_old_piggybacked_files(
         )
 
 
+def _cleanup_old_source_blobs(source_blobs: Sequence[Path], cut_off_timestamp: float) -> None:
+    """Remove the payloads of piggybacked hosts which exceed provided maximum age from the blobs."""
+    for source_blob in source_blobs:
+        if not source_blob.exists():
+            continue
+        with _locked_source_blob(source_blob):
+            _cleanup_old_source_blob(source_blob, cut_off_timestamp)
+
+
+def _cleanup_old_source_blob(source_blob: Path, cut_off_timestamp: float) -> None:
+    try:
+        blob_index = load_blob_index(source_blob)
+    except FileNotFoundError:
+        return
+    except InvalidBlobError:
+        blob_index = {}
+
+    if keep := {
+        piggybacked_hostname
+        for piggybacked_hostname, entry in blob_index.items()
+        if entry.last_update >= cut_off_timestamp
+    }:
+        if len(keep) < len(blob_index):
+            logger.debug("Piggyback blob '%s' contains outdated data. Rewrite it.", source_blob)
+            _rewrite_source_blob(source_blob, keep, {})
+        return
+
+    logger.debug("Piggyback blob '%s' only contains outdated data. Remove it.", source_blob)
+    _remove_piggyback_file(source_blob)
+
+
+def _rewrite_source_blob(
+    source_blob: Path,
+    keep: Container[HostAddress],
+    rename: Mapping[HostAddress, HostAddress],
+) -> None:
+    """Rewrite the blob with the payloads to keep, keeping the time of the last contact
+
+    The caller has to hold the lock of the blob.
+    """
+    if (mtime := _get_mtime(source_blob)) is None:
+        return
+    try:
+        payloads = read_blob_payloads(source_blob, keep.__contains__)
+    except (FileNotFoundError, InvalidBlobError):
+        return
+    _write_file_with_mtime(
+        source_blob,
+        serialize_blob({rename.get(h, h): payload for h, payload in payloads.items()}),
+        mtime,
+    )
+
+
 def _get_mtime(path: Path) -> int | None:
     try:
         # Beware:
@@ -367,7 +756,39 @@ def move_for_host_rename(omd_root: Path, old_host: str, new_host: str) -> tuple[
         old_path.rename(new_path)
         yield "piggyback-pig"
 
-    return tuple(
-        *_rename_piggybacked_dir(old_host, new_host),
-        *_rename_payload_file(piggyback_dir, old_host, new_host),
+    def _rename_in_source_blobs(old_name: str, new_name: str) -> Iterable[str]:
+        old_hostname, new_hostname = HostAddress(old_name), HostAddress(new_name)
+        for source_blob in _get_source_blobs(omd_root):
+            with _locked_source_blob(source_blob):
+                try:
+                    blob_index = load_blob_index(source_blob)
+                except (FileNotFoundError, InvalidBlobError):
+                    continue
+                if old_hostname not in blob_index:
+                    continue
+                _rewrite_source_blob(
+                    source_blob,
+                    set(blob_index) - {new_hostname},
+                    {old_hostname: new_hostname},
+                )
+            yield "piggyback-load"
+
+        if (old_path := _get_source_blob_path(old_hostname, omd_root)).exists():
+            new_path = _get_source_blob_path(new_hostname, omd_root)
+            first_path, second_path = sorted((old_path, new_path))  # lock in a fixed order
+            with _locked_source_blob(first_path), _locked_source_blob(second_path):
+                old_path.rename(new_path)
+            yield "piggyback-pig"
+
+    actions = tuple(
+        dict.fromkeys(
+            (
+                *_rename_piggybacked_dir(old_host, new_host),
+                *_rename_payload_file(piggyback_dir, old_host, new_host),
+                *_rename_in_source_blobs(old_host, new_host),
+            )
+        )
     )
+    if actions:
+        _update_index(omd_root, lambda index: index.rebuild(lambda: _scan_index_content(omd_root)))
+    return actions
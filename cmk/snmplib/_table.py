@@ -5,7 +5,6 @@
 """Provide methods to get an snmp table with or without caching
 """
 
-import contextlib
 import hashlib
 from collections.abc import Callable, MutableMapping, Sequence
 from functools import partial
@@ -21,7 +20,6 @@ from ._typedefs import (
     ensure_str,
     OID,
     SNMPBackend,
-    SNMPContext,
     SNMPContextTimeout,
     SNMPRawValue,
     SNMPRowInfo,
@@ -59,6 +57,22 @@ def get_snmp_table(
     max_len = 0
     max_len_col = -1
 
+    # All columns of the tree are walked at once, backends may fetch them in the same requests
+    walks = iter(
+        _get_snmpwalks(
+            section_name,
+            tree.base,
+            [
+                (f"{tree.base}.{oid.column}", oid.save_to_cache)
+                for oid in tree.oids
+                if not isinstance(oid.column, SpecialColumn)
+            ],
+            walk_cache=walk_cache,
+            backend=backend,
+            log=log,
+        )
+    )
+
     for oid in tree.oids:
         fetchoid: OID = f"{tree.base}.{oid.column}"
         # column may be integer or string like "1.5.4.2.3"
@@ -79,15 +93,7 @@ def get_snmp_table(
             index_column = len(columns)
             index_format = oid.column
         else:
-            rowinfo = get_snmpwalk(
-                section_name,
-                tree.base,
-                fetchoid,
-                walk_cache=walk_cache,
-                save_walk_cache=oid.save_to_cache,
-                backend=backend,
-                log=log,
-            )
+            rowinfo = next(walks)
             if len(rowinfo) > max_len:
                 max_len_col = len(columns)
 
@@ -187,61 +193,102 @@ def get_snmpwalk(
     backend: SNMPBackend,
     log: Callable[[str], None],
 ) -> SNMPRowInfo:
+    return _get_snmpwalks(
+        section_name,
+        base_oid,
+        [(fetchoid, save_walk_cache)],
+        walk_cache=walk_cache,
+        backend=backend,
+        log=log,
+    )[0]
+
+
+def _get_snmpwalks(
+    section_name: SectionName | None,
+    base_oid: str,
+    fetchoids: Sequence[tuple[OID, bool]],
+    *,
+    walk_cache: MutableMapping[tuple[str, str, bool], SNMPRowInfo],
+    backend: SNMPBackend,
+    log: Callable[[str], None],
+) -> list[SNMPRowInfo]:
+    """Walk the OIDs not yet in the walk cache with one call of the backend per context"""
     contexts = backend.config.snmpv3_contexts_of(section_name).contexts
     context_string = "-".join(["no_context" if not c else c for c in contexts])
 
     # contexts are hashed in order not to exceed max pathname length
     context_hash = hashlib.shake_256(context_string.encode("utf-8")).hexdigest(15)
 
-    with contextlib.suppress(KeyError):
-        cache_info = walk_cache[(fetchoid, context_hash, save_walk_cache)]
-        log(f"Already fetched OID: {fetchoid}")
-        return cache_info
+    cache_keys = [
+        (fetchoid, context_hash, save_walk_cache) for fetchoid, save_walk_cache in fetchoids
+    ]
+    rowinfos_by_key: dict[tuple[str, str, bool], SNMPRowInfo] = {}
+    keys_to_walk: list[tuple[str, str, bool]] = []
+    for cache_key in cache_keys:
+        if cache_key in rowinfos_by_key or cache_key in keys_to_walk:
+            continue
+        try:
+            rowinfos_by_key[cache_key] = walk_cache[cache_key]
+            log(f"Already fetched OID: {cache_key[0]}")
+        except KeyError:
+            keys_to_walk.append(cache_key)
 
-    added_oids: set[OID] = set()
-    rowinfo: SNMPRowInfo = []
+    if not keys_to_walk:
+        return [rowinfos_by_key[cache_key] for cache_key in cache_keys]
+
+    added_oids: list[set[OID]] = [set() for _ in keys_to_walk]
+    rowinfos: list[SNMPRowInfo] = [[] for _ in keys_to_walk]
+    # The columns which timed out in at least one context
+    timed_out = [False for _ in keys_to_walk]
 
-    skip: set[SNMPContext] = set()
     context_config = backend.config.snmpv3_contexts_of(section_name)
     for context in context_config.contexts:
-        if context in skip:
-            continue
-
         try:
-            rows = backend.walk(
-                fetchoid,
+            walks: Sequence[SNMPRowInfo | SNMPContextTimeout] = backend.walk_columns(
+                [fetchoid for fetchoid, _context_hash, _save_walk_cache in keys_to_walk],
                 section_name=section_name,
                 table_base_oid=base_oid,
                 context=context,
             )
-        except SNMPContextTimeout:
-            if context_config.timeout_policy == "stop":
-                raise
-
-            log(f"Timeout for SNMP context {context}.  Skipping for now.")
-            skip.add(context)
+        except SNMPContextTimeout as e:
+            walks = [e for _ in keys_to_walk]
+
+        for idx, (rows, rowinfo, added) in enumerate(zip(walks, rowinfos, added_oids)):
+            if isinstance(rows, SNMPContextTimeout):
+                if context_config.timeout_policy == "stop":
+                    raise rows
+
+                log(f"Timeout for SNMP context {context}.  Skipping for now.")
+                timed_out[idx] = True
+                continue
+
+            # I've seen a broken device (Mikrotik Router), that broke after an
+            # update to RouterOS v6.22. It would return 9 time the same OID when
+            # .1.3.6.1.2.1.1.1.0 was being walked. We try to detect these situations
+            # by removing any duplicate OID information
+            if len(rows) > 1 and rows[0][0] == rows[1][0]:
+                log("Detected broken SNMP agent. Ignoring duplicate OID {rows[0][0]}.")
+                rows = rows[:1]
+
+            for row_oid, val in rows:
+                if row_oid in added:
+                    log(f"Duplicate OID found: {row_oid} ({val!r})")
+                else:
+                    rowinfo.append((row_oid, val))
+                    added.add(row_oid)
+
+    # Cache the columns fetched before failing because of a timed out column
+    failed = False
+    for cache_key, rowinfo, column_timed_out in zip(keys_to_walk, rowinfos, timed_out):
+        if column_timed_out and not rowinfo:
+            failed = True
             continue
+        walk_cache[cache_key] = rowinfos_by_key[cache_key] = rowinfo
 
-        # I've seen a broken device (Mikrotik Router), that broke after an
-        # update to RouterOS v6.22. It would return 9 time the same OID when
-        # .1.3.6.1.2.1.1.1.0 was being walked. We try to detect these situations
-        # by removing any duplicate OID information
-        if len(rows) > 1 and rows[0][0] == rows[1][0]:
-            log("Detected broken SNMP agent. Ignoring duplicate OID {rows[0][0]}.")
-            rows = rows[:1]
-
-        for row_oid, val in rows:
-            if row_oid in added_oids:
-                log(f"Duplicate OID found: {row_oid} ({val!r})")
-            else:
-                rowinfo.append((row_oid, val))
-                added_oids.add(row_oid)
-
-    if skip and not rowinfo:
+    if failed:
         raise MKSNMPError("SNMP Error on %s: SNMP query timed out" % backend.config.hostname)
 
-    walk_cache[(fetchoid, context_hash, save_walk_cache)] = rowinfo
-    return rowinfo
+    return [rowinfos_by_key[cache_key] for cache_key in cache_keys]
 
 
 def _decode_column(
@@ -56,6 +56,7 @@ SNMPTiming = dict
 class SNMPBackendEnum(enum.Enum):
     INLINE = "Inline"
     CLASSIC = "Classic"
+    PYTHON = "Python"
     STORED_WALK = "StoredWalk"
 
     def serialize(self) -> str:
@@ -209,6 +210,15 @@ class SNMPBackend(abc.ABC):
         """
         raise NotImplementedError()
 
+    def get_many(
+        self, /, oids: Sequence[OID], *, context: SNMPContext
+    ) -> Sequence[SNMPRawValue | None]:
+        """Fetch several OIDs, the values are in the order of the OIDs
+
+        Backends which can fetch the OIDs with the same requests override this.
+        """
+        return [self.get(oid, context=context) for oid in oids]
+
     @abc.abstractmethod
     def walk(
         self,
@@ -221,6 +231,42 @@ class SNMPBackend(abc.ABC):
     ) -> SNMPRowInfo:
         return []
 
+    def walk_columns(
+        self,
+        /,
+        oids: Sequence[OID],
+        *,
+        context: SNMPContext,
+        section_name: SectionName | None = None,
+        table_base_oid: OID | None = None,
+    ) -> Sequence[SNMPRowInfo | SNMPContextTimeout]:
+        """Walk several OIDs, usually the columns of a table
+
+        A timeout of the context is returned in place of the rows of the column, the other
+        columns are walked anyway. Unless the timeout policy is to stop, then it's raised.
+        Backends which can fetch the columns with the same requests override this.
+        """
+        stop_on_timeout = self.config.snmpv3_contexts_of(section_name).timeout_policy == "stop"
+        walks: list[SNMPRowInfo | SNMPContextTimeout] = []
+        for oid in oids:
+            try:
+                walks.append(
+                    self.walk(
+                        oid,
+                        context=context,
+                        section_name=section_name,
+                        table_base_oid=table_base_oid,
+                    )
+                )
+            except SNMPContextTimeout as e:
+                if stop_on_timeout:
+                    raise
+                walks.append(e)
+        return walks
+
+    def close(self) -> None:
+        """Release the resources held by the backend, e.g. open sockets"""
+
 
 class SpecialColumn(enum.IntEnum):
     # Until we remove all but the first, its worth having an enum
@@ -52,6 +52,27 @@ class Eventconsolestatus(Table):
     )
     """The average incoming message processing time"""
 
+    status_average_queue_drop_rate = Column(
+        'status_average_queue_drop_rate',
+        col_type='float',
+        description='The average receive queue drop rate',
+    )
+    """The average receive queue drop rate"""
+
+    status_average_queue_wait_time = Column(
+        'status_average_queue_wait_time',
+        col_type='float',
+        description='The average time messages wait in the receive queue',
+    )
+    """The average time messages wait in the receive queue"""
+
+    status_average_received_rate = Column(
+        'status_average_received_rate',
+        col_type='float',
+        description='The average receive rate',
+    )
+    """The average receive rate"""
+
     status_average_request_time = Column(
         'status_average_request_time',
         col_type='float',
@@ -206,6 +227,34 @@ class Eventconsolestatus(Table):
     )
     """The number of message overflows, i.e. messages simply dropped due to an overflow of the Event Console"""
 
+    status_queue_drop_rate = Column(
+        'status_queue_drop_rate',
+        col_type='float',
+        description='The receive queue drop rate',
+    )
+    """The receive queue drop rate"""
+
+    status_queue_drops = Column(
+        'status_queue_drops',
+        col_type='int',
+        description='The number of messages dropped due to an overflow of the receive queue',
+    )
+    """The number of messages dropped due to an overflow of the receive queue"""
+
+    status_received = Column(
+        'status_received',
+        col_type='int',
+        description='The number of messages queued for processing since startup of the Event Console',
+    )
+    """The number of messages queued for processing since startup of the Event Console"""
+
+    status_received_rate = Column(
+        'status_received_rate',
+        col_type='float',
+        description='The receive rate',
+    )
+    """The receive rate"""
+
     status_replication_last_sync = Column(
         'status_replication_last_sync',
         col_type='time',
@@ -72,6 +72,7 @@ livebackendsdir = _omd_path_str("share/check_mk/livestatus")
 inventory_output_dir = _omd_path_str("var/check_mk/inventory")
 inventory_archive_dir = _omd_path_str("var/check_mk/inventory_archive")
 inventory_delta_cache_dir = _omd_path_str("var/check_mk/inventory_delta_cache")
+inventory_table_index_dir = _omd_path_str("var/check_mk/inventory_table_index")
 autoinventory_dir = _omd_path_str("var/check_mk/autoinventory")
 status_data_dir = _omd_path_str("tmp/check_mk/status_data")
 base_discovered_host_labels_dir = _omd_path("var/check_mk/discovered_host_labels")
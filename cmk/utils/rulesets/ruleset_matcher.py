@@ -7,6 +7,7 @@
 import contextlib
 import dataclasses
 from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from pathlib import Path
 from re import Pattern
 from typing import (
     Any,
@@ -33,6 +34,8 @@ from cmk.utils.labels import (
 )
 from cmk.utils.parameters import merge_parameters
 from cmk.utils.regex import combine_patterns, regex
+from cmk.utils.rulesets import ruleset_matching_cache
+from cmk.utils.rulesets.ruleset_matching_cache import PersistedRulesetMatches
 from cmk.utils.rulesets.ruleset_matching_stats import (
     HostRulesetMatchingStats,
     persist_matching_stats,
@@ -45,6 +48,7 @@ from .conditions import HostOrServiceConditions, HostOrServiceConditionsSimple
 
 RulesetName = str  # Could move to a less cluttered module as it is often used on its own.
 TRuleValue = TypeVar("TRuleValue")
+_T = TypeVar("_T")
 
 # The Tag* types below are *not* used in `cmk.utils.tags`
 # but they are used here.  Therefore, they do *not* belong
@@ -164,6 +168,64 @@ class RulesetMatchObject:
     service_labels: Labels | None = None
 
 
+class CompiledServiceRuleset(Generic[TRuleValue]):
+    """The rules of a service ruleset that apply to a single host
+
+    The rules are filtered by host once, identical service description conditions
+    are evaluated only once per service and all (non negated) conditions are
+    combined into a single regex, which rejects the services not matched by any
+    rule in a single pass.
+    """
+
+    __slots__ = ("_rules", "_conditions", "_any_condition")
+
+    def __init__(
+        self,
+        rules: Iterable[tuple[TRuleValue, LabelGroups, PreprocessedPattern]],
+    ) -> None:
+        condition_indexes: dict[PreprocessedPattern, int] = {}
+        self._rules: Sequence[tuple[TRuleValue, LabelGroups, int]] = [
+            (
+                value,
+                label_groups,
+                condition_indexes.setdefault(condition, len(condition_indexes)),
+            )
+            for value, label_groups, condition in rules
+        ]
+        self._conditions: Sequence[PreprocessedPattern] = list(condition_indexes)
+        self._any_condition: Pattern[str] | None = (
+            None
+            if not self._conditions or any(negate for negate, _pattern in self._conditions)
+            else regex(combine_patterns([pattern.pattern for _negate, pattern in self._conditions]))
+        )
+
+    def matching_values(self, match_object: RulesetMatchObject) -> Iterator[TRuleValue]:
+        if (service_description := match_object.service_description) is None or not self._rules:
+            return
+
+        if (
+            self._any_condition is not None
+            and self._any_condition.match(service_description) is None
+        ):
+            return
+
+        condition_matches: list[bool | None] = [None] * len(self._conditions)
+        for value, label_groups, condition_index in self._rules:
+            if (condition_match := condition_matches[condition_index]) is None:
+                negate, pattern = self._conditions[condition_index]
+                condition_match = condition_matches[condition_index] = (
+                    pattern.match(service_description) is None
+                ) is negate
+
+            if not condition_match:
+                continue
+
+            if label_groups and not matches_labels(match_object.service_labels, label_groups):
+                continue
+
+            yield value
+
+
 def merge_cluster_labels(all_node_labels: Iterable[Iterable[HostLabel]]) -> Sequence[HostLabel]:
     """A cluster has all its nodes labels. Last node wins."""
     return list({l.name: l for node_labels in all_node_labels for l in node_labels}.values())
@@ -186,6 +248,7 @@ class RulesetMatcher:
         clusters_of: Mapping[HostName, Sequence[HostName]],
         nodes_of: Mapping[HostName, Sequence[HostName]],
         debug_matching_stats: bool = False,
+        match_cache_path: Path | None = None,
     ) -> None:
         super().__init__()
 
@@ -198,12 +261,14 @@ class RulesetMatcher:
             clusters_of,
             nodes_of,
             debug_matching_stats,
+            match_cache_path,
         )
         self.labels_of_host = self.ruleset_optimizer.labels_of_host
         self.labels_of_service = self.ruleset_optimizer.labels_of_service
         self.label_sources_of_host = self.ruleset_optimizer.label_sources_of_host
         self.label_sources_of_service = self.ruleset_optimizer.label_sources_of_service
         self.clear_caches = self.ruleset_optimizer.clear_caches
+        self.save_persisted_matches = self.ruleset_optimizer.save_persisted_matches
 
         self._service_match_cache: dict[
             tuple[
@@ -386,14 +451,18 @@ class RulesetMatcher:
         with_foreign_hosts = (
             match_object.host_name not in self.ruleset_optimizer.all_processed_hosts()
         )
-        optimized_ruleset = self.ruleset_optimizer.get_service_ruleset(ruleset, with_foreign_hosts)
-
         ruleset_id = id(ruleset)
-        if self._debug_matching_stats:
-            self.ruleset_optimizer.matching_stats[ruleset_id].track_unnecessarily_computed_hosts(
-                match_object.host_name
-            )
+        if not self._debug_matching_stats:
+            yield from self.ruleset_optimizer.get_compiled_service_ruleset(
+                ruleset, with_foreign_hosts, match_object.host_name
+            ).matching_values(match_object)
+            return
+
+        self.ruleset_optimizer.matching_stats[ruleset_id].track_unnecessarily_computed_hosts(
+            match_object.host_name
+        )
 
+        optimized_ruleset = self.ruleset_optimizer.get_service_ruleset(ruleset, with_foreign_hosts)
         never_matched = True
         for (
             _rule_id,
@@ -431,14 +500,13 @@ class RulesetMatcher:
                 self._service_match_cache[service_cache_id] = match
 
             if match:
-                if self._debug_matching_stats:
-                    self._track_service_ruleset_match(
-                        match_object, never_matched, _rule_id, ruleset_id, service_cache_id
-                    )
-                    never_matched = False
+                self._track_service_ruleset_match(
+                    match_object, never_matched, _rule_id, ruleset_id, service_cache_id
+                )
+                never_matched = False
                 yield value
 
-        if self._debug_matching_stats and never_matched:
+        if never_matched:
             self._track_service_ruleset_miss(match_object, never_matched, ruleset_id)
 
     def _track_service_ruleset_match(
@@ -505,6 +573,7 @@ class RulesetOptimizer:
         clusters_of: Mapping[HostName, Sequence[HostName]],
         nodes_of: Mapping[HostName, Sequence[HostName]],
         debug_matching_stats: bool = False,
+        match_cache_path: Path | None = None,
     ) -> None:
         super().__init__()
         self.__labels_of_host: dict[HostName, Labels] = {}
@@ -529,6 +598,11 @@ class RulesetOptimizer:
 
         self.__service_ruleset_cache: dict[tuple[int, bool], PreprocessedServiceRuleset] = {}
         self.__host_ruleset_cache: dict[tuple[int, bool], Mapping[HostAddress, Sequence[Any]]] = {}
+        # Only the most recently requested host is kept per ruleset: The services are
+        # usually processed host by host and this keeps the memory usage bounded.
+        self.__compiled_service_ruleset_cache: dict[
+            tuple[int, bool], tuple[HostName | HostAddress, CompiledServiceRuleset[Any]]
+        ] = {}
         self._all_matching_hosts_match_cache: dict[tuple[ConditionCacheID, bool], set[HostName]] = (
             {}
         )
@@ -541,18 +615,28 @@ class RulesetOptimizer:
         # Reference hostname -> tag group reference
         self._host_grouped_ref: dict[HostName, tuple[tuple[TagGroupID, TagID], ...]] = {}
 
+        # Inverted label index: (label key, label value) -> hosts having this label.
+        # It is filled lazily, only hosts that were already looked at are indexed.
+        self._hosts_by_label: dict[tuple[str, str], set[HostName]] = {}
+        self._label_indexed_hosts: set[HostName] = set()
+
         # TODO: Clean this one up?
         self._initialize_host_lookup()
 
+        self._match_cache_path = match_cache_path
+        self._persisted_matches: PersistedRulesetMatches | None = None
+
         self._debug_matching_stats = debug_matching_stats
         self.matching_stats: dict[int, HostRulesetMatchingStats | ServiceRulesetMatchingStats] = {}
 
     def clear_ruleset_caches(self) -> None:
         self.__host_ruleset_cache.clear()
         self.__service_ruleset_cache.clear()
+        self.__compiled_service_ruleset_cache.clear()
 
     def clear_caches(self) -> None:
         self.__host_ruleset_cache.clear()
+        self.__compiled_service_ruleset_cache.clear()
         self._all_matching_hosts_match_cache.clear()
 
     def all_processed_hosts(self) -> Sequence[HostName]:
@@ -711,6 +795,33 @@ class RulesetOptimizer:
 
         return self.__service_ruleset_cache.setdefault(cache_id, _impl(ruleset, with_foreign_hosts))
 
+    def get_compiled_service_ruleset(
+        self,
+        ruleset: Sequence[RuleSpec[TRuleValue]],
+        with_foreign_hosts: bool,
+        hostname: HostName | HostAddress,
+    ) -> CompiledServiceRuleset[TRuleValue]:
+        cache_id = id(ruleset), with_foreign_hosts
+        with contextlib.suppress(KeyError):
+            cached_hostname, compiled_ruleset = self.__compiled_service_ruleset_cache[cache_id]
+            if cached_hostname == hostname:
+                return compiled_ruleset
+
+        compiled_ruleset = CompiledServiceRuleset(
+            (value, service_label_groups, service_description_condition)
+            for (
+                _rule_id,
+                value,
+                hosts,
+                service_label_groups,
+                _service_label_groups_cache_id,
+                service_description_condition,
+            ) in self.get_service_ruleset(ruleset, with_foreign_hosts)
+            if hostname in hosts
+        )
+        self.__compiled_service_ruleset_cache[cache_id] = hostname, compiled_ruleset
+        return compiled_ruleset
+
     @staticmethod
     def _convert_pattern_list(patterns: HostOrServiceConditions | None) -> PreprocessedPattern:
         """Compiles a list of service match patterns to a to a single regex
@@ -745,16 +856,11 @@ class RulesetOptimizer:
             with_foreign_hosts,
         )
 
-    def _all_matching_hosts(  # pylint: disable=too-many-branches
+    def _all_matching_hosts(
         self, condition: RuleConditionsSpec, with_foreign_hosts: bool
     ) -> set[HostName]:
         """Returns a set containing the names of hosts that match the given
         tags and hostlist conditions."""
-        hostlist = condition.get("host_name")
-        tag_conditions: Mapping[TagGroupID, TagCondition] = condition.get("host_tags", {})
-        label_groups: LabelGroups = condition.get("host_label_groups", [])
-        rule_path = condition.get("host_folder", "/")
-
         cache_id = self._get_cache_id(condition, with_foreign_hosts)
         try:
             return self._all_matching_hosts_match_cache[cache_id]
@@ -763,15 +869,121 @@ class RulesetOptimizer:
 
         # Thin out the valid hosts further. If the rule is located in a folder
         # we only need the intersection of the folders hosts and the previously determined valid_hosts
-        valid_hosts = self._get_hosts_within_folder(rule_path, with_foreign_hosts)
+        valid_hosts = self._get_hosts_within_folder(
+            condition.get("host_folder", "/"), with_foreign_hosts
+        )
+
+        if (persisted_matches := self._get_persisted_matches()) is None:
+            matching = self._match_hosts(condition, valid_hosts)
+        else:
+            matching = self._match_hosts_persisted(
+                persisted_matches, cache_id[0], condition, valid_hosts, with_foreign_hosts
+            )
+
+        self._all_matching_hosts_match_cache[cache_id] = matching
+        return matching
 
-        if tag_conditions and hostlist is None and not label_groups:
-            # TODO: Labels could also be optimized like the tags
-            matched_by_tags = self._match_hosts_by_tags(cache_id, valid_hosts, tag_conditions)
-            if matched_by_tags is not None:
-                return matched_by_tags
+    def _match_hosts_persisted(
+        self,
+        persisted_matches: PersistedRulesetMatches,
+        condition_cache_id: ConditionCacheID,
+        condition: RuleConditionsSpec,
+        valid_hosts: set[HostName],
+        with_foreign_hosts: bool,
+    ) -> set[HostName]:
+        """Only match the hosts that changed since the matches have been persisted"""
+        condition_id = ruleset_matching_cache.fingerprint(condition_cache_id)
+        # The persisted matches are only valid for the complete set of configured hosts
+        matched_all_hosts = with_foreign_hosts or len(self._all_processed_hosts) == len(
+            self._all_configured_hosts
+        )
 
-        matching: set[HostName] = set()
+        if (persisted := persisted_matches.get(condition_id)) is None:
+            matching = self._match_hosts(condition, valid_hosts)
+        else:
+            known_matching, unknown_hosts = persisted
+            matching = known_matching & valid_hosts
+            if changed_hosts := valid_hosts.intersection(unknown_hosts):
+                matching |= self._match_hosts(condition, changed_hosts)
+
+        if matched_all_hosts and (persisted is None or persisted[1]):
+            persisted_matches.update(condition_id, matching)
+
+        return matching
+
+    def _get_persisted_matches(self) -> PersistedRulesetMatches | None:
+        if self._match_cache_path is None:
+            return None
+
+        if self._persisted_matches is None:
+            self._persisted_matches = PersistedRulesetMatches.load(
+                self._match_cache_path,
+                generation=ruleset_matching_cache.fingerprint(
+                    (self._label_manager.host_label_rules, self._builtin_labels_of_host())
+                ),
+                host_fingerprints={
+                    hostname: self._host_fingerprint(hostname)
+                    for hostname in self._all_configured_hosts
+                },
+            )
+        return self._persisted_matches
+
+    def _host_fingerprint(self, hostname: HostName) -> str:
+        """Covers all attributes of a host which are relevant for the rule matching
+
+        The labels from the "Host labels" ruleset are not included: They only depend on
+        the rules (see the generation of the persisted matches) and on the attributes below.
+        The discovered labels are covered by the modification time of their files, which
+        is much cheaper than reading them.
+        """
+        return ruleset_matching_cache.fingerprint(
+            (
+                sorted(self._host_tags[hostname]),
+                self._host_paths.get(hostname, "/"),
+                sorted(self._label_manager.explicit_host_labels.get(hostname, {}).items()),
+                [
+                    _file_stamp(DiscoveredHostLabelsStore(node).file_path)
+                    for node in self._nodes_of.get(hostname, [hostname])
+                ],
+            )
+        )
+
+    def save_persisted_matches(self) -> None:
+        if self._persisted_matches is not None:
+            self._persisted_matches.save()
+
+    def _match_hosts(  # pylint: disable=too-many-branches
+        self, condition: RuleConditionsSpec, valid_hosts: set[HostName]
+    ) -> set[HostName]:
+        """Returns the hosts out of valid_hosts matching the host name, tag and label
+        conditions. The folder condition has to be applied by the caller."""
+        hostlist = condition.get("host_name")
+        tag_conditions: Mapping[TagGroupID, TagCondition] = condition.get("host_tags", {})
+        label_groups: LabelGroups = condition.get("host_label_groups", [])
+
+        if hostlist is None and (tag_conditions or label_groups):
+            # Tag and label conditions only: Both can be answered by the precomputed indexes
+            matching = valid_hosts
+            if tag_conditions:
+                matched_by_tags = self._match_hosts_by_tags(matching, tag_conditions)
+                matching = (
+                    {
+                        hostname
+                        for hostname in matching
+                        if matches_host_tags(self._host_tags[hostname], tag_conditions)
+                    }
+                    if matched_by_tags is None
+                    else matched_by_tags
+                )
+
+            # The labels of a host have to be loaded for the label index, so only the hosts
+            # matching the tag conditions are indexed
+            if label_groups:
+                matching = self._match_hosts_by_labels(matching, label_groups)
+
+            return matching
+
+        matching = set()
         only_specific_hosts = (
             hostlist is not None
             and not isinstance(hostlist, dict)
@@ -807,17 +1019,16 @@ class RulesetOptimizer:
                 ):
                     continue
 
-                if label_groups:
-                    host_labels = self.labels_of_host(hostname)
-                    if not matches_labels(host_labels, label_groups):
-                        continue
-
                 if not matches_host_name(hostlist, hostname):
                     continue
 
                 matching.add(hostname)
 
-        self._all_matching_hosts_match_cache[cache_id] = matching
+            # The labels of a host have to be loaded for the label index, so only the hosts
+            # matching all other conditions are indexed
+            if label_groups:
+                matching = self._match_hosts_by_labels(matching, label_groups)
+
         return matching
 
     @staticmethod
@@ -858,7 +1069,6 @@ class RulesetOptimizer:
     # (positive, negative, ...). Make it work with the new tag group based "$or" handling.
     def _match_hosts_by_tags(
         self,
-        cache_id: tuple[ConditionCacheID, bool],
         valid_hosts: set[HostName],
         tag_conditions: Mapping[TagGroupID, TagCondition],
     ) -> set[HostName] | None:
@@ -896,7 +1106,6 @@ class RulesetOptimizer:
                 ] and not negative_match_tags.intersection(self._host_tags[hostname]):
                     matching.add(hostname)
 
-            self._all_matching_hosts_match_cache[cache_id] = matching
             return matching
 
         # With shared folders
@@ -913,9 +1122,29 @@ class RulesetOptimizer:
             ] and not negative_match_tags.intersection(self._host_tags[hostname]):
                 matching.update(hosts_with_same_tag)
 
-        self._all_matching_hosts_match_cache[cache_id] = matching
         return matching
 
+    def _match_hosts_by_labels(
+        self,
+        valid_hosts: set[HostName],
+        label_groups: LabelGroups,
+    ) -> set[HostName]:
+        """Evaluate the label groups with set operations on the inverted label index
+
+        This is equivalent to calling matches_labels() for every host in valid_hosts,
+        but the work per rule no longer depends on the number of hosts.
+        """
+        self._index_labels_of_hosts(valid_hosts)
+        return matching_objects_by_labels(valid_hosts, self._hosts_by_label, label_groups)
+
+    def _index_labels_of_hosts(self, hostnames: Iterable[HostName]) -> None:
+        for hostname in hostnames:
+            if hostname in self._label_indexed_hosts:
+                continue
+            for label in self.labels_of_host(hostname).items():
+                self._hosts_by_label.setdefault(label, set()).add(hostname)
+            self._label_indexed_hosts.add(hostname)
+
     def _filter_hosts_with_same_tags_as_host(
         self,
         hostname: HostName,
@@ -1160,6 +1389,14 @@ def matches_labels(object_labels: Labels | None, required_label_groups: LabelGro
     return overall_match
 
 
+def _file_stamp(path: Path) -> tuple[int, int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
 def _and_or_not_group_match(
     given_group_match: bool, new_single_match: bool, operator: AndOrNotLiteral
 ) -> bool:
@@ -1172,6 +1409,53 @@ def _and_or_not_group_match(
             return given_group_match and not new_single_match
 
 
+def matching_objects_by_labels(
+    objects: set[_T],
+    objects_by_label: Mapping[tuple[str, str], set[_T]],
+    required_label_groups: LabelGroups,
+) -> set[_T]:
+    """Set based implementation of matches_labels() for many objects at once
+
+    Returns the objects whose labels match, objects_by_label maps each label (key and value)
+    to the objects having it.
+
+    >>> sorted(
+    ...     matching_objects_by_labels(
+    ...         {"a", "b", "c"},
+    ...         {("os", "linux"): {"a", "b"}, ("env", "prod"): {"b", "x"}},
+    ...         [("and", [("and", "os:linux"), ("not", "env:prod")])],
+    ...     )
+    ... )
+    ['a']
+    """
+    overall_match = objects
+    for group_operator, label_group in required_label_groups:
+        group_match = objects
+        for label_operator, label in label_group:
+            if not label:
+                continue
+
+            key, value = label.split(":")
+            label_match = objects_by_label.get((key, value), set()) & objects
+            group_match = _and_or_not_set_match(group_match, label_match, label_operator)
+
+        overall_match = _and_or_not_set_match(overall_match, group_match, group_operator)
+
+    return overall_match
+
+
+def _and_or_not_set_match(
+    given_group_match: set[_T], new_single_match: set[_T], operator: AndOrNotLiteral
+) -> set[_T]:
+    match operator:
+        case "and":
+            return given_group_match & new_single_match
+        case "or":
+            return given_group_match | new_single_match
+        case "not":
+            return given_group_match - new_single_match
+
+
 def matches_service_conditions(
     service_description_condition: tuple[bool, Pattern[str]],
     service_labels_condition: LabelGroups,
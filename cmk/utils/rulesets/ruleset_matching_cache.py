@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# Copyright (C) 2019 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+"""Persists the hosts matching the rule conditions between Checkmk invocations
+
+The matching hosts of a rule condition only change when the condition itself or
+the matching relevant attributes of a host (tags, labels, folder) change. Each
+condition is identified by a hash of its cache id, each host by a fingerprint of
+its attributes. When loading the cache, all hosts with a changed fingerprint are
+treated as unknown and have to be matched again, all other matches are reused.
+A condition keeps its unknown hosts until it is matched again.
+"""
+
+import hashlib
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Final
+
+from cmk.utils.hostaddress import HostName
+
+from cmk.ccc import store
+
+_FORMAT_VERSION: Final = 2
+
+
+def fingerprint(data: object) -> str:
+    return hashlib.sha256(repr(data).encode("utf-8")).hexdigest()
+
+
+class PersistedRulesetMatches:
+    def __init__(
+        self,
+        path: Path,
+        generation: str,
+        host_fingerprints: Mapping[HostName, str],
+        matching_hosts: Mapping[str, set[HostName]],
+        unknown_hosts: Mapping[str, frozenset[HostName]],
+        changed_hosts: Iterable[HostName],
+    ) -> None:
+        self._path: Final = path
+        self._generation: Final = generation
+        self._host_fingerprints: Final = host_fingerprints
+        self._matching_hosts = dict(matching_hosts)
+        self.changed_hosts: Final = frozenset(changed_hosts)
+        # Per condition: The hosts which have to be matched again, all others are known
+        self._unknown_hosts = dict(unknown_hosts)
+        self._updated_conditions: set[str] = set()
+
+    @classmethod
+    def load(
+        cls, path: Path, generation: str, host_fingerprints: Mapping[HostName, str]
+    ) -> "PersistedRulesetMatches":
+        """Load the persisted matches, computing the hosts which need to be matched again
+
+        Everything is invalidated if the global inputs of the matching (described by the
+        generation) changed since the cache was written.
+        """
+        raw = store.load_object_from_pickle_file(path, default={})
+        if raw.get("version") != _FORMAT_VERSION or raw.get("generation") != generation:
+            return cls(path, generation, host_fingerprints, {}, {}, host_fingerprints)
+
+        persisted_fingerprints: Mapping[HostName, str] = raw["hosts"]
+        changed_hosts = frozenset(
+            host_name
+            for host_name, host_fingerprint in host_fingerprints.items()
+            if persisted_fingerprints.get(host_name) != host_fingerprint
+        )
+        # The conditions not matched again by the last invocation share their unknown hosts
+        unknown_hosts_by_id: dict[int, frozenset[HostName]] = {}
+        return cls(
+            path,
+            generation,
+            host_fingerprints,
+            raw["conditions"],
+            {
+                condition_id: (
+                    changed_hosts
+                    if (persisted_unknown := raw["unknown_hosts"].get(condition_id)) is None
+                    else unknown_hosts_by_id.setdefault(
+                        id(persisted_unknown), persisted_unknown | changed_hosts
+                    )
+                )
+                for condition_id in raw["conditions"]
+            },
+            changed_hosts,
+        )
+
+    def save(self) -> None:
+        if not self.changed_hosts and not self._updated_conditions:
+            return
+
+        # The conditions which have not been matched again against their unknown hosts
+        # keep them for a later invocation
+        store.save_object_to_pickle_file(
+            self._path,
+            {
+                "version": _FORMAT_VERSION,
+                "generation": self._generation,
+                "hosts": self._host_fingerprints,
+                "conditions": self._matching_hosts,
+                "unknown_hosts": {
+                    condition_id: unknown_hosts
+                    for condition_id, unknown_hosts in self._unknown_hosts.items()
+                    if unknown_hosts
+                },
+            },
+        )
+
+    def get(self, condition_id: str) -> tuple[set[HostName], frozenset[HostName]] | None:
+        """Returns the persisted matching hosts and the hosts which have to be matched again"""
+        if (hosts := self._matching_hosts.get(condition_id)) is None:
+            return None
+        unknown_hosts = self._unknown_hosts.get(condition_id, frozenset())
+        return hosts - unknown_hosts, unknown_hosts
+
+    def update(self, condition_id: str, hosts: set[HostName]) -> None:
+        """Set the matching hosts of a condition, matched against all configured hosts"""
+        self._matching_hosts[condition_id] = hosts
+        self._unknown_hosts.pop(condition_id, None)
+        self._updated_conditions.add(condition_id)
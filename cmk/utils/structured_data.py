@@ -9,14 +9,20 @@ structured monitoring data of Check_MK.
 
 from __future__ import annotations
 
+import ast
 import gzip
 import io
+import marshal
+import os
 import pprint
+import struct
 from collections import Counter
-from collections.abc import Callable, Iterable, Mapping, Sequence
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from contextlib import suppress
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Generic, Literal, NamedTuple, NewType, Self, TypedDict, TypeVar
+from typing import Any, Generic, Literal, NamedTuple, NewType, Self, TypedDict, TypeVar
+from urllib.parse import quote
 
 from cmk.utils.hostaddress import HostName
 
@@ -38,8 +44,10 @@ from cmk.ccc import store
 #   - 'all' -> _use_all
 # TODO Centralize different stores and loaders of tree files:
 #   - inventory/HOSTNAME, inventory/HOSTNAME.gz, inventory/.last
-#   - inventory_archive/HOSTNAME/TIMESTAMP,
+#   - inventory_archive/HOSTNAME/TIMESTAMP (full tree or patch, see TreeOrArchiveStore),
 #   - inventory_delta_cache/HOSTNAME/TIMESTAMP_{TIMESTAMP,None}
+#   - inventory_table_index/PATH, inventory_table_index/.hosts,
+#     inventory_table_index/.pending/HOSTNAME
 #   - status_data/HOSTNAME, status_data/HOSTNAME.gz
 
 SDNodeName = NewType("SDNodeName", str)
@@ -361,6 +369,9 @@ class _FilterTree:
             else row
         )
 
+    def filter_node_name(self, node_name: SDNodeName) -> bool:
+        return _consolidate_filter_funcs(self._filter_choices_nodes)(node_name)
+
     def filter_node_names(self, node_names: set[SDNodeName]) -> set[SDNodeName]:
         filter_nodes = _consolidate_filter_funcs(self._filter_choices_nodes)
         return {n for n in node_names if filter_nodes(n)}.union(self.filters_by_name)
@@ -1629,19 +1640,612 @@ class ImmutableDeltaTree:
 #   '----------------------------------------------------------------------'
 
 
-def load_tree(filepath: Path) -> ImmutableTree:
-    if raw_tree := store.load_object_from_file(filepath, default=None):
-        return ImmutableTree.deserialize(raw_tree)
-    return ImmutableTree()
+# Every n-th archived tree is kept as a full tree, the others are stored as patches
+_ARCHIVE_BASE_INTERVAL = 10
+_ARCHIVE_FORMAT = 1
+
+
+class _SDRawTablePatch(TypedDict, total=False):
+    KeyColumns: Sequence[SDKey]
+    Retentions: Mapping[
+        SDRowIdent, Mapping[SDKey, tuple[int, int, int, Literal["previous", "current"]]]
+    ]
+    RemovedRows: Sequence[Mapping[SDKey, SDValue]]
+    AddedRows: Sequence[Mapping[SDKey, SDValue]]
+
+
+class _SDRawTreePatch(TypedDict, total=False):
+    Attributes: SDRawAttributes
+    Table: _SDRawTablePatch
+    Nodes: Mapping[SDNodeName, _SDRawTreePatch]
+    AddedNodes: Mapping[SDNodeName, SDRawTree]
+    RemovedNodes: Sequence[SDNodeName]
+
+
+class _SDRawArchiveEntry(TypedDict, total=False):
+    ArchiveFormat: int
+    # Either the full tree or the patch turning the tree of 'PatchBase' into this tree
+    Tree: SDRawTree
+    Patch: _SDRawTreePatch
+    PatchBase: int
+    # The difference to the archived tree of 'DeltaFrom', 'None' is the empty tree
+    DeltaTree: SDRawDeltaTree
+    DeltaFrom: int | None
+
+
+def _make_row_key(row: Mapping[SDKey, SDValue]) -> tuple[tuple[SDKey, SDValue], ...]:
+    return tuple(sorted(row.items()))
+
+
+def _make_raw_table_patch(from_table: SDRawTable, to_table: SDRawTable) -> _SDRawTablePatch:
+    patch: _SDRawTablePatch = {}
+    if "KeyColumns" in to_table:
+        patch["KeyColumns"] = to_table["KeyColumns"]
+    if "Retentions" in to_table:
+        patch["Retentions"] = to_table["Retentions"]
+
+    from_rows = Counter(_make_row_key(row) for row in from_table.get("Rows", []))
+    to_rows = Counter(_make_row_key(row) for row in to_table.get("Rows", []))
+    if removed_rows := from_rows - to_rows:
+        patch["RemovedRows"] = [dict(row_key) for row_key in removed_rows.elements()]
+    if added_rows := to_rows - from_rows:
+        patch["AddedRows"] = [
+            row for row in to_table.get("Rows", []) if _take_row(added_rows, _make_row_key(row))
+        ]
+    return patch
+
+
+def _take_row(
+    rows: Counter[tuple[tuple[SDKey, SDValue], ...]], row_key: tuple[tuple[SDKey, SDValue], ...]
+) -> bool:
+    if rows[row_key] <= 0:
+        return False
+    rows[row_key] -= 1
+    return True
+
+
+def _apply_raw_table_patch(table: SDRawTable, patch: _SDRawTablePatch) -> SDRawTable:
+    removed_rows = Counter(_make_row_key(row) for row in patch.get("RemovedRows", []))
+    rows = [row for row in table.get("Rows", []) if not _take_row(removed_rows, _make_row_key(row))]
+    rows.extend(patch.get("AddedRows", []))
+
+    patched_table: SDRawTable = {}
+    if "KeyColumns" in patch:
+        patched_table["KeyColumns"] = patch["KeyColumns"]
+    if rows:
+        patched_table["Rows"] = rows
+    if "Retentions" in patch:
+        patched_table["Retentions"] = patch["Retentions"]
+    return patched_table
+
+
+def _make_raw_tree_patch(from_tree: SDRawTree, to_tree: SDRawTree) -> _SDRawTreePatch:
+    patch: _SDRawTreePatch = {}
+    if from_tree["Attributes"] != to_tree["Attributes"]:
+        patch["Attributes"] = to_tree["Attributes"]
+    if from_tree["Table"] != to_tree["Table"]:
+        patch["Table"] = _make_raw_table_patch(from_tree["Table"], to_tree["Table"])
+
+    compared_node_names = _DictKeys.compare(
+        left=set(from_tree["Nodes"]),
+        right=set(to_tree["Nodes"]),
+    )
+    if node_patches := {
+        name: _make_raw_tree_patch(from_tree["Nodes"][name], to_tree["Nodes"][name])
+        for name in compared_node_names.both
+        if from_tree["Nodes"][name] != to_tree["Nodes"][name]
+    }:
+        patch["Nodes"] = node_patches
+    if compared_node_names.only_new:
+        patch["AddedNodes"] = {
+            name: to_tree["Nodes"][name] for name in compared_node_names.only_new
+        }
+    if compared_node_names.only_old:
+        patch["RemovedNodes"] = sorted(compared_node_names.only_old)
+    return patch
+
+
+def _apply_raw_tree_patch(tree: SDRawTree, patch: _SDRawTreePatch) -> SDRawTree:
+    removed_node_names = set(patch.get("RemovedNodes", []))
+    node_patches = patch.get("Nodes", {})
+    nodes = {
+        name: _apply_raw_tree_patch(node, node_patches[name]) if name in node_patches else node
+        for name, node in tree["Nodes"].items()
+        if name not in removed_node_names
+    }
+    nodes.update(patch.get("AddedNodes", {}))
+    return {
+        "Attributes": patch.get("Attributes", tree["Attributes"]),
+        "Table": (
+            _apply_raw_table_patch(tree["Table"], patch["Table"])
+            if "Table" in patch
+            else tree["Table"]
+        ),
+        "Nodes": nodes,
+    }
+
+
+# Binary format of the stored trees. The tree file itself is the raw tree as Python literal
+# because Livestatus serves it as is (column 'mk_inventory'), the binary copy is stored next
+# to it:
+#   MAGIC | node
+#   node := blob(attributes) | blob(table) | number of nodes | (blob(name) | blob(node))*
+#   blob := length | data
+# The raw attributes and the raw table are marshalled, Python literals are the fallback. The
+# length prefix of the nodes allows to skip the subtrees which are not needed without
+# decoding them.
+_TREE_MAGIC = b"CMKSDTREE\x01"
+_TREE_LENGTH = struct.Struct("<Q")
+_TREE_MARSHAL_VERSION = 4
+
+
+def _encode_raw_value(raw: SDRawAttributes | SDRawTable) -> bytes:
+    try:
+        return b"M" + marshal.dumps(dict(raw), _TREE_MARSHAL_VERSION)
+    except ValueError:
+        # Subclasses of builtin types, eg. of str, are not marshallable
+        return b"L" + repr(raw).encode("utf-8")
+
+
+def _encode_blob(data: bytes) -> bytes:
+    return _TREE_LENGTH.pack(len(data)) + data
+
+
+def _encode_raw_tree(raw_tree: SDRawTree) -> bytes:
+    chunks = [
+        _encode_blob(_encode_raw_value(raw_tree["Attributes"])),
+        _encode_blob(_encode_raw_value(raw_tree["Table"])),
+        _TREE_LENGTH.pack(len(raw_tree["Nodes"])),
+    ]
+    for name, raw_node in raw_tree["Nodes"].items():
+        chunks.append(_encode_blob(name.encode("utf-8")))
+        chunks.append(_encode_blob(_encode_raw_tree(raw_node)))
+    return b"".join(chunks)
+
+
+def _encode_tree(raw_tree: SDRawTree) -> bytes:
+    return _TREE_MAGIC + _encode_raw_tree(raw_tree)
+
+
+class _TreeDecoder:
+    def __init__(self, data: bytes) -> None:
+        self._data = memoryview(data)
+        self._offset = len(_TREE_MAGIC)
+
+    def _decode_length(self) -> int:
+        if self._offset + _TREE_LENGTH.size > len(self._data):
+            raise ValueError("Truncated tree")
+        (length,) = _TREE_LENGTH.unpack_from(self._data, self._offset)
+        self._offset += _TREE_LENGTH.size
+        return length
+
+    def _decode_blob(self) -> memoryview:
+        length = self._decode_length()
+        if (end := self._offset + length) > len(self._data):
+            raise ValueError("Truncated tree")
+        blob = self._data[self._offset : end]
+        self._offset = end
+        return blob
+
+    def _decode_raw_value(self) -> Any:
+        blob = self._decode_blob()
+        if blob[0] == ord("M"):
+            return marshal.loads(blob[1:])
+        return ast.literal_eval(str(blob[1:], "utf-8"))
+
+    def decode_tree(self, path: SDPath, filter_tree: _FilterTree | None) -> ImmutableTree:
+        """Decode the next node, skip its subtrees which are not covered by the filter tree"""
+        attributes = ImmutableAttributes.deserialize(self._decode_raw_value())
+        table = ImmutableTable.deserialize(self._decode_raw_value())
+        nodes_by_name: dict[SDNodeName, ImmutableTree] = {}
+        for _idx in range(self._decode_length()):
+            name = SDNodeName(str(self._decode_blob(), "utf-8"))
+            length = self._decode_length()
+            if filter_tree is None:
+                node_filter_tree = None
+            elif name in filter_tree.filters_by_name:
+                node_filter_tree = filter_tree.filters_by_name[name]
+            elif filter_tree.filter_node_name(name):
+                # The whole subtree is covered
+                node_filter_tree = None
+            else:
+                self._offset += length
+                continue
+            nodes_by_name[name] = self.decode_tree(path + (name,), node_filter_tree)
+        return ImmutableTree(
+            path=path,
+            attributes=attributes,
+            table=table,
+            nodes_by_name=nodes_by_name,
+        )
+
+
+def _binary_tree_file(filepath: Path) -> Path:
+    return filepath.with_name(f"{filepath.name}.sdtree")
+
+
+# Archive entries are marshalled behind a magic, Python literals are the fallback and the
+# format of older versions.
+_ARCHIVE_MAGIC = b"CMKSDARCHIVE\x01"
+
+
+def _encode_archive_entry(entry: _SDRawArchiveEntry) -> bytes:
+    try:
+        return _ARCHIVE_MAGIC + marshal.dumps(dict(entry), _TREE_MARSHAL_VERSION)
+    except ValueError:
+        # Subclasses of builtin types, eg. of str, are not marshallable
+        return repr(entry).encode("utf-8")
+
+
+def _decode_archive_entry(raw: bytes) -> Any:
+    try:
+        if raw.startswith(_ARCHIVE_MAGIC):
+            return marshal.loads(memoryview(raw)[len(_ARCHIVE_MAGIC) :])
+        return ast.literal_eval(raw.decode("utf-8")) if raw.strip() else None
+    except (EOFError, SyntaxError, TypeError) as e:
+        raise ValueError(f"Invalid archive entry: {e}") from e
+
+
+def _load_binary_tree(filepath: Path) -> bytes:
+    """The binary copy of the tree file or b"" if it's missing or outdated"""
+    try:
+        tree_mtime = filepath.stat().st_mtime_ns
+        binary_filepath = _binary_tree_file(filepath)
+        if binary_filepath.stat().st_mtime_ns < tree_mtime:
+            # The tree file has been written by someone else
+            return b""
+    except FileNotFoundError:
+        return b""
+    return store.load_bytes_from_file(binary_filepath)
+
+
+def load_tree(filepath: Path, filters: Iterable[SDFilterChoice] | None = None) -> ImmutableTree:
+    """Load a stored tree from its binary copy or from the tree file (Python literal)
+
+    If filters are given the tree is filtered. Subtrees of the binary copy which are not
+    covered by the filters are not decoded at all."""
+    filter_tree = None if filters is None else _make_filter_tree(filters)
+    if (raw := _load_binary_tree(filepath)).startswith(_TREE_MAGIC):
+        tree = _TreeDecoder(raw).decode_tree((), filter_tree)
+    elif not (raw := store.load_bytes_from_file(filepath)):
+        return ImmutableTree()
+    elif raw.startswith(_TREE_MAGIC):
+        tree = _TreeDecoder(raw).decode_tree((), filter_tree)
+    elif raw_tree := ast.literal_eval(raw.decode("utf-8")):
+        tree = ImmutableTree.deserialize(raw_tree)
+    else:
+        return ImmutableTree()
+
+    return tree if filter_tree is None else _filter_tree(tree, filter_tree)
+
+
+class _SDRawIndexedTable(TypedDict):
+    TreeMtime: int
+    KeyColumns: Sequence[SDKey]
+    Length: int
+    # One value per row, the rows without the column are listed in 'Missing'
+    Columns: Mapping[SDKey, Sequence[SDValue]]
+    Missing: Mapping[SDKey, Sequence[int]]
+    Retentions: Mapping[
+        SDRowIdent, Mapping[SDKey, tuple[int, int, int, Literal["previous", "current"]]]
+    ]
+
+
+def _make_table_file_name(path: SDPath) -> str:
+    return ".".join(quote(name, safe="").replace(".", "%2E") for name in path)
+
+
+def _make_raw_indexed_table(tree_mtime: int, raw_table: SDRawTable) -> _SDRawIndexedTable:
+    rows = raw_table.get("Rows", [])
+    columns: dict[SDKey, list[SDValue]] = {}
+    missing: dict[SDKey, list[int]] = {}
+    for idx, row in enumerate(rows):
+        for key, value in row.items():
+            if key not in columns:
+                columns[key] = [None] * idx
+                missing[key] = list(range(idx))
+            columns[key].append(value)
+        for key, values in columns.items():
+            if len(values) <= idx:
+                values.append(None)
+                missing[key].append(idx)
+    return {
+        "TreeMtime": tree_mtime,
+        "KeyColumns": raw_table.get("KeyColumns", []),
+        "Length": len(rows),
+        "Columns": columns,
+        "Missing": {key: positions for key, positions in missing.items() if positions},
+        "Retentions": raw_table.get("Retentions", {}),
+    }
+
+
+def _make_table_from_indexed_table(
+    raw_indexed_table: _SDRawIndexedTable,
+    row_filters: Mapping[SDKey, Callable[[SDValue], bool]],
+) -> ImmutableTable:
+    columns = raw_indexed_table["Columns"]
+    missing = {key: set(positions) for key, positions in raw_indexed_table["Missing"].items()}
+
+    positions: Sequence[int] = range(raw_indexed_table["Length"])
+    for key, row_filter in row_filters.items():
+        if (values := columns.get(key)) is None:
+            return ImmutableTable(key_columns=raw_indexed_table["KeyColumns"])
+        missing_positions = missing.get(key, set())
+        positions = [
+            idx for idx in positions if idx not in missing_positions and row_filter(values[idx])
+        ]
+
+    rows: list[dict[SDKey, SDValue]] = [{} for _idx in positions]
+    for key, values in columns.items():
+        missing_positions = missing.get(key, set())
+        for row, idx in zip(rows, positions):
+            if idx not in missing_positions:
+                row[key] = values[idx]
+
+    key_columns = raw_indexed_table["KeyColumns"]
+    raw_retentions = raw_indexed_table["Retentions"]
+    return ImmutableTable.deserialize(
+        {
+            "KeyColumns": key_columns,
+            "Rows": rows,
+            "Retentions": {
+                ident: raw_retentions[ident]
+                for ident in {_make_row_ident(key_columns, row) for row in rows}
+                if ident in raw_retentions
+            },
+        }
+    )
+
+
+# Number of pending hosts of the table index which triggers its compaction
+_TABLE_INDEX_MAX_PENDING = 100
+# Number of index files kept in memory by a process
+_TABLE_INDEX_MAX_CACHED_FILES = 4
+
+
+class _SDRawPendingTables(TypedDict):
+    TreeMtime: int
+    Tables: Mapping[str, _SDRawIndexedTable]
+
+
+# Per process: index file -> (modification key, content)
+_table_index_files: dict[Path, tuple[tuple[int, int, int], Any]] = {}
+
+
+def _load_table_index_file(filepath: Path, default: Any) -> Any:
+    try:
+        stat = filepath.stat()
+    except FileNotFoundError:
+        return default
+    stat_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if (cached := _table_index_files.get(filepath)) is not None and cached[0] == stat_key:
+        return cached[1]
+    content = store.load_object_from_pickle_file(filepath, default=default)
+    _table_index_files.pop(filepath, None)
+    while len(_table_index_files) >= _TABLE_INDEX_MAX_CACHED_FILES:
+        del _table_index_files[next(iter(_table_index_files))]
+    _table_index_files[filepath] = (stat_key, content)
+    return content
+
+
+class _TableIndex:
+    """Columnar copies of the tables of the trees of all hosts
+
+    Views and filters which are interested in one table of many hosts read the table of all
+    hosts from one file '<index dir>/<path>' instead of the complete tree of each host. The
+    modification times of the indexed tree files are recorded in '<index dir>/.hosts'. The
+    indexed tables of a host are only valid as long as its tree file is not changed.
+
+    Saving a tree only writes the tables of the host to '<index dir>/.pending/<host name>',
+    which take precedence over the tables of the host in the table files. The pending tables
+    are merged into the table files from time to time, see compact().
+    """
+
+    def __init__(self, index_dir: Path, tree_dir: Path) -> None:
+        self._index_dir = index_dir
+        self._tree_dir = tree_dir
+        # Not valid table file names, see _make_table_file_name
+        self._hosts_file = index_dir / ".hosts"
+        self._pending_dir = index_dir / ".pending"
+        self._lock_file = index_dir / ".lock"
+
+    def update(self, *, host_name: HostName, raw_tree: SDRawTree) -> None:
+        tree_mtime = (self._tree_dir / str(host_name)).stat().st_mtime_ns
+        self._pending_dir.mkdir(parents=True, exist_ok=True)
+        store.save_object_to_pickle_file(
+            self._pending_dir / str(host_name),
+            _SDRawPendingTables(
+                TreeMtime=tree_mtime,
+                Tables={
+                    _make_table_file_name(path): _make_raw_indexed_table(tree_mtime, raw_table)
+                    for path, raw_table in _iter_raw_tables((), raw_tree)
+                    if all(path)
+                },
+            ),
+        )
+        if len(os.listdir(self._pending_dir)) >= _TABLE_INDEX_MAX_PENDING:
+            self.compact(blocking=False)
+
+    def remove(self, *, host_name: HostName) -> None:
+        # The tables of the host in the table files are outdated from now on
+        (self._pending_dir / str(host_name)).unlink(missing_ok=True)
+
+    def compact(self, *, blocking: bool = True) -> None:
+        """Merge the pending tables into the table files and drop the tables of the hosts
+        without tree file"""
+        if not self._pending_dir.exists():
+            return
+        if blocking:
+            with store.locked(self._lock_file):
+                self._compact()
+            return
+        with store.try_locked(self._lock_file) as acquired:
+            # Otherwise someone else is compacting the index
+            if acquired:
+                self._compact()
+
+    def _compact(self) -> None:
+        pending: dict[HostName, tuple[int, _SDRawPendingTables]] = {}
+        for pending_file in self._pending_dir.iterdir():
+            if pending_file.name.startswith("."):
+                continue  # Being written
+            try:
+                mtime = pending_file.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue  # Removed in the meantime
+            if raw_pending := store.load_object_from_pickle_file(pending_file, default=None):
+                pending[HostName(pending_file.name)] = (mtime, raw_pending)
+
+        tree_mtimes: dict[HostName, int] = {
+            host_name: tree_mtime
+            for host_name, tree_mtime in store.load_object_from_pickle_file(
+                self._hosts_file, default={}
+            ).items()
+            if host_name not in pending and (self._tree_dir / str(host_name)).exists()
+        }
+        tree_mtimes.update(
+            (host_name, raw_pending["TreeMtime"])
+            for host_name, (_mtime, raw_pending) in pending.items()
+        )
+
+        table_file_names = {
+            table_file.name
+            for table_file in self._index_dir.iterdir()
+            if not table_file.name.startswith(".")
+        }
+        table_file_names.update(
+            name for _mtime, raw_pending in pending.values() for name in raw_pending["Tables"]
+        )
+        for table_file_name in table_file_names:
+            table_file = self._index_dir / table_file_name
+            raw_tables: dict[HostName, _SDRawIndexedTable] = {
+                host_name: raw_indexed_table
+                for host_name, raw_indexed_table in store.load_object_from_pickle_file(
+                    table_file, default={}
+                ).items()
+                if host_name in tree_mtimes and host_name not in pending
+            }
+            raw_tables.update(
+                (host_name, raw_table)
+                for host_name, (_mtime, raw_pending) in pending.items()
+                if (raw_table := raw_pending["Tables"].get(table_file_name)) is not None
+            )
+            if raw_tables:
+                store.save_object_to_pickle_file(table_file, raw_tables)
+            else:
+                table_file.unlink(missing_ok=True)
+        store.save_object_to_pickle_file(self._hosts_file, tree_mtimes)
+
+        for host_name, (mtime, _raw_pending) in pending.items():
+            pending_file = self._pending_dir / str(host_name)
+            with suppress(FileNotFoundError):
+                # Keep the tables saved in the meantime
+                if pending_file.stat().st_mtime_ns == mtime:
+                    pending_file.unlink()
+
+    def load_table(
+        self,
+        *,
+        host_name: HostName,
+        path: SDPath,
+        row_filters: Mapping[SDKey, Callable[[SDValue], bool]],
+    ) -> ImmutableTable | None:
+        if not path:
+            return None
+        try:
+            tree_mtime = (self._tree_dir / str(host_name)).stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        table_file_name = _make_table_file_name(path)
+
+        raw_indexed_table: _SDRawIndexedTable | None
+        if (
+            raw_pending := store.load_object_from_pickle_file(
+                self._pending_dir / str(host_name), default=None
+            )
+        ) is not None:
+            if raw_pending["TreeMtime"] != tree_mtime:
+                return None
+            raw_indexed_table = raw_pending["Tables"].get(table_file_name)
+        elif (
+            raw_indexed_table := _load_table_index_file(
+                self._index_dir / table_file_name, default={}
+            ).get(host_name)
+        ) is None:
+            if _load_table_index_file(self._hosts_file, default={}).get(host_name) != tree_mtime:
+                return None
+        elif raw_indexed_table["TreeMtime"] != tree_mtime:
+            return None
+
+        if raw_indexed_table is None:
+            return ImmutableTable()
+        return _make_table_from_indexed_table(raw_indexed_table, row_filters)
+
+
+def _iter_raw_tables(path: SDPath, raw_tree: SDRawTree) -> Iterator[tuple[SDPath, SDRawTable]]:
+    if raw_tree["Table"].get("Rows"):
+        yield path, raw_tree["Table"]
+    for name, raw_node in raw_tree["Nodes"].items():
+        yield from _iter_raw_tables(path + (name,), raw_node)
+
+
+def _make_tree_from_table(path: SDPath, table: ImmutableTable) -> ImmutableTree:
+    tree = ImmutableTree(path=path, table=table)
+    for depth in reversed(range(len(path))):
+        tree = ImmutableTree(path=path[:depth], nodes_by_name={path[depth]: tree})
+    return tree
 
 
 class TreeStore:
-    def __init__(self, tree_dir: Path | str) -> None:
+    def __init__(
+        self,
+        tree_dir: Path | str,
+        table_index_dir: Path | str | None = None,
+        *,
+        binary_copy: bool = True,
+    ) -> None:
         self._tree_dir = Path(tree_dir)
+        # The binary copy only pays off for trees which are loaded filtered, eg. the
+        # inventory trees in the GUI. It is not worth writing it on every save otherwise.
+        self._binary_copy = binary_copy
         self._last_filepath = Path(tree_dir) / ".last"
+        self._table_index = (
+            None if table_index_dir is None else _TableIndex(Path(table_index_dir), self._tree_dir)
+        )
 
-    def load(self, *, host_name: HostName) -> ImmutableTree:
-        return load_tree(self._tree_file(host_name))
+    def load(
+        self, *, host_name: HostName, filters: Iterable[SDFilterChoice] | None = None
+    ) -> ImmutableTree:
+        return load_tree(self._tree_file(host_name), filters)
+
+    def load_table_tree(
+        self,
+        *,
+        host_name: HostName,
+        path: SDPath,
+        row_filters: Mapping[SDKey, Callable[[SDValue], bool]] | None = None,
+    ) -> ImmutableTree | None:
+        """Load the tree which only consists of the table below path from the table index
+
+        Only the rows whose column values match all row filters are loaded. Returns 'None'
+        if the table is not indexed, in this case the tree has to be loaded."""
+        if self._table_index is None:
+            return None
+        if (
+            table := self._table_index.load_table(
+                host_name=host_name,
+                path=path,
+                row_filters=row_filters or {},
+            )
+        ) is None:
+            return None
+        return _make_tree_from_table(path, table)
+
+    def compact_table_index(self) -> None:
+        """Merge the recently indexed tables into the table index and drop the tables of
+        removed hosts"""
+        if self._table_index is not None:
+            self._table_index.compact()
 
     def save(self, *, host_name: HostName, tree: MutableTree, pretty: bool = False) -> None:
         self._tree_dir.mkdir(parents=True, exist_ok=True)
@@ -1650,18 +2254,26 @@ class TreeStore:
 
         output = tree.serialize()
         store.save_object_to_file(tree_file, output, pretty=pretty)
+        if self._binary_copy:
+            store.save_bytes_to_file(_binary_tree_file(tree_file), _encode_tree(output))
 
         buf = io.BytesIO()
         with gzip.GzipFile(fileobj=buf, mode="wb") as f:
             f.write((repr(output) + "\n").encode("utf-8"))
         store.save_bytes_to_file(self._gz_file(host_name), buf.getvalue())
 
+        if self._table_index is not None:
+            self._table_index.update(host_name=host_name, raw_tree=output)
+
         # Inform Livestatus about the latest inventory update
         self._last_filepath.touch()
 
     def remove(self, *, host_name: HostName) -> None:
         self._tree_file(host_name).unlink(missing_ok=True)
+        _binary_tree_file(self._tree_file(host_name)).unlink(missing_ok=True)
         self._gz_file(host_name).unlink(missing_ok=True)
+        if self._table_index is not None:
+            self._table_index.remove(host_name=host_name)
 
     def _tree_file(self, host_name: HostName) -> Path:
         return self._tree_dir / str(host_name)
@@ -1671,30 +2283,183 @@ class TreeStore:
 
 
 class TreeOrArchiveStore(TreeStore):
-    def __init__(self, tree_dir: Path | str, archive: Path | str) -> None:
-        super().__init__(tree_dir)
+    """The current trees and the archived trees of the hosts
+
+    The youngest archived tree of a host is stored as a full tree. When a tree is archived,
+    the previous youngest tree is replaced by a patch which turns the new tree into it. In
+    order to limit the number of patches to be applied, every n-th archived tree is kept as
+    a full tree. Trees archived by older versions are full trees. Additionally every
+    archived tree comes with its difference to the previously archived tree, which is all
+    the inventory history needs.
+    """
+
+    def __init__(
+        self,
+        tree_dir: Path | str,
+        archive: Path | str,
+        table_index_dir: Path | str | None = None,
+    ) -> None:
+        super().__init__(tree_dir, table_index_dir)
         self._archive_dir = Path(archive)
+        # The rebuilt archived trees of the host loaded last, patches are applied only once
+        self._raw_archived_trees_host_name: HostName | None = None
+        self._raw_archived_trees: dict[int, SDRawTree] = {}
 
     def load_previous(self, *, host_name: HostName) -> ImmutableTree:
         if (tree_file := self._tree_file(host_name=host_name)).exists():
             return load_tree(tree_file)
 
-        try:
-            latest_archive_tree_file = max(
-                self._archive_host_dir(host_name).iterdir(), key=lambda tp: int(tp.name)
-            )
-        except (FileNotFoundError, ValueError):
+        if not (timestamps := self._archived_timestamps(host_name)):
             return ImmutableTree()
 
-        return load_tree(latest_archive_tree_file)
+        return self.load_archived_tree(host_name=host_name, timestamp=timestamps[-1])
+
+    def load_archived_tree(self, *, host_name: HostName, timestamp: int) -> ImmutableTree:
+        return ImmutableTree.deserialize(self._load_raw_archived_tree(host_name, timestamp))
+
+    def load_archived_delta_tree(
+        self, *, host_name: HostName, timestamp: int, previous_timestamp: int | None
+    ) -> ImmutableDeltaTree | None:
+        """The stored difference of two archived trees or 'None' if it's not available"""
+        entry = self._load_archive_entry(host_name, timestamp)
+        if "DeltaTree" not in entry or entry.get("DeltaFrom") != previous_timestamp:
+            return None
+        return ImmutableDeltaTree.deserialize(entry["DeltaTree"])
 
     def _archive_host_dir(self, host_name: HostName) -> Path:
         return self._archive_dir / str(host_name)
 
+    def _archive_file(self, host_name: HostName, timestamp: int) -> Path:
+        return self._archive_host_dir(host_name) / str(timestamp)
+
+    def _archived_timestamps(self, host_name: HostName) -> Sequence[int]:
+        try:
+            return sorted(
+                int(tp.name)
+                for tp in self._archive_host_dir(host_name).iterdir()
+                if tp.name.isdigit()
+            )
+        except FileNotFoundError:
+            return []
+
+    def _load_archive_entry(self, host_name: HostName, timestamp: int) -> _SDRawArchiveEntry:
+        if not (archive_file := self._archive_file(host_name, timestamp)).exists():
+            raise FileNotFoundError(archive_file)
+        if not (raw := _decode_archive_entry(store.load_bytes_from_file(archive_file))):
+            return {"ArchiveFormat": _ARCHIVE_FORMAT, "Tree": ImmutableTree().serialize()}
+        if raw.get("ArchiveFormat") == _ARCHIVE_FORMAT:
+            return raw
+        # Archived by older versions
+        return {
+            "ArchiveFormat": _ARCHIVE_FORMAT,
+            "Tree": ImmutableTree.deserialize(raw).serialize(),
+        }
+
+    def _load_raw_archived_tree(self, host_name: HostName, timestamp: int) -> SDRawTree:
+        if self._raw_archived_trees_host_name != host_name:
+            self._raw_archived_trees_host_name = host_name
+            self._raw_archived_trees.clear()
+
+        patches: list[tuple[int, _SDRawTreePatch]] = []
+        while (raw_tree := self._raw_archived_trees.get(timestamp)) is None:
+            entry = self._load_archive_entry(host_name, timestamp)
+            if "Tree" in entry:
+                raw_tree = self._raw_archived_trees[timestamp] = entry["Tree"]
+                break
+            patches.append((timestamp, entry["Patch"]))
+            if (base := entry["PatchBase"]) <= timestamp:
+                raise ValueError(f"Invalid base {base} of archived tree {timestamp}")
+            timestamp = base
+
+        for patched_timestamp, patch in reversed(patches):
+            raw_tree = self._raw_archived_trees[patched_timestamp] = _apply_raw_tree_patch(
+                raw_tree, patch
+            )
+        return raw_tree
+
+    def _save_archive_entry(
+        self, host_name: HostName, timestamp: int, entry: _SDRawArchiveEntry
+    ) -> None:
+        if host_name == self._raw_archived_trees_host_name and "Tree" in entry:
+            self._raw_archived_trees.pop(timestamp, None)
+        store.save_bytes_to_file(
+            archive_file := self._archive_file(host_name, timestamp),
+            _encode_archive_entry(entry),
+        )
+        # Keep the age of the file, the archive is cleaned up by file age
+        os.utime(archive_file, (timestamp, timestamp))
+
     def archive(self, *, host_name: HostName) -> None:
         if not (tree_file := self._tree_file(host_name)).exists():
             return
-        target_dir = self._archive_host_dir(host_name)
-        target_dir.mkdir(parents=True, exist_ok=True)
-        tree_file.rename(target_dir / str(int(tree_file.stat().st_mtime)))
-        self._gz_file(host_name).unlink(missing_ok=True)
+        self._archive_host_dir(host_name).mkdir(parents=True, exist_ok=True)
+
+        timestamp = int(tree_file.stat().st_mtime)
+        tree = load_tree(tree_file)
+        raw_tree = tree.serialize()
+        timestamps = self._archived_timestamps(host_name)
+        older_timestamps = [t for t in timestamps if t < timestamp]
+
+        previous_raw_tree: SDRawTree | None = None
+        if older_timestamps:
+            try:
+                if timestamp in timestamps:
+                    # The archived tree is replaced, keep the previous one
+                    self._replace_by_full_tree(host_name, older_timestamps[-1])
+                previous_raw_tree = self._load_raw_archived_tree(host_name, older_timestamps[-1])
+            except (FileNotFoundError, KeyError, ValueError):
+                pass
+
+        entry: _SDRawArchiveEntry = {"ArchiveFormat": _ARCHIVE_FORMAT, "Tree": raw_tree}
+        if previous_raw_tree is not None:
+            entry["DeltaTree"] = tree.difference(
+                ImmutableTree.deserialize(previous_raw_tree)
+            ).serialize()
+            entry["DeltaFrom"] = older_timestamps[-1]
+        elif not older_timestamps:
+            entry["DeltaTree"] = tree.difference(ImmutableTree()).serialize()
+            entry["DeltaFrom"] = None
+        self._save_archive_entry(host_name, timestamp, entry)
+
+        if (
+            previous_raw_tree is not None
+            and timestamps[-1] <= timestamp
+            and (len(older_timestamps) - 1) % _ARCHIVE_BASE_INTERVAL
+        ):
+            self._replace_by_patch(
+                host_name, older_timestamps[-1], previous_raw_tree, timestamp, raw_tree
+            )
+
+        self.remove(host_name=host_name)
+
+    def _replace_by_full_tree(self, host_name: HostName, timestamp: int) -> None:
+        if "Tree" in (entry := self._load_archive_entry(host_name, timestamp)):
+            return
+        full_entry: _SDRawArchiveEntry = {
+            "ArchiveFormat": _ARCHIVE_FORMAT,
+            "Tree": self._load_raw_archived_tree(host_name, timestamp),
+        }
+        _copy_delta_tree(entry, full_entry)
+        self._save_archive_entry(host_name, timestamp, full_entry)
+
+    def _replace_by_patch(
+        self,
+        host_name: HostName,
+        timestamp: int,
+        raw_tree: SDRawTree,
+        base: int,
+        base_raw_tree: SDRawTree,
+    ) -> None:
+        patch_entry: _SDRawArchiveEntry = {
+            "ArchiveFormat": _ARCHIVE_FORMAT,
+            "Patch": _make_raw_tree_patch(base_raw_tree, raw_tree),
+            "PatchBase": base,
+        }
+        _copy_delta_tree(self._load_archive_entry(host_name, timestamp), patch_entry)
+        self._save_archive_entry(host_name, timestamp, patch_entry)
+
+
+def _copy_delta_tree(from_entry: _SDRawArchiveEntry, to_entry: _SDRawArchiveEntry) -> None:
+    if "DeltaTree" in from_entry:
+        to_entry["DeltaTree"] = from_entry["DeltaTree"]
+        to_entry["DeltaFrom"] = from_entry.get("DeltaFrom")
@@ -80,6 +80,24 @@ TableEventConsoleStatus::TableEventConsoleStatus() {
     addColumn(ECRow::makeDoubleColumn("status_average_rule_hit_rate",
                                       "The average rule hit rate", offsets));
 
+    addColumn(ECRow::makeIntColumn(
+        "status_received",
+        "The number of messages queued for processing since startup of the Event Console",
+        offsets));
+    addColumn(ECRow::makeDoubleColumn("status_received_rate",
+                                      "The receive rate", offsets));
+    addColumn(ECRow::makeDoubleColumn("status_average_received_rate",
+                                      "The average receive rate", offsets));
+    addColumn(ECRow::makeIntColumn(
+        "status_queue_drops",
+        "The number of messages dropped due to an overflow of the receive queue",
+        offsets));
+    addColumn(ECRow::makeDoubleColumn("status_queue_drop_rate",
+                                      "The receive queue drop rate", offsets));
+    addColumn(ECRow::makeDoubleColumn("status_average_queue_drop_rate",
+                                      "The average receive queue drop rate",
+                                      offsets));
+
     addColumn(ECRow::makeDoubleColumn(
         "status_average_processing_time",
         "The average incoming message processing time", offsets));
@@ -88,6 +106,9 @@ TableEventConsoleStatus::TableEventConsoleStatus() {
                                       offsets));
     addColumn(ECRow::makeDoubleColumn("status_average_sync_time",
                                       "The average sync time", offsets));
+    addColumn(ECRow::makeDoubleColumn(
+        "status_average_queue_wait_time",
+        "The average time messages wait in the receive queue", offsets));
     addColumn(ECRow::makeStringColumn(
         "status_replication_slavemode",
         "The replication slavemode (empty or one of sync/takeover)", offsets));
@@ -651,6 +651,9 @@ ColumnDefinitions event_console_status_columns() {
         {"status_average_message_rate", ColumnType::double_},
         {"status_average_overflow_rate", ColumnType::double_},
         {"status_average_processing_time", ColumnType::double_},
+        {"status_average_queue_drop_rate", ColumnType::double_},
+        {"status_average_queue_wait_time", ColumnType::double_},
+        {"status_average_received_rate", ColumnType::double_},
         {"status_average_request_time", ColumnType::double_},
         {"status_average_rule_hit_rate", ColumnType::double_},
         {"status_average_rule_trie_rate", ColumnType::double_},
@@ -673,6 +676,10 @@ ColumnDefinitions event_console_status_columns() {
         {"status_num_open_events", ColumnType::int_},
         {"status_overflow_rate", ColumnType::double_},
         {"status_overflows", ColumnType::int_},
+        {"status_queue_drop_rate", ColumnType::double_},
+        {"status_queue_drops", ColumnType::int_},
+        {"status_received", ColumnType::int_},
+        {"status_received_rate", ColumnType::double_},
         {"status_replication_last_sync", ColumnType::time},
         {"status_replication_slavemode", ColumnType::string},
         {"status_replication_success", ColumnType::int_},
@@ -5,6 +5,7 @@
 
 # pylint: disable=protected-access
 
+import threading
 import time
 from collections.abc import Iterable, Mapping
 from typing import Literal
@@ -14,14 +15,19 @@ from pytest import MonkeyPatch
 
 from tests.testlib.base import Scenario
 
+from cmk.utils.agentdatatype import AgentRawData
 from cmk.utils.hostaddress import HostName
 
+from cmk.fetchers import Mode, ProgramFetcher
+from cmk.fetchers.filecache import FileCacheOptions, NoCache
+
 from cmk.checkengine.checkresults import ServiceCheckResult, SubmittableServiceCheckResult
-from cmk.checkengine.fetcher import HostKey, SourceType
+from cmk.checkengine.fetcher import FetcherType, HostKey, SourceInfo, SourceType
 from cmk.checkengine.parameters import TimespecificParameters, TimespecificParameterSet
 
 from cmk.base import checkers, config
 from cmk.base.plugins.agent_based.agent_based_api.v1.type_defs import CheckResult
+from cmk.base.sources import Source
 
 from cmk.agent_based.prediction_backend import (
     InjectedParameters,
@@ -29,6 +35,7 @@ from cmk.agent_based.prediction_backend import (
     PredictionParameters,
 )
 from cmk.agent_based.v1 import Metric, Result, State
+from cmk.ccc.exceptions import MKTimeout
 
 
 def make_timespecific_params_list(
@@ -279,3 +286,37 @@ def test_prediction_injection() -> None:
             ("my_reference_metric", *prediction),
         )
     }
+
+
+class _ProgramSource(Source[AgentRawData]):
+    def __init__(self, cmdline: str) -> None:
+        self.cmdline = cmdline
+
+    def source_info(self) -> SourceInfo:
+        return SourceInfo(
+            HostName("testhost"), None, self.cmdline, FetcherType.PROGRAM, SourceType.HOST
+        )
+
+    def fetcher(self) -> ProgramFetcher:
+        return ProgramFetcher(cmdline=self.cmdline, stdin=None, is_cmc=True)
+
+    def file_cache(
+        self, *, simulation: bool, file_cache_options: FileCacheOptions
+    ) -> NoCache[AgentRawData]:
+        return NoCache()
+
+
+def test_fetch_all_concurrently_interrupts_the_late_fetchers() -> None:
+    start = time.monotonic()
+    fetched = checkers._fetch_all_concurrently(
+        [_ProgramSource("echo fast"), _ProgramSource("sleep 60")],
+        simulation=False,
+        file_cache_options=FileCacheOptions(),
+        mode=Mode.CHECKING,
+        timeout=0.5,
+    )
+
+    assert time.monotonic() - start < 30
+    assert fetched[0][1].ok == b"fast\n"
+    assert isinstance(fetched[1][1].error, MKTimeout)
+    assert not [t for t in threading.enumerate() if t.name.startswith("fetcher")]
@@ -6,6 +6,7 @@
 # pylint: disable=protected-access
 
 import itertools
+import pickle
 import re
 import shutil
 import socket
@@ -857,6 +858,33 @@ def test_tcp_connect_timeout(monkeypatch: MonkeyPatch, hostname: HostName, resul
     assert config_cache.fetcher_factory()._tcp_connect_timeout(hostname) == result
 
 
+@pytest.mark.parametrize(
+    "hostname, result",
+    [
+        (HostName("testhost1"), None),
+        (HostName("testhost2"), 30.0),
+    ],
+)
+def test_concurrent_source_fetching(
+    monkeypatch: MonkeyPatch, hostname: HostName, result: float | None
+) -> None:
+    ts = Scenario()
+    ts.add_host(hostname)
+    ts.set_ruleset(
+        "concurrent_source_fetching_hosts",
+        [
+            {
+                "id": "01",
+                "condition": {"host_name": [HostName("testhost2")]},
+                "value": 30.0,
+                "options": {},
+            }
+        ],
+    )
+    config_cache = ts.apply(monkeypatch)
+    assert config_cache.concurrent_source_fetching(hostname) == result
+
+
 @pytest.mark.parametrize(
     "hostname, result",
     [
@@ -2954,6 +2982,36 @@ class TestPackedConfigStore:
         assert precompiled_check_config.exists()
         assert store.read() == {"abc": 1}
 
+    def test_write_per_host_values(self, store: config.PackedConfigStore) -> None:
+        store.write(
+            {
+                "abc": 1,
+                "ipaddresses": {HostName("h1"): "1.2.3.4", HostName("h2"): "1.2.3.5"},
+                "ipv6addresses": {},
+                "host_attributes": {HostName("h2"): {"alias": "h2"}},
+            }
+        )
+
+        packed_config = store.read()
+
+        assert packed_config["abc"] == 1
+        ipaddresses = packed_config["ipaddresses"]
+        assert isinstance(ipaddresses, config.PackedHostValues)
+        assert ipaddresses[HostName("h2")] == "1.2.3.5"
+        assert dict(ipaddresses) == {HostName("h1"): "1.2.3.4", HostName("h2"): "1.2.3.5"}
+        assert not packed_config["ipv6addresses"]
+        host_attributes = packed_config["host_attributes"]
+        assert HostName("h1") not in host_attributes
+        assert host_attributes.get(HostName("h1")) is None
+        assert host_attributes.get(HostName("unknown")) is None
+        assert dict(host_attributes) == {HostName("h2"): {"alias": "h2"}}
+
+    def test_read_previous_format(self, store: config.PackedConfigStore) -> None:
+        store.path.parent.mkdir(parents=True, exist_ok=True)
+        store.path.write_bytes(pickle.dumps({"abc": 1, "ipaddresses": {"h1": "1.2.3.4"}}))
+
+        assert store.read() == {"abc": 1, "ipaddresses": {"h1": "1.2.3.4"}}
+
 
 def test__extract_check_plugins(monkeypatch: MonkeyPatch) -> None:
     duplicate_plugin = {
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import pytest
+
+from cmk.utils.hostaddress import HostName
+from cmk.utils.tags import TagGroupID, TagID
+
+from cmk.bi.aggregation import BIAggregation
+from cmk.bi.compiler import (
+    compute_host_fingerprints,
+    find_changed_hosts,
+    has_relational_searches,
+    is_affected_by_host_changes,
+    referenced_hosts,
+)
+from cmk.bi.lib import BIHostData
+from cmk.bi.packs import BIAggregationPacks
+from cmk.bi.searcher import BISearcher
+
+
+def test_find_changed_hosts(bi_searcher_with_sample_config: BISearcher) -> None:
+    hosts = bi_searcher_with_sample_config.hosts
+    previous = compute_host_fingerprints(hosts)
+    assert compute_host_fingerprints(hosts) == previous
+
+    current = compute_host_fingerprints(
+        {
+            "heute": hosts["heute"]._replace(alias="new alias"),
+            "new_host": hosts["heute_clone"]._replace(name=HostName("new_host")),
+        }
+    )
+
+    assert find_changed_hosts(previous, current) == {"heute", "heute_clone", "new_host"}
+
+
+def _new_host(template: BIHostData, tag: tuple[str, str]) -> BIHostData:
+    return template._replace(
+        name=HostName("new_host"), alias="new_host", tags={(TagGroupID(tag[0]), TagID(tag[1]))}
+    )
+
+
+def test_is_affected_by_host_changes(
+    bi_packs_sample_config: BIAggregationPacks, bi_searcher_with_sample_config: BISearcher
+) -> None:
+    aggregation = bi_packs_sample_config.get_aggregation_mandatory("default_aggregation")
+    compiled_hosts = referenced_hosts(aggregation.compile(bi_searcher_with_sample_config))
+    assert compiled_hosts == {"heute", "heute_clone"}
+    hosts = bi_searcher_with_sample_config.hosts
+    template = hosts["heute"]
+
+    assert not is_affected_by_host_changes(aggregation, compiled_hosts, set(), hosts)
+    # a referenced host has been modified
+    assert is_affected_by_host_changes(aggregation, compiled_hosts, {"heute"}, hosts)
+    # a host not matching the search of the aggregation has been added
+    assert not is_affected_by_host_changes(
+        aggregation,
+        compiled_hosts,
+        {"new_host"},
+        {**hosts, "new_host": _new_host(template, ("snmp_ds", "snmp-v2"))},
+    )
+    # a host matching the search of the aggregation has been added
+    assert is_affected_by_host_changes(
+        aggregation,
+        compiled_hosts,
+        {"new_host"},
+        {**hosts, "new_host": _new_host(template, ("tcp", "tcp"))},
+    )
+    # an unreferenced host has been removed
+    assert not is_affected_by_host_changes(aggregation, compiled_hosts, {"old_host"}, hosts)
+
+
+@pytest.mark.parametrize(
+    "search, arguments, expected",
+    [
+        pytest.param({"refer_to": {"type": "host"}}, ["$HOSTNAME$"], False, id="host"),
+        pytest.param({"refer_to": {"type": "parent"}}, ["$HOSTNAME$"], True, id="parent"),
+        pytest.param({"refer_to": {"type": "child"}}, ["$HOSTNAME$"], True, id="child"),
+        pytest.param(
+            {"refer_to": {"type": "host"}, "conditions": {"host_choice": {"type": "all_hosts"}}},
+            ["$1$"],
+            True,
+            id="host from match group",
+        ),
+    ],
+)
+def test_is_affected_by_host_changes_with_relational_searches(
+    bi_packs_sample_config: BIAggregationPacks,
+    bi_searcher_with_sample_config: BISearcher,
+    search: dict[str, object],
+    arguments: list[str],
+    expected: bool,
+) -> None:
+    default_aggregation = bi_packs_sample_config.get_aggregation_mandatory("default_aggregation")
+    config = BIAggregation.schema()().dump(default_aggregation)
+    config["node"]["search"] |= search
+    config["node"]["action"]["params"]["arguments"] = arguments
+    aggregation = BIAggregation(config)
+    hosts = bi_searcher_with_sample_config.hosts
+
+    assert has_relational_searches(aggregation) is expected
+    # The added host does not match the search of the aggregation
+    assert (
+        is_affected_by_host_changes(
+            aggregation,
+            {"heute", "heute_clone"},
+            {"new_host"},
+            {**hosts, "new_host": _new_host(hosts["heute"], ("snmp_ds", "snmp-v2"))},
+        )
+        is expected
+    )
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import pytest
+
+from livestatus import LivestatusResponse
+
+from cmk.bi.data_fetcher import BIStatusFetcher
+from cmk.bi.flattened_computation import BIBatchComputation, flatten_branch
+from cmk.bi.packs import BIAggregationPacks
+from cmk.bi.searcher import BISearcher
+from cmk.bi.trees import BICompiledRule
+
+from .bi_test_data import sample_config
+
+
+def test_flatten_branch(
+    bi_packs_sample_config: BIAggregationPacks, bi_searcher_with_sample_config: BISearcher
+) -> None:
+    branch = (
+        bi_packs_sample_config.get_aggregation_mandatory("default_aggregation")
+        .compile(bi_searcher_with_sample_config)
+        .branches[0]
+    )
+
+    flattened_branch = flatten_branch(branch)
+
+    assert flattened_branch.nodes[-1] is branch
+    for node, positions in zip(flattened_branch.nodes, flattened_branch.nested_positions):
+        nested_nodes = node.nodes if isinstance(node, BICompiledRule) else []
+        assert [flattened_branch.nodes[pos] for pos in positions] == nested_nodes
+        assert all(pos < flattened_branch.nodes.index(node) for pos in positions)
+
+
+@pytest.mark.parametrize(
+    "status_data",
+    [
+        sample_config.bi_status_rows,
+        sample_config.bi_acknowledgment_status_rows,
+        sample_config.bi_downtime_status_rows,
+        sample_config.bi_service_period_status_rows,
+    ],
+)
+@pytest.mark.parametrize("assumed_states", [{}, {("heute", "heute", "Interface 2"): 2}])
+def test_batch_computation_equals_tree_computation(
+    bi_packs_sample_config: BIAggregationPacks,
+    bi_searcher_with_sample_config: BISearcher,
+    bi_status_fetcher: BIStatusFetcher,
+    status_data: LivestatusResponse,
+    assumed_states: dict,
+) -> None:
+    bi_status_fetcher.states = bi_status_fetcher.create_bi_status_data(status_data)
+    bi_status_fetcher.set_assumed_states(assumed_states)
+    aggregation = bi_packs_sample_config.get_aggregation_mandatory("default_aggregation")
+    # Two aggregations consisting of the same subtrees
+    compiled_aggregations = [aggregation.compile(bi_searcher_with_sample_config) for _ in range(2)]
+
+    batch_computation = BIBatchComputation(bi_status_fetcher)
+    for compiled_aggregation in compiled_aggregations:
+        assert batch_computation.compute_branches(
+            compiled_aggregation, compiled_aggregation.branches
+        ) == compiled_aggregation.compute_branches(compiled_aggregation.branches, bi_status_fetcher)
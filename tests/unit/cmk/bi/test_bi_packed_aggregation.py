@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+# pylint: disable=protected-access
+
+from pathlib import Path
+
+import pytest
+
+from cmk.bi import flattened_computation, packed_aggregation
+from cmk.bi.packed_aggregation import (
+    branch_summaries,
+    find_branch,
+    load_packed_aggregation,
+    pack_aggregation,
+    PackedBranches,
+)
+from cmk.bi.packs import BIAggregationPacks
+from cmk.bi.searcher import BISearcher
+from cmk.ccc import store
+
+
+def test_packed_aggregation_roundtrip(
+    tmp_path: Path,
+    bi_packs_sample_config: BIAggregationPacks,
+    bi_searcher_with_sample_config: BISearcher,
+) -> None:
+    compiled_aggregation = bi_packs_sample_config.get_aggregation_mandatory(
+        "default_aggregation"
+    ).compile(bi_searcher_with_sample_config)
+    path = tmp_path / "default_aggregation"
+    store.save_bytes_to_file(path, pack_aggregation(compiled_aggregation))
+
+    loaded = load_packed_aggregation(path)
+
+    branches = loaded.branches
+    assert isinstance(branches, PackedBranches)
+    assert list(branch_summaries(loaded)) == list(branch_summaries(compiled_aggregation))
+    assert not branches._branches
+
+    title = compiled_aggregation.branches[-1].properties.title
+    branch = find_branch(loaded, title)
+    assert branch is not None
+    assert list(branches._branches) == [len(branches) - 1]
+    assert branch is branches[-1]
+    assert loaded.serialize() == compiled_aggregation.serialize()
+
+
+def test_packed_branches_are_not_flattened_again(
+    tmp_path: Path,
+    bi_packs_sample_config: BIAggregationPacks,
+    bi_searcher_with_sample_config: BISearcher,
+) -> None:
+    compiled_aggregation = bi_packs_sample_config.get_aggregation_mandatory(
+        "default_aggregation"
+    ).compile(bi_searcher_with_sample_config)
+    path = tmp_path / "default_aggregation"
+    store.save_bytes_to_file(path, pack_aggregation(compiled_aggregation))
+
+    branch = load_packed_aggregation(path).branches[0]
+
+    flattened_branch = flattened_computation._flattened_branches[branch]
+    assert flattened_computation.flatten_branch(branch) is flattened_branch
+    del flattened_computation._flattened_branches[branch]
+    assert flattened_computation.flatten_branch(branch) == flattened_branch
+    assert flattened_branch.subtree_keys == (
+        flattened_computation.flatten_branch(compiled_aggregation.branches[0]).subtree_keys
+    )
+
+
+def test_packed_aggregation_reloads_replaced_file(
+    tmp_path: Path,
+    bi_packs_sample_config: BIAggregationPacks,
+    bi_searcher_with_sample_config: BISearcher,
+) -> None:
+    compiled_aggregation = bi_packs_sample_config.get_aggregation_mandatory(
+        "default_aggregation"
+    ).compile(bi_searcher_with_sample_config)
+    path = tmp_path / "default_aggregation"
+    store.save_bytes_to_file(path, pack_aggregation(compiled_aggregation))
+    loaded = load_packed_aggregation(path)
+    reloaded = load_packed_aggregation(path)
+    assert isinstance(loaded.branches, PackedBranches)
+    assert isinstance(reloaded.branches, PackedBranches)
+    assert reloaded.branches._packed_file is loaded.branches._packed_file
+
+    compiled_aggregation.branches = compiled_aggregation.branches[:1]
+    store.save_bytes_to_file(path, pack_aggregation(compiled_aggregation))
+
+    assert len(load_packed_aggregation(path).branches) == 1
+    # The outdated aggregation keeps working
+    assert loaded.serialize()["branches"][1:]
+
+
+def test_packed_aggregation_forgets_removed_files(
+    tmp_path: Path,
+    bi_packs_sample_config: BIAggregationPacks,
+    bi_searcher_with_sample_config: BISearcher,
+) -> None:
+    compiled_aggregation = bi_packs_sample_config.get_aggregation_mandatory(
+        "default_aggregation"
+    ).compile(bi_searcher_with_sample_config)
+    removed_path = tmp_path / "removed_aggregation"
+    renamed_path = tmp_path / "renamed_aggregation"
+    for path in (removed_path, renamed_path):
+        store.save_bytes_to_file(path, pack_aggregation(compiled_aggregation))
+        load_packed_aggregation(path)
+
+    removed_path.unlink()
+    with pytest.raises(OSError):
+        load_packed_aggregation(removed_path)
+    assert removed_path not in packed_aggregation._packed_files
+
+    path = renamed_path.rename(tmp_path / "default_aggregation")
+    load_packed_aggregation(path)
+    assert renamed_path not in packed_aggregation._packed_files
+
+
+def test_load_packed_aggregation_invalid_file(tmp_path: Path) -> None:
+    path = tmp_path / "default_aggregation"
+    store.save_object_to_pickle_file(path, {})
+    with pytest.raises(ValueError):
+        load_packed_aggregation(path)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+# pylint: disable=protected-access
+
+import pytest
+
+from cmk.utils.hostaddress import HostName
+from cmk.utils.labels import LabelGroups
+from cmk.utils.rulesets.ruleset_matcher import matches_labels, matches_tag_condition, TagCondition
+from cmk.utils.tags import TagGroupID, TagID
+
+from cmk.bi.lib import BIHostData, BIHostSearchMatch, BIServiceData
+from cmk.bi.searcher import BISearcher
+
+
+def _host(name: str, folder: str, tags: dict[str, str], labels: dict[str, str]) -> BIHostData:
+    return BIHostData(
+        site_id="site",
+        tags={(TagGroupID(group), TagID(tag)) for group, tag in tags.items()},
+        labels=labels,
+        folder=folder,
+        services={
+            description: BIServiceData(tags=set(), labels={})
+            for description in ("Interface 2", "CPU load", "Interface 10", "Filesystem /", "Uptime")
+        },
+        children=(HostName("child"),),
+        parents=(HostName("router"),),
+        alias=f"alias of {name}",
+        name=HostName(name),
+    )
+
+
+@pytest.fixture(name="bi_searcher")
+def fixture_bi_searcher(bi_searcher: BISearcher) -> BISearcher:
+    bi_searcher.set_hosts(
+        {
+            "h1": _host("h1", "/wato/", {"agent": "cmk-agent", "os": "linux"}, {"env": "prod"}),
+            "h2": _host("h2", "/wato/linux/", {"agent": "cmk-agent"}, {"env": "test"}),
+            "h3": _host("h3", "/wato/linux/db/", {"agent": "no-agent"}, {"env": "prod", "db": "y"}),
+            "h4": _host("h4", "/wato/linuxes/", {"agent": "special"}, {}),
+        }
+    )
+    return bi_searcher
+
+
+@pytest.mark.parametrize(
+    "folder_path, expected_hosts",
+    [
+        ("", ["h1", "h2", "h3", "h4"]),
+        ("/wato", ["h1", "h2", "h3", "h4"]),
+        ("/wato/linux", ["h2", "h3"]),
+        ("/wato/linux/db", ["h3"]),
+        ("/wato/lin", []),
+    ],
+)
+def test_filter_host_folder(
+    bi_searcher: BISearcher, folder_path: str, expected_hosts: list[str]
+) -> None:
+    hosts = bi_searcher.hosts.values()
+    assert [h.name for h in bi_searcher.filter_host_folder(hosts, folder_path)] == expected_hosts
+
+
+@pytest.mark.parametrize(
+    "tag_conditions",
+    [
+        {TagGroupID("agent"): TagID("cmk-agent")},
+        {TagGroupID("agent"): TagID("cmk-agent"), TagGroupID("os"): TagID("linux")},
+        {TagGroupID("agent"): {"$ne": TagID("cmk-agent")}},
+        {TagGroupID("agent"): {"$or": [TagID("no-agent"), TagID("special")]}},
+        {TagGroupID("agent"): {"$nor": [TagID("no-agent"), TagID("special")]}},
+        {TagGroupID("os"): None},
+    ],
+)
+def test_filter_host_tags(
+    bi_searcher: BISearcher, tag_conditions: dict[TagGroupID, TagCondition]
+) -> None:
+    hosts = list(bi_searcher.hosts.values())
+    assert list(bi_searcher.filter_host_tags(hosts, tag_conditions)) == [
+        host
+        for host in hosts
+        if all(
+            matches_tag_condition(group, condition, host.tags)
+            for group, condition in tag_conditions.items()
+        )
+    ]
+
+
+@pytest.mark.parametrize(
+    "label_groups",
+    [
+        [("and", [("and", "env:prod")])],
+        [("and", [("and", "env:prod"), ("not", "db:y")])],
+        [("and", [("and", "env:prod")]), ("or", [("and", "env:test")])],
+        [("not", [("or", "env:prod"), ("or", "env:test")])],
+        [("and", [("and", "env:prod")]), ("not", [("and", "db:y")])],
+    ],
+)
+def test_filter_host_labels(bi_searcher: BISearcher, label_groups: LabelGroups) -> None:
+    hosts = list(bi_searcher.hosts.values())
+    assert list(bi_searcher.filter_host_labels(hosts, label_groups)) == [
+        host for host in hosts if matches_labels(host.labels, label_groups)
+    ]
+
+
+def test_get_host_alias_matches_is_cached(bi_searcher: BISearcher) -> None:
+    hosts = list(bi_searcher.hosts.values())
+    for _ in range(2):
+        matched_hosts, groups = bi_searcher.get_host_alias_matches(hosts, "alias of (h[12])")
+        assert [h.name for h in matched_hosts] == ["h1", "h2"]
+        assert groups == {"h1": ("h1",), "h2": ("h2",)}
+    assert bi_searcher._alias_regex_miss_cache["alias of (h[12])"] == {"h3", "h4"}
+
+    bi_searcher.cleanup()
+    assert not bi_searcher._alias_regex_match_cache
+
+
+@pytest.mark.parametrize(
+    "pattern, expected_services",
+    [
+        ("Interface", ["Interface 2", "Interface 10"]),
+        ("Interface (1.*)", ["Interface 10"]),
+        ("Interfaces?", ["Interface 2", "Interface 10"]),
+        ("CPU|Uptime", ["CPU load", "Uptime"]),
+        ("(?i)cpu", ["CPU load"]),
+        (".*e", ["Interface 2", "Interface 10", "Filesystem /", "Uptime"]),
+        ("Memory", []),
+    ],
+)
+def test_get_service_description_matches(
+    bi_searcher: BISearcher, pattern: str, expected_services: list[str]
+) -> None:
+    host_match = BIHostSearchMatch(bi_searcher.hosts["h1"], ("h1",))
+    assert [
+        match.service_description
+        for match in bi_searcher.get_service_description_matches([host_match], pattern)
+    ] == expected_services
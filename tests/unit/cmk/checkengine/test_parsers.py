@@ -10,7 +10,7 @@ import itertools
 import logging
 import time
 from collections import defaultdict
-from collections.abc import Sequence
+from collections.abc import Iterator, Mapping, Sequence
 from pathlib import Path
 
 import pytest
@@ -22,9 +22,11 @@ from cmk.utils.translations import TranslationOptions
 
 from cmk.snmplib import SNMPRawData
 
+from cmk.checkengine.fetcher import HostKey, SourceType
 from cmk.checkengine.parser import (
     AgentParser,
     AgentRawDataSectionElem,
+    group_by_host,
     NO_SELECTION,
     SectionStore,
     SNMPParser,
@@ -187,6 +189,33 @@ class TestAgentParser:
         assert ahs.piggybacked_raw_data == {}
         assert not store.load()
 
+    def test_header_within_line_is_not_a_header(
+        self, parser: AgentParser, store: SectionStore[Sequence[AgentRawDataSectionElem]]
+    ) -> None:
+        raw_data = AgentRawData(
+            b"\r\n".join(
+                (
+                    b"<<<a_section>>>",
+                    b"first <<<another_section>>>",
+                    b" <<<another_section>>>",
+                    b"<<<another_section>>> second",
+                    b"",
+                )
+            )
+        )
+
+        ahs = parser.parse(raw_data, selection=NO_SELECTION)
+        assert ahs.sections == {
+            SectionName("a_section"): [
+                ["first", "<<<another_section>>>"],
+                ["<<<another_section>>>"],
+                ["<<<another_section>>>", "second"],
+            ]
+        }
+        assert ahs.cache_info == {}
+        assert ahs.piggybacked_raw_data == {}
+        assert not store.load()
+
     def test_merge_split_raw_sections(
         self, parser: AgentParser, store: SectionStore[Sequence[AgentRawDataSectionElem]]
     ) -> None:
@@ -936,6 +965,44 @@ class TestSNMPParser:
         assert ahs.cache_info == {SectionName("persisted"): (42, 27)}
         assert ahs.piggybacked_raw_data == {}
 
+    def test_sections_are_accessed_lazily(
+        self, parser: SNMPParser, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        accessed: list[SectionName] = []
+
+        class Sections(Mapping[SectionName, StringTable]):
+            def __getitem__(self, key: SectionName) -> StringTable:
+                accessed.append(key)
+                return {SectionName("section_a"): [["a"]], SectionName("section_b"): [["b"]]}[key]
+
+            def __iter__(self) -> Iterator[SectionName]:
+                return iter([SectionName("section_a"), SectionName("section_b")])
+
+            def __len__(self) -> int:
+                return 2
+
+        monkeypatch.setattr(parser, "check_intervals", {SectionName("section_a"): 33})
+        monkeypatch.setattr(
+            SectionStore, "load", lambda self: {SectionName("persisted"): (42, 69, [["content"]])}
+        )
+        monkeypatch.setattr(SectionStore, "store", lambda self, sections: None)
+
+        host_key = HostKey(HostName("hostname"), SourceType.HOST)
+        host_sections = group_by_host(
+            [(host_key, parser.parse(Sections(), selection=NO_SELECTION))], lambda msg: None
+        )[host_key]
+        assert accessed == [SectionName("section_a")]  # to be persisted
+
+        assert host_sections.sections[SectionName("persisted")] == [["content"]]
+        assert accessed == [SectionName("section_a")]
+        assert host_sections.sections[SectionName("section_b")] == [["b"]]
+        assert accessed == [SectionName("section_a"), SectionName("section_b")]
+        assert sorted(host_sections.sections) == [
+            SectionName("persisted"),
+            SectionName("section_a"),
+            SectionName("section_b"),
+        ]
+
 
 class MockStore(SectionStore):
     def __init__(self, path: str | Path, sections: object, *, logger: logging.Logger) -> None:
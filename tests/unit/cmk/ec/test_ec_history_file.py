@@ -6,7 +6,6 @@
 
 import datetime
 import logging
-import shlex
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
@@ -18,13 +17,14 @@ import cmk.ec.export as ec
 from cmk.ec.config import Config
 from cmk.ec.history import _current_history_period
 from cmk.ec.history_file import (
-    _grep_pipeline,
+    _candidate_lines,
     convert_history_line,
     FileHistory,
     parse_history_file,
 )
+from cmk.ec.history_file_index import index_path
 from cmk.ec.main import StatusTableHistory
-from cmk.ec.query import QueryFilter, QueryGET, StatusTable
+from cmk.ec.query import QueryGET, StatusTable
 
 
 def test_file_add_get(history: FileHistory) -> None:
@@ -56,6 +56,62 @@ def test_file_add_get(history: FileHistory) -> None:
     assert row[column_index("event_host")] == "ABC1"
 
 
+def _query(history: FileHistory, *headers: str) -> QueryGET:
+    logger = logging.getLogger("cmk.mkeventd")
+
+    def get_table(name: str) -> StatusTable:
+        assert name == "history"
+        return StatusTableHistory(logger, history)
+
+    return QueryGET(get_table, ["GET history", "Columns: history_line event_id", *headers], logger)
+
+
+def test_file_get_with_index(settings: ec.Settings, history: FileHistory) -> None:
+    for event_id, host in enumerate(["ABC1", "ABC2", "ABC1"], start=1):
+        history.add(event=ec.Event(id=event_id, host=HostName(host)), what="NEW")
+    history.housekeeping()
+    (path,) = settings.paths.history_dir.value.glob("*.log")
+    assert index_path(path).exists()
+
+    # written after the index has been updated
+    history.add(event=ec.Event(id=4, host=HostName("ABC1")), what="NEW")
+
+    column_index = StatusTableHistory(logging.getLogger("cmk.mkeventd"), history).column_names.index
+    assert [
+        (row[column_index("history_line")], row[column_index("event_id")])
+        for row in history.get(_query(history, "Filter: event_host = ABC1"))
+    ] == [(4, 4), (3, 3), (1, 1)]
+    assert [
+        row[column_index("event_id")]
+        for row in history.get(
+            _query(history, "Filter: event_host in ABC1 ABC2", "Filter: event_id = 2")
+        )
+    ] == [2]
+
+    history.flush()
+    assert not index_path(path).exists()
+
+
+def test_file_get_with_text_prefilters(settings: ec.Settings, history: FileHistory) -> None:
+    for event_id, text in enumerate(["foo bar", "Foo", "bar foo", "baz"], start=1):
+        history.add(event=ec.Event(id=event_id, text=text, host=HostName("ABC1")), what="NEW")
+    history.housekeeping()
+    # written after the index has been updated
+    history.add(event=ec.Event(id=5, text="foo", host=HostName("ABC1")), what="NEW")
+
+    column_index = StatusTableHistory(logging.getLogger("cmk.mkeventd"), history).column_names.index
+
+    def event_ids(*headers: str) -> list[object]:
+        return [row[column_index("event_id")] for row in history.get(_query(history, *headers))]
+
+    assert event_ids("Filter: event_text = foo") == [5]
+    assert event_ids("Filter: event_text =~ FOO") == [5, 2]
+    assert event_ids("Filter: event_text ~ ^foo") == [5, 1]
+    assert event_ids("Filter: event_text ~~ foo$") == [5, 3, 2]
+    assert event_ids("Filter: event_text in baz", "Filter: event_host = ABC1") == [4]
+    assert event_ids("Filter: event_contact = foo") == []
+
+
 def test_current_history_period(config: Config) -> None:
     """timestamp of the beginning of the current history period correctly returned."""
     with time_machine.travel(datetime.datetime.fromtimestamp(1550000000.0, tz=ZoneInfo("CET"))):
@@ -89,23 +145,16 @@ def test_history_parse(tmp_path: Path) -> None:
     """
     path = tmp_path / "history_test.log"
     path.write_text(values)
-    filter_ = QueryFilter(
-        column_name="event_id",
-        operator_name="=",
-        predicate=lambda x: True,
-        argument="1",
-    )
-    tac = f"nl -b a {shlex.quote(str(path))} | tac"
-    cmd = " | ".join([tac] + _grep_pipeline([filter_]))
 
     new_entries = parse_history_file(
         StatusTableHistory.columns,
         path,
         lambda x: True,
-        cmd,
+        _candidate_lines(path, {}, (None, None)),
         None,
         logging.getLogger("cmk.mkeventd"),
     )
 
     assert len(new_entries) == 4
+    assert new_entries[0][0] == 4
     assert new_entries[0][1] == 1666942292.3000507
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+from tests.unit.cmk.ec.helpers import new_event
+
+from cmk.utils.hostaddress import HostName
+
+from cmk.ec.event import Event
+from cmk.ec.event_store import EventStore
+from cmk.ec.main import EventStatus
+
+
+def _event(event_id: int, rule_id: str, host: str) -> Event:
+    return new_event({"id": event_id, "rule_id": rule_id, "host": HostName(host)})
+
+
+def test_event_store_lookups() -> None:
+    events = [_event(1, "a", "h1"), _event(2, "b", "h1"), _event(3, "a", "h2")]
+    store = EventStore(events)
+
+    assert len(store) == 3
+    assert store.get(2) is events[1]
+    assert store.get(4) is None
+    assert store.oldest() is events[0]
+    assert store.oldest_of_rule("b") is events[1]
+    assert store.oldest_of_host(HostName("h2")) is events[2]
+    assert store.of_rule("a") == [events[0], events[2]]
+    assert store.of_host(HostName("h1")) == [events[0], events[1]]
+    assert store.all() == events
+
+
+def test_event_store_remove() -> None:
+    events = [_event(1, "a", "h1"), _event(2, "a", "h1")]
+    store = EventStore(events)
+
+    assert store.remove(events[0])
+    assert not store.remove(events[0])
+    # an equal event that is not stored must not remove the stored one
+    assert not store.remove(events[1].copy())
+
+    assert store.all() == [events[1]]
+    assert store.oldest_of_rule("a") is events[1]
+    assert store.oldest_of_host(HostName("h1")) is events[1]
+
+
+def test_event_store_reindex() -> None:
+    event, other = _event(1, "a", "h1"), _event(2, "a", "h2")
+    store = EventStore([event, other])
+
+    event["host"] = HostName("h2")
+    store.reindex(event)
+
+    assert not store.of_host(HostName("h1"))
+    assert store.of_host(HostName("h2")) == [event, other]
+    assert store.remove(event)
+    assert store.of_host(HostName("h2")) == [other]
+
+
+def test_remove_oldest_event_of_host(event_status: EventStatus) -> None:
+    for host in ("h1", "h2", "h1"):
+        event_status.new_event(new_event({"host": HostName(host), "core_host": HostName(host)}))
+
+    event_status.remove_oldest_event("by_host", new_event({"host": HostName("h1")}))
+
+    assert [(e["id"], e["host"]) for e in event_status.events()] == [(2, "h2"), (3, "h1")]
+    assert event_status.num_existing_events_by_host[(HostName("h1"), HostName("h1"))] == 1
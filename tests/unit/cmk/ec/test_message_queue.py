@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+# pylint: disable=protected-access
+
+import logging
+import time
+
+import cmk.ec.export as ec
+from cmk.ec.main import EventServer
+from cmk.ec.message_queue import MessageQueue
+from cmk.ec.perfcounters import Perfcounters
+
+
+def test_message_queue_drops_on_overflow() -> None:
+    perfcounters = Perfcounters(logging.getLogger("cmk.mkeventd.lock.perfcounters"))
+    message_queue = MessageQueue(1, perfcounters)
+
+    assert message_queue.put([b"m1", b"m2"], ("127.0.0.1", 514))
+    assert message_queue.put([], None)
+    assert not message_queue.put([b"m3"], None)
+
+    data = message_queue.get(timeout=0)
+    assert data is not None
+    assert data.messages == [b"m1", b"m2"]
+    assert data.address == ("127.0.0.1", 514)
+    assert not data.is_trap
+    assert message_queue.get(timeout=0) is None
+
+    assert perfcounters._counters["received"] == 2
+    assert perfcounters._counters["queue_drops"] == 1
+    assert "queue_wait" in perfcounters._times
+
+
+def test_event_processor_processes_queue_before_terminating(
+    event_server: EventServer, perfcounters: Perfcounters
+) -> None:
+    event_server._message_queue.put([b"<13>Jan  1 00:00:00 myhost app: some text"], None)
+    event_server._processor.terminate()
+
+    event_server._processor.start()
+    event_server._processor.join(timeout=10)
+
+    assert not event_server._processor.is_alive()
+    assert event_server._message_queue.empty()
+    assert perfcounters._counters["messages"] == 1
+
+
+def test_event_processor_with_parser_processes(
+    settings: ec.Settings, event_server: EventServer, perfcounters: Perfcounters
+) -> None:
+    event_server._processor.settings = settings._replace(
+        options=settings.options._replace(parser_processes=2)
+    )
+    # Enough messages to be parsed by the pool
+    for index in range(40):
+        event_server._message_queue.put(
+            [b"<13>Jan  1 00:00:00 myhost app: text %d" % index for _ in range(index)], None
+        )
+
+    event_server._processor.start()
+    deadline = time.monotonic() + 60
+    while perfcounters._counters["messages"] < 780 and time.monotonic() < deadline:
+        time.sleep(0.1)
+    event_server._processor.terminate()
+    event_server._processor.join(timeout=60)
+
+    assert not event_server._processor.is_alive()
+    assert perfcounters._counters["messages"] == 780
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+# pylint: disable=protected-access
+
+import logging
+from collections.abc import Callable
+
+import pytest
+
+from tests.unit.cmk.ec.helpers import new_event
+
+from cmk.utils.hostaddress import HostName
+
+import cmk.ec.export as ec
+from cmk.ec.config import Config
+from cmk.ec.history_file import FileHistory
+from cmk.ec.main import EventServer, EventStatus
+from cmk.ec.perfcounters import Perfcounters
+
+
+@pytest.fixture(name="restart")
+def fixture_restart(
+    settings: ec.Settings,
+    config: Config,
+    perfcounters: Perfcounters,
+    history: FileHistory,
+    event_server: EventServer,
+) -> Callable[[], EventStatus]:
+    """An event status as it is loaded after a restart"""
+
+    def _restart() -> EventStatus:
+        event_status = EventStatus(
+            settings, config, perfcounters, history, logging.getLogger("cmk.mkeventd.EventStatus")
+        )
+        event_status.load_status(event_server)
+        return event_status
+
+    return _restart
+
+
+@pytest.fixture(name="event_status")
+def fixture_event_status_with_state_dir(
+    settings: ec.Settings, event_status: EventStatus
+) -> EventStatus:
+    settings.paths.status_file.value.parent.mkdir(parents=True, exist_ok=True)
+    return event_status
+
+
+def _new_event(host: str) -> ec.Event:
+    return new_event({"host": HostName(host), "core_host": HostName(host)})
+
+
+def test_save_status_journals_changes(
+    settings: ec.Settings, event_status: EventStatus, restart: Callable[[], EventStatus]
+) -> None:
+    event_status.new_event(_new_event("h1"))
+    event_status.save_status()  # initial snapshot
+    snapshot = settings.paths.status_file.value.read_bytes()
+
+    event_status.new_event(_new_event("h2"))
+    event_status.new_event(_new_event("h3"))
+    event = event_status.event(1)
+    assert event is not None
+    event["comment"] = "changed"
+    event_status.event_changed(event)
+    removed = event_status.event(2)
+    assert removed is not None
+    event_status.remove_event(removed, "DELETE")
+    event_status.save_status()
+
+    assert settings.paths.status_file.value.read_bytes() == snapshot
+    reloaded = restart()
+    assert [(e["id"], e["host"], e["comment"]) for e in reloaded.events()] == [
+        (1, "h1", "changed"),
+        (3, "h3", ""),
+    ]
+    assert reloaded._next_event_id == 4
+
+
+def test_load_status_ignores_stale_journal(
+    settings: ec.Settings, event_status: EventStatus, restart: Callable[[], EventStatus]
+) -> None:
+    event_status.new_event(_new_event("h1"))
+    event_status.save_status()
+    event_status.new_event(_new_event("h2"))
+    event_status.save_status()
+    journal = settings.paths.status_journal_file.value.read_bytes()
+
+    # A new snapshot has been written, but the journal was not reset
+    event_status.flush()
+    event_status.save_status()
+    settings.paths.status_journal_file.value.write_bytes(journal)
+
+    assert not restart().events()
+
+
+def test_load_status_ignores_truncated_journal_entry(
+    settings: ec.Settings, event_status: EventStatus, restart: Callable[[], EventStatus]
+) -> None:
+    event_status.save_status()
+    event_status.new_event(_new_event("h1"))
+    event_status.save_status()
+    with settings.paths.status_journal_file.value.open("ab") as f:
+        f.write(b"('event', {'id': 2, 'ho")
+
+    reloaded = restart()
+
+    assert [e["id"] for e in reloaded.events()] == [1]
+    assert reloaded._next_event_id == 2
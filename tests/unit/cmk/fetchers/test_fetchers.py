@@ -6,9 +6,11 @@
 # pylint: disable=protected-access
 from __future__ import annotations
 
+import json
 import os
 import socket
-from collections.abc import Sequence, Sized
+import threading
+from collections.abc import Mapping, Sequence, Sized
 from pathlib import Path
 from typing import Generic, NamedTuple, NoReturn, TypeAlias, TypeVar
 
@@ -175,6 +177,66 @@ class TestAgentFileCache_and_SNMPFileCache:
         assert file_cache.read(mode) is None
 
 
+class TestSNMPFileCache:
+    @pytest.fixture
+    def path(self, tmp_path: Path) -> Path:
+        return tmp_path / "database"
+
+    @pytest.fixture
+    def file_cache(self, path: Path) -> SNMPFileCache:
+        return SNMPFileCache(
+            path_template=str(path),
+            max_age=MaxAge.unlimited(),
+            simulation=False,
+            use_only_cache=False,
+            file_cache_mode=FileCacheMode.READ_WRITE,
+        )
+
+    @pytest.fixture
+    def raw_data(self) -> SNMPRawData:
+        return {
+            SectionName("one"): [[["1", "b\xe4h"], ["2", "\udcff"]]],
+            SectionName("two"): [[], [[0, 255]]],
+        }
+
+    def test_read_write(self, file_cache: SNMPFileCache, raw_data: SNMPRawData) -> None:
+        file_cache.write(raw_data, Mode.CHECKING)
+
+        cached = file_cache.read(Mode.CHECKING)
+
+        assert cached == raw_data
+        assert list(cached or {}) == list(raw_data)
+
+    def test_read_decodes_accessed_sections_only(
+        self, file_cache: SNMPFileCache, raw_data: SNMPRawData, monkeypatch: MonkeyPatch
+    ) -> None:
+        file_cache.write(raw_data, Mode.CHECKING)
+        cached = file_cache.read(Mode.CHECKING)
+        assert isinstance(cached, Mapping)
+
+        decoded: list[str | bytes] = []
+        json_loads = json.loads
+
+        def counting_loads(s: str | bytes) -> object:
+            decoded.append(s)
+            return json_loads(s)
+
+        monkeypatch.setattr(json, "loads", counting_loads)
+
+        assert len(cached) == 2
+        assert SectionName("one") in cached
+        assert cached[SectionName("two")] == raw_data[SectionName("two")]
+        assert cached[SectionName("two")] == raw_data[SectionName("two")]
+        assert len(decoded) == 1
+
+    def test_read_legacy_format(
+        self, file_cache: SNMPFileCache, path: Path, raw_data: SNMPRawData
+    ) -> None:
+        path.write_text(repr({str(k): v for k, v in raw_data.items()}) + "\n")
+
+        assert file_cache.read(Mode.CHECKING) == raw_data
+
+
 _TRawData = TypeVar("_TRawData", bound=Sized)
 
 
@@ -294,6 +356,14 @@ class TestProgramFetcher:
     def test_repr(self, fetcher: ProgramFetcher) -> None:
         assert isinstance(repr(fetcher), str)
 
+    def test_interrupt_ends_blocked_fetch(self) -> None:
+        with ProgramFetcher(cmdline="sleep 60", stdin=None, is_cmc=True) as fetcher:
+            timer = threading.Timer(0.1, fetcher.interrupt)
+            timer.start()
+            with pytest.raises(MKFetcherError):
+                fetcher.fetch(Mode.CHECKING)
+            timer.join()
+
 
 class TestSNMPPluginStore:
     @pytest.fixture
@@ -838,6 +908,29 @@ class TestTCPFetcher:
 
         assert isinstance(raw_data.error, MKFetcherError)
 
+    def test_interrupt_ends_blocked_fetch(self, tmp_path: Path) -> None:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as silent:
+            silent.bind(("127.0.0.1", 0))
+            silent.listen()
+            with TCPFetcher(
+                family=socket.AF_INET,
+                address=(HostAddress("127.0.0.1"), silent.getsockname()[1]),
+                host_name=HostName("irrelevant_for_this_test"),
+                timeout=1.0,
+                encryption_handling=TCPEncryptionHandling.ANY_AND_PLAIN,
+                pre_shared_secret=None,
+                tls_config=TLSConfig(
+                    cas_dir=tmp_path,
+                    ca_store=tmp_path,
+                    site_crt=tmp_path,
+                ),
+            ) as fetcher:
+                timer = threading.Timer(0.1, fetcher.interrupt)
+                timer.start()
+                with pytest.raises(MKFetcherError):
+                    fetcher.fetch(Mode.CHECKING)
+                timer.join()
+
 
 class TestFetcherCaching:
     @pytest.fixture
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+# pylint: disable=protected-access
+
+import bisect
+import dataclasses
+import logging
+import socket
+import threading
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+import pytest
+
+from cmk.utils.hostaddress import HostAddress, HostName
+
+from cmk.snmplib import (
+    BackendOIDSpec,
+    BackendSNMPTree,
+    get_snmp_table,
+    SNMPBackendEnum,
+    SNMPHostConfig,
+    SNMPVersion,
+    SpecialColumn,
+)
+
+from cmk.fetchers.snmp import make_backend
+from cmk.fetchers.snmp_backend import _ber as ber
+from cmk.fetchers.snmp_backend import ClassicSNMPBackend, PythonSNMPBackend
+
+from cmk.ccc.exceptions import MKSNMPError
+
+_IF_TABLE = ".1.3.6.1.2.1.2.2.1"
+
+_MIB = {
+    ber.parse_oid(".1.3.6.1.2.1.1.1.0"): (ber.OCTET_STRING, b"Simulated switch"),
+    ber.parse_oid(".1.3.6.1.2.1.1.3.0"): (ber.TIME_TICKS, (123456).to_bytes(3, "big")),
+    **{
+        ber.parse_oid(f"{_IF_TABLE}.1.{index}"): (ber.INTEGER, bytes((index,)))
+        for index in range(1, 49)
+    },
+    **{
+        ber.parse_oid(f"{_IF_TABLE}.2.{index}"): (ber.OCTET_STRING, b"Port %d" % index)
+        for index in range(1, 49)
+    },
+    # Some devices omit entries of some columns
+    **{
+        ber.parse_oid(f"{_IF_TABLE}.10.{index}"): (ber.COUNTER32, (index * 1000).to_bytes(4, "big"))
+        for index in range(1, 49)
+        if index != 5
+    },
+    ber.parse_oid(".1.3.6.1.2.1.4.20.1.1.10.0.0.1"): (ber.IP_ADDRESS, bytes((10, 0, 0, 1))),
+}
+
+
+class SimulatedAgent:
+    """Answers the SNMP requests for the OIDs in `_MIB`"""
+
+    def __init__(self, *, max_varbinds: int = 10000) -> None:
+        self.max_varbinds = max_varbinds
+        self.requests: list[ber.Message] = []
+        self._oids = sorted(_MIB)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.settimeout(0.05)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve)
+
+    @property
+    def port(self) -> int:
+        return self._socket.getsockname()[1]
+
+    def __enter__(self) -> "SimulatedAgent":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._socket.close()
+
+    def _serve(self) -> None:
+        while not self._stop.is_set():
+            try:
+                data, address = self._socket.recvfrom(65535)
+            except TimeoutError:
+                continue
+            request = ber.decode_message(data)
+            self.requests.append(request)
+            self._socket.sendto(ber.encode_message(self._respond(request)), address)
+
+    def _respond(self, request: ber.Message) -> ber.Message:
+        error_status, error_index, varbinds = 0, 0, []
+        oids = [varbind.oid for varbind in request.varbinds]
+        if request.pdu_type == ber.GET_REQUEST:
+            varbinds = [
+                (
+                    ber.VarBind(oid, *_MIB[oid])
+                    if oid in _MIB
+                    else self._end(oid, ber.NO_SUCH_INSTANCE)
+                )
+                for oid in oids
+            ]
+        elif request.pdu_type == ber.GET_NEXT_REQUEST:
+            varbinds = [self._next(oid) for oid in oids]
+        elif request.pdu_type == ber.GET_BULK_REQUEST:
+            non_repeaters, max_repetitions = request.error_status, request.error_index
+            varbinds = [self._next(oid) for oid in oids[:non_repeaters]]
+            repeaters = oids[non_repeaters:]
+            for _repetition in range(max_repetitions):
+                row = [self._next(oid) for oid in repeaters]
+                varbinds.extend(row)
+                repeaters = [varbind.oid for varbind in row]
+
+        if request.version == 0:
+            # SNMP v1 has no exceptions, but errors
+            for index, varbind in enumerate(varbinds, start=1):
+                if varbind.tag in (ber.NO_SUCH_INSTANCE, ber.END_OF_MIB_VIEW):
+                    error_status, error_index = ber.NO_SUCH_NAME, index
+                    break
+        if len(varbinds) > self.max_varbinds:
+            error_status = ber.TOO_BIG
+
+        return request._replace(
+            pdu_type=ber.RESPONSE,
+            error_status=error_status,
+            error_index=error_index,
+            varbinds=request.varbinds if error_status else varbinds,
+        )
+
+    def _next(self, oid: tuple[int, ...]) -> ber.VarBind:
+        position = bisect.bisect_right(self._oids, oid)
+        if position == len(self._oids):
+            return self._end(oid, ber.END_OF_MIB_VIEW)
+        next_oid = self._oids[position]
+        return ber.VarBind(next_oid, *_MIB[next_oid])
+
+    @staticmethod
+    def _end(oid: tuple[int, ...], tag: int) -> ber.VarBind:
+        return ber.VarBind(oid, tag, b"")
+
+
+def _snmp_config(
+    port: int,
+    *,
+    snmp_version: SNMPVersion = SNMPVersion.V2C,
+    bulkwalk_enabled: bool = True,
+    timing: dict | None = None,
+) -> SNMPHostConfig:
+    return SNMPHostConfig(
+        is_ipv6_primary=False,
+        hostname=HostName("switch"),
+        ipaddress=HostAddress("127.0.0.1"),
+        credentials="public",
+        port=port,
+        snmp_version=snmp_version,
+        bulkwalk_enabled=bulkwalk_enabled,
+        bulk_walk_size_of=10,
+        timing={"timeout": 1, "retries": 1} if timing is None else timing,
+        oid_range_limits={},
+        snmpv3_contexts=[],
+        character_encoding=None,
+        snmp_backend=SNMPBackendEnum.PYTHON,
+    )
+
+
+@pytest.fixture(name="agent")
+def fixture_agent() -> Iterator[SimulatedAgent]:
+    with SimulatedAgent() as agent:
+        yield agent
+
+
+def _expected_walk(oid: str) -> Sequence[tuple[str, bytes]]:
+    root = ber.parse_oid(oid)
+    return [
+        (ber.format_oid(mib_oid), value)
+        for mib_oid in sorted(_MIB)
+        if mib_oid[: len(root)] == root
+        and (value := ber.raw_value(ber.VarBind(mib_oid, *_MIB[mib_oid]))) is not None
+    ]
+
+
+def test_encode_get_request() -> None:
+    assert ber.encode_message(
+        ber.Message(
+            version=0,
+            community=b"public",
+            pdu_type=ber.GET_REQUEST,
+            request_id=1,
+            error_status=0,
+            error_index=0,
+            varbinds=[ber.VarBind(ber.parse_oid(".1.3.6.1.2.1.1.1.0"), ber.NULL, b"")],
+        )
+    ) == bytes.fromhex(
+        "302602010004067075626c6963a019020101020100020100300e300c06082b060102010101000500"
+    )
+
+
+def test_decode_long_message() -> None:
+    message = ber.Message(
+        version=1,
+        community=b"public",
+        pdu_type=ber.RESPONSE,
+        request_id=2**31 - 1,
+        error_status=0,
+        error_index=0,
+        varbinds=[
+            ber.VarBind((1, 3, 6, 1, 4, 1, 2**32 - 1, index), ber.OCTET_STRING, b"x" * 300)
+            for index in range(3)
+        ],
+    )
+    assert ber.decode_message(ber.encode_message(message)) == message
+
+
+def test_decode_truncated_message() -> None:
+    with pytest.raises(ValueError):
+        ber.decode_message(
+            ber.encode_message(ber.Message(1, b"public", ber.RESPONSE, 1, 0, 0, []))[:-1]
+        )
+
+
+@pytest.mark.parametrize(
+    "varbind, expected",
+    [
+        (ber.VarBind((), ber.INTEGER, b"\xff"), b"-1"),
+        (ber.VarBind((), ber.COUNTER32, b"\x00\xff\xff\xff\xff"), b"4294967295"),
+        (ber.VarBind((), ber.OCTET_STRING, b"\xb2\xe0},M\x15"), b"\xb2\xe0},M\x15"),
+        (
+            ber.VarBind((), ber.OBJECT_IDENTIFIER, b"\x2b\x06\x01\x04\x01\x89\x0c"),
+            b".1.3.6.1.4.1.1164",
+        ),
+        (ber.VarBind((), ber.IP_ADDRESS, bytes((10, 0, 0, 1))), b"10.0.0.1"),
+        (ber.VarBind((), ber.NULL, b""), b""),
+        (ber.VarBind((), ber.NO_SUCH_OBJECT, b""), None),
+    ],
+)
+def test_raw_value(varbind: ber.VarBind, expected: bytes | None) -> None:
+    assert ber.raw_value(varbind) == expected
+
+
+@pytest.mark.parametrize(
+    "snmp_version, bulkwalk_enabled, expected_requests",
+    [
+        # One request per row, SNMP v1 needs one more to find the end of the last column
+        (SNMPVersion.V1, True, 50),
+        (SNMPVersion.V2C, False, 49),
+        # One request per ten rows
+        (SNMPVersion.V2C, True, 5),
+    ],
+)
+def test_walk_columns(
+    agent: SimulatedAgent,
+    snmp_version: SNMPVersion,
+    bulkwalk_enabled: bool,
+    expected_requests: int,
+) -> None:
+    columns = [f"{_IF_TABLE}.1", f"{_IF_TABLE}.2", f"{_IF_TABLE}.10", ".1.3.6.1.2.1.4"]
+    backend = PythonSNMPBackend(
+        _snmp_config(agent.port, snmp_version=snmp_version, bulkwalk_enabled=bulkwalk_enabled),
+        logging.getLogger("test"),
+    )
+
+    assert backend.walk_columns(columns, context="") == [
+        _expected_walk(column) for column in columns
+    ]
+    assert len(agent.requests) == expected_requests
+    backend.close()
+
+
+@pytest.mark.parametrize("snmp_version", [SNMPVersion.V1, SNMPVersion.V2C])
+def test_walk_scalar(agent: SimulatedAgent, snmp_version: SNMPVersion) -> None:
+    backend = PythonSNMPBackend(
+        _snmp_config(agent.port, snmp_version=snmp_version), logging.getLogger("test")
+    )
+
+    # Like Net-SNMP: the OID itself if there is nothing below it
+    assert backend.walk_columns(
+        [".1.3.6.1.2.1.1.1.0", ".1.3.6.1.2.1.1.3", ".1.3.6.1.2.1.1.2.0"], context=""
+    ) == [
+        [(".1.3.6.1.2.1.1.1.0", b"Simulated switch")],
+        [(".1.3.6.1.2.1.1.3.0", b"123456")],
+        [],
+    ]
+    backend.close()
+
+
+def test_walk_reduces_repetitions_if_response_too_big() -> None:
+    with SimulatedAgent(max_varbinds=8) as agent:
+        backend = PythonSNMPBackend(_snmp_config(agent.port), logging.getLogger("test"))
+        assert backend.walk(f"{_IF_TABLE}.2", context="") == _expected_walk(f"{_IF_TABLE}.2")
+        assert [request.error_index for request in agent.requests[:3]] == [10, 5, 5]
+        backend.close()
+
+
+def test_get_snmp_table(agent: SimulatedAgent) -> None:
+    backend = PythonSNMPBackend(_snmp_config(agent.port), logging.getLogger("test"))
+
+    table = get_snmp_table(
+        section_name=None,
+        tree=BackendSNMPTree(
+            base=_IF_TABLE,
+            oids=[
+                BackendOIDSpec(SpecialColumn.END, "string", False),
+                BackendOIDSpec("2", "string", False),
+                BackendOIDSpec("10", "string", False),
+            ],
+        ),
+        walk_cache={},
+        backend=backend,
+        log=lambda msg: None,
+    )
+
+    assert table == [
+        [str(index), f"Port {index}", "" if index == 5 else str(index * 1000)]
+        for index in range(1, 49)
+    ]
+    # Both columns with the same requests
+    assert len(agent.requests) == 5
+    backend.close()
+
+
+@pytest.mark.parametrize("snmp_version", [SNMPVersion.V1, SNMPVersion.V2C])
+def test_get(agent: SimulatedAgent, snmp_version: SNMPVersion) -> None:
+    backend = PythonSNMPBackend(
+        _snmp_config(agent.port, snmp_version=snmp_version), logging.getLogger("test")
+    )
+    assert backend.get(".1.3.6.1.2.1.1.1.0", context="") == b"Simulated switch"
+    assert backend.get(".1.3.6.1.2.1.1.3.*", context="") == b"123456"
+    assert backend.get(".1.3.6.1.2.1.1.2.0", context="") is None
+    assert backend.get(".1.3.6.1.2.1.1.2.*", context="") is None
+    backend.close()
+
+
+@pytest.mark.parametrize(
+    "snmp_version, expected_requests",
+    [
+        # SNMP v1 asks again without the unknown OID
+        (SNMPVersion.V1, 3),
+        (SNMPVersion.V2C, 2),
+    ],
+)
+def test_get_many(agent: SimulatedAgent, snmp_version: SNMPVersion, expected_requests: int) -> None:
+    backend = PythonSNMPBackend(
+        _snmp_config(agent.port, snmp_version=snmp_version), logging.getLogger("test")
+    )
+    assert backend.get_many(
+        [
+            ".1.3.6.1.2.1.1.1.0",
+            ".1.3.6.1.2.1.1.3.*",
+            ".1.3.6.1.2.1.1.2.0",
+            f"{_IF_TABLE}.2.7",
+            ".1.3.6.1.2.1.1.2.*",
+        ],
+        context="",
+    ) == [b"Simulated switch", b"123456", None, b"Port 7", None]
+    assert len(agent.requests) == expected_requests
+    backend.close()
+
+
+def test_get_many_splits_request_if_response_too_big() -> None:
+    with SimulatedAgent(max_varbinds=2) as agent:
+        backend = PythonSNMPBackend(_snmp_config(agent.port), logging.getLogger("test"))
+        oids = [f"{_IF_TABLE}.1.{index}" for index in range(1, 6)]
+        assert backend.get_many(oids, context="") == [b"%d" % index for index in range(1, 6)]
+        assert [len(request.varbinds) for request in agent.requests] == [5, 2, 2, 1]
+        backend.close()
+
+
+def test_get_many_raises_on_error_response() -> None:
+    class FailingAgent(SimulatedAgent):
+        def _respond(self, request: ber.Message) -> ber.Message:
+            return super()._respond(request)._replace(error_status=ber.GEN_ERR, error_index=1)
+
+    with FailingAgent() as agent:
+        backend = PythonSNMPBackend(_snmp_config(agent.port), logging.getLogger("test"))
+        with pytest.raises(MKSNMPError):
+            backend.get_many([".1.3.6.1.2.1.1.1.0", f"{_IF_TABLE}.2.7"], context="")
+        backend.close()
+
+
+def test_walk_timeout() -> None:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as silent:
+        silent.bind(("127.0.0.1", 0))
+        backend = PythonSNMPBackend(
+            _snmp_config(silent.getsockname()[1], timing={"timeout": 0.05, "retries": 1}),
+            logging.getLogger("test"),
+        )
+        with pytest.raises(MKSNMPError, match="Timeout"):
+            backend.walk(f"{_IF_TABLE}.2", context="")
+        assert backend.get(".1.3.6.1.2.1.1.1.0", context="") is None
+        backend.close()
+
+
+def test_make_backend_snmpv3_uses_classic_backend(tmp_path: Path) -> None:
+    snmp_config = _snmp_config(161)
+    assert isinstance(
+        make_backend(snmp_config, logging.getLogger("test"), stored_walk_path=tmp_path),
+        PythonSNMPBackend,
+    )
+    assert isinstance(
+        make_backend(
+            dataclasses.replace(
+                snmp_config,
+                snmp_version=SNMPVersion.V3,
+                credentials=("noAuthNoPriv", "user"),
+            ),
+            logging.getLogger("test"),
+            stored_walk_path=tmp_path,
+        ),
+        ClassicSNMPBackend,
+    )
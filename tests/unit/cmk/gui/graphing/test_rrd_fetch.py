@@ -48,9 +48,10 @@ def _setup_livestatus(mock_livestatus: MockLiveStatusConnection) -> Iterator[Non
         )
         mock_live.expect_query(
             """GET services
-Columns: rrddata:temp:temp.max:1681985455:1681999855:20
+Columns: host_name service_description rrddata:temp:temp.max:1681985455:1681999855:20
 Filter: host_name = my-host
 Filter: service_description = Temperature Zone 6
+And: 2
 ColumnHeaders: off
 
             """,
@@ -136,6 +137,89 @@ def test_fetch_rrd_data_for_graph_with_conversion(
         }
 
 
+def test_fetch_rrd_data_for_graph_of_several_services(
+    mock_livestatus: MockLiveStatusConnection,
+    request_context: None,
+) -> None:
+    graph_recipe = _GRAPH_RECIPE.model_copy(
+        update={
+            "metrics": [
+                _GRAPH_RECIPE.metrics[0].model_copy(
+                    update={
+                        "operation": MetricOpRRDSource(
+                            site_id=SiteId("NO_SITE"),
+                            host_name=HostName("my-host"),
+                            service_name=service_name,
+                            metric_name="temp",
+                            consolidation_func_name="max",
+                            scale=1,
+                        )
+                    }
+                )
+                for service_name in ("Temperature Zone 6", "Temperature Zone 7", "Missing")
+            ]
+        }
+    )
+    with mock_livestatus(expect_status_query=True) as mock_live:
+        mock_live.add_table(
+            "services",
+            [
+                {
+                    "host_name": "my-host",
+                    "service_description": "Temperature Zone 6",
+                    "rrddata:temp:temp.max:1681985455:1681999855:20": [1, 2, 3, 4, 5, None],
+                },
+                {
+                    "host_name": "my-host",
+                    "service_description": "Temperature Zone 7",
+                    "rrddata:temp:temp.max:1681985455:1681999855:20": [1, 2, 3, 6, 7, 8],
+                },
+            ],
+        )
+        mock_live.expect_query(
+            """GET services
+Columns: host_name service_description rrddata:temp:temp.max:1681985455:1681999855:20
+Filter: host_name = my-host
+Filter: service_description = Missing
+And: 2
+Filter: host_name = my-host
+Filter: service_description = Temperature Zone 6
+And: 2
+Filter: host_name = my-host
+Filter: service_description = Temperature Zone 7
+And: 2
+Or: 3
+ColumnHeaders: off
+
+            """,
+            sites=["NO_SITE"],
+        )
+        assert fetch_rrd_data_for_graph(graph_recipe, _GRAPH_DATA_RANGE) == {
+            RRDDataKey(
+                SiteId("NO_SITE"),
+                HostName("my-host"),
+                "Temperature Zone 6",
+                "temp",
+                "max",
+                1,
+            ): TimeSeries(
+                [4, 5, None],
+                time_window=(1, 2, 3),
+            ),
+            RRDDataKey(
+                SiteId("NO_SITE"),
+                HostName("my-host"),
+                "Temperature Zone 7",
+                "temp",
+                "max",
+                1,
+            ): TimeSeries(
+                [6, 7, 8],
+                time_window=(1, 2, 3),
+            ),
+        }
+
+
 def test_translate_and_merge_rrd_columns() -> None:
     assert translate_and_merge_rrd_columns(
         MetricName("my_metric"),
@@ -7,7 +7,11 @@ from typing import Literal
 
 import pytest
 
-from cmk.gui.graphing._timeseries import time_series_math
+from cmk.gui.graphing._timeseries import (
+    op_func_wrapper,
+    time_series_math,
+    time_series_operators,
+)
 from cmk.gui.graphing._type_defs import Operators
 from cmk.gui.time_series import TimeSeries
 
@@ -29,3 +33,65 @@ def test__time_series_math_exc_symbol(args: tuple[Literal["%"], list[TimeSeries]
 def test__time_series_math_stable_singles(operator: Operators) -> None:
     test_ts = TimeSeries([0, 180, 60, 6, 5, 10, None, -2, -3.14])
     assert time_series_math(operator, [test_ts]) == test_ts
+
+
+@pytest.mark.parametrize("operator", ["+", "*", "-", "/", "MAX", "MIN", "AVERAGE", "MERGE"])
+def test__time_series_math_equals_point_wise_computation(operator: Operators) -> None:
+    operands = [
+        TimeSeries([0.1, 7, 0.2, None, 1e308, -0.0, 5, 3, None, 2], time_window=(0, 100, 10)),
+        TimeSeries([0.2, 0.5, None, 4, 1e308, 0.0, 0, 1, None], time_window=(0, 90, 10)),
+    ]
+    if operator not in ("-", "/"):
+        operands.append(
+            TimeSeries([0.3, 1, -0.3, 8, -1e308, 0.0, 2.5, 3, 1], time_window=(0, 90, 10))
+        )
+    _op_title, op_func = time_series_operators()[operator]
+
+    result = time_series_math(operator, operands)
+
+    assert result is not None
+    assert result.values == [op_func_wrapper(op_func, list(points)) for points in zip(*operands)]
+    assert [type(v) for v in result.values] == [
+        type(op_func_wrapper(op_func, list(points))) for points in zip(*operands)
+    ]
+
+
+@pytest.mark.parametrize(
+    "operator, operands, expected",
+    [
+        pytest.param("+", [[2**53], [1]], [2**53 + 1], id="sum-beyond-float-precision"),
+        pytest.param("*", [[2**40], [2**40]], [2**80], id="product-beyond-int64"),
+        pytest.param("-", [[2**63 + 5], [5]], [2**63], id="difference-of-huge-ints"),
+        pytest.param("MAX", [[2**53 + 1], [2**53]], [2**53 + 1], id="max-of-huge-ints"),
+        pytest.param("*", [[0], [-3], [-1.5]], [-0.0], id="zero-int-product"),
+    ],
+)
+def test__time_series_math_large_ints(
+    operator: Operators, operands: list[list[int | float]], expected: list[int | float]
+) -> None:
+    time_series = [TimeSeries(values, time_window=(0, 10, 10)) for values in operands]
+
+    result = time_series_math(operator, time_series)
+
+    assert result is not None
+    # Compare the types and the signs of zeros, too
+    assert [repr(v) for v in result.values] == [repr(v) for v in expected]
+
+
+@pytest.mark.parametrize("operator", ["+", "*", "-", "/", "MAX", "MIN", "AVERAGE", "MERGE"])
+def test__time_series_math_nan_like_point_wise_computation(operator: Operators) -> None:
+    nan = float("nan")
+    operands = [
+        TimeSeries([nan, 1.0, nan, None, 2, nan], time_window=(0, 60, 10)),
+        TimeSeries([1.0, nan, None, nan, nan, -1], time_window=(0, 60, 10)),
+    ]
+    if operator not in ("-", "/"):
+        operands.append(TimeSeries([3, 0.5, 2.0, nan, 1, None], time_window=(0, 60, 10)))
+    _op_title, op_func = time_series_operators()[operator]
+
+    result = time_series_math(operator, operands)
+
+    assert result is not None
+    assert [repr(v) for v in result.values] == [
+        repr(op_func_wrapper(op_func, list(points))) for points in zip(*operands)
+    ]
@@ -6,7 +6,13 @@
 
 import pytest
 
-from cmk.gui.time_series import rrd_timestamps, TimeSeries, TimeSeriesValues, TimeWindow
+from cmk.gui.time_series import (
+    MaskedValues,
+    rrd_timestamps,
+    TimeSeries,
+    TimeSeriesValues,
+    TimeWindow,
+)
 
 
 @pytest.mark.parametrize(
@@ -101,3 +107,20 @@ class TestTimeseries:
             ).count(None)
             == 2
         )
+
+
+def test_masked_values_roundtrip() -> None:
+    values: TimeSeriesValues = [1, None, 2.5, -0.0, 3]
+    masked_values = MaskedValues.from_list(values)
+    assert len(masked_values) == 5
+    assert masked_values.to_list() == values
+    assert [type(v) for v in masked_values.to_list()] == [type(v) for v in values]
+
+
+def test_time_series_from_masked_values() -> None:
+    masked_values = MaskedValues.from_list([1, None, 2.5])
+    time_series = TimeSeries.from_masked_values(masked_values, (10, 40, 10))
+    assert time_series.masked_values() is masked_values
+    assert len(time_series) == 3
+    assert time_series.twindow == (10, 40, 10)
+    assert time_series.values == [1, None, 2.5]
@@ -575,6 +575,34 @@ def test_subfolder_creation() -> None:
     assert len(folder._subfolders) == 1
 
 
+def test_search_folder_uses_host_attribute_index() -> None:
+    root = folder_tree().root_folder()
+    subfolder = root.create_subfolder("sub", "Sub", {})
+    root.create_hosts([(HostName("host-1"), {"alias": "alias 1"}, None)])
+    subfolder.create_hosts([(HostName("host-2"), {"alias": "alias 2"}, None)])
+
+    indexed = hosts_and_folders.HostAttributeIndex().load(subfolder)
+    assert indexed is not None
+    assert indexed[1][HostName("host-2")]["alias"] == "alias 2"
+
+    folder_tree().invalidate_caches()
+    root = folder_tree().root_folder()
+    search_folder = hosts_and_folders.SearchFolder(
+        folder_tree(), root, {".name": None, "alias": "alias 2"}
+    )
+    assert list(search_folder.hosts()) == ["host-2"]
+    # No host of the root folder matches the index, so its hosts were not loaded
+    assert root._hosts is None
+
+    host = root.host(HostName("host-1"))
+    assert host is not None
+    host.edit({"alias": "alias 2"}, None)
+    search_folder = hosts_and_folders.SearchFolder(
+        folder_tree(), folder_tree().root_folder(), {".name": None, "alias": "alias 2"}
+    )
+    assert sorted(search_folder.hosts()) == ["host-1", "host-2"]
+
+
 def test_match_item_generator_hosts() -> None:
     assert list(
         hosts_and_folders.MatchItemGeneratorHosts(
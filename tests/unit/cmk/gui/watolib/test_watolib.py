@@ -94,6 +94,7 @@ def test_registered_configvars() -> None:
         "bulk_discovery_default_settings",
         "check_mk_perfdata_with_times",
         "cluster_max_cachefile_age",
+        "concurrent_source_fetching",
         "crash_report_target",
         "crash_report_url",
         "custom_service_attributes",
@@ -156,6 +157,7 @@ def test_registered_configvars() -> None:
         "retention_interval",
         "rrdcached_tuning",
         "rule_optimizer",
+        "ruleset_matching_cache",
         "ruleset_matching_stats",
         "selection_livetime",
         "service_view_grouping",
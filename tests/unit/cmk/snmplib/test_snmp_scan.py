@@ -5,8 +5,10 @@
 
 # pylint: disable=protected-access, redefined-outer-name
 
+import dataclasses
 import logging
-from collections.abc import Iterator
+import threading
+from collections.abc import Iterator, Sequence
 from pathlib import Path
 
 import pytest
@@ -258,3 +260,207 @@ def test_gather_available_raw_section_names_defaults(backend: SNMPBackend, tmp_p
         SectionName("snmp_info"),
         SectionName("snmp_uptime"),
     }
+
+
+@pytest.mark.parametrize(
+    "detect_spec, expected",
+    [
+        # decided by the system object
+        ([[(snmp_scan.OID_SYS_OBJ, "other.*", True), (".1.2.3.0", ".*", True)]], set()),
+        ([[(snmp_scan.OID_SYS_OBJ, "sys.*", True), (".1.2.3.0", ".*", True)]], {".1.2.3.0"}),
+        (
+            [
+                [(snmp_scan.OID_SYS_OBJ, "other.*", True), (".1.2.3.0", ".*", True)],
+                [(snmp_scan.OID_SYS_DESCR, "sys.*", True), (".1.2.4.0", ".*", True)],
+            ],
+            {".1.2.4.0"},
+        ),
+        # true by the second alternative
+        (
+            [
+                [(".1.2.3.0", ".*", True)],
+                [(snmp_scan.OID_SYS_DESCR, "sys.*", True)],
+            ],
+            set(),
+        ),
+    ],
+)
+def test_undecided_oids(detect_spec: list[list[tuple[str, str, bool]]], expected: set[str]) -> None:
+    assert (
+        snmp_scan._undecided_oids(
+            detect_spec,
+            {snmp_scan.OID_SYS_DESCR: "sys description", snmp_scan.OID_SYS_OBJ: "sys object"},
+        )
+        == expected
+    )
+
+
+def test_snmp_scan_reuses_result_of_same_fingerprint(tmp_path: Path) -> None:
+    requested: list[Sequence[OID]] = []
+
+    class Backend(SNMPBackend):
+        def get(self, /, oid, *, context):
+            return {
+                snmp_scan.OID_SYS_DESCR: b"sys description",
+                snmp_scan.OID_SYS_OBJ: b"sys object",
+                ".1.2.3.0": b"exists",
+            }.get(oid)
+
+        def get_many(self, /, oids, *, context):
+            requested.append(oids)
+            return super().get_many(oids, context=context)
+
+        def walk(self, /, oid, *, context, **kw):
+            raise NotImplementedError("walk")
+
+    sections = [
+        (
+            SectionName("found"),
+            [[(snmp_scan.OID_SYS_OBJ, "sys.*", True), (".1.2.3.0", ".*", True)]],
+        ),
+        (
+            SectionName("missing"),
+            [[(snmp_scan.OID_SYS_DESCR, "sys.*", True), (".1.2.4.0", ".*", True)]],
+        ),
+        (
+            SectionName("other"),
+            [[(snmp_scan.OID_SYS_OBJ, "other.*", True), (".1.2.5.0", ".*", True)]],
+        ),
+    ]
+    scan_config = snmp_scan.SNMPScanConfig(
+        on_error=OnError.RAISE,
+        missing_sys_description=False,
+        oid_cache_dir=tmp_path,
+    )
+
+    try:
+        for host_name in ("host1", "host2"):
+            assert snmp_scan._snmp_scan(
+                sections,
+                scan_config=scan_config,
+                backend=Backend(
+                    dataclasses.replace(SNMPConfig, hostname=HostName(host_name)), logger
+                ),
+            ) == {SectionName("found")}
+    finally:
+        snmp_cache._clear_other_hosts_oid_cache(None)
+
+    # All OIDs with one call for the first host, nothing for the second one
+    assert requested == [[".1.2.3.0", ".1.2.4.0"]]
+
+
+class _ScanBackend(SNMPBackend):
+    def get(self, /, oid, *, context):
+        return {
+            snmp_scan.OID_SYS_DESCR: b"sys description",
+            snmp_scan.OID_SYS_OBJ: b"sys object",
+            ".1.2.3.0": b"exists",
+        }.get(oid)
+
+    def walk(self, /, oid, *, context, **kw):
+        raise NotImplementedError("walk")
+
+
+_SCAN_SECTIONS = [
+    (
+        SectionName("found"),
+        [[(snmp_scan.OID_SYS_OBJ, "sys.*", True), (".1.2.3.0", ".*", True)]],
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "get_many_fails, use_cached_scan_result, expected_scans",
+    [
+        pytest.param(False, True, 1, id="reused"),
+        pytest.param(True, True, 2, id="incomplete scan"),
+        pytest.param(False, False, 2, id="explicit rescan"),
+    ],
+)
+def test_snmp_scan_result_reuse(
+    tmp_path: Path, get_many_fails: bool, use_cached_scan_result: bool, expected_scans: int
+) -> None:
+    requested: list[Sequence[OID]] = []
+
+    class Backend(_ScanBackend):
+        def get_many(self, /, oids, *, context):
+            requested.append(oids)
+            if get_many_fails:
+                raise MKSNMPError("genErr")
+            return super().get_many(oids, context=context)
+
+    scan_config = snmp_scan.SNMPScanConfig(
+        on_error=OnError.RAISE,
+        missing_sys_description=False,
+        oid_cache_dir=tmp_path,
+        use_cached_scan_result=use_cached_scan_result,
+    )
+
+    try:
+        for host_name in ("host1", "host2"):
+            assert snmp_scan._snmp_scan(
+                _SCAN_SECTIONS,
+                scan_config=scan_config,
+                backend=Backend(
+                    dataclasses.replace(SNMPConfig, hostname=HostName(host_name)), logger
+                ),
+            ) == {SectionName("found")}
+    finally:
+        snmp_cache._clear_other_hosts_oid_cache(None)
+
+    assert len(requested) == expected_scans
+
+
+def test_snmp_scan_does_not_prefetch_without_batching_backend(tmp_path: Path) -> None:
+    requested: list[OID] = []
+
+    class Backend(_ScanBackend):
+        def get(self, /, oid, *, context):
+            requested.append(oid)
+            return super().get(oid, context=context)
+
+    try:
+        assert snmp_scan._snmp_scan(
+            [
+                *_SCAN_SECTIONS,
+                (
+                    SectionName("missing"),
+                    [[(".1.2.4.0", ".*", True), (".1.2.5.0", ".*", True)]],
+                ),
+            ],
+            scan_config=snmp_scan.SNMPScanConfig(
+                on_error=OnError.RAISE,
+                missing_sys_description=False,
+                oid_cache_dir=tmp_path,
+            ),
+            backend=Backend(SNMPConfig, logger),
+        ) == {SectionName("found")}
+    finally:
+        snmp_cache._clear_other_hosts_oid_cache(None)
+
+    # Only the OIDs the detect specs are evaluated with
+    assert requested == [snmp_scan.OID_SYS_DESCR, snmp_scan.OID_SYS_OBJ, ".1.2.3.0", ".1.2.4.0"]
+
+
+def test_single_oid_cache_of_concurrent_sources(tmp_path: Path) -> None:
+    # E.g. the host and its management board: same host name, different addresses
+    barrier = threading.Barrier(2)
+    values: dict[HostAddress, object] = {}
+
+    def _scan(ipaddress: HostAddress) -> None:
+        snmp_cache.initialize_single_oid_cache(HostName("host"), ipaddress, cache_dir=tmp_path)
+        snmp_cache.single_oid_cache()[snmp_scan.OID_SYS_DESCR] = str(ipaddress)
+        barrier.wait()
+        snmp_cache.initialize_single_oid_cache(HostName("host"), ipaddress, cache_dir=tmp_path)
+        values[ipaddress] = snmp_cache.single_oid_cache().get(snmp_scan.OID_SYS_DESCR)
+
+    threads = [
+        threading.Thread(target=_scan, args=(HostAddress(ipaddress),))
+        for ipaddress in ("1.2.3.4", "1.2.3.5")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert values == {HostAddress("1.2.3.4"): "1.2.3.4", HostAddress("1.2.3.5"): "1.2.3.5"}
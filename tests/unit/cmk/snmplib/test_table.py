@@ -6,6 +6,7 @@
 # pylint: disable=protected-access
 
 import dataclasses
+import hashlib
 import logging
 from collections.abc import Sequence
 from functools import partial
@@ -31,6 +32,7 @@ from cmk.snmplib import (
     SNMPContextConfig,
     SNMPContextTimeout,
     SNMPHostConfig,
+    SNMPRowInfo,
     SNMPTable,
     SNMPVersion,
     SpecialColumn,
@@ -113,6 +115,77 @@ def test_get_snmp_table(
     assert get_all_snmp_tables(snmp_info) == expected_values
 
 
+def test_get_snmp_table_walks_uncached_columns_together() -> None:
+    walked: list[Sequence[str]] = []
+
+    class Backend(SNMPTestBackend):
+        def walk_columns(self, /, oids, *, context, **kw):
+            walked.append(oids)
+            return super().walk_columns(oids, context=context, **kw)
+
+    walk_cache: dict[tuple[str, str, bool], SNMPRowInfo] = {
+        (".1.2.2", hashlib.shake_256(b"no_context").hexdigest(15), False): []
+    }
+    table = get_snmp_table(
+        section_name=SectionName("unit_test"),
+        tree=BackendSNMPTree(
+            base=".1.2",
+            oids=[
+                BackendOIDSpec(SpecialColumn.END, "string", False),
+                BackendOIDSpec("1", "string", False),
+                BackendOIDSpec("2", "string", False),
+                BackendOIDSpec("3", "string", True),
+            ],
+        ),
+        walk_cache=walk_cache,
+        backend=Backend(SNMPConfig, logger),
+        log=logger.debug,
+    )
+
+    assert walked == [[".1.2.1", ".1.2.3"]]
+    assert table == [[str(r), "C0FEFE", "", "C0FEFE"] for r in (1, 2, 3)]
+
+
+def test_get_snmp_table_caches_the_columns_walked_before_a_timeout() -> None:
+    class Backend(SNMPTestBackend):
+        def walk(self, /, oid, *, context, **kw):
+            if oid == ".1.2.2":
+                raise SNMPContextTimeout
+            return super().walk(oid, context=context, **kw)
+
+    walk_cache: dict[tuple[str, str, bool], SNMPRowInfo] = {}
+    with pytest.raises(MKSNMPError):
+        get_snmp_table(
+            section_name=SectionName("unit_test"),
+            tree=BackendSNMPTree(
+                base=".1.2",
+                oids=[
+                    BackendOIDSpec("1", "string", False),
+                    BackendOIDSpec("2", "string", False),
+                    BackendOIDSpec("3", "string", False),
+                ],
+            ),
+            walk_cache=walk_cache,
+            backend=Backend(
+                dataclasses.replace(
+                    SNMPConfig,
+                    snmp_version=SNMPVersion.V3,
+                    snmpv3_contexts=[
+                        SNMPContextConfig(
+                            section=SectionName("unit_test"),
+                            contexts=[""],
+                            timeout_policy="continue",
+                        )
+                    ],
+                ),
+                logger,
+            ),
+            log=logger.debug,
+        )
+
+    assert sorted(fetchoid for fetchoid, _context_hash, _save in walk_cache) == [".1.2.1", ".1.2.3"]
+
+
 @pytest.mark.parametrize(
     "encoding, columns, expected",
     [
@@ -6,6 +6,10 @@
 # pylint: disable=protected-access
 
 import pprint
+import sqlite3
+import threading
+
+import pytest
 
 import cmk.utils.log
 import cmk.utils.paths
@@ -180,3 +184,284 @@ def test_get_source_and_piggyback_hosts() -> None:
             ),
         ],
     }
+
+
+def _many_hosts_raw_data(
+    count: int, payload: tuple[bytes, ...] = _PAYLOAD
+) -> dict[HostAddress, tuple[bytes, ...]]:
+    return {HostAddress(f"vm-{i}"): payload for i in range(count)}
+
+
+def test_store_piggyback_raw_data_blob() -> None:
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source"),
+        _many_hosts_raw_data(piggyback._storage._BLOB_MIN_PIGGYBACKED_HOSTS),
+        timestamp=_REF_TIME,
+        omd_root=cmk.utils.paths.omd_root,
+    )
+
+    assert not (cmk.utils.paths.omd_root / "tmp/check_mk/piggyback").exists()
+    assert [
+        p.name
+        for p in (cmk.utils.paths.omd_root / "tmp/check_mk/piggyback_blobs").iterdir()
+        if not p.name.startswith(".")  # lock files
+    ] == ["source"]
+
+    stored = _get_only_raw_data_element(HostAddress("vm-1"))
+    assert stored.meta == piggyback.PiggybackMetaData(
+        source=HostAddress("source"),
+        piggybacked=HostAddress("vm-1"),
+        last_update=int(_REF_TIME),
+        last_contact=int(_REF_TIME),
+    )
+    assert stored.raw_data == b"pay\nload\n"
+
+
+def test_store_piggyback_raw_data_blob_not_updated() -> None:
+    raw_data = _many_hosts_raw_data(piggyback._storage._BLOB_MIN_PIGGYBACKED_HOSTS + 1)
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source"), raw_data, _REF_TIME, cmk.utils.paths.omd_root
+    )
+    del raw_data[HostAddress("vm-0")]
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source"),
+        {h: (b"new",) for h in raw_data},
+        _REF_TIME + 10,
+        cmk.utils.paths.omd_root,
+    )
+
+    not_updated = _get_only_raw_data_element(HostAddress("vm-0"))
+    assert not_updated.meta.last_update == _REF_TIME
+    assert not_updated.meta.last_contact == _REF_TIME + 10
+    assert not_updated.raw_data == b"pay\nload\n"
+
+    updated = _get_only_raw_data_element(HostAddress("vm-1"))
+    assert updated.meta.last_update == _REF_TIME + 10
+    assert updated.raw_data == b"new\n"
+
+
+def test_store_piggyback_raw_data_switch_storage() -> None:
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source"),
+        _many_hosts_raw_data(piggyback._storage._BLOB_MIN_PIGGYBACKED_HOSTS),
+        _REF_TIME,
+        cmk.utils.paths.omd_root,
+    )
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source"),
+        {HostAddress("vm-1"): (b"new",)},
+        _REF_TIME + 10,
+        cmk.utils.paths.omd_root,
+    )
+
+    assert not (cmk.utils.paths.omd_root / "tmp/check_mk/piggyback_blobs/source").exists()
+    assert _get_only_raw_data_element(HostAddress("vm-0")).meta.last_update == _REF_TIME
+    assert _get_only_raw_data_element(HostAddress("vm-1")).raw_data == b"new\n"
+
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source"),
+        _many_hosts_raw_data(piggyback._storage._BLOB_MIN_PIGGYBACKED_HOSTS, (b"newer",)),
+        _REF_TIME + 20,
+        cmk.utils.paths.omd_root,
+    )
+
+    # the outdated files of the source are shadowed by the blob
+    assert _get_only_raw_data_element(HostAddress("vm-1")).raw_data == b"newer\n"
+    assert len(piggyback.get_piggybacked_host_with_sources(cmk.utils.paths.omd_root)) == (
+        piggyback._storage._BLOB_MIN_PIGGYBACKED_HOSTS
+    )
+
+
+def test_cleanup_piggyback_files_blob() -> None:
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source"),
+        _many_hosts_raw_data(piggyback._storage._BLOB_MIN_PIGGYBACKED_HOSTS + 1),
+        _REF_TIME,
+        cmk.utils.paths.omd_root,
+    )
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source"),
+        _many_hosts_raw_data(piggyback._storage._BLOB_MIN_PIGGYBACKED_HOSTS),
+        _REF_TIME + 100,
+        cmk.utils.paths.omd_root,
+    )
+    last_vm = HostAddress(f"vm-{piggyback._storage._BLOB_MIN_PIGGYBACKED_HOSTS}")
+
+    piggyback.cleanup_piggyback_files(_REF_TIME + 50, cmk.utils.paths.omd_root)
+
+    assert not piggyback.get_piggyback_raw_data(last_vm, cmk.utils.paths.omd_root)
+    assert _get_only_raw_data_element(HostAddress("vm-0")).meta.last_update == _REF_TIME + 100
+
+    piggyback.cleanup_piggyback_files(_REF_TIME + 150, cmk.utils.paths.omd_root)
+
+    assert not piggyback.get_piggybacked_host_with_sources(cmk.utils.paths.omd_root)
+
+
+def test_get_piggyback_raw_data_blob_replaced_in_same_second() -> None:
+    for payload in (b"old", b"new"):
+        piggyback.store_piggyback_raw_data(
+            HostAddress("source"),
+            _many_hosts_raw_data(piggyback._storage._BLOB_MIN_PIGGYBACKED_HOSTS, (payload,)),
+            _REF_TIME,
+            cmk.utils.paths.omd_root,
+        )
+        assert _get_only_raw_data_element(HostAddress("vm-1")).raw_data == payload + b"\n"
+
+
+def test_cleanup_piggyback_files_blob_waits_for_update() -> None:
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source"),
+        _many_hosts_raw_data(piggyback._storage._BLOB_MIN_PIGGYBACKED_HOSTS),
+        _REF_TIME,
+        cmk.utils.paths.omd_root,
+    )
+    blob_path = cmk.utils.paths.omd_root / "tmp/check_mk/piggyback_blobs/source"
+
+    with piggyback._storage._locked_source_blob(blob_path):
+        cleanup = threading.Thread(
+            target=piggyback.cleanup_piggyback_files,
+            args=(_REF_TIME + 50, cmk.utils.paths.omd_root),
+        )
+        cleanup.start()
+        cleanup.join(timeout=0.2)
+        assert cleanup.is_alive()
+        assert blob_path.exists()
+
+    cleanup.join()
+    assert not blob_path.exists()
+
+
+def test_move_for_host_rename_blob() -> None:
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source"),
+        _many_hosts_raw_data(piggyback._storage._BLOB_MIN_PIGGYBACKED_HOSTS),
+        _REF_TIME,
+        cmk.utils.paths.omd_root,
+    )
+
+    assert piggyback.move_for_host_rename(cmk.utils.paths.omd_root, "vm-0", "renamed") == (
+        "piggyback-load",
+    )
+    assert not piggyback.get_piggyback_raw_data(HostAddress("vm-0"), cmk.utils.paths.omd_root)
+    assert _get_only_raw_data_element(HostAddress("renamed")).meta.last_update == _REF_TIME
+
+    assert piggyback.move_for_host_rename(cmk.utils.paths.omd_root, "source", "new-source") == (
+        "piggyback-pig",
+    )
+    assert _get_only_raw_data_element(HostAddress("renamed")).meta.source == "new-source"
+
+
+def test_get_piggyback_raw_data_from_index(monkeypatch: pytest.MonkeyPatch) -> None:
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source1"), {_TEST_HOST_NAME: _PAYLOAD}, _REF_TIME, cmk.utils.paths.omd_root
+    )
+
+    def _no_listing(path: object) -> None:
+        raise AssertionError(f"unexpected listing of {path}")
+
+    monkeypatch.setattr(piggyback._storage, "_files_in", _no_listing)
+
+    info = _get_only_raw_data_element(_TEST_HOST_NAME).meta
+    assert info.source == HostAddress("source1")
+    assert info.last_contact == _REF_TIME
+    assert list(piggyback.get_piggybacked_host_with_sources(cmk.utils.paths.omd_root)) == [
+        _TEST_HOST_NAME
+    ]
+
+
+def test_index_is_rebuilt_from_files() -> None:
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source1"), {_TEST_HOST_NAME: _PAYLOAD}, _REF_TIME, cmk.utils.paths.omd_root
+    )
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source2"),
+        _many_hosts_raw_data(piggyback._storage._BLOB_MIN_PIGGYBACKED_HOSTS),
+        _REF_TIME + 10,
+        cmk.utils.paths.omd_root,
+    )
+    expected = piggyback.get_piggybacked_host_with_sources(cmk.utils.paths.omd_root)
+
+    with piggyback._storage._open_index(cmk.utils.paths.omd_root):
+        # Still in use by another process
+        piggyback._storage._invalidate_index(cmk.utils.paths.omd_root)
+
+    assert piggyback._paths.index_path(cmk.utils.paths.omd_root).exists()
+    assert piggyback.get_piggybacked_host_with_sources(cmk.utils.paths.omd_root) == expected
+
+
+def test_corrupted_index_is_removed() -> None:
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source1"), {_TEST_HOST_NAME: _PAYLOAD}, _REF_TIME, cmk.utils.paths.omd_root
+    )
+    expected = piggyback.get_piggybacked_host_with_sources(cmk.utils.paths.omd_root)
+    piggyback._paths.index_path(cmk.utils.paths.omd_root).write_bytes(b"no database" * 100)
+
+    piggyback._storage._invalidate_index(cmk.utils.paths.omd_root)
+
+    assert not piggyback._paths.index_path(cmk.utils.paths.omd_root).exists()
+    assert piggyback.get_piggybacked_host_with_sources(cmk.utils.paths.omd_root) == expected
+
+
+def test_locked_index_is_not_removed(monkeypatch: pytest.MonkeyPatch) -> None:
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source1"), {_TEST_HOST_NAME: _PAYLOAD}, _REF_TIME, cmk.utils.paths.omd_root
+    )
+    monkeypatch.setattr(piggyback._index, "_PRAGMAS", ("PRAGMA busy_timeout=0;",))
+    writer = sqlite3.connect(piggyback._paths.index_path(cmk.utils.paths.omd_root))
+    try:
+        writer.execute("BEGIN IMMEDIATE;")
+        with pytest.raises(sqlite3.OperationalError):
+            piggyback._storage._invalidate_index(cmk.utils.paths.omd_root)
+    finally:
+        writer.close()
+
+    assert piggyback._paths.index_path(cmk.utils.paths.omd_root).exists()
+
+
+def test_index_is_scanned_without_write_lock() -> None:
+    path = piggyback._paths.index_path(cmk.utils.paths.omd_root)
+    scans: list[None] = []
+
+    def _scan() -> piggyback._index.IndexContent:
+        # Another process commits while the files are scanned
+        writer = sqlite3.connect(path, timeout=0)
+        try:
+            writer.execute(
+                "CREATE TABLE IF NOT EXISTS sources"
+                " (source TEXT PRIMARY KEY, last_contact INTEGER NOT NULL);"
+            )
+            writer.execute("INSERT OR REPLACE INTO sources VALUES ('other', ?);", (len(scans),))
+            writer.commit()
+        except sqlite3.OperationalError:  # locked by the index during the second scan
+            pass
+        finally:
+            writer.close()
+        scans.append(None)
+        return piggyback._index.IndexContent(
+            payloads=[], last_contacts=[(HostAddress("source1"), len(scans))]
+        )
+
+    with piggyback._index.PiggybackIndex.open(path, _scan) as index:
+        assert index.outdated_sources(_REF_TIME) == [HostAddress("source1")]
+
+    assert len(scans) == 2
+
+
+def test_cleanup_piggyback_files_updates_index() -> None:
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source1"), {_TEST_HOST_NAME: _PAYLOAD}, _REF_TIME, cmk.utils.paths.omd_root
+    )
+    piggyback.store_piggyback_raw_data(
+        HostAddress("source2"),
+        {_TEST_HOST_NAME: _PAYLOAD},
+        _REF_TIME + 100,
+        cmk.utils.paths.omd_root,
+    )
+
+    piggyback.cleanup_piggyback_files(_REF_TIME + 50, cmk.utils.paths.omd_root)
+
+    assert _get_only_raw_data_element(_TEST_HOST_NAME).meta.source == HostAddress("source2")
+    assert not (
+        cmk.utils.paths.omd_root / "tmp/check_mk/piggyback" / _TEST_HOST_NAME / "source1"
+    ).exists()
+    assert not (cmk.utils.paths.omd_root / "tmp/check_mk/piggyback_sources/source1").exists()
@@ -6,6 +6,7 @@
 # pylint: disable=protected-access
 
 from collections.abc import Mapping, Sequence
+from pathlib import Path
 from typing import Any
 
 import pytest
@@ -22,6 +23,7 @@ from cmk.utils.rulesets.ruleset_matcher import (
     RulesetMatchObject,
     RuleSpec,
     TagCondition,
+    TagsOfHosts,
 )
 from cmk.utils.servicename import ServiceName
 from cmk.utils.tags import TagConfig, TagGroupID, TagID
@@ -156,6 +158,271 @@ def test_ruleset_matcher_get_host_values_labels(
     assert list(matcher.get_host_values(hostname, ruleset=host_label_ruleset)) == expected_result
 
 
+host_label_groups_ruleset: Sequence[RuleSpec[str]] = [
+    # test OR within a group
+    {
+        "id": "id0",
+        "value": "linux_or_windows",
+        "condition": {
+            "host_label_groups": [("and", [("and", "os:linux"), ("or", "os:windows")])],
+        },
+        "options": {},
+    },
+    # test OR and NOT of groups
+    {
+        "id": "id1",
+        "value": "prod_or_not_test",
+        "condition": {
+            "host_label_groups": [
+                ("and", [("and", "env:prod")]),
+                ("or", [("not", "env:test")]),
+            ],
+        },
+        "options": {},
+    },
+    # test labels combined with tags
+    {
+        "id": "id2",
+        "value": "linux_lan",
+        "condition": {
+            "host_tags": {TagGroupID("networking"): TagID("lan")},
+            "host_label_groups": [("and", [("and", "os:linux")])],
+        },
+        "options": {},
+    },
+    # test labels combined with a host name condition
+    {
+        "id": "id3",
+        "value": "windows_host3",
+        "condition": {
+            "host_name": ["host3"],
+            "host_label_groups": [("and", [("and", "os:windows")])],
+        },
+        "options": {},
+    },
+    # test labels of a group that does not match any host
+    {
+        "id": "id4",
+        "value": "not_linux_and_not_windows",
+        "condition": {
+            "host_label_groups": [("not", [("and", "os:linux")]), ("not", [("and", "os:windows")])],
+        },
+        "options": {},
+    },
+]
+
+
+@pytest.mark.parametrize(
+    "hostname, expected_result",
+    [
+        (HostName("host1"), ["linux_or_windows", "prod_or_not_test", "linux_lan"]),
+        (HostName("host2"), ["linux_or_windows"]),
+        (HostName("host3"), ["linux_or_windows", "prod_or_not_test", "windows_host3"]),
+        (HostName("host4"), ["prod_or_not_test", "not_linux_and_not_windows"]),
+    ],
+)
+def test_ruleset_matcher_get_host_values_label_groups(
+    hostname: HostName, expected_result: Sequence[str]
+) -> None:
+    matcher = RulesetMatcher(
+        host_tags={
+            HostName("host1"): {TagGroupID("networking"): TagID("lan")},
+            HostName("host2"): {TagGroupID("networking"): TagID("lan")},
+            HostName("host3"): {TagGroupID("networking"): TagID("wan")},
+            HostName("host4"): {TagGroupID("networking"): TagID("lan")},
+        },
+        host_paths={},
+        label_manager=LabelManager(
+            explicit_host_labels={
+                HostName("host1"): {"os": "linux", "env": "prod"},
+                HostName("host2"): {"os": "windows", "env": "test"},
+                HostName("host3"): {"os": "windows"},
+                HostName("host4"): {"os": "aix"},
+            },
+            host_label_rules=(),
+            service_label_rules=(),
+            discovered_labels_of_service=lambda *args, **kw: {},
+        ),
+        all_configured_hosts=[
+            HostName("host1"),
+            HostName("host2"),
+            HostName("host3"),
+            HostName("host4"),
+        ],
+        clusters_of={},
+        nodes_of={},
+    )
+
+    assert (
+        list(matcher.get_host_values(hostname, ruleset=host_label_groups_ruleset))
+        == expected_result
+    )
+
+
+def test_ruleset_matcher_indexes_labels_of_tag_matching_hosts_only() -> None:
+    matcher = RulesetMatcher(
+        host_tags={
+            HostName("host1"): {TagGroupID("networking"): TagID("lan")},
+            HostName("host2"): {TagGroupID("networking"): TagID("wan")},
+        },
+        host_paths={},
+        label_manager=LabelManager(
+            explicit_host_labels={
+                HostName("host1"): {"os": "linux"},
+                HostName("host2"): {"os": "linux"},
+            },
+            host_label_rules=(),
+            service_label_rules=(),
+            discovered_labels_of_service=lambda *args, **kw: {},
+        ),
+        all_configured_hosts=[HostName("host1"), HostName("host2")],
+        clusters_of={},
+        nodes_of={},
+    )
+
+    assert matcher.ruleset_optimizer._match_hosts(
+        {
+            "host_tags": {TagGroupID("networking"): TagID("lan")},
+            "host_label_groups": [("and", [("and", "os:linux")])],
+        },
+        {HostName("host1"), HostName("host2")},
+    ) == {HostName("host1")}
+    assert matcher.ruleset_optimizer._label_indexed_hosts == {HostName("host1")}
+
+
+def _make_matcher_with_match_cache(
+    match_cache_path: Path, host_tags: TagsOfHosts
+) -> RulesetMatcher:
+    return RulesetMatcher(
+        host_tags=host_tags,
+        host_paths={},
+        label_manager=LabelManager(
+            explicit_host_labels={
+                HostName("host1"): {"os": "linux"},
+                HostName("host2"): {"os": "windows"},
+            },
+            host_label_rules=(),
+            service_label_rules=(),
+            discovered_labels_of_service=lambda *args, **kw: {},
+        ),
+        all_configured_hosts=[HostName("host1"), HostName("host2")],
+        clusters_of={},
+        nodes_of={},
+        match_cache_path=match_cache_path,
+    )
+
+
+def test_ruleset_matcher_persisted_matches(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    tag_label_ruleset: Sequence[RuleSpec[str]] = [
+        {
+            "id": "id0",
+            "value": "linux_lan",
+            "condition": {
+                "host_tags": {TagGroupID("networking"): TagID("lan")},
+                "host_label_groups": [("and", [("and", "os:linux")])],
+            },
+            "options": {},
+        },
+        {
+            "id": "id1",
+            "value": "lan",
+            "condition": {"host_tags": {TagGroupID("networking"): TagID("lan")}},
+            "options": {},
+        },
+    ]
+    match_cache_path = tmp_path / "ruleset_matching_cache"
+
+    matcher = _make_matcher_with_match_cache(
+        match_cache_path,
+        {
+            HostName("host1"): {TagGroupID("networking"): TagID("lan")},
+            HostName("host2"): {TagGroupID("networking"): TagID("lan")},
+        },
+    )
+    assert list(matcher.get_host_values(HostName("host1"), tag_label_ruleset)) == [
+        "linux_lan",
+        "lan",
+    ]
+    assert list(matcher.get_host_values(HostName("host2"), tag_label_ruleset)) == ["lan"]
+    matcher.save_persisted_matches()
+    assert match_cache_path.exists()
+
+    # host2 changed its tags in the meantime, only this host has to be matched again
+    matcher = _make_matcher_with_match_cache(
+        match_cache_path,
+        {
+            HostName("host1"): {TagGroupID("networking"): TagID("lan")},
+            HostName("host2"): {TagGroupID("networking"): TagID("wan")},
+        },
+    )
+    matched_hosts: list[set[HostName]] = []
+    match_hosts = matcher.ruleset_optimizer._match_hosts
+
+    def _match_hosts(condition: RuleConditionsSpec, valid_hosts: set[HostName]) -> set[HostName]:
+        matched_hosts.append(set(valid_hosts))
+        return match_hosts(condition, valid_hosts)
+
+    monkeypatch.setattr(matcher.ruleset_optimizer, "_match_hosts", _match_hosts)
+
+    assert list(matcher.get_host_values(HostName("host1"), tag_label_ruleset)) == [
+        "linux_lan",
+        "lan",
+    ]
+    assert not list(matcher.get_host_values(HostName("host2"), tag_label_ruleset))
+    assert matched_hosts == [{HostName("host2")}, {HostName("host2")}]
+
+
+def test_ruleset_matcher_persisted_matches_of_unused_conditions(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    lan_rule: RuleSpec[str] = {
+        "id": "id0",
+        "value": "lan",
+        "condition": {"host_tags": {TagGroupID("networking"): TagID("lan")}},
+        "options": {},
+    }
+    linux_rule: RuleSpec[str] = {
+        "id": "id1",
+        "value": "linux",
+        "condition": {"host_label_groups": [("and", [("and", "os:linux")])]},
+        "options": {},
+    }
+    match_cache_path = tmp_path / "ruleset_matching_cache"
+    host_tags: TagsOfHosts = {
+        HostName("host1"): {TagGroupID("networking"): TagID("lan")},
+        HostName("host2"): {TagGroupID("networking"): TagID("lan")},
+    }
+    matcher = _make_matcher_with_match_cache(match_cache_path, host_tags)
+    assert list(matcher.get_host_values(HostName("host1"), [lan_rule, linux_rule])) == [
+        "lan",
+        "linux",
+    ]
+    matcher.save_persisted_matches()
+
+    # host2 changed, but the linux rule is not used by this invocation
+    host_tags = {**host_tags, HostName("host2"): {TagGroupID("networking"): TagID("wan")}}
+    matcher = _make_matcher_with_match_cache(match_cache_path, host_tags)
+    assert not list(matcher.get_host_values(HostName("host2"), [lan_rule]))
+    matcher.save_persisted_matches()
+
+    matcher = _make_matcher_with_match_cache(match_cache_path, host_tags)
+    matched_hosts: list[set[HostName]] = []
+    match_hosts = matcher.ruleset_optimizer._match_hosts
+
+    def _match_hosts(condition: RuleConditionsSpec, valid_hosts: set[HostName]) -> set[HostName]:
+        matched_hosts.append(set(valid_hosts))
+        return match_hosts(condition, valid_hosts)
+
+    monkeypatch.setattr(matcher.ruleset_optimizer, "_match_hosts", _match_hosts)
+
+    assert list(matcher.get_host_values(HostName("host1"), [lan_rule, linux_rule])) == [
+        "lan",
+        "linux",
+    ]
+    # Only the linux rule has to be matched again, and only against host2
+    assert matched_hosts == [{HostName("host2")}]
+
+
 def test_labels_of_service(monkeypatch: MonkeyPatch) -> None:
     test_host = HostName("test-host")
     xyz_host = HostName("xyz")
@@ -764,6 +1031,88 @@ def test_ruleset_matcher_get_service_ruleset_values_labels(
     )
 
 
+service_description_ruleset: Sequence[RuleSpec[str]] = [
+    {
+        "id": "id0",
+        "value": "interface",
+        "condition": {"service_description": [{"$regex": "Interface "}]},
+        "options": {},
+    },
+    {
+        "id": "id1",
+        "value": "not_interface",
+        "condition": {"service_description": {"$nor": [{"$regex": "Interface "}]}},
+        "options": {},
+    },
+    {
+        "id": "id2",
+        "value": "interface_1",
+        "condition": {
+            "host_name": ["host1"],
+            "service_description": [{"$regex": "Interface 1$"}],
+        },
+        "options": {},
+    },
+    {
+        "id": "id3",
+        "value": "interface_linux",
+        "condition": {
+            "service_description": [{"$regex": "Interface "}],
+            "service_label_groups": [("and", [("and", "os:linux")])],
+        },
+        "options": {},
+    },
+]
+
+
+@pytest.mark.parametrize(
+    "hostname, service_description, service_labels, expected_result",
+    [
+        (HostName("host1"), "Interface 1", {}, ["interface", "interface_1"]),
+        (HostName("host1"), "Interface 10", {}, ["interface"]),
+        (
+            HostName("host1"),
+            "Interface 2",
+            {"os": "linux"},
+            ["interface", "interface_linux"],
+        ),
+        (HostName("host1"), "CPU load", {"os": "linux"}, ["not_interface"]),
+        (HostName("host2"), "Interface 1", {}, ["interface"]),
+        (HostName("host2"), None, {}, []),
+    ],
+)
+def test_ruleset_matcher_get_service_ruleset_values_service_description(
+    hostname: HostName,
+    service_description: ServiceName | None,
+    service_labels: Mapping[str, str],
+    expected_result: Sequence[str],
+) -> None:
+    matcher = RulesetMatcher(
+        host_tags={HostName("host1"): {}, HostName("host2"): {}},
+        host_paths={},
+        label_manager=LabelManager(
+            explicit_host_labels={},
+            host_label_rules=(),
+            service_label_rules=(),
+            discovered_labels_of_service=lambda *args, **kw: {},
+        ),
+        all_configured_hosts=[HostName("host1"), HostName("host2")],
+        clusters_of={},
+        nodes_of={},
+    )
+
+    for _repetition in range(2):  # second round is served by the compiled ruleset
+        assert (
+            list(
+                matcher.get_service_ruleset_values(
+                    RulesetMatchObject(hostname, service_description, dict(service_labels)),
+                    ruleset=service_description_ruleset,
+                )
+            )
+            == expected_result
+        )
+
+
 @pytest.mark.parametrize(
     "taggroud_id, tag_condition, expected_result",
     [
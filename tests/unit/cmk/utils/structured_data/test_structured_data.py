@@ -3,7 +3,9 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import ast
 import gzip
+import os
 import shutil
 from collections.abc import Iterable, Mapping, Sequence
 from pathlib import Path
@@ -28,11 +30,16 @@ from cmk.utils.structured_data import (
     SDKey,
     SDNodeName,
     SDPath,
+    SDRawTree,
     SDRetentionFilterChoices,
+    SDValue,
+    TreeOrArchiveStore,
     TreeStore,
     UpdateResult,
 )
 
+from cmk.ccc import store
+
 
 def _make_mutable_tree(tree: ImmutableTree) -> MutableTree:
     return MutableTree(
@@ -1015,6 +1022,388 @@ def test_save_and_load_real_tree(tree_name: HostName, tmp_path: Path) -> None:
         shutil.rmtree(str(tmp_path))
 
 
+def test_save_tree_in_binary_format(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree = MutableTree()
+    tree.add(
+        path=(SDNodeName("path-to"), SDNodeName("node")), pairs=[{SDKey("foo"): 1, SDKey("bär"): 2}]
+    )
+    tree_store = TreeStore(tmp_path / "inventory")
+    tree_store.save(host_name=host_name, tree=tree)
+
+    # Livestatus serves the tree file as is (column 'mk_inventory')
+    assert (
+        ast.literal_eval((tmp_path / "inventory" / str(host_name)).read_text()) == tree.serialize()
+    )
+    assert (tmp_path / "inventory" / f"{host_name}.sdtree").read_bytes().startswith(b"CMKSDTREE")
+    with gzip.open(tmp_path / "inventory" / f"{host_name}.gz", "rb") as f:
+        assert ast.literal_eval(f.read().decode("utf-8")) == tree.serialize()
+    assert tree_store.load(host_name=host_name) == tree
+
+    tree_store.remove(host_name=host_name)
+    assert not list((tmp_path / "inventory").glob(f"{host_name}*"))
+
+
+def test_save_tree_without_binary_copy(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree = MutableTree()
+    tree.add(path=(SDNodeName("path-to"), SDNodeName("node")), pairs=[{SDKey("foo"): 1}])
+    tree_store = TreeStore(tmp_path / "status_data", binary_copy=False)
+    tree_store.save(host_name=host_name, tree=tree)
+
+    assert sorted(p.name for p in (tmp_path / "status_data").iterdir()) == [
+        ".last",
+        str(host_name),
+        f"{host_name}.gz",
+    ]
+    assert tree_store.load(host_name=host_name) == tree
+
+
+def test_load_tree_ignores_outdated_binary_copy(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree = MutableTree()
+    tree.add(path=(SDNodeName("path-to"), SDNodeName("node")), pairs=[{SDKey("foo"): 1}])
+    tree_store = TreeStore(tmp_path / "inventory")
+    tree_store.save(host_name=host_name, tree=tree)
+
+    tree_file = tmp_path / "inventory" / str(host_name)
+    tree_file.write_text(repr({"Attributes": {"Pairs": {"bar": 2}}, "Table": {}, "Nodes": {}}))
+    binary_mtime = (tmp_path / "inventory" / f"{host_name}.sdtree").stat().st_mtime_ns
+    os.utime(tree_file, ns=(binary_mtime + 1, binary_mtime + 1))
+
+    assert tree_store.load(host_name=host_name).attributes.pairs == {SDKey("bar"): 2}
+
+
+def test_save_and_load_tree_with_str_subclass_values(tmp_path: Path) -> None:
+    tree = MutableTree()
+    tree.add(
+        path=(SDNodeName("path-to"), SDNodeName("node")),
+        pairs=[{SDKey("host_name"): HostName("heute")}],
+        key_columns=[SDKey("host_name")],
+        rows=[{SDKey("host_name"): HostName("heute")}],
+    )
+    tree_store = TreeStore(tmp_path / "inventory")
+    tree_store.save(host_name=HostName("heute"), tree=tree)
+    assert tree_store.load(host_name=HostName("heute")) == tree
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        pytest.param([], id="nothing"),
+        pytest.param(
+            [
+                SDFilterChoice(
+                    path=(SDNodeName("networking"),),
+                    pairs="all",
+                    columns="all",
+                    nodes="all",
+                ),
+            ],
+            id="whole-subtree",
+        ),
+        pytest.param(
+            [
+                SDFilterChoice(
+                    path=(SDNodeName("networking"),),
+                    pairs=[SDKey("total_interfaces")],
+                    columns="nothing",
+                    nodes=[SDNodeName("interfaces")],
+                ),
+                SDFilterChoice(
+                    path=(SDNodeName("hardware"), SDNodeName("cpu")),
+                    pairs="all",
+                    columns="all",
+                    nodes="nothing",
+                ),
+            ],
+            id="some-subtrees",
+        ),
+        pytest.param(
+            [
+                SDFilterChoice(
+                    path=(SDNodeName("networking"), SDNodeName("interfaces")),
+                    pairs="nothing",
+                    columns=[SDKey("admin_status"), SDKey("FOOBAR")],
+                    nodes="nothing",
+                ),
+                SDFilterChoice(
+                    path=(SDNodeName("software"), SDNodeName("unknown")),
+                    pairs="all",
+                    columns="all",
+                    nodes="all",
+                ),
+            ],
+            id="columns-and-unknown-node",
+        ),
+    ],
+)
+def test_load_filtered_tree(filters: Sequence[SDFilterChoice], tmp_path: Path) -> None:
+    orig_tree = _get_tree_store().load(host_name=HostName("tree_new_interfaces"))
+    tree_store = TreeStore(tmp_path / "inventory")
+    tree_store.save(host_name=HostName("foo"), tree=_make_mutable_tree(orig_tree))
+
+    filtered = tree_store.load(host_name=HostName("foo"), filters=filters)
+    assert filtered == orig_tree.filter(filters)
+    assert filtered.serialize() == orig_tree.filter(filters).serialize()
+
+
+def test_load_filtered_tree_legacy_format() -> None:
+    filters = [
+        SDFilterChoice(
+            path=(SDNodeName("networking"),),
+            pairs="all",
+            columns="all",
+            nodes="nothing",
+        ),
+    ]
+    tree_store = _get_tree_store()
+    assert tree_store.load(
+        host_name=HostName("tree_new_interfaces"), filters=filters
+    ) == tree_store.load(host_name=HostName("tree_new_interfaces")).filter(filters)
+
+
+def test_load_table_tree_from_table_index(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree = _get_tree_store().load(host_name=HostName("tree_new_interfaces"))
+    tree_store = TreeStore(tmp_path / "inventory", tmp_path / "table_index")
+    tree_store.save(host_name=host_name, tree=_make_mutable_tree(tree))
+
+    path = (SDNodeName("networking"), SDNodeName("interfaces"))
+    table_tree = tree_store.load_table_tree(host_name=host_name, path=path)
+    assert table_tree is not None
+    assert table_tree.get_tree(path).table == tree.get_tree(path).table
+    assert table_tree.get_tree(path).table.retentions == tree.get_tree(path).table.retentions
+    assert not table_tree.get_tree(path).nodes_by_name
+
+    filtered_table_tree = tree_store.load_table_tree(
+        host_name=host_name, path=path, row_filters={SDKey("oper_status"): lambda v: v == 1}
+    )
+    assert filtered_table_tree is not None
+    assert filtered_table_tree.get_rows(path) == [
+        row for row in tree.get_rows(path) if row.get(SDKey("oper_status")) == 1
+    ]
+
+    # Indexed but no such table
+    missing_table_tree = tree_store.load_table_tree(
+        host_name=host_name, path=(SDNodeName("software"), SDNodeName("packages"))
+    )
+    assert missing_table_tree is not None
+    assert not missing_table_tree
+
+
+def test_load_table_tree_missing_columns(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    path = (SDNodeName("path-to"), SDNodeName("table"))
+    tree = MutableTree()
+    rows: list[Mapping[SDKey, SDValue]] = [
+        {SDKey("ident"): "a", SDKey("x"): 1},
+        {SDKey("ident"): "b", SDKey("y"): None},
+        {SDKey("ident"): "c", SDKey("x"): 3, SDKey("y"): 3},
+    ]
+    tree.add(path=path, key_columns=[SDKey("ident")], rows=rows)
+    tree_store = TreeStore(tmp_path / "inventory", tmp_path / "table_index")
+    tree_store.save(host_name=host_name, tree=tree)
+
+    table_tree = tree_store.load_table_tree(host_name=host_name, path=path)
+    assert table_tree is not None
+    assert table_tree.get_rows(path) == rows
+
+    filtered_table_tree = tree_store.load_table_tree(
+        host_name=host_name, path=path, row_filters={SDKey("y"): lambda v: v is None}
+    )
+    assert filtered_table_tree is not None
+    assert filtered_table_tree.get_rows(path) == [rows[1]]
+
+
+def test_load_table_tree_outdated_table_index(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    path = (SDNodeName("path-to"), SDNodeName("table"))
+    tree = MutableTree()
+    tree.add(path=path, key_columns=[SDKey("ident")], rows=[{SDKey("ident"): "a"}])
+    tree_store = TreeStore(tmp_path / "inventory", tmp_path / "table_index")
+    tree_store.save(host_name=host_name, tree=tree)
+    assert tree_store.load_table_tree(host_name=host_name, path=path) is not None
+
+    # Saved without table index
+    TreeStore(tmp_path / "inventory").save(host_name=host_name, tree=tree)
+    os.utime(tmp_path / "inventory" / host_name, ns=(0, 0))
+    assert tree_store.load_table_tree(host_name=host_name, path=path) is None
+
+    tree_store.save(host_name=host_name, tree=tree)
+    tree_store.remove(host_name=host_name)
+    assert tree_store.load_table_tree(host_name=host_name, path=path) is None
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_load_table_tree_of_many_hosts(tmp_path: Path, compact: bool) -> None:
+    path = (SDNodeName("path-to"), SDNodeName("table"))
+    tree_store = TreeStore(tmp_path / "inventory", tmp_path / "table_index")
+    for idx, host_name in enumerate((HostName("heute"), HostName("morgen"))):
+        tree = MutableTree()
+        tree.add(path=path, key_columns=[SDKey("ident")], rows=[{SDKey("ident"): idx}])
+        tree_store.save(host_name=host_name, tree=tree)
+    tree_store.save(host_name=HostName("gestern"), tree=MutableTree())
+    if compact:
+        tree_store.compact_table_index()
+        assert not list((tmp_path / "table_index" / ".pending").iterdir())
+
+    for idx, host_name in enumerate((HostName("heute"), HostName("morgen"))):
+        table_tree = tree_store.load_table_tree(host_name=host_name, path=path)
+        assert table_tree is not None
+        assert table_tree.get_rows(path) == [{SDKey("ident"): idx}]
+    table_tree = tree_store.load_table_tree(host_name=HostName("gestern"), path=path)
+    assert table_tree is not None
+    assert not table_tree
+
+
+def test_compact_table_index(tmp_path: Path) -> None:
+    path = (SDNodeName("path-to"), SDNodeName("table"))
+    tree = MutableTree()
+    tree.add(path=path, key_columns=[SDKey("ident")], rows=[{SDKey("ident"): "a"}])
+    tree_store = TreeStore(tmp_path / "inventory", tmp_path / "table_index")
+    for host_name in (HostName("heute"), HostName("morgen")):
+        tree_store.save(host_name=host_name, tree=tree)
+    tree_store.compact_table_index()
+    # Saved after the compaction
+    tree_store.save(host_name=HostName("heute"), tree=MutableTree())
+    (tmp_path / "inventory" / "morgen").unlink()
+
+    tree_store.compact_table_index()
+
+    assert sorted(p.name for p in (tmp_path / "table_index").iterdir()) == [
+        ".hosts",
+        ".lock",
+        ".pending",
+    ]
+    table_tree = tree_store.load_table_tree(host_name=HostName("heute"), path=path)
+    assert table_tree is not None
+    assert not table_tree
+    assert tree_store.load_table_tree(host_name=HostName("morgen"), path=path) is None
+
+
+def _archive_tree(
+    tree_or_archive_store: TreeOrArchiveStore,
+    host_name: HostName,
+    tree: MutableTree,
+    timestamp: int,
+) -> None:
+    tree_or_archive_store.save(host_name=host_name, tree=tree)
+    os.utime(tree_or_archive_store._tree_file(host_name), (timestamp, timestamp))
+    tree_or_archive_store.archive(host_name=host_name)
+
+
+def test_archive_and_load_archived_trees(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree_or_archive_store = TreeOrArchiveStore(tmp_path / "inventory", tmp_path / "archive")
+    tree_names = [
+        HostName("tree_old_addresses_arrays_memory"),
+        HostName("tree_new_addresses_arrays_memory"),
+        HostName("tree_old_interfaces"),
+        HostName("tree_new_interfaces"),
+    ]
+    # Long enough for a full tree in between the patches
+    trees = [_get_tree_store().load(host_name=tree_name) for tree_name in tree_names] * 3
+    for timestamp, tree in enumerate(trees, start=100):
+        _archive_tree(tree_or_archive_store, host_name, _make_mutable_tree(tree), timestamp)
+
+    archive_files = sorted((tmp_path / "archive" / host_name).iterdir(), key=lambda p: int(p.name))
+    assert [p.name for p in archive_files] == [str(t) for t in range(100, 112)]
+    assert [int(p.stat().st_mtime) for p in archive_files] == list(range(100, 112))
+    assert all(p.read_bytes().startswith(b"CMKSDARCHIVE") for p in archive_files)
+    assert [
+        idx
+        for idx, p in enumerate(archive_files)
+        if "Tree" in tree_or_archive_store._load_archive_entry(host_name, int(p.name))
+    ] == [0, 10, 11]
+    assert not (tmp_path / "inventory" / host_name).exists()
+
+    previous_tree = ImmutableTree()
+    for timestamp, tree in enumerate(trees, start=100):
+        assert (
+            tree_or_archive_store.load_archived_tree(host_name=host_name, timestamp=timestamp)
+            == tree
+        )
+        delta_tree = tree_or_archive_store.load_archived_delta_tree(
+            host_name=host_name,
+            timestamp=timestamp,
+            previous_timestamp=timestamp - 1 if timestamp > 100 else None,
+        )
+        assert delta_tree is not None
+        assert delta_tree.get_stats() == tree.difference(previous_tree).get_stats()
+        previous_tree = tree
+
+    assert tree_or_archive_store.load_previous(host_name=host_name) == trees[-1]
+
+
+def test_archive_keeps_retentions(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree_or_archive_store = TreeOrArchiveStore(tmp_path / "inventory", tmp_path / "archive")
+    raw_trees: list[SDRawTree] = [
+        {
+            "Attributes": {"Pairs": {SDKey("key"): f"value {idx}"}},
+            "Table": {
+                "KeyColumns": [SDKey("ident")],
+                "Rows": [{SDKey("ident"): i, SDKey("value"): i + idx} for i in range(5)],
+                "Retentions": {(idx,): {SDKey("value"): (idx, 1, 2, "previous")}},
+            },
+            "Nodes": {
+                SDNodeName(f"node {idx}"): {
+                    "Attributes": {"Pairs": {SDKey("key"): "value"}},
+                    "Table": {},
+                    "Nodes": {},
+                },
+            },
+        }
+        for idx in range(3)
+    ]
+    for timestamp, raw_tree in enumerate(raw_trees):
+        _archive_tree(
+            tree_or_archive_store,
+            host_name,
+            _make_mutable_tree(ImmutableTree.deserialize(raw_tree)),
+            timestamp,
+        )
+
+    for timestamp, raw_tree in enumerate(raw_trees):
+        tree = tree_or_archive_store.load_archived_tree(host_name=host_name, timestamp=timestamp)
+        assert tree == ImmutableTree.deserialize(raw_tree)
+        assert tree.serialize()["Table"]["Retentions"] == raw_tree["Table"]["Retentions"]
+
+
+def test_archive_after_legacy_archive(tmp_path: Path) -> None:
+    host_name = HostName("heute")
+    tree_or_archive_store = TreeOrArchiveStore(tmp_path / "inventory", tmp_path / "archive")
+    legacy_trees = [
+        ImmutableTree.deserialize({"inv": "attr-0"}),
+        ImmutableTree.deserialize({"inv": "attr-1"}),
+    ]
+    for timestamp, tree in enumerate(legacy_trees):
+        store.save_object_to_file(
+            tmp_path / "archive" / host_name / str(timestamp), tree.serialize()
+        )
+    tree = ImmutableTree.deserialize({"inv": "attr-2"})
+    _archive_tree(tree_or_archive_store, host_name, _make_mutable_tree(tree), 2)
+
+    assert "Patch" in tree_or_archive_store._load_archive_entry(host_name, 1)
+    for timestamp, expected_tree in enumerate(legacy_trees + [tree]):
+        assert (
+            tree_or_archive_store.load_archived_tree(host_name=host_name, timestamp=timestamp)
+            == expected_tree
+        )
+    assert (
+        tree_or_archive_store.load_archived_delta_tree(
+            host_name=host_name, timestamp=1, previous_timestamp=0
+        )
+        is None
+    )
+    delta_tree = tree_or_archive_store.load_archived_delta_tree(
+        host_name=host_name, timestamp=2, previous_timestamp=1
+    )
+    assert delta_tree is not None
+    assert delta_tree.get_stats() == {"changed": 1}
+
+
 @pytest.mark.parametrize(
     "tree_name, result",
     [
@@ -4,10 +4,12 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import json
+import threading
+import time
 
 import pytest
 
-from cmk.utils.cpu_tracking import Snapshot
+from cmk.utils.cpu_tracking import CPUTracker, Snapshot
 
 
 def json_identity(serializable: object) -> object:
@@ -50,3 +52,20 @@ class TestCpuTracking:
 
     def test_json_serialization_now(self, now: Snapshot) -> None:
         assert Snapshot.deserialize(json_identity(now.serialize())) == now
+
+
+def test_cpu_tracker_per_thread() -> None:
+    def busy() -> None:
+        end = time.process_time() + 0.3
+        while time.process_time() < end:
+            pass
+
+    with CPUTracker(lambda _msg: None) as process_tracker:
+        with CPUTracker(lambda _msg: None, per_thread=True) as thread_tracker:
+            thread = threading.Thread(target=busy)
+            thread.start()
+            thread.join()
+
+    # The time of the other thread is only accounted to the process
+    assert thread_tracker.duration.process.user < 0.1
+    assert process_tracker.duration.process.user + process_tracker.duration.process.system > 0.2
@@ -53,6 +53,7 @@ _STR_PATHS: Final = {
     "inventory_output_dir",
     "inventory_archive_dir",
     "inventory_delta_cache_dir",
+    "inventory_table_index_dir",
     "status_data_dir",
     "share_dir",
     "checks_dir",
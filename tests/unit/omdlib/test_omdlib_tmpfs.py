@@ -70,6 +70,7 @@ def test_tmpfs_save_then_restore(tmp_path: Path) -> None:
     restored_tmp_files = [
         Path(site_tmp_dir) / "check_mk/piggyback/backed/pig",
         Path(site_tmp_dir) / "check_mk/piggyback_sources/pig",
+        Path(site_tmp_dir) / "check_mk/piggyback_blobs/pig",
     ]
     for file in restored_tmp_files:
         file.parent.mkdir(parents=True, exist_ok=True)